@@ -1,10 +1,28 @@
 # 📦 Importações
+# pandas, numpy, altair e openpyxl são importados só nos trechos que os usam
+# (leitura/exportação de planilhas, tabelas exibidas e análises de fachada),
+# para não pesar no início de cada sessão.
 import streamlit as st
-import pandas as pd
+from streamlit.runtime.scriptrunner import get_script_run_ctx
 import io
-import re
+import hashlib
+import os
 from datetime import datetime
 
+from ppci.regras import (
+    gerar_nome_arquivo, fachada_edificacao, exige_trrf_por_pavimento, abertura_maxima,
+)
+from ppci.grade import (
+    COLUNAS_ANEXOS, COLUNAS_TORRES, OPCOES_AREA_SUBSOLO, OPCOES_CARGA_INCENDIO, OPCOES_NAO_SIM,
+    OPCOES_NUMERO_SUBSOLOS, OPCOES_SIM_NAO, OPCOES_TRATAMENTO, OPCOES_USO_ANEXO, edificacoes_da_grade,
+)
+from ppci.cache import CACHE_RESULTADOS, avaliar_trrf_compartilhado
+from ppci.incremental import AvaliacaoSite
+from ppci.ingestao import carregar_planilha, nome_projeto_do_arquivo
+from ppci.perfil import Perfil, gravar_log
+from ppci.registros import Anexo, ColecaoEdificacoes, Torre
+from ppci.relatorio import dados_relatorio, hash_normalizado, pdf_disponivel, solicitar_relatorio
+
 # ⚙️ Configuração da página
 st.set_page_config(page_title="Gestão de Projetos PPCI", layout="centered")
 st.title("📁 Ferramenta de Projetos PPCI")
@@ -20,221 +38,8 @@ if 'edificacoes_finais' not in st.session_state:
     st.session_state.edificacoes_finais = []
 if 'processamento_concluido' not in st.session_state:
     st.session_state.processamento_concluido = False
-
-
-# 🧠 Funções auxiliares
-
-def gerar_nome_arquivo(nome_projeto, nome_arquivo_entrada=None):
-    if nome_arquivo_entrada:
-        match = re.search(r"-R(\d+)", nome_arquivo_entrada)
-        numero = int(match.group(1)) + 1 if match else 1
-        novo_nome = re.sub(r"-R\d+", f"-R{numero:02}", nome_arquivo_entrada)
-    else:
-        novo_nome = f"checklistINC_{nome_projeto}-R00.xlsx"
-    return novo_nome
-
-def faixa_altura(h):
-    if h == 0:
-        return "Térrea"
-    elif h < 6:
-        return "H < 6 m"
-    elif h < 12:
-        return "6 ≤ H < 12 m"
-    elif h < 23:
-        return "12 ≤ H < 23 m"
-    elif h < 30:
-        return "23 ≤ H < 30 m"
-    else:
-        return "Acima de 30 m"
-
-def medidas_tabela_completa(faixa):
-    tabela = {
-        "Acesso de Viatura na Edificação": ["X"] * 6,
-        "Segurança Estrutural contra Incêndio": ["X"] * 6,
-        "Compartimentação Horizontal ou de Área": ["X⁴"] * 6,
-        "Compartimentação de Verticais": ["", "", "", "X²", "X²", "X²"],
-        "Controle de Materiais de Acabamento": ["", "", "", "X", "X", "X"],
-        "Saídas de Emergência": ["X", "X", "X", "X", "X", "X¹"],
-        "Brigada de Incêndio": ["X"] * 6,
-        "Iluminação de Emergência": ["X"] * 6,
-        "Alarme de Incêndio": ["X³", "X³", "X³", "X³", "X³", "X"],
-        "Sinalização de Emergência": ["X"] * 6,
-        "Extintores": ["X"] * 6,
-        "Hidrantes e Mangotinhos": ["X"] * 6
-    }
-    faixas = ["Térrea", "H < 6 m", "6 ≤ H < 12 m", "12 ≤ H < 23 m", "23 ≤ H < 30 m", "Acima de 30 m"]
-    idx = faixas.index(faixa)
-    return {medida: tabela[medida][idx] for medida in tabela}
-
-def medidas_tabela_simplificada(num_pavimentos):
-    iluminacao_aplicavel = "X" if num_pavimentos > 2 else "-"
-
-    tabela = {
-        "Acesso de Viatura na Edificação": ["X"], 
-        "Segurança Estrutural contra Incêndio": ["X"], 
-        "Compartimentação Horizontal ou de Área": ["X⁴"],
-        "Compartimentação de Verticais": ["-"],
-        "Controle de Materiais de Acabamento": ["-"],
-        "Saídas de Emergência": ["X"],
-        "Brigada de Incêndio": ["-"],
-        "Iluminação de Emergência": [iluminacao_aplicavel],
-        "Alarme de Incêndio": ["X³"],
-        "Sinalização de Emergência": ["X"],
-        "Extintores": ["X"],
-        "Hidrantes e Mangotinhos": ["-"]
-    }
-    return {medida: tabela[medida][0] for medida in tabela}
-
-def medidas_por_enquadramento(area_consolidada, altura, num_pavimentos):
-    """Determina o conjunto de medidas de segurança com base na área e altura."""
-    
-    if area_consolidada > 750 or altura > 12:
-        faixa = faixa_altura(altura)
-        return medidas_tabela_completa(faixa)
-    else:
-        return medidas_tabela_simplificada(num_pavimentos)
-
-
-def notas_relevantes(resumo, altura, num_pavimentos, is_tabela_simplificada):
-    notas = []
-    
-    if not is_tabela_simplificada:
-        if altura >= 80:
-            notas.append("1 – Deve haver Elevador de Emergência para altura maior que 80 m")
-        if any("X²" in v for v in resumo.values()):
-            notas.append("2 – Pode ser substituída por sistema de controle de fumaça somente nos átrios")
-        if any("X³" in v for v in resumo.values()):
-            notas.append("3 – O sistema de alarme pode ser setorizado na central junto à portaria, desde que tenha vigilância 24 horas")
-        if any("X⁴" in v for v in resumo.values()):
-            notas.append("4 – Devem ser atendidas somente as regras específicas de compartimentação entre unidades autônomas")
-
-    if is_tabela_simplificada and resumo.get("Iluminação de Emergência") == "X":
-        notas.append("5 – Iluminação de Emergência: Somente para as edificações com mais de dois pavimentos (regra simplificada).")
-        
-    return notas
-
-def fachada_edificacao(edf):
-    if "um_ap_por_pav" in edf and edf["um_ap_por_pav"] == "Sim":
-        return "toda a fachada do pavimento"
-    elif "terrea" in edf and edf["terrea"] == "Sim":
-        return "toda a fachada do edifício"
-    elif "altura" in edf and "area" in edf:
-        if edf["area"] <= 750 and edf["altura"] < 12:
-            return "toda a área da fachada"
-        elif edf["area"] > 750 and edf["altura"] < 12:
-            return "fachada da área do maior compartimento"
-        elif edf["area"] > 750 and edf["altura"] >= 12:
-            return "fachada da área do maior compartimento"
-        else:
-            return "toda a área da fachada"
-    else:
-        return "toda a fachada do edifício"
-
-def buscar_valor_tabela_simplificada(porcentagem, num_pavimentos):
-    # Lógica da Tabela Simplificada para Distância (Tabela A.4 NT-07)
-    tabela = {
-        1: {10: 4, 20: 5, 30: 6, 40: 7, 50: 8, 70: 9, 100: 10},
-        2: {10: 6, 20: 7, 30: 8, 40: 9, 50: 10, 70: 11, 100: 12},
-        3: {10: 8, 20: 9, 30: 10, 40: 11, 50: 12, 70: 13, 100: 14}
-    }
-    num_pavimentos_lookup = min(num_pavimentos, 3) 
-
-    porcentagens_lookup = sorted(tabela[num_pavimentos_lookup].keys())
-    
-    porcentagem_clamped = max(min(porcentagem, 100), 10) 
-    porcentagem_mais_proxima = min(porcentagens_lookup, key=lambda p: abs(p - porcentagem_clamped))
-    
-    return tabela[num_pavimentos_lookup][porcentagem_mais_proxima]
-
-def buscar_valor_tabela(porcentagem, fator_x):
-    """
-    Calcula o Fator Alfa (α) usando Interpolação Linear Bidimensional.
-    (Fator Alfa é o valor da Tabela A.3 da NT-07)
-    """
-    tabela_data = {
-        20: [0.4, 0.4, 0.44, 0.46, 0.48, 0.49, 0.5, 0.51, 0.51, 0.51, 0.51, 0.51, 0.51, 0.51, 0.51, 0.51, 0.51],
-        30: [0.6, 0.66, 0.73, 0.79, 0.84, 0.88, 0.9, 0.92, 0.93, 0.94, 0.94, 0.95, 0.95, 0.95, 0.95, 0.95, 0.95],
-        40: [0.8, 0.8, 0.94, 1.02, 1.1, 1.17, 1.23, 1.27, 1.3, 1.32, 1.33, 1.33, 1.34, 1.34, 1.34, 1.34, 1.34, 1.34],
-        50: [0.9, 1.0, 1.11, 1.22, 1.33, 1.42, 1.51, 1.58, 1.63, 1.66, 1.69, 1.7, 1.71, 1.71, 1.71, 1.71, 1.71, 1.71],
-        60: [1.0, 1.14, 1.26, 1.39, 1.52, 1.64, 1.76, 1.85, 1.93, 1.99, 2.03, 2.05, 2.07, 2.08, 2.08, 2.08, 2.08, 2.08],
-        80: [1.2, 1.37, 1.52, 1.68, 1.85, 2.02, 2.18, 2.34, 2.48, 2.59, 2.67, 2.73, 2.77, 2.79, 2.8, 2.81, 2.81],
-        100: [1.4, 1.56, 1.74, 1.93, 2.13, 2.34, 2.55, 2.76, 2.95, 3.12, 3.26, 3.36, 3.43, 3.48, 3.51, 3.52, 3.53]
-    }
-    y_values = sorted(tabela_data.keys()) # Eixo Y (Porcentagem de Abertura)
-    x_values = [1.0, 1.3, 1.6, 2.0, 2.5, 3.2, 4.0, 5.0, 6.0, 8.0, 10.0, 13.0, 16.0, 20.0, 25.0, 32.0, 40.0] # Eixo X (Fator X)
-
-    def linear_interpolate(x, x1, x2, y1, y2):
-        if x2 == x1: return y1
-        return y1 + (x - x1) * (y2 - y1) / (x2 - x1)
-
-    # 1. ANCORAGEM/CLAMPING (Piso e Teto)
-    porcentagem = max(porcentagem, 20) # Garante o piso de 20%
-    fator_x = max(min(fator_x, 40.0), 1.0) # Limita X entre 1.0 e 40.0
-
-    # 2. LOCALIZAÇÃO DOS PONTOS DE INTERPOLAÇÃO
-    idx1_x = max([i for i, x in enumerate(x_values) if x <= fator_x])
-    idx2_x = min([i for i, x in enumerate(x_values) if x >= fator_x])
-    x1 = x_values[idx1_x]
-    x2 = x_values[idx2_x]
-
-    idx1_y = max([i for i, y in enumerate(y_values) if y <= porcentagem])
-    idx2_y = min([i for i, y in enumerate(y_values) if y >= porcentagem])
-    y1 = y_values[idx1_y]
-    y2 = y_values[idx2_y]
-
-    # 3. INTERPOLAÇÃO
-    if y1 == y2: 
-        v_y1 = tabela_data[y1][idx1_x]
-        v_y2 = tabela_data[y1][idx2_x]
-        final_alpha = linear_interpolate(fator_x, x1, x2, v_y1, v_y2)
-    else:
-        # Interpolação Bidimensional
-        a11 = tabela_data[y1][idx1_x] 
-        a21 = tabela_data[y1][idx2_x] 
-        a12 = tabela_data[y2][idx1_x] 
-        a22 = tabela_data[y2][idx2_x] 
-
-        alpha_y1 = linear_interpolate(fator_x, x1, x2, a11, a21)
-        alpha_y2 = linear_interpolate(fator_x, x1, x2, a12, a22)
-
-        final_alpha = linear_interpolate(porcentagem, y1, y2, alpha_y1, alpha_y2)
-    
-    return final_alpha.item() if hasattr(final_alpha, 'item') else final_alpha 
-
-def consolidar_edificacoes(edificacoes_atuais):
-    edificacoes_consolidadas = []
-    nomes_ja_consolidados = set()
-    
-    todas_edificacoes_copia = [e.copy() for e in edificacoes_atuais] 
-
-    for edificacao in todas_edificacoes_copia:
-        if edificacao["nome"] in nomes_ja_consolidados:
-            continue
-        
-        is_principal_ou_independente = edificacao.get("tratamento") != "Conjunta" or \
-                                      edificacao.get("nome") == edificacao.get("edificacao_conjunta")
-        
-        if is_principal_ou_independente:
-            edificacao_combinada = edificacao.copy()
-            edificacao_combinada['area_original'] = edificacao['area']
-            edificacao_combinada['areas_combinadas_com'] = [edificacao["nome"]]
-            
-            area_total_combinada = edificacao['area']
-            
-            for outra_edificacao in todas_edificacoes_copia:
-                if outra_edificacao["nome"] != edificacao["nome"] and \
-                   outra_edificacao.get("tratamento") == "Conjunta" and \
-                   outra_edificacao.get("edificacao_conjunta") == edificacao["nome"]:
-                       
-                       area_total_combinada += outra_edificacao['area']
-                       edificacao_combinada['areas_combinadas_com'].append(outra_edificacao['nome'])
-                       
-            edificacao_combinada['area'] = area_total_combinada
-            
-            edificacoes_consolidadas.append(edificacao_combinada)
-            nomes_ja_consolidados.add(edificacao["nome"])
-        
-    return edificacoes_consolidadas
+if 'avaliacao_site' not in st.session_state:
+    st.session_state.avaliacao_site = AvaliacaoSite() # Grafo de dependências das grandezas derivadas
 
 
 # --- FUNÇÕES PARA GESTÃO DE COMPARAÇÕES DE ISOLAMENTO DE RISCO ---
@@ -263,9 +68,666 @@ def remove_comparison(index):
 # --- FIM FUNÇÕES GESTÃO DE COMPARAÇÕES ---
 
 
+# --- REPOSITÓRIO LOCAL DE PROJETOS ---
+# Chaves dos widgets do formulário: ao abrir uma revisão elas são descartadas
+# para que os widgets sejam recriados com os valores da revisão aberta.
+PREFIXOS_FORMULARIO = (
+    "num_torres", "num_anexos", "nome_torre_", "area_torre_", "terrea_torre_", "num_pavimentos_torre_",
+    "ap_por_pav_", "subsolo_tecnico_", "numero_subsolos_", "area_subsolo_", "subsolo_ocupado_",
+    "subsolo_menor_50_", "duplex_", "atico_", "altura_torre_", "nome_anexo_", "area_anexo_",
+    "uso_anexo_", "carga_anexo_", "tratamento_", "conjunta_com_", "comparacao_edf1_", "comparacao_edf2_",
+    "largura1_", "altura1_", "abertura1_", "largura2_", "altura2_", "abertura2_", "grade_",
+    "trrf_base_", "trrf_pavimentos_", "pavimentos_trrf_",
+)
+
+@st.cache_resource
+def repositorio_local():
+    """Uma conexão ao repositório SQLite compartilhada por todas as sessões."""
+    from ppci.repositorio import RepositorioProjetos
+    return RepositorioProjetos()
+
+def abrir_revisao(nome_projeto, numero):
+    """Callback do botão "Abrir": carrega a revisão no formulário."""
+    retrato = repositorio_local().abrir(nome_projeto, numero)
+    for chave in [c for c in st.session_state.keys() if c.startswith(PREFIXOS_FORMULARIO)]:
+        del st.session_state[chave]
+    st.session_state.projeto_aberto = (nome_projeto, numero, retrato)
+    st.session_state.comparacoes_extra = retrato["comparacoes"]
+
+def edificacoes_abertas(tipo):
+    """Edificações ("torre" ou "anexo") da revisão aberta, sem os campos vazios."""
+    projeto_aberto = st.session_state.get("projeto_aberto")
+    if not projeto_aberto:
+        return []
+    return [
+        {campo: valor for campo, valor in e.items() if valor is not None}
+        for e in projeto_aberto[2]["edificacoes"] if (e.get("uso") is None) == (tipo == "torre")
+    ]
+
+def valores_abertos(tipo, i):
+    abertas = edificacoes_abertas(tipo)
+    return abertas[i] if i < len(abertas) else {}
+
+def indice_opcao(opcoes, valor):
+    return opcoes.index(valor) if valor in opcoes else 0
+# --- FIM REPOSITÓRIO LOCAL ---
+
+
+# --- EDIÇÃO EM TABELA ---
+# Dois st.data_editor (torres e anexos) no lugar de um formulário por
+# edificação: o número de widgets não cresce com o número de edificações.
+CONFIG_GRADE_TORRES = {
+    "nome": st.column_config.TextColumn("Nome", required=True),
+    "area": st.column_config.NumberColumn("Área (m²)", min_value=0.0, step=1.0),
+    "terrea": st.column_config.SelectboxColumn("Térrea?", options=OPCOES_SIM_NAO),
+    "num_pavimentos": st.column_config.NumberColumn("Pavimentos", min_value=1, step=1),
+    "altura": st.column_config.NumberColumn("Altura (m)", min_value=0.0, step=0.1),
+    "um_ap_por_pav": st.column_config.SelectboxColumn("1 ap./pav.?", options=OPCOES_SIM_NAO),
+    "subsolo_tecnico": st.column_config.SelectboxColumn("Subsolo?", options=OPCOES_NAO_SIM),
+    "numero_subsolos": st.column_config.SelectboxColumn("Nº de subsolos", options=OPCOES_NUMERO_SUBSOLOS),
+    "area_subsolo": st.column_config.SelectboxColumn("Área do subsolo", options=OPCOES_AREA_SUBSOLO),
+    "subsolo_ocupado": st.column_config.SelectboxColumn("Subsolo com ocupação?", options=OPCOES_NAO_SIM),
+    "subsolo_menor_50": st.column_config.SelectboxColumn("Ocupação ≤ 50m²?", options=OPCOES_NAO_SIM),
+    "duplex": st.column_config.SelectboxColumn("Duplex?", options=OPCOES_NAO_SIM),
+    "atico": st.column_config.SelectboxColumn("Ático?", options=OPCOES_NAO_SIM),
+    "tratamento": st.column_config.SelectboxColumn("Tratamento", options=OPCOES_TRATAMENTO),
+    "edificacao_conjunta": st.column_config.TextColumn("Conjunta com (torre)"),
+}
+CONFIG_GRADE_ANEXOS = {
+    "nome": st.column_config.TextColumn("Nome", required=True),
+    "area": st.column_config.NumberColumn("Área (m²)", min_value=0.0, step=1.0),
+    "uso": st.column_config.SelectboxColumn("Uso/Ocupação", options=OPCOES_USO_ANEXO),
+    "carga_incendio": st.column_config.SelectboxColumn("Carga de incêndio", options=OPCOES_CARGA_INCENDIO),
+    "tratamento": st.column_config.SelectboxColumn("Tratamento", options=OPCOES_TRATAMENTO),
+    "edificacao_conjunta": st.column_config.TextColumn("Anexado à (torre)"),
+}
+MAX_ERROS_GRADE = 20
+
+def grade_inicial(tipo):
+    """Linhas iniciais da tabela: as da revisão aberta ou uma linha com os padrões do formulário."""
+    import pandas as pd
+    colunas = COLUNAS_TORRES if tipo == "torre" else COLUNAS_ANEXOS
+    linhas = edificacoes_abertas(tipo)
+    if not st.session_state.get("projeto_aberto"):
+        linhas = [{"nome": "Edificação a", "area": 750.0, "terrea": "Sim"}] if tipo == "torre" else [{"nome": "Anexo a", "area": 50.0}]
+    df_grade = pd.DataFrame([{coluna: linha.get(coluna) for coluna in colunas} for linha in linhas], columns=colunas)
+    tipos = {"area": "float", "altura": "float", "num_pavimentos": "Int64"} if tipo == "torre" else {"area": "float"}
+    return df_grade.astype(tipos)
+
+def editar_em_grade():
+    """Tabelas editáveis de torres e anexos; devolve (torres, anexos) já validados."""
+    for tipo in ("torre", "anexo"):
+        if f"grade_base_{tipo}" not in st.session_state:
+            st.session_state[f"grade_base_{tipo}"] = grade_inicial(tipo) # Base fixa: as edições ficam no widget
+
+    st.markdown("### 🏢 Edificações Residenciais")
+    df_torres = st.data_editor(
+        st.session_state.grade_base_torre, column_config=CONFIG_GRADE_TORRES,
+        num_rows="dynamic", hide_index=True, key="grade_torres",
+    )
+    st.markdown("### 📎 Anexos do Projeto")
+    df_anexos = st.data_editor(
+        st.session_state.grade_base_anexo, column_config=CONFIG_GRADE_ANEXOS,
+        num_rows="dynamic", hide_index=True, key="grade_anexos",
+    )
+    st.caption("💡 Em torres térreas, subsolos, duplex, ático e altura são ignorados; sem subsolo, as colunas de subsolo também.")
+
+    torres, anexos, erros = edificacoes_da_grade(df_torres.to_dict("records"), df_anexos.to_dict("records"))
+    if erros:
+        excedentes = len(erros) - MAX_ERROS_GRADE
+        st.error(
+            "Linhas com problemas (fora da avaliação até serem corrigidas):\n"
+            + "\n".join(f"- {erro}" for erro in erros[:MAX_ERROS_GRADE])
+            + (f"\n- ... e mais {excedentes}" if excedentes > 0 else "")
+        )
+    return torres, anexos
+# --- FIM EDIÇÃO EM TABELA ---
+
+
+# --- TRRF POR PAVIMENTO ---
+def render_trrf_pavimentos(edificacao, i, estrutura_terrea="Não"):
+    """Pavimentos editáveis (de baixo para cima) e o TRRF resultante de cada um."""
+    import pandas as pd
+    from ppci.trrf import COLUNAS_PAVIMENTOS, USOS_PAVIMENTO, pavimentos_padrao, trrf_site
+    padrao = pavimentos_padrao(edificacao)
+    # Base fixa enquanto o cadastro não muda a lista de pavimentos: as edições ficam no widget.
+    # Se o editor deixou de ser exibido (outra edificação no navegador), a base
+    # volta a partir dos pavimentos já editados, guardados em pavimentos_trrf_{i}.
+    assinatura = tuple((p["Pavimento"], p["Uso"]) for p in padrao)
+    chave_editor = f"trrf_pavimentos_{i}_{len(padrao)}"
+    base = st.session_state.get(f"trrf_base_{i}")
+    if base is None or base[0] != assinatura or chave_editor not in st.session_state:
+        salvos = st.session_state.get(f"pavimentos_trrf_{i}") if base is not None and base[0] == assinatura else None
+        st.session_state[f"trrf_base_{i}"] = (assinatura, pd.DataFrame(salvos or padrao, columns=COLUNAS_PAVIMENTOS).astype({"Profundidade (m)": "float"}))
+
+    st.markdown("**TRRF por pavimento** (de baixo para cima; ajuste o uso de cada pavimento e a profundidade dos subsolos)")
+    df_pavimentos = st.data_editor(
+        st.session_state[f"trrf_base_{i}"][1], num_rows="dynamic", hide_index=True, key=chave_editor,
+        column_config={
+            "Uso": st.column_config.SelectboxColumn("Uso", options=sorted({*USOS_PAVIMENTO, *(p["Uso"] for p in padrao)}), required=True),
+            "Subsolo": st.column_config.CheckboxColumn("Subsolo?"),
+            "Profundidade (m)": st.column_config.NumberColumn("Profundidade (m)", min_value=0.0, step=0.5),
+        },
+    )
+    pavimentos = df_pavimentos.to_dict("records")
+    st.session_state[f"pavimentos_trrf_{i}"] = pavimentos
+    try:
+        _, linhas = trrf_site([edificacao], [pavimentos], [estrutura_terrea])[0]
+    except ValueError as e:
+        st.error(str(e))
+        return
+    st.dataframe([{k: v for k, v in linha.items() if k != "Edificação"} for linha in reversed(linhas)], hide_index=True)
+    maximo = max((linha["TRRF (min)"] or 0 for linha in linhas), default=0)
+    if maximo:
+        st.caption(f"Maior TRRF exigido: **{maximo} min**. Nenhum pavimento fica abaixo do pavimento imediatamente superior.")
+# --- FIM TRRF POR PAVIMENTO ---
+
+
+# --- FRAGMENTOS DO ISOLAMENTO DE RISCO ---
+# Cada bloco abaixo é um st.fragment: alterar uma fachada reexecuta apenas o
+# cartão da comparação, sem refazer formulários, consolidação e medidas.
+
+def render_fachada(comp, i, lado, edf_data):
+    """Inputs e resultados de uma das fachadas (lado 1 ou 2) de uma comparação."""
+    nome = edf_data.nome
+    st.markdown(f"**Fachada a usar na comparação (Edificação {lado} - {nome}):** {fachada_edificacao(edf_data)}")
+    col_calc = st.columns(4)
+    with col_calc[0]:
+        comp[f'largura{lado}'] = st.number_input(f"Largura Fachada {nome} (m)", min_value=0.0, step=0.1, key=f"largura{lado}_{i}", value=comp.get(f'largura{lado}', 0.0))
+    with col_calc[1]:
+        comp[f'altura{lado}'] = st.number_input(f"Altura Fachada {nome} (m)", min_value=0.0, step=0.1, key=f"altura{lado}_{i}", value=comp.get(f'altura{lado}', 0.0))
+    with col_calc[2]:
+        st.metric(label=f"Área Fachada {nome} (m²)", value=f"{comp[f'largura{lado}'] * comp[f'altura{lado}']:.2f}")
+    with col_calc[3]:
+        comp[f'abertura{lado}'] = st.number_input(f"Área Abertura {nome} (m²)", min_value=0.0, step=0.1, key=f"abertura{lado}_{i}", value=comp.get(f'abertura{lado}', 0.0))
+
+    # Só é recalculada se a fachada, a edificação ou os bombeiros mudaram
+    distancia_final = st.session_state.avaliacao_site.distancia(
+        i, lado, comp[f'largura{lado}'], comp[f'altura{lado}'], comp[f'abertura{lado}'],
+        nome, st.session_state.bombeiros,
+    )
+    st.metric(label=f"Distância de isolamento (Edificação {lado})", value=f"{distancia_final:.2f} m")
+
+@st.fragment
+def render_comparacao(i, opcoes_edf):
+    """Cartão de uma comparação de isolamento; reexecuta isoladamente."""
+    if i >= len(st.session_state.comparacoes_extra):
+        return
+    comp = st.session_state.comparacoes_extra[i]
+
+    # 1. TRATAMENTO DE VALOR INICIAL PARA SELEÇÃO (Edificação 1)
+    if comp['edf1_nome'] is None or comp['edf1_nome'] not in opcoes_edf:
+        comp['edf1_nome'] = opcoes_edf[0] if opcoes_edf else None
+        
+    # 2. TRATAMENTO DE VALOR INICIAL PARA EDIFICAÇÃO 2
+    opcoes_edf2 = [n for n in opcoes_edf if n != comp['edf1_nome']]
+    if not opcoes_edf2:
+         comp['edf2_nome'] = None
+    elif comp['edf2_nome'] is None or comp['edf2_nome'] not in opcoes_edf2:
+        comp['edf2_nome'] = opcoes_edf2[0]
+    
+    st.markdown(f"#### Comparação {i+1}: Risco entre {comp.get('edf1_nome', '...')} e {comp.get('edf2_nome', '...')}")
+    
+    col_init = st.columns(3)
+    
+    # Edificação 1 (Input)
+    with col_init[0]:
+        index_edf1 = opcoes_edf.index(comp['edf1_nome']) if comp['edf1_nome'] in opcoes_edf else 0
+        
+        comp['edf1_nome'] = st.selectbox(
+            "Edificação 1:", 
+            opcoes_edf, 
+            key=f"comparacao_edf1_{i}",
+            index=index_edf1
+        )
+    
+    # Edificação 2 (Input)
+    with col_init[1]:
+        # Recalcula as opções após a seleção da Edificação 1
+        opcoes_edf2 = [n for n in opcoes_edf if n != comp['edf1_nome']]
+        
+        # Se não há mais opções, garante que a seleção seja None
+        if not opcoes_edf2:
+            comp['edf2_nome'] = None
+            index_edf2 = 0
+        elif comp['edf2_nome'] not in opcoes_edf2:
+             comp['edf2_nome'] = opcoes_edf2[0]
+             index_edf2 = 0
+        else:
+             index_edf2 = opcoes_edf2.index(comp['edf2_nome'])
+
+        comp['edf2_nome'] = st.selectbox(
+            "Edificação 2:", 
+            opcoes_edf2, 
+            key=f"comparacao_edf2_{i}",
+            index=index_edf2
+        )
+
+    # Botão de Remover (a lista de cartões muda, então reexecuta o app inteiro)
+    with col_init[2]:
+        st.write("") 
+        if st.button(f"➖ Remover", key=f"remove_comp_{i}"):
+            remove_comparison(i)
+            st.rerun()
+
+    # Os dados para cálculo devem vir da lista CONSOLIDADA
+    edf1_data = next((e for e in st.session_state.edificacoes_finais if e.nome == comp['edf1_nome']), None)
+    edf2_data = next((e for e in st.session_state.edificacoes_finais if e.nome == comp['edf2_nome']), None)
+
+    # Só exibe os campos de input de cálculo se houver 2 edificações válidas para comparação
+    if edf1_data and edf2_data and edf1_data.nome != edf2_data.nome:
+        render_fachada(comp, i, 1, edf1_data)
+        render_fachada(comp, i, 2, edf2_data)
+    
+    st.markdown("<div style='border-top: 2px solid #ddd; margin-top: 20px; margin-bottom: 20px'></div>", unsafe_allow_html=True)
+
+@st.fragment
+def render_todos_os_pares(nomes_edificacoes_finais):
+    """Matriz de distâncias exigidas entre todos os pares de edificações consolidadas."""
+    import pandas as pd
+    from ppci.vetorizado import matriz_isolamento, pares_em_violacao
+    edificacoes_pares = [e for e in st.session_state.edificacoes_finais if e.nome]
+    st.markdown("**Fachada de cada edificação** (usada na comparação com todas as demais)")
+    df_fachadas = st.data_editor(
+        pd.DataFrame({
+            "Edificação": nomes_edificacoes_finais,
+            "Largura (m)": 10.00, "Altura (m)": 2.70, "Abertura (m²)": 3.36,
+        }),
+        disabled=["Edificação"], hide_index=True, key="fachadas_todos_pares"
+    )
+    st.markdown("**Afastamento disponível entre as edificações (m)** — deixe em branco os pares sem afastamento definido")
+    df_espacamentos = st.data_editor(
+        pd.DataFrame(float("nan"), index=nomes_edificacoes_finais, columns=nomes_edificacoes_finais),
+        key="espacamentos_todos_pares"
+    )
+
+    _, exigidas, violacoes = matriz_isolamento(
+        edificacoes_pares,
+        df_fachadas["Largura (m)"].to_numpy(dtype=float),
+        df_fachadas["Altura (m)"].to_numpy(dtype=float),
+        df_fachadas["Abertura (m²)"].to_numpy(dtype=float),
+        st.session_state.bombeiros,
+        df_espacamentos.to_numpy(dtype=float),
+    )
+    st.markdown("**Distância de isolamento exigida entre cada par (m)**")
+    st.dataframe(pd.DataFrame(exigidas, index=nomes_edificacoes_finais, columns=nomes_edificacoes_finais).round(2))
+
+    pares_violados = pares_em_violacao(nomes_edificacoes_finais, exigidas, violacoes, df_espacamentos.to_numpy(dtype=float))
+    for nome_a, nome_b, exigida, disponivel in pares_violados:
+        st.error(f"❌ {nome_a} × {nome_b}: afastamento disponível de {disponivel:.2f} m, exigido {exigida:.2f} m.")
+    if not pares_violados:
+        st.success("✅ Nenhum par com afastamento disponível menor que o exigido.")
+    st.markdown("<div style='border-top: 2px solid #ddd; margin-top: 20px; margin-bottom: 20px'></div>", unsafe_allow_html=True)
+
+@st.fragment
+def render_estudo_abertura(nomes_edificacoes_finais):
+    """Abertura máxima para um afastamento (problema inverso) e varredura de largura x altura x abertura."""
+    import altair as alt
+    import numpy as np
+    import pandas as pd
+    from ppci.vetorizado import varredura_isolamento
+    nome_estudo = st.selectbox("Edificação estudada", nomes_edificacoes_finais, key="estudo_edificacao")
+    edificacao_estudo = next(e for e in st.session_state.edificacoes_finais if e.nome == nome_estudo)
+
+    st.markdown("**🎯 Abertura máxima para o afastamento disponível**")
+    col_inv = st.columns(3)
+    with col_inv[0]:
+        largura_inv = st.number_input("Largura da fachada (m)", min_value=0.0, step=0.1, value=10.0, key="estudo_largura")
+    with col_inv[1]:
+        altura_inv = st.number_input("Altura da fachada (m)", min_value=0.0, step=0.1, value=2.7, key="estudo_altura")
+    with col_inv[2]:
+        afastamento_inv = st.number_input("Afastamento disponível (m)", min_value=0.0, step=0.1, value=5.0, key="estudo_afastamento")
+    abertura_max = abertura_maxima(largura_inv, altura_inv, afastamento_inv, edificacao_estudo, st.session_state.bombeiros)
+    if abertura_max is None:
+        st.error("❌ Nem a fachada sem aberturas atende a esse afastamento.")
+    else:
+        area_fachada_inv = largura_inv * altura_inv
+        st.metric("Abertura máxima", f"{abertura_max:.2f} m²", f"{abertura_max / area_fachada_inv * 100:.1f}% da fachada", delta_color="off")
+
+    st.markdown("**📈 Varredura (largura × altura × abertura)**")
+    col_var = st.columns(3)
+    with col_var[0]:
+        faixa_largura = st.slider("Largura (m)", 1.0, 60.0, (5.0, 30.0), key="estudo_faixa_largura")
+    with col_var[1]:
+        faixa_altura_fachada = st.slider("Altura (m)", 1.0, 60.0, (2.7, 12.0), key="estudo_faixa_altura")
+    with col_var[2]:
+        faixa_abertura = st.slider("Abertura (m²)", 0.0, 200.0, (1.0, 40.0), key="estudo_faixa_abertura")
+    pontos = st.slider("Pontos por eixo", 5, 40, 12, key="estudo_pontos")
+
+    larguras = np.linspace(*faixa_largura, pontos)
+    alturas = np.linspace(*faixa_altura_fachada, pontos)
+    aberturas = np.linspace(*faixa_abertura, pontos)
+    distancias = varredura_isolamento(larguras, alturas, aberturas, edificacao_estudo, st.session_state.bombeiros)
+
+    indice_altura = st.select_slider(
+        "Altura da fachada exibida (m)", options=list(range(pontos)), format_func=lambda i: f"{alturas[i]:.2f}", key="estudo_altura_exibida"
+    )
+    df_varredura = pd.DataFrame(
+        distancias[:, indice_altura, :].T,
+        index=pd.Index(aberturas.round(2), name="Abertura (m²)"),
+        columns=pd.Index(larguras.round(2), name="Largura (m)"),
+    )
+    df_longo = df_varredura.stack().rename("Distância (m)").reset_index()
+    st.altair_chart(
+        alt.Chart(df_longo).mark_rect().encode(
+            x=alt.X("Largura (m):O"), y=alt.Y("Abertura (m²):O", sort="descending"),
+            color=alt.Color("Distância (m):Q", scale=alt.Scale(scheme="orangered")),
+            tooltip=["Largura (m)", "Abertura (m²)", alt.Tooltip("Distância (m):Q", format=".2f")],
+        ),
+        use_container_width=True,
+    )
+    st.dataframe(df_varredura.round(2))
+    st.markdown("<div style='border-top: 2px solid #ddd; margin-top: 20px; margin-bottom: 20px'></div>", unsafe_allow_html=True)
+
+@st.cache_resource(max_entries=8)
+def blocos_implantacao(conteudo, nome_arquivo):
+    """Leitura do arquivo de implantação, compartilhada entre reruns e sessões."""
+    from ppci.geometria import ler_implantacao
+    return ler_implantacao(conteudo, nome_arquivo)
+
+def criar_comparacoes_implantacao(linhas):
+    """Callback: um cartão de comparação por par de edificações, com as fachadas medidas na implantação."""
+    existentes = {frozenset((c['edf1_nome'], c['edf2_nome'])) for c in st.session_state.comparacoes_extra}
+    for linha in linhas:
+        par = frozenset((linha["Edificação 1"], linha["Edificação 2"]))
+        if par in existentes:
+            continue
+        existentes.add(par)
+        st.session_state.comparacoes_extra.append({
+            'edf1_nome': linha["Edificação 1"], 'edf2_nome': linha["Edificação 2"],
+            **{f'{campo}{lado}': linha[f"{rotulo} {lado} ({unidade})"] for lado in (1, 2)
+               for campo, rotulo, unidade in (("largura", "Largura", "m"), ("altura", "Altura", "m"), ("abertura", "Abertura", "m²"))},
+        })
+
+@st.fragment
+def render_implantacao(nomes_edificacoes_finais):
+    """Fachadas e afastamentos reais lidos de um arquivo de implantação (GeoJSON ou DXF)."""
+    from ppci.geometria import FOLGA_PADRAO, PORCENTAGEM_ABERTURA_PADRAO, afastamentos, associar_cadastro
+    arquivo = st.file_uploader(
+        "Implantação (.geojson ou .dxf, em metros)", type=["geojson", "json", "dxf"], key="implantacao_arquivo",
+        help="GeoJSON: polígonos com as propriedades nome e altura. DXF: polilinhas fechadas, com o nome na camada e a altura na espessura.",
+    )
+    col_impl = st.columns(2)
+    with col_impl[0]:
+        porcentagem_abertura = st.number_input("Aberturas das fachadas (% da área)", min_value=0.0, max_value=100.0, step=5.0, value=PORCENTAGEM_ABERTURA_PADRAO, key="implantacao_abertura")
+    with col_impl[1]:
+        folga = st.number_input("Listar também os pares que atendem por menos de (m)", min_value=0.0, step=0.5, value=FOLGA_PADRAO, key="implantacao_folga")
+    if not arquivo:
+        return
+    try:
+        blocos = blocos_implantacao(arquivo.getvalue(), arquivo.name)
+    except Exception as e:
+        st.error(f"Erro ao ler a implantação: {e}")
+        return
+
+    blocos, sem_cadastro = associar_cadastro(blocos, st.session_state.edificacoes_finais)
+    if sem_cadastro:
+        st.caption(f"Sem correspondência no cadastro (avaliadas com os dados do arquivo): {', '.join(sem_cadastro)}")
+    resultado = afastamentos(blocos, st.session_state.bombeiros, porcentagem_abertura, folga)
+    resumo = resultado["resumo"]
+    st.caption(f"{resumo['blocos']} blocos · {resumo['fachadas']} fachadas · {resumo['pares_examinados']} pares de fachadas próximas examinados")
+
+    linhas = resultado["linhas"]
+    if not linhas:
+        st.success("✅ Nenhum par de fachadas voltadas uma para a outra a menos da distância exigida.")
+        return
+    st.dataframe(linhas, hide_index=True, use_container_width=True)
+    if resumo["violacoes"]:
+        st.error(f"❌ {resumo['violacoes']} pares de edificações sem o afastamento exigido.")
+    else:
+        st.success("✅ Todos os pares listados têm o afastamento exigido.")
+
+    cadastradas = [l for l in linhas if l["Edificação 1"] in nomes_edificacoes_finais and l["Edificação 2"] in nomes_edificacoes_finais]
+    if cadastradas and st.button(f"📋 Criar {len(cadastradas)} comparações com as fachadas medidas", key="implantacao_criar_comparacoes"):
+        criar_comparacoes_implantacao(cadastradas)
+        st.rerun() # a lista de cartões muda: reexecuta o app inteiro
+
+@st.fragment
+def render_isolamento():
+    """Bloco de Isolamento entre Edificações; reexecuta sem refazer o restante da página."""
+    # --- PREPARAÇÃO DA LISTA DE OPÇÕES ---
+    nomes_edificacoes_finais = [e.nome for e in st.session_state.edificacoes_finais if e.nome]
+    
+    st.markdown("<div style='border-top: 6px solid #555; margin-top: 20px; margin-bottom: 20px'></div>", unsafe_allow_html=True)
+    st.markdown("### Isolamento entre Edificações (Análise de Fachada)")
+    
+    st.radio("Há corpo de bombeiros com viatura de combate a incêndio na cidade?", ["Sim", "Não"], key="bombeiros")
+
+    # --- AVALIAÇÃO DE TODOS OS PARES ---
+    if len(nomes_edificacoes_finais) >= 2 and st.checkbox("Avaliar todos os pares de edificações de uma só vez", key="isolamento_todos_pares"):
+        render_todos_os_pares(nomes_edificacoes_finais)
+
+    # --- ESTUDO DE ABERTURAS ---
+    if nomes_edificacoes_finais and st.checkbox("Estudar aberturas da fachada (abertura máxima e varredura)", key="isolamento_estudo_abertura"):
+        render_estudo_abertura(nomes_edificacoes_finais)
+
+    # --- IMPLANTAÇÃO GEOMÉTRICA ---
+    if st.checkbox("Importar implantação (GeoJSON ou DXF) e verificar os afastamentos reais", key="isolamento_implantacao"):
+        render_implantacao(nomes_edificacoes_finais)
+
+    # --- GESTÃO DINÂMICA DE COMPARAÇÕES ---
+    if st.button("➕ Adicionar Comparação de Isolamento de Risco", on_click=add_comparison):
+        pass 
+    
+    if len(nomes_edificacoes_finais) < 2:
+        st.warning("É necessário que hajam pelo menos duas edificações ou grupos consolidados (Independentes) para fazer uma comparação de isolamento de risco.")
+    
+    # Loop sobre as comparações dinâmicas (fachadas de comparações removidas saem do grafo)
+    st.session_state.avaliacao_site.atualizar_comparacoes(range(len(st.session_state.comparacoes_extra)))
+    if nomes_edificacoes_finais:
+        for i in range(len(st.session_state.comparacoes_extra)):
+            render_comparacao(i, nomes_edificacoes_finais)
+        
+    st.markdown(
+        "<span style='color:red'>⚠️ Ao terminar as análises, volte e revise as considerações de **independência** de cada edificação/anexo.</span>", 
+        unsafe_allow_html=True
+    )
+    
+    st.markdown("### 📝 Comentários sobre Isolamento de Risco")
+    st.text_area("Observações sobre distanciamento e isolamento de risco.", key="comentario_isolamento_geral")
+# --- FIM FRAGMENTOS DO ISOLAMENTO ---
+
+
+# --- DETALHAMENTO DAS MEDIDAS ---
+# Só a edificação selecionada no navegador tem o detalhamento renderizado; as
+# respostas das demais continuam no session_state (ver preservar_respostas_detalhe).
+PREFIXOS_RESPOSTAS_DETALHE = ("hidrante_recalque_", "estrutura_terrea_", "cobertura_trrf_", "trrf_adotado_", "comentario_estrutural_")
+
+def preservar_respostas_detalhe():
+    """
+    O Streamlit descarta o estado de widgets que deixam de ser renderizados;
+    regravar as chaves a cada rerun as mantém para quando a edificação voltar
+    a ser exibida (e para a exportação).
+    """
+    for chave in [c for c in st.session_state.keys() if c.startswith(PREFIXOS_RESPOSTAS_DETALHE)]:
+        st.session_state[chave] = st.session_state[chave]
+
+def resumo_medidas_site(edificacoes):
+    """Uma linha por edificação com a aplicação de cada medida; remontada só quando algum enquadramento muda."""
+    classificacoes = [st.session_state.avaliacao_site.classificacao(e.nome) for e in edificacoes]
+    assinatura = tuple((e.nome, e.area, entrada.chave, notas) for e, (entrada, notas) in zip(edificacoes, classificacoes))
+    guardado = st.session_state.get("resumo_medidas_site")
+    if guardado is None or guardado[0] != assinatura:
+        linhas = [
+            {"Edificação": e.nome, "Área consolidada (m²)": round(e.area, 2), "Tabela": "Simplificada" if entrada.tabela_simplificada else "Completa", **entrada.medidas}
+            for e, (entrada, _) in zip(edificacoes, classificacoes)
+        ]
+        st.session_state.resumo_medidas_site = guardado = (assinatura, linhas)
+    return guardado[1]
+
+@st.fragment
+def render_detalhe_medidas(i):
+    """Tabela, notas e detalhamento por medida de uma edificação; reexecuta isoladamente."""
+    if i is None or i >= len(st.session_state.edificacoes_finais):
+        return
+    edificacao = st.session_state.edificacoes_finais[i]
+    nome_edificacao = edificacao.nome or f"Edificação {i+1}"
+    st.markdown(f"### 🏢 {nome_edificacao}")
+
+    # Uma consulta ao índice de decisão compilado: medidas e notas já resolvidas
+    enquadramento, notas = st.session_state.avaliacao_site.classificacao(edificacao.nome)
+    resumo = enquadramento.medidas
+
+    st.markdown("### Tabela de Medidas de Segurança Aplicáveis")
+    st.info(f"Área Consolidada utilizada para Enquadramento: **{edificacao.area:.2f} m²**")
+    import pandas as pd
+    df_resumo = pd.DataFrame.from_dict(dict(resumo), orient='index', columns=["Aplicação"])
+    st.table(df_resumo)
+
+    if notas:
+        st.markdown("### Notas Específicas")
+        for nota in notas:
+            st.markdown(f"- {nota}")
+
+    # Detalhamento para "Acesso de Viatura"
+    if "X" in resumo.get("Acesso de Viatura na Edificação", ""):
+        with st.expander(f"🔹 Acesso de Viatura na Edificação - {nome_edificacao}"):
+            st.markdown("**Será previsto hidrante de recalque a não mais que 20m do limite da edificação?**")
+            hidrante_recalque = st.radio("Resposta:", ["Sim", "Não"], key=f"hidrante_recalque_{i}")
+            st.markdown("<span style='color:red'>⚠️ O hidrante de recalque a menos de 20m anula as exigências a respeito do acesso de viaturas na edificação.</span>", unsafe_allow_html=True)
+            st.markdown("✅ O portão de acesso deve ter, no mínimo, **4m de largura** e **4,5m de altura**.")
+            if hidrante_recalque == "Não":
+                st.markdown("✅ As vias devem ter, no mínimo, **6m de largura** e **4,5m de altura**, além de suportar viaturas de **25 toneladas em dois eixos**.")
+
+    # Detalhamento para "Segurança Estrutural"
+    if "X" in resumo.get("Segurança Estrutural contra Incêndio", ""):
+        with st.expander(f"🔹 Segurança Estrutural contra Incêndio - {nome_edificacao}"):
+            if edificacao.terrea == "Sim":
+                resposta_estrutura_terrea = st.radio(
+                    "Há algum elemento estrutural que seu colapso comprometa a estabilidade de elementos de compartimentação ou isolamento?",
+                    ["Não", "Sim"], key=f"estrutura_terrea_{i}")
+                resposta_trrf, mostrar_trrf_adotado = avaliar_trrf_compartilhado(edificacao, resposta_estrutura_terrea)
+                if mostrar_trrf_adotado:
+                    st.markdown(f"<span style='color:red'>{resposta_trrf}</span>", unsafe_allow_html=True)
+                else:
+                    st.markdown(resposta_trrf)
+            else:
+                resposta_trrf, mostrar_trrf_adotado = avaliar_trrf_compartilhado(edificacao)
+                st.markdown(resposta_trrf)
+
+                if exige_trrf_por_pavimento(resposta_trrf):
+                    cobertura_check = st.radio("Algum dos seguintes itens é verdadeiro:\n\nI. A cobertura tem permanência de pessoas ou estoque de algum material?\nII. Faz parte de alguma rota de fuga?\nIII. Seu colapso estrutural compromete a estrutura principal ou paredes externas?", ["Não", "Sim"], index=0, key=f"cobertura_trrf_{i}")
+                    if cobertura_check == "Sim":
+                        st.markdown("⚠️ A cobertura deve ter o mesmo TRRF da estrutura principal.")
+                    else:
+                        st.markdown("✅ A cobertura está isenta de comprovação de TRRF para os elementos estruturais.")
+
+            if mostrar_trrf_adotado:
+                if exige_trrf_por_pavimento(resposta_trrf) or "subsolo(s) deverão apresentar comprovação de TRRF" in resposta_trrf:
+                    st.markdown("*(Referência: Imagem da tabela de Tempos requeridos de resistência ao fogo)*")
+                    render_trrf_pavimentos(edificacao, i)
+                st.text_area("TRRF adotado:", value="", key=f"trrf_adotado_{i}")
+            st.text_area("Observações sobre segurança estrutural", value="", key=f"comentario_estrutural_{i}")
+
+    # Detalhamento para outras medidas
+    for medida, aplicacao in resumo.items():
+        if aplicacao != "-" and medida not in ["Acesso de Viatura na Edificação", "Segurança Estrutural contra Incêndio"]:
+            with st.expander(f"🔹 {medida} - {nome_edificacao}"):
+                st.markdown(f"Conteúdo técnico sobre **{medida.lower()}**...")
+                if "¹" in aplicacao: st.markdown("📌 Observação especial: ver nota 1")
+                elif "²" in aplicacao: st.markdown("📌 Observação especial: ver nota 2")
+                elif "³" in aplicacao: st.markdown("📌 Observação especial: ver nota 3")
+                elif "⁴" in aplicacao: st.markdown("📌 Observação especial: ver nota 4")
+# --- FIM DETALHAMENTO DAS MEDIDAS ---
+
+
+# --- EXPORTAÇÃO ---
+def respostas_trrf_sessao(num_edificacoes):
+    """Respostas da Segurança Estrutural de cada edificação consolidada, lidas do session_state."""
+    return [
+        {chave: st.session_state.get(f"{chave}_{i}") for chave in ("estrutura_terrea", "cobertura_trrf", "trrf_adotado", "comentario_estrutural", "pavimentos_trrf")}
+        for i in range(num_edificacoes)
+    ]
+
+def assinatura_dados(*dados):
+    """Hash dos dados exportados, para saber se a planilha gerada ainda está atual."""
+    return hashlib.sha1(repr(dados).encode("utf-8")).hexdigest()
+
+def gerar_planilha(edificacoes, comparacoes, respostas_trrf, bombeiros):
+    from ppci.exportacao import escrever_relatorio
+    output = io.BytesIO()
+    escrever_relatorio(output, edificacoes, comparacoes, respostas_trrf, bombeiros)
+    output.seek(0)
+    return output
+
+@st.fragment(run_every=1.0)
+def acompanhar_relatorio():
+    """Consulta o relatório em geração a cada segundo; ao terminar, reexecuta o app para exibir o download."""
+    if st.session_state.relatorio_pedido[2].done():
+        st.rerun()
+    st.info("⏳ Gerando o relatório em segundo plano... você pode continuar editando.")
+# --- FIM EXPORTAÇÃO ---
+
+
+# --- DIFERENÇAS ENTRE REVISÕES ---
+@st.cache_resource(max_entries=8)
+def diferencas_revisoes(conteudo_antes, conteudo_depois):
+    """Diferenças entre duas planilhas exportadas, calculadas uma vez por par de arquivos (somente leitura)."""
+    from ppci.diferencas import comparar_planilhas
+    return comparar_planilhas(conteudo_antes, conteudo_depois)
+
+def render_diferencas():
+    """Compara duas revisões exportadas (ex.: -R03 e -R04), casando as edificações pelo nome."""
+    from ppci.diferencas import formatar_valor
+    col_antes, col_depois = st.columns(2)
+    with col_antes:
+        arquivo_antes = st.file_uploader("Revisão anterior (.xlsx)", type=["xlsx"], key="diferencas_antes")
+    with col_depois:
+        arquivo_depois = st.file_uploader("Revisão nova (.xlsx)", type=["xlsx"], key="diferencas_depois")
+    if not (arquivo_antes and arquivo_depois):
+        st.warning("⚠️ Anexe as duas planilhas exportadas para comparar.")
+        return
+    try:
+        diferencas = diferencas_revisoes(arquivo_antes.getvalue(), arquivo_depois.getvalue())
+    except Exception as e:
+        st.error(f"Erro ao ler as planilhas: {e}")
+        return
+
+    resumo = diferencas["resumo"]
+    col_resumo = st.columns(5)
+    col_resumo[0].metric("Edificações adicionadas", resumo["adicionadas"])
+    col_resumo[1].metric("Edificações removidas", resumo["removidas"])
+    col_resumo[2].metric("Com entradas alteradas", resumo["entradas_alteradas"])
+    col_resumo[3].metric("Com resultado alterado", resumo["resultados_alterados"])
+    col_resumo[4].metric("Comparações de isolamento", resumo["isolamento_alterado"])
+
+    apenas_resultados = st.checkbox("Mostrar apenas resultados alterados (tabela, medidas, notas, TRRF, distâncias)", value=True, key="diferencas_apenas_resultados")
+    linhas = [l for l in diferencas["linhas"] if l["Tipo"] == "Resultado" or not apenas_resultados]
+    categorias = sorted({l["Categoria"] for l in linhas})
+    col_filtros = st.columns(2)
+    with col_filtros[0]:
+        selecionadas = st.multiselect("Categorias", categorias, key="diferencas_categorias", placeholder="Todas")
+    with col_filtros[1]:
+        busca = st.text_input("Filtrar por edificação", key="diferencas_busca").strip().lower()
+    linhas = [
+        {**l, "Antes": formatar_valor(l["Antes"]), "Depois": formatar_valor(l["Depois"])}
+        for l in linhas
+        if (not selecionadas or l["Categoria"] in selecionadas) and busca in l["Edificação"].lower()
+    ]
+    if not linhas:
+        st.success("✅ Nenhuma diferença encontrada com os filtros atuais.")
+        return
+    st.caption(f"{len(linhas)} diferenças")
+    st.dataframe(linhas, hide_index=True, use_container_width=True)
+# --- FIM DIFERENÇAS ENTRE REVISÕES ---
+
+
+# ⏱️ Instrumentação opcional (painel na barra lateral + log em JSON lines)
+def contar_widgets_rerun():
+    ctx = get_script_run_ctx()
+    widget_ids = getattr(ctx, "widget_ids_this_run", None) if ctx else None
+    return len(widget_ids) if widget_ids is not None else None
+
+modo_perfil = st.sidebar.checkbox("⏱️ Instrumentação de desempenho", value=os.environ.get("PPCI_PERFIL") == "1", key="modo_perfil")
+perfil = Perfil(ativo=modo_perfil, contador_widgets=contar_widgets_rerun)
+
+
 # 🧭 Interface principal
-modo = st.radio("Como deseja começar?", ["📄 Revisar projeto existente", "🆕 Criar novo projeto"])
-df = pd.DataFrame()
+perfil.marcar("ingestao")
+modo = st.radio("Como deseja começar?", ["📄 Revisar projeto existente", "🆕 Criar novo projeto", "🗄️ Abrir do repositório local", "🔀 Comparar duas revisões"])
+if modo != "🗄️ Abrir do repositório local":
+    st.session_state.pop("projeto_aberto", None)
+df = None
 arquivo = None
 linha_selecionada = None
 mostrar_campos = False
@@ -278,7 +740,9 @@ if modo == "📄 Revisar projeto existente":
     if arquivo:
         nome_arquivo_entrada = arquivo.name
         try:
-            df = pd.read_excel(arquivo)
+            # Lida uma vez por conteúdo; os reruns seguintes vêm do cache
+            df = carregar_planilha(arquivo.getvalue())
+            linha_selecionada = {"NomeProjeto": nome_projeto_do_arquivo(nome_arquivo_entrada)}
             st.success("Planilha carregada com sucesso!")
             if not df.empty:
                 st.session_state.processamento_concluido = True 
@@ -287,10 +751,48 @@ if modo == "📄 Revisar projeto existente":
             st.error(f"Erro ao ler a planilha: {e}")
 
 elif modo == "🆕 Criar novo projeto":
-    linha_selecionada = pd.Series({"NomeProjeto": ""})
+    linha_selecionada = {"NomeProjeto": ""}
     st.success("Novo projeto iniciado. Preencha os dados abaixo.")
     mostrar_campos = True
 
+elif modo == "🗄️ Abrir do repositório local":
+    repositorio = repositorio_local()
+    with st.expander("🔎 Buscar edificações no repositório"):
+        col_busca_1, col_busca_2 = st.columns(2)
+        with col_busca_1:
+            altura_minima_busca = st.number_input("Altura acima de (m)", min_value=0.0, step=1.0, value=23.0, key="busca_altura_minima")
+        with col_busca_2:
+            uso_busca = st.selectbox("Uso/Ocupação", ["Qualquer", "C-1", "F-6", "F-8", "G-1", "G-2", "J-2"], key="busca_uso")
+        encontradas = repositorio.buscar(altura_minima=altura_minima_busca, uso=None if uso_busca == "Qualquer" else uso_busca)
+        st.dataframe(
+            [dict(zip(("Projeto", "Revisão", "Edificação", "Uso", "Altura (m)", "Área (m²)"), linha)) for linha in encontradas],
+            hide_index=True,
+        )
+
+    projetos_salvos = repositorio.projetos()
+    if not projetos_salvos:
+        st.warning("⚠️ Nenhum projeto salvo no repositório local ainda.")
+    else:
+        projeto_repositorio = st.selectbox(
+            "Projeto", [nome for nome, *_ in projetos_salvos], key="projeto_repositorio",
+            format_func=lambda nome: next(f"{nome} (R{rev:02} · {usuario or '-'} · {data})" for n, rev, usuario, data in projetos_salvos if n == nome),
+        )
+        revisoes_projeto = repositorio.revisoes(projeto_repositorio)
+        numero_revisao = st.selectbox(
+            "Revisão", [numero for numero, *_ in revisoes_projeto], key="revisao_repositorio",
+            format_func=lambda numero: next(f"R{numero:02} · {usuario or '-'} · {data}" for n, usuario, data, _ in revisoes_projeto if n == numero),
+        )
+        st.button("📂 Abrir revisão", on_click=abrir_revisao, args=(projeto_repositorio, numero_revisao), key="abrir_revisao")
+
+    projeto_aberto = st.session_state.get("projeto_aberto")
+    if projeto_aberto:
+        linha_selecionada = {"NomeProjeto": projeto_aberto[0]}
+        st.success(f"Revisão R{projeto_aberto[1]:02} de **{projeto_aberto[0]}** aberta. Edite os dados abaixo.")
+        mostrar_campos = True
+
+elif modo == "🔀 Comparar duas revisões":
+    render_diferencas()
+
 # 🏗️ Levantamento das edificações
 if mostrar_campos:
     st.markdown("### 🧾 Versão do Projeto")
@@ -301,83 +803,93 @@ if mostrar_campos:
     st.markdown("<div style='border-top: 6px solid #555; margin-top: 20px; margin-bottom: 20px'></div>", unsafe_allow_html=True)
     st.markdown("<h3 style='text-align: center;'>🏢 Levantamento das Edificações e Anexos</h3>", unsafe_allow_html=True)
     
-    col_qtd_edificacoes, col_qtd_anexos = st.columns(2)
-    with col_qtd_edificacoes:
-        num_torres = st.number_input("Quantidade de torres/edificações residenciais", min_value=0, step=1, value=1, key='num_torres')
-    with col_qtd_anexos:
-        num_anexos = st.number_input("Quantidade de anexos", min_value=0, step=1, value=1, key='num_anexos', help="Edificações térreas com permanência de pessoas e de uso não residencial.")
+    em_grade = st.radio(
+        "Forma de entrada das edificações", ["📝 Formulário", "🧮 Tabela (edição em lote)"], horizontal=True, key="modo_entrada",
+        help="Na tabela, cada linha é uma torre/anexo; é possível colar linhas copiadas de uma planilha.",
+    ) == "🧮 Tabela (edição em lote)"
+    if em_grade:
+        perfil.marcar("grade")
+        torres, anexos = editar_em_grade()
+    else:
+        col_qtd_edificacoes, col_qtd_anexos = st.columns(2)
+        with col_qtd_edificacoes:
+            num_torres = st.number_input("Quantidade de torres/edificações residenciais", min_value=0, step=1, value=len(edificacoes_abertas("torre")) if st.session_state.get("projeto_aberto") else 1, key='num_torres')
+        with col_qtd_anexos:
+            num_anexos = st.number_input("Quantidade de anexos", min_value=0, step=1, value=len(edificacoes_abertas("anexo")) if st.session_state.get("projeto_aberto") else 1, key='num_anexos', help="Edificações térreas com permanência de pessoas e de uso não residencial.")
 
-    torres = []
-    st.markdown("### 🏢 Edificações Residenciais")
-    if num_torres > 0:
-        for i in range(int(num_torres)):
-            st.markdown(f"**Edificação Residencial {i+1}**")
-            col1, col2 = st.columns(2)
-            with col1:
-                nome = st.text_input(f"Nome da edificação {i+1}", key=f"nome_torre_{i}", value=f"Edificação {chr(97+i)}")
-            with col2:
-                area = st.number_input(f"Área da edificação {i+1} (m²)", min_value=0.0, step=1.0, key=f"area_torre_{i}", value=750.0)
-            terrea = st.radio(f"A edificação {i+1} é térrea?", ["Sim", "Não"], key=f"terrea_torre_{i}")
+        perfil.marcar("formulario_torres")
+        torres = []
+        st.markdown("### 🏢 Edificações Residenciais")
+        if num_torres > 0:
+            for i in range(int(num_torres)):
+                st.markdown(f"**Edificação Residencial {i+1}**")
+                padrao = valores_abertos("torre", i)
+                col1, col2 = st.columns(2)
+                with col1:
+                    nome = st.text_input(f"Nome da edificação {i+1}", key=f"nome_torre_{i}", value=padrao.get("nome", f"Edificação {chr(97+i)}"))
+                with col2:
+                    area = st.number_input(f"Área da edificação {i+1} (m²)", min_value=0.0, step=1.0, key=f"area_torre_{i}", value=float(padrao.get("area", 750.0)))
+                terrea = st.radio(f"A edificação {i+1} é térrea?", ["Sim", "Não"], key=f"terrea_torre_{i}", index=indice_opcao(["Sim", "Não"], padrao.get("terrea")))
             
-            num_pavimentos, um_ap_por_pav, subsolo_tecnico, numero_subsolos, area_subsolo, subsolo_ocupado, subsolo_menor_50, duplex, atico, altura = (1, None, "Não", "0", "Menor que 500m²", "Não", "Não", "Não", "Não", 0.0)
-
-            if terrea == "Não":
-                num_pavimentos = st.number_input(f"Número de pavimentos da edificação {i+1}", min_value=2, step=1, key=f"num_pavimentos_torre_{i}", value=4)
-                um_ap_por_pav = st.radio(f"A edificação {i+1} é de um apartamento por pavimento?", ["Sim", "Não"], key=f"ap_por_pav_{i}")
-                subsolo_tecnico = st.radio(f"Existe subsolo na edificação {i+1}?", ["Não", "Sim"], key=f"subsolo_tecnico_{i}")
-                if subsolo_tecnico == "Sim":
-                    st.markdown("<span style='color:red'>⚠️ Se tiver mais de 0,006m² por m³ do pavimento...</span>", unsafe_allow_html=True)
-                    numero_subsolos = st.radio(f"Quantidade de subsolos na edificação {i+1}?", ["1", "Mais de 1"], key=f"numero_subsolos_{i}")
-                    if numero_subsolos == "1":
-                        area_subsolo = st.selectbox(f"Área do subsolo da edificação {i+1}", ["Menor que 500m²", "Maior que 500m²"], key=f"area_subsolo_{i}")
-                    else:
-                        area_subsolo = "Maior que 500m²"
-                    subsolo_ocupado = st.radio(f"Algum dos dois primeiros subsolos possui ocupação secundária?", ["Não", "Sim"], key=f"subsolo_ocupado_{i}")
-                    if subsolo_ocupado == "Sim":
-                        subsolo_menor_50 = st.radio(f"A ocupação secundária tem no máximo 50m² em cada subsolo?", ["Não", "Sim"], key=f"subsolo_menor_50_{i}")
-                duplex = st.radio(f"Existe duplex no último pavimento da edificação {i+1}?", ["Não", "Sim"], key=f"duplex_{i}")
-                atico = st.radio(f"Há pavimento de ático/casa de máquinas acima do último pavimento?", ["Não", "Sim"], key=f"atico_{i}")
+                num_pavimentos, um_ap_por_pav, subsolo_tecnico, numero_subsolos, area_subsolo, subsolo_ocupado, subsolo_menor_50, duplex, atico, altura = (1, None, "Não", "0", "Menor que 500m²", "Não", "Não", "Não", "Não", 0.0)
+
+                if terrea == "Não":
+                    num_pavimentos = st.number_input(f"Número de pavimentos da edificação {i+1}", min_value=2, step=1, key=f"num_pavimentos_torre_{i}", value=max(2, padrao.get("num_pavimentos", 4)))
+                    um_ap_por_pav = st.radio(f"A edificação {i+1} é de um apartamento por pavimento?", ["Sim", "Não"], key=f"ap_por_pav_{i}", index=indice_opcao(["Sim", "Não"], padrao.get("um_ap_por_pav")))
+                    subsolo_tecnico = st.radio(f"Existe subsolo na edificação {i+1}?", ["Não", "Sim"], key=f"subsolo_tecnico_{i}", index=indice_opcao(["Não", "Sim"], padrao.get("subsolo_tecnico")))
+                    if subsolo_tecnico == "Sim":
+                        st.markdown("<span style='color:red'>⚠️ Se tiver mais de 0,006m² por m³ do pavimento...</span>", unsafe_allow_html=True)
+                        numero_subsolos = st.radio(f"Quantidade de subsolos na edificação {i+1}?", ["1", "Mais de 1"], key=f"numero_subsolos_{i}", index=indice_opcao(["1", "Mais de 1"], padrao.get("numero_subsolos")))
+                        if numero_subsolos == "1":
+                            area_subsolo = st.selectbox(f"Área do subsolo da edificação {i+1}", ["Menor que 500m²", "Maior que 500m²"], key=f"area_subsolo_{i}", index=indice_opcao(["Menor que 500m²", "Maior que 500m²"], padrao.get("area_subsolo")))
+                        else:
+                            area_subsolo = "Maior que 500m²"
+                        subsolo_ocupado = st.radio(f"Algum dos dois primeiros subsolos possui ocupação secundária?", ["Não", "Sim"], key=f"subsolo_ocupado_{i}", index=indice_opcao(["Não", "Sim"], padrao.get("subsolo_ocupado")))
+                        if subsolo_ocupado == "Sim":
+                            subsolo_menor_50 = st.radio(f"A ocupação secundária tem no máximo 50m² em cada subsolo?", ["Não", "Sim"], key=f"subsolo_menor_50_{i}", index=indice_opcao(["Não", "Sim"], padrao.get("subsolo_menor_50")))
+                    duplex = st.radio(f"Existe duplex no último pavimento da edificação {i+1}?", ["Não", "Sim"], key=f"duplex_{i}", index=indice_opcao(["Não", "Sim"], padrao.get("duplex")))
+                    atico = st.radio(f"Há pavimento de ático/casa de máquinas acima do último pavimento?", ["Não", "Sim"], key=f"atico_{i}", index=indice_opcao(["Não", "Sim"], padrao.get("atico")))
                 
-                parte_superior = "Cota do primeiro pavimento do duplex" if duplex == "Sim" else "Cota de piso do último pavimento habitado"
-                if subsolo_tecnico == "Não" and subsolo_ocupado == "Não":
-                    parte_inferior = "cota de piso do pavimento mais baixo, exceto subsolos"
-                elif subsolo_tecnico == "Sim" and subsolo_ocupado == "Sim" and subsolo_menor_50 == "Não":
-                    parte_inferior = "cota de piso do subsolo em que a ocupação secundária ultrapassa 50m²"
-                else:
-                    parte_inferior = "cota de piso do pavimento mais baixo, exceto subsolos"
-                st.markdown(f"💡 Altura da edificação {i+1} é: **{parte_superior} - {parte_inferior}**")
-                altura = st.number_input(f"Informe a altura da edificação {i+1} (m)", min_value=0.0, step=0.1, key=f"altura_torre_{i}", value=8.0)
+                    parte_superior = "Cota do primeiro pavimento do duplex" if duplex == "Sim" else "Cota de piso do último pavimento habitado"
+                    if subsolo_tecnico == "Não" and subsolo_ocupado == "Não":
+                        parte_inferior = "cota de piso do pavimento mais baixo, exceto subsolos"
+                    elif subsolo_tecnico == "Sim" and subsolo_ocupado == "Sim" and subsolo_menor_50 == "Não":
+                        parte_inferior = "cota de piso do subsolo em que a ocupação secundária ultrapassa 50m²"
+                    else:
+                        parte_inferior = "cota de piso do pavimento mais baixo, exceto subsolos"
+                    st.markdown(f"💡 Altura da edificação {i+1} é: **{parte_superior} - {parte_inferior}**")
+                    altura = st.number_input(f"Informe a altura da edificação {i+1} (m)", min_value=0.0, step=0.1, key=f"altura_torre_{i}", value=float(padrao.get("altura", 8.0)))
             
-            torres.append({
-                "nome": nome, "area": area, "altura": altura, "terrea": terrea,
-                "num_pavimentos": num_pavimentos, "um_ap_por_pav": um_ap_por_pav,
-                "subsolo_tecnico": subsolo_tecnico, "numero_subsolos": numero_subsolos,
-                "area_subsolo": area_subsolo, "subsolo_ocupado": subsolo_ocupado,
-                "subsolo_menor_50": subsolo_menor_50, "duplex": duplex, "atico": atico,
-            })
-
-    anexos = []
-    st.markdown("### 📎 Anexos do Projeto")
-    if num_anexos > 0:
-        opcoes_uso_anexo = ["C-1", "F-6", "F-8", "G-1", "G-2", "J-2"]
-        opcoes_carga_incendio = ["300 MJ/m²", "600 MJ/m²"]
-        for i in range(int(num_anexos)):
-            st.markdown(f"**Anexo {i+1}**")
-            col_anexo_1, col_anexo_2 = st.columns(2)
-            with col_anexo_1:
-                nome = st.text_input(f"Nome do anexo {i+1}", key=f"nome_anexo_{i}", value=f"Anexo {chr(97+i)}")
-            with col_anexo_2:
-                area = st.number_input(f"Área do anexo {i+1} (m²)", min_value=0.0, step=1.0, key=f"area_anexo_{i}", value=50.0)
-            col_anexo_3, col_anexo_4 = st.columns(2)
-            with col_anexo_3:
-                uso = st.selectbox(f"Uso/Ocupação do anexo {i+1}", options=opcoes_uso_anexo, key=f"uso_anexo_{i}")
-            with col_anexo_4:
-                carga = st.selectbox(f"Carga de incêndio do anexo {i+1}", options=opcoes_carga_incendio, key=f"carga_anexo_{i}")
-            anexos.append({
-                "nome": nome, "area": area, "uso": uso, "carga_incendio": carga,
-                "terrea": "Sim", "num_pavimentos": 1, "um_ap_por_pav": None, "altura": 0.0
-            })
+                torres.append(Torre(
+                    nome=nome, area=area, altura=altura, terrea=terrea,
+                    num_pavimentos=num_pavimentos, um_ap_por_pav=um_ap_por_pav,
+                    subsolo_tecnico=subsolo_tecnico, numero_subsolos=numero_subsolos,
+                    area_subsolo=area_subsolo, subsolo_ocupado=subsolo_ocupado,
+                    subsolo_menor_50=subsolo_menor_50, duplex=duplex, atico=atico,
+                ))
+
+        perfil.marcar("formulario_anexos")
+        anexos = []
+        st.markdown("### 📎 Anexos do Projeto")
+        if num_anexos > 0:
+            opcoes_uso_anexo = ["C-1", "F-6", "F-8", "G-1", "G-2", "J-2"]
+            opcoes_carga_incendio = ["300 MJ/m²", "600 MJ/m²"]
+            for i in range(int(num_anexos)):
+                st.markdown(f"**Anexo {i+1}**")
+                padrao = valores_abertos("anexo", i)
+                col_anexo_1, col_anexo_2 = st.columns(2)
+                with col_anexo_1:
+                    nome = st.text_input(f"Nome do anexo {i+1}", key=f"nome_anexo_{i}", value=padrao.get("nome", f"Anexo {chr(97+i)}"))
+                with col_anexo_2:
+                    area = st.number_input(f"Área do anexo {i+1} (m²)", min_value=0.0, step=1.0, key=f"area_anexo_{i}", value=float(padrao.get("area", 50.0)))
+                col_anexo_3, col_anexo_4 = st.columns(2)
+                with col_anexo_3:
+                    uso = st.selectbox(f"Uso/Ocupação do anexo {i+1}", options=opcoes_uso_anexo, key=f"uso_anexo_{i}", index=indice_opcao(opcoes_uso_anexo, padrao.get("uso")))
+                with col_anexo_4:
+                    carga = st.selectbox(f"Carga de incêndio do anexo {i+1}", options=opcoes_carga_incendio, key=f"carga_anexo_{i}", index=indice_opcao(opcoes_carga_incendio, padrao.get("carga_incendio")))
+                anexos.append(Anexo(nome=nome, area=area, uso=uso, carga_incendio=carga))
     
+    perfil.marcar("consolidacao")
     # Juntar todas as edificações
     todas_edificacoes = torres + anexos
 
@@ -385,7 +897,8 @@ if mostrar_campos:
     if len(todas_edificacoes) >= 1:
         
         # 1. Definição de Tratamento (Aparece se houver ANEXOS OU MAIS DE UMA TORRE)
-        if len(torres) > 1 or len(anexos) > 0:
+        # Na edição em tabela, tratamento e edificação conjunta já vêm das colunas
+        if not em_grade and (len(torres) > 1 or len(anexos) > 0):
             st.markdown("<div style='border-top: 6px solid #555; margin-top: 20px; margin-bottom: 20px'></div>", unsafe_allow_html=True)
             st.markdown("### 🔀 Definição de Tratamento por Edificação")
             
@@ -396,7 +909,8 @@ if mostrar_campos:
                     tratamento_key = f"tratamento_{edificacao['nome']}_{i}"
                     conjunta_key = f"conjunta_com_{edificacao['nome']}_{i}"
                     
-                    is_torre = edificacao in torres
+                    is_torre = isinstance(edificacao, Torre)
+                    padrao = valores_abertos("torre", i) if is_torre else valores_abertos("anexo", i - len(torres))
                     
                     # --- FLUXO CONDICIONAL DE EXIBIÇÃO ---
                     # 1. Se é a ÚNICA torre, define como Independente e informa
@@ -414,7 +928,8 @@ if mostrar_campos:
                     tratamento = st.radio(
                         pergunta,
                         ["Independente", "Conjunta"],
-                        key=tratamento_key
+                        key=tratamento_key,
+                        index=indice_opcao(["Independente", "Conjunta"], padrao.get("tratamento"))
                     )
                     edificacao['tratamento'] = tratamento
                     
@@ -426,320 +941,148 @@ if mostrar_campos:
                             edificacao['edificacao_conjunta'] = st.selectbox(
                                 f"Qual edificação **irá absorver** a área de **{edificacao['nome']}**?",
                                 options=nomes_torres,
-                                key=conjunta_key
+                                key=conjunta_key,
+                                index=indice_opcao(nomes_torres, padrao.get("edificacao_conjunta"))
                             )
                     else:
                         edificacao['edificacao_conjunta'] = None
-        else:
+        elif not em_grade:
             # Caso haja apenas 1 edificação e 0 anexos, define como Independente
             if todas_edificacoes:
                 todas_edificacoes[0]['tratamento'] = "Independente"
                 todas_edificacoes[0]['edificacao_conjunta'] = None
         
         # 2. Consolidação da Área (Executada após o loop de tratamento)
-        edificacoes_consolidadas = consolidar_edificacoes(todas_edificacoes)
+        # Avaliação incremental: só os grupos afetados pelas edições são reconsolidados
+        st.session_state.avaliacao_site.atualizar_edificacoes(todas_edificacoes)
+        edificacoes_consolidadas = st.session_state.avaliacao_site.grupos()
+        for problema in st.session_state.avaliacao_site.problemas():
+            st.warning(f"⚠️ {problema}")
+        if edificacoes_consolidadas and st.checkbox("📋 Mostrar a tabela das edificações consolidadas", key="mostrar_consolidadas"):
+            # DataFrame montado a partir das colunas (códigos viram categorias), sem dicts por linha
+            st.dataframe(ColecaoEdificacoes.de_registros(edificacoes_consolidadas).para_dataframe(), hide_index=True, use_container_width=True)
         
         st.session_state.edificacoes_finais = edificacoes_consolidadas
         st.session_state.processamento_concluido = True 
         
     # --- FIM LÓGICA DE DECISÃO E CONSOLIDAÇÃO ---
 
+    perfil.marcar("isolamento")
     # 🔀 Bloco de Isolamento entre Edificações (OPCIONAL)
     if len(todas_edificacoes) > 1:
         if st.checkbox("Deseja rodar a análise detalhada de Isolamento de Risco (Fachada/Abertura)?", key='check_isolamento'):
-            
-            # --- PREPARAÇÃO DA LISTA DE OPÇÕES ---
-            nomes_edificacoes_finais = [e["nome"] for e in st.session_state.edificacoes_finais if e["nome"]]
-            
-            st.markdown("<div style='border-top: 6px solid #555; margin-top: 20px; margin-bottom: 20px'></div>", unsafe_allow_html=True)
-            st.markdown("### Isolamento entre Edificações (Análise de Fachada)")
-            
-            st.radio("Há corpo de bombeiros com viatura de combate a incêndio na cidade?", ["Sim", "Não"], key="bombeiros")
-
-            # --- GESTÃO DINÂMICA DE COMPARAÇÕES ---
-            if st.button("➕ Adicionar Comparação de Isolamento de Risco", on_click=add_comparison):
-                pass 
-            
-            if len(nomes_edificacoes_finais) < 2:
-                st.warning("É necessário que hajam pelo menos duas edificações ou grupos consolidados (Independentes) para fazer uma comparação de isolamento de risco.")
-            
-            # Loop sobre as comparações dinâmicas
-            for i, comp in enumerate(st.session_state.comparacoes_extra):
-                
-                opcoes_edf = nomes_edificacoes_finais
-                
-                if not opcoes_edf:
-                    break
-                    
-                # 1. TRATAMENTO DE VALOR INICIAL PARA SELEÇÃO (Edificação 1)
-                if comp['edf1_nome'] is None or comp['edf1_nome'] not in opcoes_edf:
-                    comp['edf1_nome'] = opcoes_edf[0] if opcoes_edf else None
-                    
-                # 2. TRATAMENTO DE VALOR INICIAL PARA EDIFICAÇÃO 2
-                opcoes_edf2 = [n for n in opcoes_edf if n != comp['edf1_nome']]
-                if not opcoes_edf2:
-                     comp['edf2_nome'] = None
-                elif comp['edf2_nome'] is None or comp['edf2_nome'] not in opcoes_edf2:
-                    comp['edf2_nome'] = opcoes_edf2[0]
-                
-                st.markdown(f"#### Comparação {i+1}: Risco entre {comp.get('edf1_nome', '...')} e {comp.get('edf2_nome', '...')}")
-                
-                col_init = st.columns(3)
-                
-                # Edificação 1 (Input)
-                with col_init[0]:
-                    index_edf1 = opcoes_edf.index(comp['edf1_nome']) if comp['edf1_nome'] in opcoes_edf else 0
-                    
-                    comp['edf1_nome'] = st.selectbox(
-                        "Edificação 1:", 
-                        opcoes_edf, 
-                        key=f"comparacao_edf1_{i}",
-                        index=index_edf1
-                    )
-                
-                # Edificação 2 (Input)
-                with col_init[1]:
-                    # Recalcula as opções após a seleção da Edificação 1
-                    opcoes_edf2 = [n for n in opcoes_edf if n != comp['edf1_nome']]
-                    
-                    # Se não há mais opções, garante que a seleção seja None
-                    if not opcoes_edf2:
-                        comp['edf2_nome'] = None
-                        index_edf2 = 0
-                    elif comp['edf2_nome'] not in opcoes_edf2:
-                         comp['edf2_nome'] = opcoes_edf2[0]
-                         index_edf2 = 0
-                    else:
-                         index_edf2 = opcoes_edf2.index(comp['edf2_nome'])
-
-                    comp['edf2_nome'] = st.selectbox(
-                        "Edificação 2:", 
-                        opcoes_edf2, 
-                        key=f"comparacao_edf2_{i}",
-                        index=index_edf2
-                    )
-
-                # Botão de Remover
-                with col_init[2]:
-                    st.write("") 
-                    if st.button(f"➖ Remover", key=f"remove_comp_{i}", on_click=remove_comparison, args=(i,)):
-                        pass 
-
-                # Os dados para cálculo devem vir da lista CONSOLIDADA
-                edf1_data = next((e for e in st.session_state.edificacoes_finais if e["nome"] == comp['edf1_nome']), None)
-                edf2_data = next((e for e in st.session_state.edificacoes_finais if e["nome"] == comp['edf2_nome']), None)
-
-                # Só exibe os campos de input de cálculo se houver 2 edificações válidas para comparação
-                if edf1_data and edf2_data and edf1_data['nome'] != edf2_data['nome']:
-                    acrescimo = 1.5 if st.session_state.bombeiros == "Sim" else 3.0
-                    
-                    # --- CÁLCULOS PARA EDIFICAÇÃO 1 ---
-                    largura1 = comp.get('largura1', 0.0)
-                    altura1 = comp.get('altura1', 0.0)
-                    area1 = largura1 * altura1
-                    abertura1 = comp.get('abertura1', 0.0)
-                    
-                    porcentagem1 = (abertura1 / area1) * 100 if area1 > 0 else 0
-                    fator_x1 = max(largura1, altura1) / max(1.0, min(largura1, altura1))
-                    valor_tabela1 = buscar_valor_tabela(porcentagem1, fator_x1)
-                    menor_dim1 = min(largura1, altura1)
-                    distancia_calculada_1 = (valor_tabela1 * menor_dim1) + acrescimo
-                    
-                    # Aplica regra de min(Distância Calculada, Distância Simplificada)
-                    if edf1_data.get('area', 0.0) <= 750 and edf1_data.get('altura', 0.0) <= 12:
-                        distancia_tabela_simplificada1 = buscar_valor_tabela_simplificada(porcentagem1, edf1_data.get('num_pavimentos', 1))
-                        distancia_final_1 = min(distancia_calculada_1, distancia_tabela_simplificada1)
-                    else:
-                        distancia_final_1 = distancia_calculada_1
-
-
-                    # --- INPUTS E RESULTADOS PARA EDIFICAÇÃO 1 ---
-                    st.markdown(f"**Fachada a usar na comparação (Edificação 1 - {edf1_data['nome']}):** {fachada_edificacao(edf1_data)}")
-                    col_calc_1 = st.columns(4)
-                    with col_calc_1[0]:
-                        comp['largura1'] = st.number_input(f"Largura Fachada {edf1_data['nome']} (m)", min_value=0.0, step=0.1, key=f"largura1_{i}", value=largura1)
-                    with col_calc_1[1]:
-                        comp['altura1'] = st.number_input(f"Altura Fachada {edf1_data['nome']} (m)", min_value=0.0, step=0.1, key=f"altura1_{i}", value=altura1)
-                    with col_calc_1[2]:
-                        st.metric(label=f"Área Fachada {edf1_data['nome']} (m²)", value=f"{area1:.2f}")
-                    with col_calc_1[3]:
-                        comp['abertura1'] = st.number_input(f"Área Abertura {edf1_data['nome']} (m²)", min_value=0.0, step=0.1, key=f"abertura1_{i}", value=abertura1)
-                    
-                    st.metric(label=f"Distância de isolamento (Edificação 1)", value=f"{distancia_final_1:.2f} m")
-                    
-                    
-                    # --- CÁLCULOS PARA EDIFICAÇÃO 2 ---
-                    largura2 = comp.get('largura2', 0.0)
-                    altura2 = comp.get('altura2', 0.0)
-                    area2 = largura2 * altura2
-                    abertura2 = comp.get('abertura2', 0.0)
-                    
-                    porcentagem2 = (abertura2 / area2) * 100 if area2 > 0 else 0
-                    fator_x2 = max(largura2, altura2) / max(1.0, min(largura2, altura2))
-                    valor_tabela2 = buscar_valor_tabela(porcentagem2, fator_x2)
-                    menor_dim2 = min(largura2, altura2)
-                    distancia_calculada_2 = (valor_tabela2 * menor_dim2) + acrescimo
-                    
-                    if edf2_data.get('area', 0.0) <= 750 and edf2_data.get('altura', 0.0) <= 12:
-                        distancia_tabela_simplificada2 = buscar_valor_tabela_simplificada(porcentagem2, edf2_data.get('num_pavimentos', 1))
-                        distancia_final_2 = min(distancia_calculada_2, distancia_tabela_simplificada2)
-                    else:
-                        distancia_final_2 = distancia_calculada_2
-
-
-                    # --- INPUTS E RESULTADOS PARA EDIFICAÇÃO 2 ---
-                    st.markdown(f"**Fachada a usar na comparação (Edificação 2 - {edf2_data['nome']}):** {fachada_edificacao(edf2_data)}")
-                    col_calc_2 = st.columns(4)
-                    with col_calc_2[0]:
-                        comp['largura2'] = st.number_input(f"Largura Fachada {edf2_data['nome']} (m)", min_value=0.0, step=0.1, key=f"largura2_{i}", value=largura2)
-                    with col_calc_2[1]:
-                        comp['altura2'] = st.number_input(f"Altura Fachada {edf2_data['nome']} (m)", min_value=0.0, step=0.1, key=f"altura2_{i}", value=altura2)
-                    with col_calc_2[2]:
-                        st.metric(label=f"Área Fachada {edf2_data['nome']} (m²)", value=f"{area2:.2f}")
-                    with col_calc_2[3]:
-                        comp['abertura2'] = st.number_input(f"Área Abertura {edf2_data['nome']} (m²)", min_value=0.0, step=0.1, key=f"abertura2_{i}", value=abertura2)
-                        
-                    st.metric(label=f"Distância de isolamento (Edificação 2)", value=f"{distancia_final_2:.2f} m")
-                
-                st.markdown("<div style='border-top: 2px solid #ddd; margin-top: 20px; margin-bottom: 20px'></div>", unsafe_allow_html=True)
-                
-            st.markdown(
-                "<span style='color:red'>⚠️ Ao terminar as análises, volte e revise as considerações de **independência** de cada edificação/anexo.</span>", 
-                unsafe_allow_html=True
-            )
-            
-            st.markdown("### 📝 Comentários sobre Isolamento de Risco")
-            st.text_area("Observações sobre distanciamento e isolamento de risco.", key="comentario_isolamento_geral")
+            render_isolamento()
     
+    perfil.marcar("medidas")
     # 🧯 Tabela resumo de medidas de segurança e Detalhamento por medida de segurança
     if st.session_state.processamento_concluido:
         st.markdown("<div style='border-top: 6px solid #555; margin-top: 20px; margin-bottom: 20px'></div>", unsafe_allow_html=True)
         st.markdown("## 🔍 Medidas de Segurança por Edificação")
         
-        for i, edificacao in enumerate(st.session_state.edificacoes_finais):
-            nome_edificacao = edificacao.get("nome", f"Edificação {i+1}")
-            st.markdown(f"### 🏢 {nome_edificacao}")
-
-            area_consolidada = edificacao.get("area", 0) 
-            altura_valor = edificacao.get("altura", 0)
-            num_pavimentos = edificacao.get("num_pavimentos", 1)
-            
-            is_tabela_simplificada = area_consolidada <= 750 and altura_valor <= 12
-
-            resumo = medidas_por_enquadramento(area_consolidada, altura_valor, num_pavimentos)
-            
-            notas = notas_relevantes(resumo, altura_valor, num_pavimentos, is_tabela_simplificada)
-            
-            st.markdown("### Tabela de Medidas de Segurança Aplicáveis")
-            st.info(f"Área Consolidada utilizada para Enquadramento: **{area_consolidada:.2f} m²**") 
-            df_resumo = pd.DataFrame.from_dict(resumo, orient='index', columns=["Aplicação"])
-            st.table(df_resumo)
-
-            if notas:
-                st.markdown("### Notas Específicas")
-                for nota in notas:
-                    st.markdown(f"- {nota}")
-            
-            # Detalhamento para "Acesso de Viatura"
-            if "X" in resumo.get("Acesso de Viatura na Edificação", ""):
-                with st.expander(f"🔹 Acesso de Viatura na Edificação - {nome_edificacao}"):
-                    st.markdown("**Será previsto hidrante de recalque a não mais que 20m do limite da edificação?**")
-                    hidrante_recalque = st.radio("Resposta:", ["Sim", "Não"], key=f"hidrante_recalque_{i}")
-                    st.markdown("<span style='color:red'>⚠️ O hidrante de recalque a menos de 20m anula as exigências a respeito do acesso de viaturas na edificação.</span>", unsafe_allow_html=True)
-                    st.markdown("✅ O portão de acesso deve ter, no mínimo, **4m de largura** e **4,5m de altura**.")
-                    if hidrante_recalque == "Não":
-                        st.markdown("✅ As vias devem ter, no mínimo, **6m de largura** e **4,5m de altura**, além de suportar viaturas de **25 toneladas em dois eixos**.")
-            
-            # Detalhamento para "Segurança Estrutural"
-            if "X" in resumo.get("Segurança Estrutural contra Incêndio", ""):
-                with st.expander(f"🔹 Segurança Estrutural contra Incêndio - {nome_edificacao}"):
-                    resposta_trrf = ""
-                    mostrar_trrf_adotado = False
-                    
-                    if edificacao.get("terrea") == "Sim":
-                        resposta_estrutura_terrea = st.radio(
-                            "Há algum elemento estrutural que seu colapso comprometa a estabilidade de elementos de compartimentação ou isolamento?",
-                            ["Não", "Sim"], key=f"estrutura_terrea_{i}")
-                        if resposta_estrutura_terrea == "Sim":
-                            resposta_trrf = "⚠️ A edificação deve comprovar TRRF de 30min para elementos estruturais."
-                            st.markdown(f"<span style='color:red'>{resposta_trrf}</span>", unsafe_allow_html=True)
-                            mostrar_trrf_adotado = True
-                        else:
-                            resposta_trrf = "✅ A edificação está isenta de comprovação de TRRF para elementos estruturais."
-                            st.markdown(resposta_trrf)
-                    else:
-                        area = area_consolidada
-                        subsolo_tecnico = edificacao.get("subsolo_tecnico", "Não")
-                        numero_subsolos = edificacao.get("numero_subsolos", "0")
-                        area_subsolo = edificacao.get("area_subsolo", "Menor que 500m²")
-                        
-                        altura_menor_igual_12 = altura_valor <= 12
-                        area_menor_1500 = area < 1500
-                        area_maior_igual_1500 = area >= 1500
-                        subsolo_simples = numero_subsolos == "1" and area_subsolo == "Menor que 500m²"
-                        subsolo_complexo = numero_subsolos != "1" or area_subsolo == "Maior que 500m²"
-                        sem_subsolo = subsolo_tecnico == "Não"
-                        
-                        if altura_menor_igual_12 and area_menor_1500 and (sem_subsolo or subsolo_simples):
-                            resposta_trrf = "✅ A edificação está isenta de comprovação de TRRF para elementos estruturais."
-                        elif altura_menor_igual_12 and area_menor_1500 and subsolo_complexo:
-                            resposta_trrf = "⚠️ Apenas o(s) subsolo(s) deverão apresentar comprovação de TRRF para elementos estruturais."
-                            mostrar_trrf_adotado = True
-                        elif (altura_valor > 12 or area_maior_igual_1500) and (sem_subsolo or subsolo_simples):
-                            resposta_trrf = "⚠️ Cada pavimento deverá apresentar comprovação de TRRF para elementos estruturais. Cada pavimento tem seu TRRF determinado de acordo com seu uso e nunca inferior ao do pavimento superior (o subsolo absorve o TRRF do pavimento superior)."
-                            mostrar_trrf_adotado = True
-                        elif (altura_valor > 12 or area_maior_igual_1500) and subsolo_complexo:
-                            resposta_trrf = "⚠️ Cada pavimento deverá apresentar comprovação de TRRF para elementos estruturais. Cada pavimento tem seu TRRF determinado de acordo com seu uso e nunca inferior ao do pavimento superior."
-                            mostrar_trrf_adotado = True
-                        st.markdown(resposta_trrf)
-                        
-                        if "Cada pavimento deverá apresentar comprovação de TRRF" in resposta_trrf:
-                            cobertura_check = st.radio("Algum dos seguintes itens é verdadeiro:\n\nI. A cobertura tem permanência de pessoas ou estoque de algum material?\nII. Faz parte de alguma rota de fuga?\nIII. Seu colapso estrutural compromete a estrutura principal ou paredes externas?", ["Não", "Sim"], index=0, key=f"cobertura_trrf_{i}")
-                            if cobertura_check == "Sim":
-                                st.markdown("⚠️ A cobertura deve ter o mesmo TRRF da estrutura principal.")
-                            else:
-                                st.markdown("✅ A cobertura está isenta de comprovação de TRRF para os elementos estruturais.")
-                        
-                    if mostrar_trrf_adotado:
-                        if "Cada pavimento deverá apresentar comprovação de TRRF" in resposta_trrf or "subsolo(s) deverão apresentar comprovação de TRRF" in resposta_trrf:
-                            st.markdown("*(Referência: Imagem da tabela de Tempos requeridos de resistência ao fogo)*")
-                        st.text_area("TRRF adotado:", value="", key=f"trrf_adotado_{i}")
-                    st.text_area("Observações sobre segurança estrutural", value="", key=f"comentario_estrutural_{i}")
-
-            # Detalhamento para outras medidas
-            for medida, aplicacao in resumo.items():
-                if aplicacao != "-" and medida not in ["Acesso de Viatura na Edificação", "Segurança Estrutural contra Incêndio"]:
-                    with st.expander(f"🔹 {medida} - {nome_edificacao}"):
-                        st.markdown(f"Conteúdo técnico sobre **{medida.lower()}**...")
-                        if "¹" in aplicacao: st.markdown("📌 Observação especial: ver nota 1")
-                        elif "²" in aplicacao: st.markdown("📌 Observação especial: ver nota 2")
-                        elif "³" in aplicacao: st.markdown("📌 Observação especial: ver nota 3")
-                        elif "⁴" in aplicacao: st.markdown("📌 Observação especial: ver nota 4")
+        # Visão geral de todas as edificações em uma única tabela; o detalhamento
+        # (expanders e perguntas) é renderizado só para a edificação selecionada
+        preservar_respostas_detalhe()
+        st.dataframe(resumo_medidas_site(st.session_state.edificacoes_finais), hide_index=True, use_container_width=True)
+        indice_exibido = st.selectbox(
+            "🏢 Edificação detalhada", range(len(st.session_state.edificacoes_finais)),
+            format_func=lambda i: st.session_state.edificacoes_finais[i].nome or f"Edificação {i+1}",
+            key="medidas_edificacao_exibida",
+        )
+        render_detalhe_medidas(indice_exibido)
     else:
         st.warning("Cadastre as edificações para ver as medidas de segurança aplicáveis.")
 
 
-    # 📥 Exportação final (Adaptado para múltiplas edificações)
+    perfil.marcar("exportacao")
+    # 📥 Exportação final (gerada somente quando solicitada)
     st.markdown("## 📥 Exportar planilha atualizada")
     if st.session_state.processamento_concluido and st.session_state.edificacoes_finais:
-        df_completo = pd.DataFrame(st.session_state.edificacoes_finais)
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df_completo.to_excel(writer, index=False, sheet_name='Edificações')
-        output.seek(0)
-        
         nome_projeto = linha_selecionada.get("NomeProjeto", "ProjetoSemNome")
         nome_arquivo_saida = gerar_nome_arquivo(nome_projeto, arquivo.name if arquivo else None)
         
-        st.download_button(
-            label="📥 Baixar Planilha Atualizada",
-            data=output.getvalue(),
-            file_name=nome_arquivo_saida,
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            key="download_button_planilha_final"
+        respostas_trrf = respostas_trrf_sessao(len(st.session_state.edificacoes_finais))
+        assinatura_exportacao = assinatura_dados(
+            st.session_state.edificacoes_finais, st.session_state.comparacoes_extra, respostas_trrf, st.session_state.bombeiros
         )
+        if st.button("⚙️ Gerar planilha atualizada", key="gerar_planilha_final"):
+            st.session_state.planilha_exportada = (assinatura_exportacao, gerar_planilha(
+                st.session_state.edificacoes_finais, st.session_state.comparacoes_extra, respostas_trrf, st.session_state.bombeiros
+            ))
+        
+        planilha_exportada = st.session_state.get("planilha_exportada")
+        if planilha_exportada and planilha_exportada[0] == assinatura_exportacao:
+            st.download_button(
+                label="📥 Baixar Planilha Atualizada",
+                data=planilha_exportada[1],
+                file_name=nome_arquivo_saida,
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                key="download_button_planilha_final"
+            )
+        elif planilha_exportada:
+            st.info("Os dados mudaram desde a última geração. Gere a planilha novamente para baixar a versão atual.")
+
+        # 🧾 Relatório do checklist (HTML/PDF), gerado fora do script e em cache por conteúdo
+        st.markdown("## 🧾 Relatório do checklist")
+        formatos_relatorio = ["html", "pdf"] if pdf_disponivel() else ["html"]
+        formato_relatorio = st.radio("Formato do relatório", formatos_relatorio, horizontal=True, format_func=str.upper, key="formato_relatorio")
+        dados_do_relatorio = dados_relatorio(
+            nome_projeto, st.session_state.edificacoes_finais, st.session_state.comparacoes_extra, respostas_trrf, st.session_state.bombeiros
+        )
+        assinatura_relatorio = (hash_normalizado(dados_do_relatorio), formato_relatorio)
+        if st.button("🧾 Gerar relatório", key="gerar_relatorio"):
+            st.session_state.relatorio_pedido = (*assinatura_relatorio, solicitar_relatorio(dados_do_relatorio, formato_relatorio))
+
+        relatorio_pedido = st.session_state.get("relatorio_pedido")
+        if relatorio_pedido and not relatorio_pedido[2].done():
+            acompanhar_relatorio()
+        elif relatorio_pedido and relatorio_pedido[2].exception():
+            st.error(f"Erro ao gerar o relatório: {relatorio_pedido[2].exception()}")
+        elif relatorio_pedido and relatorio_pedido[:2] == assinatura_relatorio:
+            resultado_relatorio = relatorio_pedido[2].result()
+            with open(resultado_relatorio["caminho"], "rb") as arquivo_relatorio:
+                st.download_button(
+                    label=f"📥 Baixar relatório ({formato_relatorio.upper()})",
+                    data=arquivo_relatorio.read(),
+                    file_name=f"checklistINC_{nome_projeto or 'ProjetoSemNome'}.{formato_relatorio}",
+                    mime="application/pdf" if formato_relatorio == "pdf" else "text/html",
+                    key="download_relatorio",
+                )
+            if resultado_relatorio["renderizadas"]:
+                st.caption(f"Seções renderizadas: {resultado_relatorio['renderizadas']} · reaproveitadas do cache: {resultado_relatorio['reaproveitadas']}")
+        elif relatorio_pedido:
+            st.info("Os dados mudaram desde a última geração. Gere o relatório novamente para baixar a versão atual.")
+
+        # 🗄️ Revisão no repositório local (só grava a diferença para a revisão anterior)
+        if st.button("💾 Salvar revisão no repositório local", key="salvar_repositorio"):
+            numero_salvo = repositorio_local().salvar(
+                nome_projeto or "ProjetoSemNome", todas_edificacoes, st.session_state.comparacoes_extra,
+                usuario=nome_usuario,
+                metadados={"bombeiros": st.session_state.bombeiros, "trrf": respostas_trrf},
+            )
+            st.success(f"Revisão R{numero_salvo:02} de **{nome_projeto or 'ProjetoSemNome'}** salva no repositório local.")
     else:
         if len(todas_edificacoes) > 0 and not st.session_state.processamento_concluido:
             st.warning("Defina o agrupamento das edificações para liberar a exportação.")
         elif not todas_edificacoes:
             st.warning("Cadastre as edificações para exportar.")
+
+
+# ⏱️ Painel de instrumentação
+if perfil.ativo:
+    resumo_perfil = perfil.finalizar(st.session_state)
+    gravar_log(resumo_perfil)
+    with st.sidebar:
+        st.markdown("### ⏱️ Perfil do último rerun")
+        st.metric("Tempo total", f"{resumo_perfil['total_ms']:.1f} ms")
+        st.dataframe(resumo_perfil["etapas"], hide_index=True)
+        st.caption(
+            f"Widgets criados: {resumo_perfil['widgets']} · "
+            f"session_state: {resumo_perfil['session_state']['chaves']} chaves, "
+            f"~{resumo_perfil['session_state']['bytes'] / 1024:.1f} KiB"
+        )
+        cache = CACHE_RESULTADOS.estatisticas()
+        taxa = f"{cache['taxa_acerto']:.0%}" if cache["taxa_acerto"] is not None else "—"
+        st.caption(
+            f"Cache compartilhado: {cache['acertos']} acertos / {cache['faltas']} faltas ({taxa}) · "
+            f"{cache['itens']} itens, {cache['bytes'] / 1024 / 1024:.1f} de {cache['max_bytes'] / 1024 / 1024:.0f} MB"
+        )
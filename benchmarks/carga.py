@@ -0,0 +1,201 @@
+# 👥 Teste de carga: várias sessões simultâneas do app.py, sem navegador
+#
+# Uso:
+#   python -m benchmarks.carga [--sessoes 1,5,10,20] [--torres 6] [--comparacoes 3]
+#                              [--saida arquivo.json] [--limite-p95 SEGUNDOS]
+#
+# Cada sessão é um AppTest (streamlit.testing) que percorre um roteiro
+# realista: cria um projeto com N torres e um anexo, marca torres e o anexo
+# como "Conjunta" (e desfaz uma delas), liga o isolamento, adiciona
+# comparações preenchendo as fachadas e gera a planilha de exportação.
+# As sessões rodam em threads de um único processo, como no servidor do
+# Streamlit: disputam o mesmo interpretador e compartilham os caches de
+# processo (st.cache_resource, ppci.cache).
+#
+# Para cada nível de concorrência o relatório traz os percentis de latência
+# de rerun (geral e por etapa do roteiro), a vazão em reruns/s, o pico de RSS
+# do processo e o tamanho do session_state de cada sessão (comparacoes_extra,
+# edificacoes_finais). A execução termina com código 1 se algum roteiro falhar
+# ou, com --limite-p95, se o p95 de algum nível passar do limite (útil antes
+# de um deploy).
+import argparse
+import json
+import os
+import resource
+import statistics
+import sys
+import threading
+import time
+import traceback
+from datetime import datetime
+
+from benchmarks.executar import DIRETORIO_RESULTADOS, RAIZ_REPOSITORIO, versao_codigo
+from ppci.perfil import tamanho_estado
+
+CHAVES_ESTADO = ("comparacoes_extra", "edificacoes_finais")
+
+
+def percentis(valores, pontos=(50, 90, 95, 99)):
+    """Percentis pelo método do posto mais próximo, mais mínimo, máximo e média."""
+    if not valores:
+        return {}
+    ordenados = sorted(valores)
+    resultado = {f"p{p}": ordenados[min(len(ordenados) - 1, max(0, -(-p * len(ordenados) // 100) - 1))] for p in pontos}
+    resultado.update(min=ordenados[0], max=ordenados[-1], media=statistics.fmean(ordenados), n=len(ordenados))
+    return resultado
+
+
+class Sessao:
+    """Uma sessão headless do app, com cada rerun cronometrado e rotulado pela etapa do roteiro."""
+
+    def __init__(self, caminho_app, timeout):
+        from streamlit.testing.v1 import AppTest
+        self.at = AppTest.from_file(caminho_app, default_timeout=timeout)
+        self.reruns = [] # (etapa, segundos)
+        self.excecoes = []
+
+    def executar(self, etapa, widget=None):
+        """Roda o app (pelo widget alterado, se houver) e registra a latência."""
+        inicio = time.perf_counter()
+        (widget or self.at).run()
+        self.reruns.append((etapa, time.perf_counter() - inicio))
+        self.excecoes.extend(f"{etapa}: {excecao.value}" for excecao in self.at.exception)
+
+    def botao(self, rotulo):
+        return next(b for b in self.at.button if b.label.startswith(rotulo))
+
+    def estado(self):
+        estado = self.at.session_state
+        return {chave: tamanho_estado({chave: estado[chave]})["bytes"] for chave in CHAVES_ESTADO if chave in estado}
+
+
+def roteiro(sessao, num_torres, num_comparacoes):
+    """Criar projeto -> cadastrar torres -> "Conjunta" -> isolamento -> exportar."""
+    at = sessao.at
+    sessao.executar("abrir")
+    sessao.executar("novo_projeto", at.radio[0].set_value("🆕 Criar novo projeto"))
+    sessao.executar("quantidade_torres", at.number_input(key="num_torres").set_value(num_torres))
+
+    nomes = [f"T{i + 1}" for i in range(num_torres)]
+    for i, nome in enumerate(nomes):
+        sessao.executar("nome_torre", at.text_input(key=f"nome_torre_{i}").set_value(nome))
+        sessao.executar("area_torre", at.number_input(key=f"area_torre_{i}").set_value(400.0 + 150.0 * i))
+        sessao.executar("terrea_torre", at.radio(key=f"terrea_torre_{i}").set_value("Não"))
+        sessao.executar("pavimentos_torre", at.number_input(key=f"num_pavimentos_torre_{i}").set_value(4 + 2 * i))
+
+    # Uma a cada três torres (a partir da segunda) e o anexo passam a "Conjunta"
+    if num_torres > 1:
+        conjuntas = [(i, nome) for i, nome in enumerate(nomes) if i % 3 == 1]
+        for i, nome in conjuntas:
+            sessao.executar("conjunta", at.radio(key=f"tratamento_{nome}_{i}").set_value("Conjunta"))
+        sessao.executar("conjunta", at.radio(key=f"tratamento_Anexo a_{num_torres}").set_value("Conjunta"))
+        i, nome = conjuntas[0]
+        sessao.executar("independente", at.radio(key=f"tratamento_{nome}_{i}").set_value("Independente"))
+
+        sessao.executar("ligar_isolamento", at.checkbox(key="check_isolamento").check())
+        for c in range(num_comparacoes):
+            sessao.executar("adicionar_comparacao", sessao.botao("➕ Adicionar Comparação").click())
+            sessao.executar("fachada", at.number_input(key=f"largura1_{c}").set_value(8.0 + c))
+            sessao.executar("fachada", at.number_input(key=f"abertura2_{c}").set_value(4.0 + c))
+
+    sessao.executar("gerar_planilha", at.button(key="gerar_planilha_final").click())
+
+
+def executar_nivel(num_sessoes, num_torres, num_comparacoes, timeout=300):
+    """Roda `num_sessoes` roteiros ao mesmo tempo e agrega as medições."""
+    caminho_app = os.path.join(RAIZ_REPOSITORIO, "app.py")
+    sessoes = [Sessao(caminho_app, timeout) for _ in range(num_sessoes)]
+    falhas = []
+    barreira = threading.Barrier(num_sessoes)
+
+    def trabalhar(sessao):
+        barreira.wait() # todas as sessões começam juntas
+        try:
+            roteiro(sessao, num_torres, num_comparacoes)
+        except Exception:
+            falhas.append(traceback.format_exc(limit=3))
+
+    inicio = time.perf_counter()
+    threads = [threading.Thread(target=trabalhar, args=(sessao,), name=f"sessao-{n}") for n, sessao in enumerate(sessoes)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duracao = time.perf_counter() - inicio
+
+    latencias = [segundos for sessao in sessoes for _, segundos in sessao.reruns]
+    por_etapa = {}
+    for sessao in sessoes:
+        for etapa, segundos in sessao.reruns:
+            por_etapa.setdefault(etapa, []).append(segundos)
+    estados = [sessao.estado() for sessao in sessoes]
+    return {
+        "sessoes": num_sessoes,
+        "duracao_s": duracao,
+        "reruns": len(latencias),
+        "vazao_reruns_s": len(latencias) / duracao if duracao else None,
+        "latencia_rerun_s": percentis(latencias),
+        "latencia_por_etapa_s": {etapa: percentis(valores) for etapa, valores in por_etapa.items()},
+        "session_state_bytes": {chave: percentis([e[chave] for e in estados if chave in e]) for chave in CHAVES_ESTADO},
+        "pico_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "excecoes": [excecao for sessao in sessoes for excecao in sessao.excecoes][:20],
+        "falhas": falhas[:5],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.carga", description="Teste de carga com sessões simultâneas do app.py.")
+    parser.add_argument("--sessoes", default="1,5,10,20", help="Níveis de concorrência, separados por vírgula")
+    parser.add_argument("--torres", type=int, default=6, help="Torres cadastradas em cada sessão")
+    parser.add_argument("--comparacoes", type=int, default=3, help="Comparações de isolamento em cada sessão")
+    parser.add_argument("--saida", help="Arquivo JSON de saída (padrão: benchmarks/resultados/carga-<data>-<versão>.json)")
+    parser.add_argument("--limite-p95", type=float, help="Falha (código 1) se o p95 do rerun passar deste valor em segundos")
+    args = parser.parse_args(argv)
+
+    try:
+        import streamlit # noqa: F401
+    except ImportError as erro:
+        print(f"Streamlit indisponível: {erro}", file=sys.stderr)
+        return 2
+
+    resultado = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "versao": versao_codigo(),
+        "torres": args.torres,
+        "comparacoes": args.comparacoes,
+        "niveis": [],
+    }
+    for num_sessoes in (int(n) for n in args.sessoes.split(",")):
+        print(f"Executando {num_sessoes} sessões simultâneas...", file=sys.stderr)
+        nivel = executar_nivel(num_sessoes, args.torres, args.comparacoes)
+        resultado["niveis"].append(nivel)
+        latencia = nivel["latencia_rerun_s"]
+        print(
+            f"  {nivel['reruns']} reruns em {nivel['duracao_s']:.1f} s ({nivel['vazao_reruns_s']:.1f}/s) · "
+            f"p50 {latencia.get('p50', 0) * 1000:.0f} ms · p95 {latencia.get('p95', 0) * 1000:.0f} ms · "
+            f"p99 {latencia.get('p99', 0) * 1000:.0f} ms · {len(nivel['falhas'])} falhas",
+            file=sys.stderr,
+        )
+
+    saida = args.saida
+    if not saida:
+        os.makedirs(DIRETORIO_RESULTADOS, exist_ok=True)
+        carimbo = datetime.now().strftime("%Y%m%d-%H%M%S")
+        saida = os.path.join(DIRETORIO_RESULTADOS, f"carga-{carimbo}-{resultado['versao'] or 'local'}.json")
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"Resultados gravados em {saida}", file=sys.stderr)
+
+    if any(n["falhas"] for n in resultado["niveis"]):
+        print("Algum roteiro falhou; veja \"falhas\" no JSON.", file=sys.stderr)
+        return 1
+    if args.limite_p95 is not None:
+        estourados = [n["sessoes"] for n in resultado["niveis"] if n["latencia_rerun_s"].get("p95", 0) > args.limite_p95]
+        if estourados:
+            print(f"p95 acima de {args.limite_p95} s com {estourados} sessões simultâneas.", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
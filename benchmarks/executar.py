@@ -0,0 +1,185 @@
+# ⏱️ Suite de benchmarks
+#
+# Uso:
+#   python -m benchmarks.executar [--tamanhos 10,1000,100000] [--saida arquivo.json] [--sem-app]
+#
+# Mede consolidar_edificacoes, buscar_valor_tabela (escalar e em lote),
+# medidas_por_enquadramento, a avaliação ponta a ponta com exportação Excel e
+# a latência de rerun completo do app.py pelo AppTest do Streamlit e a
+# inicialização de sessões (tempo até a primeira renderização e pico de RSS,
+# cada medição em um interpretador novo). O resultado é gravado em JSON para
+# comparação entre versões.
+import argparse
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+from benchmarks.sinteticos import gerar_carteira, gerar_fachadas, gerar_site
+from ppci.regras import buscar_valor_tabela, consolidar_edificacoes, medidas_por_enquadramento
+
+DIRETORIO_RESULTADOS = os.path.join(os.path.dirname(__file__), "resultados")
+RAIZ_REPOSITORIO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def medir(funcao, repeticoes=5):
+    """Executa `funcao` `repeticoes` vezes e devolve estatísticas em segundos."""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append(time.perf_counter() - inicio)
+    return {"min": min(tempos), "mediana": statistics.median(tempos), "max": max(tempos), "repeticoes": repeticoes}
+
+def _repeticoes(tamanho):
+    return 5 if tamanho <= 1000 else 1
+
+def bench_consolidacao(tamanho):
+    edificacoes = gerar_site(tamanho, semente=tamanho)
+    return medir(lambda: consolidar_edificacoes(edificacoes), _repeticoes(tamanho))
+
+def bench_tabela_a3(tamanho):
+    porcentagens, fatores_x = gerar_fachadas(tamanho, semente=tamanho)
+    resultados = {"escalar": medir(lambda: [buscar_valor_tabela(p, x) for p, x in zip(porcentagens, fatores_x)], _repeticoes(tamanho))}
+    try:
+        import numpy as np
+        from ppci.vetorizado import buscar_valor_tabela_lote
+    except ImportError as erro:
+        resultados["lote"] = {"indisponivel": str(erro)}
+    else:
+        p, x = np.array(porcentagens), np.array(fatores_x)
+        resultados["lote"] = medir(lambda: buscar_valor_tabela_lote(p, x), _repeticoes(tamanho))
+    return resultados
+
+def bench_enquadramento(tamanho):
+    edificacoes = consolidar_edificacoes(gerar_site(tamanho, semente=tamanho))
+    return medir(lambda: [medidas_por_enquadramento(e["area"], e["altura"], e["num_pavimentos"]) for e in edificacoes], _repeticoes(tamanho))
+
+def bench_ponta_a_ponta(tamanho):
+    """Consolidação + avaliação da carteira (processo único) + exportação Excel em memória."""
+    from ppci.lote import COLUNAS_RESULTADO, iterar_carteira
+    linhas = gerar_carteira(tamanho, semente=tamanho)
+    resultados = {"avaliacao": medir(lambda: list(iterar_carteira(linhas, processos=1)), _repeticoes(tamanho))}
+    try:
+        import openpyxl # noqa: F401 (ppci.exportacao só o importa ao exportar)
+        from ppci.exportacao import escrever_linhas
+    except ImportError as erro:
+        resultados["avaliacao_e_exportacao"] = {"indisponivel": str(erro)}
+    else:
+        resultados["avaliacao_e_exportacao"] = medir(
+            lambda: escrever_linhas(io.BytesIO(), iterar_carteira(linhas, processos=1), COLUNAS_RESULTADO), _repeticoes(tamanho)
+        )
+    return resultados
+
+def bench_app(num_torres_lista=(1, 10, 40), repeticoes=3):
+    """Latência de rerun completo do app.py com N torres, via streamlit.testing (headless)."""
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError as erro:
+        return {"indisponivel": str(erro)}
+    resultados = {}
+    for num_torres in num_torres_lista:
+        at = AppTest.from_file(os.path.join(RAIZ_REPOSITORIO, "app.py"), default_timeout=120)
+        at.run()
+        at.radio[0].set_value("🆕 Criar novo projeto").run()
+        at.number_input(key="num_torres").set_value(num_torres).run()
+        resultados[str(num_torres)] = medir(at.run, repeticoes)
+    return resultados
+
+# Executado em um interpretador novo: a primeira sessão é a "fria" (paga as
+# importações); as seguintes mostram o custo incremental de cada sessão.
+_SCRIPT_INICIALIZACAO = """
+import json, resource, sys, time
+inicio = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+importacao = time.perf_counter() - inicio
+sessoes = []
+for _ in range({sessoes}):
+    inicio = time.perf_counter()
+    at = AppTest.from_file({app!r}, default_timeout=120)
+    at.run()
+    sessoes.append({{
+        "primeira_renderizacao_s": time.perf_counter() - inicio,
+        "pico_rss_kib": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "excecoes": len(at.exception),
+    }})
+pesados = [m for m in ("pandas", "numpy", "openpyxl", "altair", "sqlite3") if m in sys.modules]
+print(json.dumps({{"importacao_streamlit_s": importacao, "sessoes": sessoes, "modulos_pesados_carregados": pesados}}))
+"""
+
+def bench_inicializacao(processos=3, sessoes_por_processo=3):
+    """Tempo até a primeira renderização e pico de RSS por sessão, partindo de interpretadores novos."""
+    try:
+        import streamlit # noqa: F401
+    except ImportError as erro:
+        return {"indisponivel": str(erro)}
+    script = _SCRIPT_INICIALIZACAO.format(sessoes=sessoes_por_processo, app=os.path.join(RAIZ_REPOSITORIO, "app.py"))
+    execucoes = []
+    for _ in range(processos):
+        saida = subprocess.run([sys.executable, "-c", script], cwd=RAIZ_REPOSITORIO, capture_output=True, text=True, check=True)
+        execucoes.append(json.loads(saida.stdout.strip().splitlines()[-1]))
+    frias = [e["sessoes"][0]["primeira_renderizacao_s"] for e in execucoes]
+    return {
+        "primeira_sessao_s": {"min": min(frias), "mediana": statistics.median(frias), "max": max(frias)},
+        "pico_rss_kib_primeira_sessao": max(e["sessoes"][0]["pico_rss_kib"] for e in execucoes),
+        "execucoes": execucoes,
+    }
+
+def versao_codigo():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=RAIZ_REPOSITORIO,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def executar(tamanhos, incluir_app=True):
+    resultado = {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "versao": versao_codigo(),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "tamanhos": {},
+    }
+    for tamanho in tamanhos:
+        print(f"Executando benchmarks com {tamanho} edificações...", file=sys.stderr)
+        resultado["tamanhos"][str(tamanho)] = {
+            "consolidar_edificacoes": bench_consolidacao(tamanho),
+            "buscar_valor_tabela": bench_tabela_a3(tamanho),
+            "medidas_por_enquadramento": bench_enquadramento(tamanho),
+            "ponta_a_ponta": bench_ponta_a_ponta(tamanho),
+        }
+    if incluir_app:
+        print("Executando reruns do app.py...", file=sys.stderr)
+        resultado["app_rerun"] = bench_app()
+        print("Medindo a inicialização de sessões...", file=sys.stderr)
+        resultado["inicializacao"] = bench_inicializacao()
+    return resultado
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.executar", description="Benchmarks das regras do PPCI.")
+    parser.add_argument("--tamanhos", default="10,1000,100000", help="Quantidades de edificações, separadas por vírgula")
+    parser.add_argument("--saida", help="Arquivo JSON de saída (padrão: benchmarks/resultados/<data>-<versão>.json)")
+    parser.add_argument("--sem-app", action="store_true", help="Não mede o rerun nem a inicialização do app.py")
+    args = parser.parse_args(argv)
+
+    resultado = executar([int(t) for t in args.tamanhos.split(",")], incluir_app=not args.sem_app)
+
+    saida = args.saida
+    if not saida:
+        os.makedirs(DIRETORIO_RESULTADOS, exist_ok=True)
+        carimbo = datetime.now().strftime("%Y%m%d-%H%M%S")
+        saida = os.path.join(DIRETORIO_RESULTADOS, f"{carimbo}-{resultado['versao'] or 'local'}.json")
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, ensure_ascii=False, indent=2)
+    print(f"Resultados gravados em {saida}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+# 🎲 Geradores de sites e carteiras sintéticas
+#
+# Produzem edificações com as mesmas chaves do formulário do app (torres e
+# anexos), com alturas, áreas, subsolos e agrupamentos "Conjunta" aleatórios
+# porém reprodutíveis pela semente.
+import random
+
+OPCOES_USO_ANEXO = ["C-1", "F-6", "F-8", "G-1", "G-2", "J-2"]
+OPCOES_CARGA_INCENDIO = ["300 MJ/m²", "600 MJ/m²"]
+
+
+def gerar_torre(rng, nome):
+    terrea = "Sim" if rng.random() < 0.1 else "Não"
+    torre = {
+        "nome": nome, "area": round(rng.uniform(150, 3000), 2), "altura": 0.0, "terrea": terrea,
+        "num_pavimentos": 1, "um_ap_por_pav": None, "subsolo_tecnico": "Não", "numero_subsolos": "0",
+        "area_subsolo": "Menor que 500m²", "subsolo_ocupado": "Não", "subsolo_menor_50": "Não",
+        "duplex": "Não", "atico": "Não",
+    }
+    if terrea == "Não":
+        num_pavimentos = rng.randint(2, 40)
+        torre.update({
+            "num_pavimentos": num_pavimentos,
+            "altura": round((num_pavimentos - 1) * rng.uniform(2.8, 3.2), 2),
+            "um_ap_por_pav": rng.choice(["Sim", "Não"]),
+            "duplex": rng.choice(["Sim", "Não"]),
+            "atico": rng.choice(["Sim", "Não"]),
+        })
+        if rng.random() < 0.4:
+            numero_subsolos = rng.choice(["1", "Mais de 1"])
+            subsolo_ocupado = rng.choice(["Sim", "Não"])
+            torre.update({
+                "subsolo_tecnico": "Sim",
+                "numero_subsolos": numero_subsolos,
+                "area_subsolo": rng.choice(["Menor que 500m²", "Maior que 500m²"]) if numero_subsolos == "1" else "Maior que 500m²",
+                "subsolo_ocupado": subsolo_ocupado,
+                "subsolo_menor_50": rng.choice(["Sim", "Não"]) if subsolo_ocupado == "Sim" else "Não",
+            })
+    return torre
+
+def gerar_anexo(rng, nome):
+    return {
+        "nome": nome, "area": round(rng.uniform(20, 600), 2),
+        "uso": rng.choice(OPCOES_USO_ANEXO), "carga_incendio": rng.choice(OPCOES_CARGA_INCENDIO),
+        "terrea": "Sim", "num_pavimentos": 1, "um_ap_por_pav": None, "altura": 0.0,
+    }
+
+def gerar_site(num_edificacoes, semente=0, fracao_anexos=0.3, fracao_conjunta=0.3, fracao_cadeia=0.1):
+    """
+    Lista de edificações de um site (torres + anexos) com tratamento definido.
+    `fracao_conjunta` das edificações é absorvida por uma torre; uma parte
+    delas (`fracao_cadeia`) aponta para outra edificação conjunta, formando cadeias.
+    """
+    rng = random.Random(semente)
+    num_anexos = int(num_edificacoes * fracao_anexos)
+    num_torres = max(1, num_edificacoes - num_anexos)
+    torres = [gerar_torre(rng, f"Torre {i + 1}") for i in range(num_torres)]
+    anexos = [gerar_anexo(rng, f"Anexo {i + 1}") for i in range(num_edificacoes - num_torres)]
+
+    edificacoes = torres + anexos
+    for edificacao in edificacoes:
+        edificacao["tratamento"] = "Independente"
+        edificacao["edificacao_conjunta"] = None
+
+    conjuntas = []
+    nomes_torres = [t["nome"] for t in torres]
+    for edificacao in rng.sample(edificacoes, int(len(edificacoes) * fracao_conjunta)):
+        if conjuntas and rng.random() < fracao_cadeia:
+            alvo = rng.choice(conjuntas)["nome"]
+        else:
+            alvo = rng.choice(nomes_torres)
+        if alvo == edificacao["nome"]:
+            continue
+        edificacao["tratamento"] = "Conjunta"
+        edificacao["edificacao_conjunta"] = alvo
+        conjuntas.append(edificacao)
+    return edificacoes
+
+def gerar_carteira(num_edificacoes, edificacoes_por_projeto=20, semente=0):
+    """Linhas de uma planilha de carteira (uma edificação por linha, com NomeProjeto)."""
+    linhas = []
+    num_projetos = max(1, -(-num_edificacoes // edificacoes_por_projeto))
+    for p in range(num_projetos):
+        restante = num_edificacoes - len(linhas)
+        for edificacao in gerar_site(min(edificacoes_por_projeto, restante), semente=semente + p):
+            edificacao["NomeProjeto"] = f"Projeto {p + 1:05d}"
+            linhas.append(edificacao)
+    return linhas
+
+def gerar_fachadas(quantidade, semente=0):
+    """Arrays (listas) de porcentagem de abertura e Fator X para consultas à Tabela A.3."""
+    rng = random.Random(semente)
+    porcentagens = [rng.uniform(0, 100) for _ in range(quantidade)]
+    fatores_x = [rng.uniform(1, 45) for _ in range(quantidade)]
+    return porcentagens, fatores_x
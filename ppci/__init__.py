@@ -0,0 +1 @@
+"""Núcleo de regras do PPCI, independente da interface Streamlit."""
@@ -0,0 +1,121 @@
+# 🤝 Cache de resultados compartilhado entre as sessões do servidor
+#
+# Enquadramento, veredito de TRRF e distâncias de isolamento dependem só de
+# poucos valores de entrada, e muitos usuários avaliam edificações quase
+# iguais (o bloco padrão de 4 pavimentos e 750 m², por exemplo). Este cache é
+# único por processo: as sessões do Streamlit (threads do mesmo processo)
+# recebem os mesmos objetos imutáveis em vez de cada uma guardar sua cópia.
+#
+# A remoção é LRU, limitada por um teto de memória (tamanho estimado pelo
+# pickle de chave + valor) e por um número máximo de itens. Os contadores de
+# acertos/faltas aparecem no painel de instrumentação do app.
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+
+from ppci.regras import avaliar_trrf, chave_decisao, classificar, distancia_isolamento
+
+MAX_BYTES_PADRAO = int(os.environ.get("PPCI_CACHE_MB", "64")) * 1024 * 1024
+MAX_ITENS_PADRAO = 200_000
+
+
+def _tamanho(chave, valor):
+    try:
+        return len(pickle.dumps((chave, valor), protocol=pickle.HIGHEST_PROTOCOL))
+    except (AttributeError, TypeError, pickle.PicklingError):
+        # Ex.: entradas do índice de decisão (MappingProxyType), que já são compartilhadas
+        return sys.getsizeof(chave) + sys.getsizeof(valor)
+
+
+class CacheLRU:
+    """LRU seguro entre threads, com teto de memória e contadores de uso."""
+
+    def __init__(self, max_bytes=MAX_BYTES_PADRAO, max_itens=MAX_ITENS_PADRAO):
+        self.max_bytes = max_bytes
+        self.max_itens = max_itens
+        self._itens = OrderedDict() # chave -> (valor, bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+        self.remocoes = 0
+
+    def __len__(self):
+        return len(self._itens)
+
+    def obter(self, chave, calcular):
+        """
+        Valor em cache para `chave` ou, na falta, `calcular()` (fora do lock:
+        duas sessões podem calcular a mesma chave ao mesmo tempo, com o mesmo
+        resultado). O valor deve ser imutável, pois é compartilhado.
+        """
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is not None:
+                self._itens.move_to_end(chave)
+                self.acertos += 1
+                return item[0]
+            self.faltas += 1
+
+        valor = calcular()
+        tamanho = _tamanho(chave, valor)
+        with self._lock:
+            anterior = self._itens.pop(chave, None)
+            if anterior is not None:
+                self._bytes -= anterior[1]
+            self._itens[chave] = (valor, tamanho)
+            self._bytes += tamanho
+            while self._itens and (self._bytes > self.max_bytes or len(self._itens) > self.max_itens):
+                _, (_, tamanho_removido) = self._itens.popitem(last=False)
+                self._bytes -= tamanho_removido
+                self.remocoes += 1
+        return valor
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
+            self._bytes = 0
+
+    def estatisticas(self):
+        with self._lock:
+            consultas = self.acertos + self.faltas
+            return {
+                "itens": len(self._itens), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                "acertos": self.acertos, "faltas": self.faltas, "remocoes": self.remocoes,
+                "taxa_acerto": self.acertos / consultas if consultas else None,
+            }
+
+
+# Instância única do processo
+CACHE_RESULTADOS = CacheLRU()
+
+
+# 🧠 Consultas com cache
+# As chaves guardam só o que de fato altera o resultado (faixa da tabela,
+# limites de área/altura...), e não os valores brutos: edificações diferentes
+# que caem na mesma regra compartilham a mesma entrada.
+def classificar_compartilhado(area_consolidada, altura, num_pavimentos):
+    """classificar() com cache: (entrada do índice de decisão, notas)."""
+    chave_indice = chave_decisao(area_consolidada, altura, num_pavimentos)
+    chave = ("classificacao", chave_indice, chave_indice[0] == "completa" and altura >= 80)
+    return CACHE_RESULTADOS.obter(chave, lambda: classificar(area_consolidada, altura, num_pavimentos))
+
+def avaliar_trrf_compartilhado(edificacao, estrutura_terrea="Não"):
+    """avaliar_trrf() com cache: (resposta_trrf, mostrar_trrf_adotado)."""
+    terrea = edificacao.get("terrea") == "Sim"
+    chave = ("trrf", terrea, estrutura_terrea) if terrea else (
+        "trrf", terrea, edificacao.get("altura", 0) <= 12, edificacao.get("area", 0) < 1500,
+        edificacao.get("subsolo_tecnico", "Não"), edificacao.get("numero_subsolos", "0") == "1",
+        edificacao.get("area_subsolo", "Menor que 500m²"),
+    )
+    return CACHE_RESULTADOS.obter(chave, lambda: avaliar_trrf(edificacao, estrutura_terrea))
+
+def distancia_isolamento_compartilhada(largura, altura, abertura, area_edificacao, altura_edificacao, num_pavimentos, bombeiros="Sim"):
+    """distancia_isolamento() com cache, a partir dos valores de que ela depende."""
+    simplificada = area_edificacao <= 750 and altura_edificacao <= 12
+    chave = ("distancia", float(largura), float(altura), float(abertura), bombeiros,
+             simplificada, min(num_pavimentos, 3) if simplificada else None)
+    edificacao = {"area": area_edificacao, "altura": altura_edificacao, "num_pavimentos": num_pavimentos}
+    return CACHE_RESULTADOS.obter(chave, lambda: distancia_isolamento(largura, altura, abertura, edificacao, bombeiros))
@@ -0,0 +1,218 @@
+# 🔀 Diferenças entre duas revisões de um checklist exportado
+#
+# Uso:
+#   python -m ppci.diferencas ANTES.xlsx DEPOIS.xlsx [-o diferencas.xlsx] [--apenas-resultados]
+#
+# Lê as abas "Edificações", "Isolamento" e "TRRF" das duas planilhas (cada
+# uma aberta uma única vez), casa as edificações pelo nome e as comparações
+# de isolamento pelo par de edificações com dicionários, sem varreduras
+# aninhadas, e lista as diferenças, uma por linha:
+#   - entradas alteradas (área, altura, pavimentos, subsolos, tratamento,
+#     respostas de TRRF, fachadas);
+#   - resultados alterados: tabela escolhida, medidas ganhas/perdidas,
+#     notas, veredito de TRRF e distâncias de isolamento.
+# Tabela, medidas e notas são obtidas pelo índice de decisão a partir das
+# entradas de cada revisão; o veredito de TRRF e as distâncias vêm das abas
+# gravadas na exportação (o veredito é recalculado se a aba não existir).
+import argparse
+import math
+import os
+import sys
+
+from ppci.ingestao import ESQUEMA_EDIFICACAO, ler_abas
+from ppci.lote import normalizar_edificacao
+from ppci.regras import avaliar_edificacao
+
+COLUNAS_DIFERENCAS = ["Edificação", "Tipo", "Categoria", "Campo", "Antes", "Depois"]
+
+# Colunas das abas gravadas por ppci.exportacao.escrever_relatorio
+ESQUEMA_ISOLAMENTO = {
+    "Comparação": "Int64",
+    **{f"Edificação {lado}": "string" for lado in (1, 2)},
+    **{f"{campo} {lado} ({unidade})": "Float64" for lado in (1, 2)
+       for campo, unidade in (("Largura", "m"), ("Altura", "m"), ("Abertura", "m²"), ("Distância", "m"))},
+}
+ESQUEMA_TRRF = {
+    "Edificação": "string", "Veredito TRRF": "string", "Elemento estrutural crítico (térrea)": "string",
+    "Cobertura com TRRF": "string", "TRRF adotado": "string",
+}
+CAMPOS_ENTRADA = [campo for campo in ESQUEMA_EDIFICACAO if campo != "nome"]
+PRESENCA = ("ausente", "presente")
+RESPOSTAS_TRRF = ["Elemento estrutural crítico (térrea)", "Cobertura com TRRF", "TRRF adotado"]
+
+
+def _linhas(colunas):
+    total = max((len(valores) for valores in colunas.values()), default=0)
+    return [{coluna: valores[i] for coluna, valores in colunas.items()} for i in range(total)]
+
+def _iguais(a, b):
+    if isinstance(a, float) and isinstance(b, float):
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)
+    return a == b
+
+def _exigida(aplicacao):
+    return str(aplicacao or "").startswith("X")
+
+
+# 📄 Leitura de uma revisão
+
+def ler_revisao(conteudo):
+    """
+    Planilha exportada -> {"edificacoes": {nome: entradas}, "resultados":
+    {nome: avaliação}, "isolamento": {(edf1, edf2, n): linha}}.
+    """
+    abas = ler_abas(conteudo, {None: ESQUEMA_EDIFICACAO, "Isolamento": ESQUEMA_ISOLAMENTO, "TRRF": ESQUEMA_TRRF})
+    respostas_trrf = {linha["Edificação"]: linha for linha in _linhas(abas["TRRF"])}
+
+    edificacoes, resultados = {}, {}
+    for linha in _linhas(abas[None]):
+        nome = linha.get("nome") or ""
+        if nome in edificacoes:
+            continue # nome repetido: vale a primeira linha, como na consolidação
+        respostas = respostas_trrf.get(nome, {})
+        entradas = {campo: linha.get(campo) for campo in CAMPOS_ENTRADA}
+        entradas.update((campo, respostas.get(campo)) for campo in RESPOSTAS_TRRF)
+        edificacoes[nome] = entradas
+
+        avaliacao = avaliar_edificacao(normalizar_edificacao(linha), respostas.get("Elemento estrutural crítico (térrea)") or "Não")
+        if respostas.get("Veredito TRRF") is not None:
+            avaliacao["trrf"] = respostas["Veredito TRRF"]
+        resultados[nome] = avaliacao
+
+    isolamento, ocorrencias = {}, {}
+    for linha in _linhas(abas["Isolamento"]):
+        par = (linha.get("Edificação 1"), linha.get("Edificação 2"))
+        ocorrencias[par] = ocorrencias.get(par, 0) + 1
+        isolamento[(*par, ocorrencias[par])] = linha
+    return {"edificacoes": edificacoes, "resultados": resultados, "isolamento": isolamento}
+
+
+# 🔍 Comparação
+
+def _diferencas_resultado(nome, antes, depois):
+    linhas = []
+    def registrar(categoria, campo, valor_antes, valor_depois):
+        linhas.append({"Edificação": nome, "Tipo": "Resultado", "Categoria": categoria, "Campo": campo, "Antes": valor_antes, "Depois": valor_depois})
+
+    tabelas = ["Completa", "Simplificada"]
+    if antes["tabela_simplificada"] != depois["tabela_simplificada"]:
+        registrar("Tabela", "Tabela", tabelas[antes["tabela_simplificada"]], tabelas[depois["tabela_simplificada"]])
+    for medida, aplicacao_depois in depois["medidas"].items():
+        aplicacao_antes = antes["medidas"].get(medida)
+        exigida_antes, exigida_depois = _exigida(aplicacao_antes), _exigida(aplicacao_depois)
+        if aplicacao_antes == aplicacao_depois or not (exigida_antes or exigida_depois):
+            continue # "-" e vazio significam a mesma coisa: não exigida
+        if exigida_antes == exigida_depois:
+            categoria = "Medida alterada" # mudou só o sobrescrito (nota aplicável)
+        else:
+            categoria = "Medida ganha" if exigida_depois else "Medida perdida"
+        registrar(categoria, medida, aplicacao_antes, aplicacao_depois)
+    notas_antes, notas_depois = set(antes["notas"]), set(depois["notas"])
+    for nota in depois["notas"]:
+        if nota not in notas_antes:
+            registrar("Nota adicionada", "Nota", None, nota)
+    for nota in antes["notas"]:
+        if nota not in notas_depois:
+            registrar("Nota removida", "Nota", nota, None)
+    if antes["trrf"] != depois["trrf"]:
+        registrar("TRRF", "Veredito TRRF", antes["trrf"], depois["trrf"])
+    return linhas
+
+def _diferencas_isolamento(antes, depois):
+    linhas = []
+    for chave in [*depois, *(chave for chave in antes if chave not in depois)]:
+        edf1, edf2, n = chave
+        rotulo = f"{edf1} × {edf2}" + (f" ({n})" if n > 1 else "")
+        linha_antes, linha_depois = antes.get(chave), depois.get(chave)
+        if linha_antes is None or linha_depois is None:
+            categoria = "Comparação adicionada" if linha_antes is None else "Comparação removida"
+            linhas.append({"Edificação": rotulo, "Tipo": "Entrada", "Categoria": categoria, "Campo": None,
+                           "Antes": PRESENCA[linha_antes is not None], "Depois": PRESENCA[linha_depois is not None]})
+            continue
+        for campo, valor_depois in linha_depois.items():
+            valor_antes = linha_antes.get(campo)
+            if campo == "Comparação" or _iguais(valor_antes, valor_depois):
+                continue
+            tipo = "Resultado" if campo.startswith("Distância") else "Entrada"
+            linhas.append({"Edificação": rotulo, "Tipo": tipo, "Categoria": "Isolamento", "Campo": campo, "Antes": valor_antes, "Depois": valor_depois})
+    return linhas
+
+def comparar_revisoes(antes, depois):
+    """
+    Diferenças entre duas revisões lidas por ler_revisao. Devolve
+    {"linhas": [dict com COLUNAS_DIFERENCAS], "resumo": contagens}.
+    """
+    linhas = []
+    resumo = dict.fromkeys(("adicionadas", "removidas", "entradas_alteradas", "resultados_alterados", "isolamento_alterado"), 0)
+    edificacoes_antes, edificacoes_depois = antes["edificacoes"], depois["edificacoes"]
+
+    for nome, entradas_depois in edificacoes_depois.items():
+        entradas_antes = edificacoes_antes.get(nome)
+        if entradas_antes is None:
+            resumo["adicionadas"] += 1
+            linhas.append({"Edificação": nome, "Tipo": "Entrada", "Categoria": "Edificação adicionada", "Campo": None, "Antes": PRESENCA[False], "Depois": PRESENCA[True]})
+            continue
+        alteradas = [
+            {"Edificação": nome, "Tipo": "Entrada", "Categoria": "Entrada", "Campo": campo, "Antes": entradas_antes.get(campo), "Depois": valor}
+            for campo, valor in entradas_depois.items() if not _iguais(entradas_antes.get(campo), valor)
+        ]
+        resultado = _diferencas_resultado(nome, antes["resultados"][nome], depois["resultados"][nome])
+        resumo["entradas_alteradas"] += bool(alteradas)
+        resumo["resultados_alterados"] += bool(resultado)
+        linhas += alteradas + resultado
+
+    for nome in edificacoes_antes:
+        if nome not in edificacoes_depois:
+            resumo["removidas"] += 1
+            linhas.append({"Edificação": nome, "Tipo": "Entrada", "Categoria": "Edificação removida", "Campo": None, "Antes": PRESENCA[True], "Depois": PRESENCA[False]})
+
+    isolamento = _diferencas_isolamento(antes["isolamento"], depois["isolamento"])
+    resumo["isolamento_alterado"] = len({linha["Edificação"] for linha in isolamento})
+    linhas += isolamento
+    return {"linhas": linhas, "resumo": resumo}
+
+def comparar_planilhas(conteudo_antes, conteudo_depois):
+    return comparar_revisoes(ler_revisao(conteudo_antes), ler_revisao(conteudo_depois))
+
+def formatar_valor(valor):
+    return "—" if valor is None else str(valor)
+
+
+# 🖥️ Linha de comando
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m ppci.diferencas", description="Compara duas revisões de um checklist exportado.")
+    parser.add_argument("antes", help="Revisão anterior (.xlsx)")
+    parser.add_argument("depois", help="Revisão nova (.xlsx)")
+    parser.add_argument("-o", "--saida", help="Grava as diferenças em uma planilha em vez de listá-las")
+    parser.add_argument("--apenas-resultados", action="store_true", help="Só as diferenças de resultado (tabela, medidas, notas, TRRF, distâncias)")
+    args = parser.parse_args(argv)
+
+    with open(args.antes, "rb") as f:
+        conteudo_antes = f.read()
+    with open(args.depois, "rb") as f:
+        conteudo_depois = f.read()
+    diferencas = comparar_planilhas(conteudo_antes, conteudo_depois)
+    linhas = [l for l in diferencas["linhas"] if l["Tipo"] == "Resultado"] if args.apenas_resultados else diferencas["linhas"]
+
+    if args.saida:
+        from ppci.exportacao import escrever_linhas
+        escrever_linhas(args.saida, linhas, COLUNAS_DIFERENCAS, nome_aba="Diferenças")
+    else:
+        for linha in linhas:
+            campo = f" · {linha['Campo']}" if linha["Campo"] else ""
+            print(f"{linha['Edificação']} [{linha['Categoria']}]{campo}: {formatar_valor(linha['Antes'])} → {formatar_valor(linha['Depois'])}")
+
+    resumo = diferencas["resumo"]
+    print(
+        f"{os.path.basename(args.antes)} → {os.path.basename(args.depois)}: "
+        f"{resumo['adicionadas']} edificações adicionadas, {resumo['removidas']} removidas, "
+        f"{resumo['entradas_alteradas']} com entradas alteradas ({resumo['resultados_alterados']} com resultado alterado), "
+        f"{resumo['isolamento_alterado']} comparações de isolamento alteradas",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+# 📥 Exportação em Excel (openpyxl em modo write-only)
+#
+# As linhas são geradas sob demanda e gravadas diretamente no arquivo, sem
+# montar DataFrames intermediários: a memória fica estável mesmo em
+# exportações de carteiras com dezenas de milhares de linhas.
+import re
+
+from ppci.ingestao import ESQUEMA_EDIFICACAO
+from ppci.registros import ColecaoEdificacoes, RegistroEdificacao
+from ppci.regras import TRRF_ISENTA, avaliar_edificacao, avaliar_trrf, distancia_isolamento
+
+COLUNAS_EDIFICACAO = list(ESQUEMA_EDIFICACAO)
+
+COLUNAS_ISOLAMENTO = [
+    "Comparação", "Edificação 1", "Largura 1 (m)", "Altura 1 (m)", "Abertura 1 (m²)", "Distância 1 (m)",
+    "Edificação 2", "Largura 2 (m)", "Altura 2 (m)", "Abertura 2 (m²)", "Distância 2 (m)",
+]
+
+COLUNAS_TRRF = ["Edificação", "Veredito TRRF", "Elemento estrutural crítico (térrea)", "Cobertura com TRRF", "TRRF adotado", "Observações"]
+
+_CARACTERES_INVALIDOS_ABA = re.compile(r"[\[\]:*?/\\]")
+
+
+def _valor_celula(valor):
+    if isinstance(valor, (list, tuple)):
+        return ", ".join(str(v) for v in valor)
+    return valor
+
+def _nome_aba(nome, usados):
+    """Nome de aba válido (até 31 caracteres, sem caracteres proibidos) e único."""
+    base = _CARACTERES_INVALIDOS_ABA.sub("_", str(nome or "Edificação")).strip("'")[:31] or "Edificação"
+    candidato, n = base, 2
+    while candidato.lower() in usados:
+        sufixo = f" ({n})"
+        candidato, n = base[:31 - len(sufixo)] + sufixo, n + 1
+    usados.add(candidato.lower())
+    return candidato
+
+def escrever_linhas(destino, linhas, colunas, nome_aba="Resultados"):
+    """Grava um iterável de dicts em uma única aba, linha a linha. Retorna o total de linhas."""
+    from openpyxl import Workbook # Importado só quando há o que exportar
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(nome_aba)
+    ws.append(colunas)
+    total = 0
+    for total, linha in enumerate(linhas, start=1):
+        ws.append([_valor_celula(linha.get(coluna)) for coluna in colunas])
+    wb.save(destino)
+    return total
+
+def escrever_relatorio(destino, edificacoes, comparacoes=(), respostas_trrf=None, bombeiros="Sim"):
+    """
+    Relatório completo do projeto:
+      - "Edificações": dados de entrada das edificações consolidadas;
+      - uma aba por edificação com a tabela de medidas e as notas;
+      - "Isolamento": todas as comparações de fachada com as distâncias;
+      - "TRRF": veredito e respostas da Segurança Estrutural;
+      - "TRRF por pavimento": TRRF de cada pavimento das edificações que
+        precisam comprová-lo (ppci.trrf, todas resolvidas de uma vez).
+    `respostas_trrf` é uma lista (na ordem de `edificacoes`) de dicts com as
+    chaves estrutura_terrea, cobertura_trrf, trrf_adotado, comentario_estrutural
+    e, opcionalmente, pavimentos_trrf (pavimentos editados, de baixo para cima).
+    """
+    respostas_trrf = respostas_trrf or [{} for _ in edificacoes]
+    from openpyxl import Workbook # Importado só quando há o que exportar
+    wb = Workbook(write_only=True)
+    usados = {"edificações", "isolamento", "trrf", "trrf por pavimento"}
+
+    ws = wb.create_sheet("Edificações")
+    ws.append(COLUNAS_EDIFICACAO)
+    if all(isinstance(edificacao, RegistroEdificacao) for edificacao in edificacoes):
+        # Registros compactos: leitura coluna a coluna, sem um dict por linha
+        linhas = ColecaoEdificacoes.de_registros(edificacoes).linhas(COLUNAS_EDIFICACAO)
+    else:
+        linhas = ([edificacao.get(coluna) for coluna in COLUNAS_EDIFICACAO] for edificacao in edificacoes)
+    for linha in linhas:
+        ws.append([_valor_celula(valor) for valor in linha])
+
+    for edificacao in edificacoes:
+        avaliacao = avaliar_edificacao(edificacao)
+        ws = wb.create_sheet(_nome_aba(edificacao.get("nome"), usados))
+        ws.append(["Área consolidada (m²)", avaliacao["area_consolidada"]])
+        ws.append(["Tabela", "Simplificada" if avaliacao["tabela_simplificada"] else "Completa"])
+        ws.append([])
+        ws.append(["Medida de Segurança", "Aplicação"])
+        for medida, aplicacao in avaliacao["medidas"].items():
+            ws.append([medida, aplicacao])
+        if avaliacao["notas"]:
+            ws.append([])
+            ws.append(["Notas Específicas"])
+            for nota in avaliacao["notas"]:
+                ws.append([nota])
+
+    indice = {e.get("nome"): e for e in edificacoes}
+    ws = wb.create_sheet("Isolamento")
+    ws.append(COLUNAS_ISOLAMENTO)
+    for n, comp in enumerate(comparacoes, start=1):
+        linha = [n]
+        for lado in (1, 2):
+            edificacao = indice.get(comp.get(f"edf{lado}_nome"))
+            largura, altura, abertura = comp.get(f"largura{lado}", 0.0), comp.get(f"altura{lado}", 0.0), comp.get(f"abertura{lado}", 0.0)
+            distancia = distancia_isolamento(largura, altura, abertura, edificacao, bombeiros) if edificacao else None
+            linha += [comp.get(f"edf{lado}_nome"), largura, altura, abertura, distancia]
+        ws.append(linha)
+
+    ws = wb.create_sheet("TRRF")
+    ws.append(COLUNAS_TRRF)
+    for edificacao, respostas in zip(edificacoes, respostas_trrf):
+        estrutura_terrea = respostas.get("estrutura_terrea") or "Não"
+        resposta_trrf, _ = avaliar_trrf(edificacao, estrutura_terrea)
+        ws.append([
+            edificacao.get("nome"), resposta_trrf,
+            estrutura_terrea if edificacao.get("terrea") == "Sim" else None,
+            respostas.get("cobertura_trrf"), respostas.get("trrf_adotado"), respostas.get("comentario_estrutural"),
+        ])
+
+    from ppci.trrf import COLUNAS_TRRF_PAVIMENTOS, trrf_site # NumPy só é carregado ao exportar
+    ws = wb.create_sheet("TRRF por pavimento")
+    ws.append(COLUNAS_TRRF_PAVIMENTOS)
+    try:
+        resultados_trrf = trrf_site(
+            edificacoes, [respostas.get("pavimentos_trrf") for respostas in respostas_trrf],
+            [respostas.get("estrutura_terrea") for respostas in respostas_trrf],
+        )
+    except ValueError as erro: # uso sem TRRF tabelado em algum pavimento editado
+        ws.append([f"⚠️ TRRF por pavimento não calculado: {erro}"])
+        resultados_trrf = []
+    for veredito, linhas in resultados_trrf:
+        if veredito == TRRF_ISENTA:
+            continue
+        for linha in reversed(linhas): # do topo para a base, como na tabela da norma
+            ws.append([linha[coluna] for coluna in COLUNAS_TRRF_PAVIMENTOS])
+
+    wb.save(destino)
@@ -0,0 +1,411 @@
+# 🗺️ Implantação geométrica: fachadas e afastamentos reais entre edificações
+#
+# Uso:
+#   python -m ppci.geometria IMPLANTACAO.geojson|.dxf [-o afastamentos.xlsx]
+#                            [--bombeiros Sim|Não] [--abertura PORCENTAGEM] [--folga METROS]
+#
+# Lê as projeções das edificações (polígonos de um GeoJSON ou polilinhas
+# fechadas de um DXF, em coordenadas projetadas em metros) e divide cada
+# contorno em fachadas, trechos retos com largura = comprimento do trecho e
+# altura = altura da edificação. Cada fachada recebe a distância de isolamento
+# exigida pela NT-07 (ppci.vetorizado, a mesma interpolação de
+# buscar_valor_tabela) e é comparada só com as fachadas próximas, encontradas
+# por uma grade espacial uniforme; o trabalho cresce quase linearmente com o
+# número de blocos. Entre fachadas de edificações diferentes que se enxergam,
+# o afastamento real é a menor distância entre os dois segmentos.
+#
+# GeoJSON: feições Polygon/MultiPolygon com as propriedades "nome" (ou
+# "name"), "altura" (ou "height", altura da fachada em m) e, opcionais,
+# "pavimentos", "area" (área construída), "altura_edificacao" (altura da
+# NT-07) e "abertura" (porcentagem de aberturas das fachadas).
+# DXF (ASCII): LWPOLYLINE ou POLYLINE fechadas; o nome é a camada e a altura
+# é a espessura (código 39). Contornos com o mesmo nome são partes da mesma
+# edificação; os furos (pátios internos) dos polígonos são ignorados.
+import argparse
+import json
+import math
+import os
+import sys
+
+import numpy as np
+
+from ppci.regras import fachada_edificacao
+from ppci.vetorizado import distancias_isolamento_lote
+
+PE_DIREITO = 3.0 # altura presumida de cada pavimento (m), quando o arquivo não informa
+PORCENTAGEM_ABERTURA_PADRAO = 100.0 # sem o levantamento das aberturas, fachada toda aberta (a favor da segurança)
+FOLGA_PADRAO = 2.0 # pares que atendem por menos que isso também são listados (m)
+TOLERANCIA_COLINEAR = math.sin(math.radians(5.0)) # vértices com desvio menor não dividem a fachada
+ORIENTACOES = ("L", "NE", "N", "NO", "O", "SO", "S", "SE")
+COLUNAS_AFASTAMENTOS = [
+    "Edificação 1", "Fachada 1", "Edificação 2", "Fachada 2",
+    "Largura 1 (m)", "Altura 1 (m)", "Abertura 1 (m²)", "Largura 2 (m)", "Altura 2 (m)", "Abertura 2 (m²)",
+    "Distância 1 (m)", "Distância 2 (m)", "Distância exigida (m)", "Afastamento (m)", "Situação",
+]
+
+
+def _numero(valor):
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        return None
+    return numero if math.isfinite(numero) and numero > 0 else None
+
+def _area_com_sinal(contorno):
+    x, y = contorno[:, 0], contorno[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+def criar_bloco(nome, contorno, altura=None, pavimentos=None, area=None, altura_edificacao=None, abertura=None):
+    """
+    Bloco de implantação: contorno anti-horário sem vértices repetidos, altura
+    da fachada e a edificação usada nas regras da NT-07 (área construída,
+    altura e pavimentos, estimados a partir do contorno quando ausentes).
+    """
+    contorno = np.asarray(contorno, dtype=float)[:, :2]
+    if len(contorno) > 1 and np.array_equal(contorno[0], contorno[-1]):
+        contorno = contorno[:-1]
+    repetido = np.all(contorno == np.roll(contorno, 1, axis=0), axis=1)
+    contorno = contorno[~repetido] if len(contorno) > 1 else contorno
+    area_projecao = _area_com_sinal(contorno) if len(contorno) >= 3 else 0.0
+    if abs(area_projecao) < 1e-9:
+        raise ValueError(f"Edificação '{nome}': contorno com menos de 3 vértices distintos.")
+    if area_projecao < 0:
+        contorno = contorno[::-1]
+
+    altura, pavimentos = _numero(altura), _numero(pavimentos)
+    if altura is None and pavimentos is None:
+        raise ValueError(f"Edificação '{nome}': informe a altura (ou o número de pavimentos).")
+    num_pavimentos = int(pavimentos) if pavimentos else max(1, round(altura / PE_DIREITO))
+    altura = altura or num_pavimentos * PE_DIREITO
+    edificacao = {
+        "nome": nome,
+        "area": _numero(area) or abs(area_projecao) * num_pavimentos,
+        "altura": _numero(altura_edificacao) or (num_pavimentos - 1) * PE_DIREITO,
+        "num_pavimentos": num_pavimentos,
+        "terrea": "Sim" if num_pavimentos == 1 else "Não",
+    }
+    return {"nome": nome, "grupo": nome, "contorno": contorno, "altura": altura, "abertura": _numero(abertura), "edificacao": edificacao}
+
+def _conferir_coordenadas(blocos):
+    """Coordenadas em graus (lon/lat) dariam afastamentos sem sentido: exige um sistema métrico."""
+    if not blocos:
+        raise ValueError("Nenhuma edificação encontrada no arquivo.")
+    pontos = np.concatenate([bloco["contorno"] for bloco in blocos])
+    extensao = pontos.max(axis=0) - pontos.min(axis=0)
+    if np.all(np.abs(pontos) <= 180.0) and extensao.max() < 0.5:
+        raise ValueError("As coordenadas parecem estar em graus (longitude/latitude); reprojete a implantação para um sistema métrico (ex.: UTM).")
+    return blocos
+
+
+# 📄 Leitura
+
+def ler_geojson(conteudo):
+    """FeatureCollection (ou Feature) GeoJSON -> lista de blocos."""
+    dados = json.loads(conteudo)
+    feicoes = dados.get("features", []) if dados.get("type") == "FeatureCollection" else [dados]
+    blocos = []
+    for n, feicao in enumerate(feicoes, start=1):
+        geometria = feicao.get("geometry") or {}
+        propriedades = feicao.get("properties") or {}
+        if geometria.get("type") == "Polygon":
+            aneis = [geometria["coordinates"][0]]
+        elif geometria.get("type") == "MultiPolygon":
+            aneis = [poligono[0] for poligono in geometria["coordinates"]]
+        else:
+            continue # pontos, linhas e anotações não são edificações
+        nome = str(propriedades.get("nome") or propriedades.get("name") or f"Edificação {n}")
+        for anel in aneis:
+            blocos.append(criar_bloco(
+                nome, anel,
+                altura=propriedades.get("altura", propriedades.get("height")),
+                pavimentos=propriedades.get("pavimentos", propriedades.get("num_pavimentos")),
+                area=propriedades.get("area"),
+                altura_edificacao=propriedades.get("altura_edificacao"),
+                abertura=propriedades.get("abertura"),
+            ))
+    return _conferir_coordenadas(blocos)
+
+def _entidades_dxf(texto):
+    """(tipo, [(código, valor), ...]) de cada entidade da seção ENTITIES de um DXF ASCII."""
+    linhas = texto.splitlines()
+    secao, atual = None, None
+    for i in range(0, len(linhas) - 1, 2):
+        codigo, valor = linhas[i].strip(), linhas[i + 1].strip()
+        if codigo == "0":
+            if atual is not None and secao == "ENTITIES":
+                yield atual
+            if valor == "ENDSEC":
+                secao = None
+            atual = (valor, [])
+        elif atual is not None:
+            if atual[0] == "SECTION" and codigo == "2":
+                secao = valor
+            atual[1].append((codigo, valor))
+
+def ler_dxf(conteudo):
+    """Polilinhas fechadas de um DXF ASCII -> lista de blocos (nome = camada, altura = espessura)."""
+    texto = conteudo.decode("utf-8") if isinstance(conteudo, bytes) else conteudo
+    blocos, polilinha = [], None
+
+    def adicionar(grupos, vertices):
+        atributos = dict(grupos)
+        fechada = int(atributos.get("70", 0)) & 1 or (len(vertices) > 2 and vertices[0] == vertices[-1])
+        if fechada:
+            blocos.append(criar_bloco(atributos.get("8", "0"), vertices, altura=atributos.get("39")))
+
+    for tipo, grupos in _entidades_dxf(texto):
+        if tipo == "LWPOLYLINE":
+            xs = [float(v) for c, v in grupos if c == "10"]
+            ys = [float(v) for c, v in grupos if c == "20"]
+            adicionar(grupos, list(zip(xs, ys)))
+        elif tipo == "POLYLINE":
+            polilinha = (grupos, [])
+        elif tipo == "VERTEX" and polilinha is not None:
+            atributos = dict(grupos)
+            polilinha[1].append((float(atributos["10"]), float(atributos["20"])))
+        elif tipo == "SEQEND" and polilinha is not None:
+            adicionar(*polilinha)
+            polilinha = None
+    return _conferir_coordenadas(blocos)
+
+def ler_implantacao(conteudo, nome_arquivo):
+    """Escolhe o leitor pela extensão do arquivo (.geojson/.json ou .dxf)."""
+    extensao = os.path.splitext(nome_arquivo)[1].lower()
+    if extensao == ".dxf":
+        try:
+            return ler_dxf(conteudo)
+        except UnicodeDecodeError:
+            return ler_dxf(conteudo.decode("latin-1")) # DXFs antigos gravados em ANSI
+    if extensao in (".geojson", ".json"):
+        return ler_geojson(conteudo)
+    raise ValueError(f"Formato não suportado: '{extensao}' (use .geojson, .json ou .dxf).")
+
+def associar_cadastro(blocos, edificacoes):
+    """
+    Liga cada bloco à edificação consolidada do cadastro com o mesmo nome
+    (ou que absorveu sua área): o grupo passa a ser o nome consolidado e as
+    regras usam os dados do cadastro. Devolve (blocos, nomes sem cadastro).
+    """
+    consolidada = {}
+    for edificacao in edificacoes:
+        for membro in edificacao.get("areas_combinadas_com") or [edificacao["nome"]]:
+            consolidada[membro] = edificacao
+    associados, sem_cadastro = [], []
+    for bloco in blocos:
+        edificacao = consolidada.get(bloco["nome"])
+        if edificacao is None:
+            sem_cadastro.append(bloco["nome"])
+            associados.append(bloco)
+        else:
+            associados.append({**bloco, "grupo": edificacao["nome"], "edificacao": edificacao})
+    return associados, list(dict.fromkeys(sem_cadastro))
+
+
+# 📐 Fachadas
+
+def _trechos_retos(contorno):
+    """(início, fim) das fachadas de um contorno anti-horário, juntando vértices quase colineares."""
+    lados = np.roll(contorno, -1, axis=0) - contorno
+    direcoes = lados / np.linalg.norm(lados, axis=1)[:, None]
+    # Começa no vértice de maior mudança de direção, que é sempre um canto
+    inicio = int(np.argmin((np.roll(direcoes, 1, axis=0) * direcoes).sum(axis=1)))
+    trechos, origem = [], inicio
+    for passo in range(1, len(contorno) + 1):
+        k = (inicio + passo) % len(contorno)
+        d0, d1 = direcoes[origem], direcoes[k]
+        if passo == len(contorno) or abs(d0[0] * d1[1] - d0[1] * d1[0]) > TOLERANCIA_COLINEAR or np.dot(d0, d1) < 0:
+            trechos.append((contorno[origem], contorno[k]))
+            origem = k
+    return trechos
+
+def fachadas_site(blocos, porcentagem_abertura=PORCENTAGEM_ABERTURA_PADRAO, bombeiros="Sim"):
+    """
+    Fachadas de todos os blocos em arrays: início/fim (F, 2), normal externa,
+    índice do bloco, largura, altura, abertura (m²), rótulo e distância de
+    isolamento exigida por cada uma.
+    """
+    inicio, fim, indice, rotulos = [], [], [], []
+    for b, bloco in enumerate(blocos):
+        for k, (p0, p1) in enumerate(_trechos_retos(bloco["contorno"]), start=1):
+            inicio.append(p0)
+            fim.append(p1)
+            indice.append(b)
+            rotulos.append(k)
+    inicio, fim, indice = np.array(inicio, dtype=float).reshape(-1, 2), np.array(fim, dtype=float).reshape(-1, 2), np.array(indice, dtype=np.intp)
+    direcao = fim - inicio
+    largura = np.linalg.norm(direcao, axis=1)
+    normal = np.column_stack((direcao[:, 1], -direcao[:, 0])) / largura[:, None]
+
+    # Um apartamento por pavimento: vale a fachada do pavimento, não a do edifício
+    altura_bloco = np.array([
+        bloco["altura"] / bloco["edificacao"].get("num_pavimentos", 1) if fachada_edificacao(bloco["edificacao"]) == "toda a fachada do pavimento" else bloco["altura"]
+        for bloco in blocos
+    ], dtype=float)
+    porcentagem_bloco = np.array([bloco["abertura"] or porcentagem_abertura for bloco in blocos], dtype=float)
+    altura = altura_bloco[indice]
+    abertura = largura * altura * porcentagem_bloco[indice] / 100
+
+    edificacoes = [bloco["edificacao"] for bloco in blocos]
+    exigida = distancias_isolamento_lote(
+        largura, altura, abertura,
+        np.array([e.get("area", 0.0) for e in edificacoes], dtype=float)[indice],
+        np.array([e.get("altura", 0.0) for e in edificacoes], dtype=float)[indice],
+        np.array([e.get("num_pavimentos", 1) for e in edificacoes], dtype=int)[indice],
+        bombeiros,
+    )
+    angulo = np.degrees(np.arctan2(normal[:, 1], normal[:, 0])) % 360
+    orientacao = ((angulo + 22.5) // 45).astype(int) % 8
+    rotulos = [f"{blocos[b]['nome']} · F{k} ({ORIENTACOES[o]})" for b, k, o in zip(indice.tolist(), rotulos, orientacao.tolist())]
+    return {
+        "inicio": inicio, "fim": fim, "normal": normal, "bloco": indice, "largura": largura,
+        "altura": altura, "abertura": abertura, "rotulo": rotulos, "exigida": exigida,
+    }
+
+
+# 🔎 Busca espacial e afastamentos
+
+def pares_proximos(inicio, fim, alcance):
+    """
+    Pares (a, b), a < b, de segmentos cujas caixas envolventes estão a menos
+    de max(alcance[a], alcance[b]). Grade uniforme: cada segmento é inserido
+    nas células que sua caixa cobre e consulta só as células ao alcance dele.
+    """
+    minimos, maximos = np.minimum(inicio, fim), np.maximum(inicio, fim)
+    tamanho = max(float(np.max(alcance, initial=0.0)), float(np.median(np.linalg.norm(fim - inicio, axis=1))) if len(inicio) else 0.0, 1.0)
+    celula_min, celula_max = np.floor(minimos / tamanho).astype(int), np.floor(maximos / tamanho).astype(int)
+
+    grade = {}
+    for s, ((x0, y0), (x1, y1)) in enumerate(zip(celula_min.tolist(), celula_max.tolist())):
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                grade.setdefault((cx, cy), []).append(s)
+
+    consulta_min = np.floor((minimos - alcance[:, None]) / tamanho).astype(int)
+    consulta_max = np.floor((maximos + alcance[:, None]) / tamanho).astype(int)
+    pares = set()
+    for a, ((x0, y0), (x1, y1)) in enumerate(zip(consulta_min.tolist(), consulta_max.tolist())):
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                for b in grade.get((cx, cy), ()):
+                    if b != a:
+                        pares.add((a, b) if a < b else (b, a))
+    if not pares:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+    a, b = np.array(sorted(pares), dtype=np.intp).T
+
+    # Refina pela distância entre as caixas envolventes
+    folga_caixas = np.maximum(0.0, np.maximum(minimos[a], minimos[b]) - np.minimum(maximos[a], maximos[b]))
+    perto = np.hypot(folga_caixas[:, 0], folga_caixas[:, 1]) <= np.maximum(alcance[a], alcance[b])
+    return a[perto], b[perto]
+
+def _distancia_ponto_segmento(p, inicio, fim):
+    direcao = fim - inicio
+    comprimento2 = np.maximum((direcao * direcao).sum(axis=1), 1e-12)
+    t = np.clip(((p - inicio) * direcao).sum(axis=1) / comprimento2, 0.0, 1.0)
+    return np.linalg.norm(p - (inicio + t[:, None] * direcao), axis=1)
+
+def _cruzam(p1, p2, q1, q2):
+    def orientacao(a, b, c):
+        return np.sign((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0]))
+    return (orientacao(p1, p2, q1) * orientacao(p1, p2, q2) < 0) & (orientacao(q1, q2, p1) * orientacao(q1, q2, p2) < 0)
+
+def distancia_segmentos(p1, p2, q1, q2):
+    """Menor distância entre os segmentos p1-p2 e q1-q2 (arrays (N, 2)); 0 se eles se cruzam."""
+    distancia = np.minimum.reduce([
+        _distancia_ponto_segmento(p1, q1, q2), _distancia_ponto_segmento(p2, q1, q2),
+        _distancia_ponto_segmento(q1, p1, p2), _distancia_ponto_segmento(q2, p1, p2),
+    ])
+    return np.where(_cruzam(p1, p2, q1, q2), 0.0, distancia)
+
+def afastamentos(blocos, bombeiros="Sim", porcentagem_abertura=PORCENTAGEM_ABERTURA_PADRAO, folga=FOLGA_PADRAO):
+    """
+    Afastamento real x distância exigida entre as edificações da implantação.
+    Para cada par de edificações (grupos) com fachadas que se enxergam a
+    menos da distância exigida + `folga`, devolve o par de fachadas mais
+    crítico. Devolve {"linhas": [dict com COLUNAS_AFASTAMENTOS], "resumo": contagens}.
+    """
+    fachadas = fachadas_site(blocos, porcentagem_abertura, bombeiros)
+    exigida = fachadas["exigida"]
+    a, b = pares_proximos(fachadas["inicio"], fachadas["fim"], exigida + folga)
+    examinados = len(a)
+
+    # Só fachadas de edificações diferentes (fora do mesmo grupo consolidado)
+    grupos = np.array([bloco["grupo"] for bloco in blocos], dtype=object)[fachadas["bloco"]]
+    diferentes = grupos[a] != grupos[b]
+    a, b = a[diferentes], b[diferentes]
+
+    # Cada fachada precisa ter parte da outra à sua frente (lado da normal externa)
+    inicio, fim, normal = fachadas["inicio"], fachadas["fim"], fachadas["normal"]
+    def a_frente(x, y):
+        return np.maximum(((inicio[y] - inicio[x]) * normal[x]).sum(axis=1), ((fim[y] - inicio[x]) * normal[x]).sum(axis=1)) > 1e-6
+    voltadas = a_frente(a, b) & a_frente(b, a)
+    a, b = a[voltadas], b[voltadas]
+
+    afastamento = distancia_segmentos(inicio[a], fim[a], inicio[b], fim[b])
+    exigida_par = np.maximum(exigida[a], exigida[b])
+    relevantes = afastamento <= exigida_par + folga
+    a, b, afastamento, exigida_par = a[relevantes], b[relevantes], afastamento[relevantes], exigida_par[relevantes]
+
+    # O par de fachadas mais crítico de cada par de edificações
+    criticos = {}
+    for k in np.argsort(afastamento - exigida_par, kind="stable").tolist():
+        x, y = int(a[k]), int(b[k])
+        if grupos[x] > grupos[y]:
+            x, y = y, x
+        criticos.setdefault((grupos[x], grupos[y]), (x, y, k))
+
+    linhas = []
+    for (grupo_1, grupo_2), (x, y, k) in criticos.items():
+        linhas.append({
+            "Edificação 1": grupo_1, "Fachada 1": fachadas["rotulo"][x], "Edificação 2": grupo_2, "Fachada 2": fachadas["rotulo"][y],
+            "Largura 1 (m)": round(float(fachadas["largura"][x]), 2), "Altura 1 (m)": round(float(fachadas["altura"][x]), 2),
+            "Abertura 1 (m²)": round(float(fachadas["abertura"][x]), 2),
+            "Largura 2 (m)": round(float(fachadas["largura"][y]), 2), "Altura 2 (m)": round(float(fachadas["altura"][y]), 2),
+            "Abertura 2 (m²)": round(float(fachadas["abertura"][y]), 2),
+            "Distância 1 (m)": round(float(exigida[x]), 2), "Distância 2 (m)": round(float(exigida[y]), 2),
+            "Distância exigida (m)": round(float(exigida_par[k]), 2), "Afastamento (m)": round(float(afastamento[k]), 2),
+            "Situação": "Atende" if afastamento[k] >= exigida_par[k] else "Não atende",
+        })
+    resumo = {
+        "blocos": len(blocos), "fachadas": len(exigida), "pares_examinados": examinados,
+        "pares_listados": len(linhas), "violacoes": sum(linha["Situação"] == "Não atende" for linha in linhas),
+    }
+    return {"linhas": linhas, "resumo": resumo}
+
+
+# 🖥️ Linha de comando
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m ppci.geometria", description="Verifica os afastamentos reais entre as edificações de uma implantação.")
+    parser.add_argument("arquivo", help="Implantação em GeoJSON (.geojson/.json) ou DXF (.dxf), em metros")
+    parser.add_argument("-o", "--saida", help="Grava os afastamentos em uma planilha em vez de listá-los")
+    parser.add_argument("--bombeiros", choices=["Sim", "Não"], default="Sim", help="Há corpo de bombeiros com viatura na cidade?")
+    parser.add_argument("--abertura", type=float, default=PORCENTAGEM_ABERTURA_PADRAO, help="Porcentagem de aberturas das fachadas sem a propriedade \"abertura\"")
+    parser.add_argument("--folga", type=float, default=FOLGA_PADRAO, help="Lista também os pares que atendem por menos que esta folga (m)")
+    args = parser.parse_args(argv)
+
+    with open(args.arquivo, "rb") as f:
+        blocos = ler_implantacao(f.read(), args.arquivo)
+    resultado = afastamentos(blocos, args.bombeiros, args.abertura, args.folga)
+
+    if args.saida:
+        from ppci.exportacao import escrever_linhas
+        escrever_linhas(args.saida, resultado["linhas"], COLUNAS_AFASTAMENTOS, nome_aba="Afastamentos")
+    else:
+        for linha in resultado["linhas"]:
+            print(
+                f"{linha['Fachada 1']} × {linha['Fachada 2']}: afastamento {linha['Afastamento (m)']:.2f} m, "
+                f"exigido {linha['Distância exigida (m)']:.2f} m [{linha['Situação']}]"
+            )
+
+    resumo = resultado["resumo"]
+    print(
+        f"{os.path.basename(args.arquivo)}: {resumo['blocos']} blocos, {resumo['fachadas']} fachadas, "
+        f"{resumo['pares_examinados']} pares de fachadas examinados, {resumo['violacoes']} pares de edificações sem o afastamento exigido",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
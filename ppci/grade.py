@@ -0,0 +1,171 @@
+# 🧮 Edição das edificações em tabela (uma linha por torre/anexo)
+#
+# Cada linha da tabela passa pelas mesmas dependências do formulário: torre
+# térrea zera subsolos, duplex, ático e altura; sem subsolo não há número,
+# área nem ocupação de subsolo; mais de um subsolo implica área maior que
+# 500m²; e assim por diante. Células vazias recebem o padrão do formulário e
+# valores fora das opções viram mensagens de erro por linha. Não depende do
+# Streamlit: recebe listas de dicts (df.to_dict("records")).
+import math
+
+from ppci.registros import Anexo, Torre
+
+OPCOES_SIM_NAO = ["Sim", "Não"]
+OPCOES_NAO_SIM = ["Não", "Sim"]
+OPCOES_NUMERO_SUBSOLOS = ["1", "Mais de 1"]
+OPCOES_AREA_SUBSOLO = ["Menor que 500m²", "Maior que 500m²"]
+OPCOES_USO_ANEXO = ["C-1", "F-6", "F-8", "G-1", "G-2", "J-2"]
+OPCOES_CARGA_INCENDIO = ["300 MJ/m²", "600 MJ/m²"]
+OPCOES_TRATAMENTO = ["Independente", "Conjunta"]
+
+COLUNAS_TORRES = [
+    "nome", "area", "terrea", "num_pavimentos", "altura", "um_ap_por_pav", "subsolo_tecnico",
+    "numero_subsolos", "area_subsolo", "subsolo_ocupado", "subsolo_menor_50", "duplex", "atico",
+    "tratamento", "edificacao_conjunta",
+]
+COLUNAS_ANEXOS = ["nome", "area", "uso", "carga_incendio", "tratamento", "edificacao_conjunta"]
+
+# Valores de uma torre térrea (os mesmos atribuídos pelo formulário)
+PADROES_TERREA = {
+    "num_pavimentos": 1, "um_ap_por_pav": None, "subsolo_tecnico": "Não", "numero_subsolos": "0",
+    "area_subsolo": "Menor que 500m²", "subsolo_ocupado": "Não", "subsolo_menor_50": "Não",
+    "duplex": "Não", "atico": "Não", "altura": 0.0,
+}
+
+
+# 🧠 Funções auxiliares
+def _vazio(valor):
+    return valor is None or (isinstance(valor, float) and math.isnan(valor)) or (isinstance(valor, str) and not valor.strip())
+
+def _texto(valor):
+    if _vazio(valor):
+        return None
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor) # "1" colado como número
+    return str(valor).strip()
+
+def _numero(linha, campo, erros, padrao=None, minimo=0.0, inteiro=False):
+    valor = linha.get(campo)
+    if _vazio(valor):
+        if padrao is None:
+            erros.append(f"{campo} não informado")
+        return padrao
+    try:
+        # Aceita "12,5" colado de planilhas em português
+        numero = float(valor.replace(",", ".")) if isinstance(valor, str) else float(valor)
+    except (TypeError, ValueError):
+        erros.append(f"{campo} inválido: {valor!r}")
+        return padrao
+    if numero < minimo:
+        erros.append(f"{campo} deve ser no mínimo {minimo:g}")
+        numero = minimo
+    return int(numero) if inteiro else numero
+
+def _opcao(linha, campo, opcoes, erros):
+    """Valor da célula se estiver entre as opções; vazia assume a primeira opção."""
+    valor = _texto(linha.get(campo))
+    if valor is None:
+        return opcoes[0]
+    if valor not in opcoes:
+        erros.append(f"{campo} deve ser um de {', '.join(opcoes)} (recebido {valor!r})")
+        return opcoes[0]
+    return valor
+
+def linha_vazia(linha):
+    return all(_vazio(valor) for valor in linha.values())
+
+
+# 🏢 Regras por linha
+def regras_torre(linha):
+    """Campos de uma torre a partir de uma linha da tabela: (campos, erros)."""
+    erros = []
+    campos = {"nome": _texto(linha.get("nome")), "area": _numero(linha, "area", erros, padrao=0.0)}
+    if not campos["nome"]:
+        erros.append("nome não informado")
+    campos["terrea"] = _opcao(linha, "terrea", OPCOES_SIM_NAO, erros)
+    if campos["terrea"] == "Sim":
+        campos.update(PADROES_TERREA)
+        return campos, erros
+
+    campos["num_pavimentos"] = _numero(linha, "num_pavimentos", erros, padrao=2, minimo=2, inteiro=True)
+    campos["altura"] = _numero(linha, "altura", erros)
+    campos["um_ap_por_pav"] = _opcao(linha, "um_ap_por_pav", OPCOES_SIM_NAO, erros)
+    campos["subsolo_tecnico"] = _opcao(linha, "subsolo_tecnico", OPCOES_NAO_SIM, erros)
+    if campos["subsolo_tecnico"] == "Sim":
+        campos["numero_subsolos"] = _opcao(linha, "numero_subsolos", OPCOES_NUMERO_SUBSOLOS, erros)
+        if campos["numero_subsolos"] == "1":
+            campos["area_subsolo"] = _opcao(linha, "area_subsolo", OPCOES_AREA_SUBSOLO, erros)
+        else:
+            campos["area_subsolo"] = "Maior que 500m²"
+        campos["subsolo_ocupado"] = _opcao(linha, "subsolo_ocupado", OPCOES_NAO_SIM, erros)
+        campos["subsolo_menor_50"] = (
+            _opcao(linha, "subsolo_menor_50", OPCOES_NAO_SIM, erros) if campos["subsolo_ocupado"] == "Sim" else "Não"
+        )
+    else:
+        campos.update(numero_subsolos="0", area_subsolo="Menor que 500m²", subsolo_ocupado="Não", subsolo_menor_50="Não")
+    campos["duplex"] = _opcao(linha, "duplex", OPCOES_NAO_SIM, erros)
+    campos["atico"] = _opcao(linha, "atico", OPCOES_NAO_SIM, erros)
+    return campos, erros
+
+def regras_anexo(linha):
+    """Campos de um anexo a partir de uma linha da tabela: (campos, erros)."""
+    erros = []
+    campos = {
+        "nome": _texto(linha.get("nome")),
+        "area": _numero(linha, "area", erros, padrao=0.0),
+        "uso": _opcao(linha, "uso", OPCOES_USO_ANEXO, erros),
+        "carga_incendio": _opcao(linha, "carga_incendio", OPCOES_CARGA_INCENDIO, erros),
+    }
+    if not campos["nome"]:
+        erros.append("nome não informado")
+    return campos, erros
+
+
+def edificacoes_da_grade(linhas_torres, linhas_anexos):
+    """
+    Converte as duas tabelas em registros Torre/Anexo já com tratamento e
+    edificação conjunta definidos. Devolve (torres, anexos, erros), onde cada
+    erro identifica a linha ("Torre 3 (Bloco C): altura não informado").
+    Linhas com erro ficam fora da avaliação; linhas totalmente vazias
+    (acrescentadas e não preenchidas) são ignoradas.
+    """
+    erros = []
+    lidas = []
+    for tipo, linhas, regras in (("Torre", linhas_torres, regras_torre), ("Anexo", linhas_anexos, regras_anexo)):
+        for posicao, linha in enumerate(linhas, start=1):
+            if linha_vazia(linha):
+                continue
+            campos, erros_linha = regras(linha)
+            rotulo = f"{tipo} {posicao}" + (f" ({campos['nome']})" if campos["nome"] else "")
+            erros.extend(f"{rotulo}: {erro}" for erro in erros_linha)
+            if not erros_linha:
+                lidas.append((tipo, rotulo, linha, campos))
+
+    nomes_torres = [campos["nome"] for tipo, _, _, campos in lidas if tipo == "Torre" and campos["nome"]]
+    vistos = set()
+    torres, anexos = [], []
+    for tipo, rotulo, linha, campos in lidas:
+        if campos["nome"] in vistos:
+            erros.append(f"{rotulo}: nome repetido")
+            continue
+        vistos.add(campos["nome"])
+
+        # Mesmas regras da Definição de Tratamento do formulário
+        if tipo == "Torre" and len(nomes_torres) == 1:
+            tratamento, conjunta = "Independente", None
+        else:
+            erros_tratamento = []
+            tratamento = _opcao(linha, "tratamento", OPCOES_TRATAMENTO, erros_tratamento)
+            erros.extend(f"{rotulo}: {erro}" for erro in erros_tratamento)
+            conjunta = None
+            if tratamento == "Conjunta":
+                conjunta = _texto(linha.get("edificacao_conjunta"))
+                if conjunta not in nomes_torres or conjunta == campos["nome"]:
+                    erros.append(f"{rotulo}: edificacao_conjunta deve ser o nome de outra torre da tabela")
+                    tratamento, conjunta = "Independente", None # sem destino válido, não há o que absorver
+
+        registro = (Torre if tipo == "Torre" else Anexo)(**campos)
+        registro["tratamento"] = tratamento
+        registro["edificacao_conjunta"] = conjunta
+        (torres if tipo == "Torre" else anexos).append(registro)
+    return torres, anexos, erros
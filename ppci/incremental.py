@@ -0,0 +1,246 @@
+# 🔁 Recomputação incremental orientada por grafo de dependências
+#
+# GrafoIncremental guarda entradas (valores definidos de fora) e consultas
+# derivadas (funções puras do grafo). Cada consulta registra automaticamente
+# as entradas e consultas que leu; quando uma entrada muda, só as consultas
+# que dependem dela (direta ou indiretamente) são reavaliadas, e apenas
+# quando alguém pede o seu valor. Se um valor recalculado é igual ao anterior,
+# a mudança não se propaga adiante (corte antecipado).
+#
+# AvaliacaoSite monta sobre esse grafo a avaliação de um site: área
+# consolidada de cada grupo, escolha de tabela, medidas, notas e a distância
+# de cada comparação de isolamento.
+from ppci.cache import classificar_compartilhado, distancia_isolamento_compartilhada
+from ppci.regras import _resolver_raizes
+
+_NUNCA = float("inf")
+
+
+class _No:
+    __slots__ = ("valor", "dependencias", "alterado_em", "verificado_em")
+
+
+class GrafoIncremental:
+    """Grafo de entradas e consultas derivadas com dependências rastreadas dinamicamente."""
+
+    def __init__(self):
+        self.revisao = 0
+        self.recalculos = 0 # total de consultas efetivamente recalculadas
+        self._entradas = {} # chave -> (valor, alterado_em)
+        self._derivados = {} # chave -> _No
+        self._consultas = {} # nome -> funcao(grafo, *args)
+        self._pilha = [] # dependências lidas pelas consultas em cálculo
+        self._calculando = set()
+
+    def registrar(self, nome, funcao):
+        self._consultas[nome] = funcao
+
+    def definir(self, chave, valor):
+        """Define uma entrada; só avança a revisão se o valor mudou."""
+        atual = self._entradas.get(chave)
+        if atual is not None and atual[0] == valor:
+            return False
+        self.revisao += 1
+        self._entradas[chave] = (valor, self.revisao)
+        return True
+
+    def remover(self, chave):
+        """Remove uma entrada, ou o valor memorizado de uma consulta, que deixou de existir."""
+        if chave[0] in self._consultas:
+            self._derivados.pop(chave, None)
+        elif self._entradas.pop(chave, None) is not None:
+            self.revisao += 1
+
+    def entrada(self, chave):
+        self._ler(chave)
+        return self._entradas[chave][0]
+
+    def __call__(self, nome, *args):
+        chave = (nome, *args)
+        self._ler(chave)
+        return self._atualizar(chave).valor
+
+    def _ler(self, chave):
+        if self._pilha:
+            self._pilha[-1][chave] = None
+
+    def _alterado_em(self, chave):
+        if chave[0] in self._consultas:
+            return self._atualizar(chave).alterado_em
+        entrada = self._entradas.get(chave)
+        return entrada[1] if entrada is not None else _NUNCA
+
+    def _atualizar(self, chave):
+        no = self._derivados.get(chave)
+        if no is not None:
+            if no.verificado_em == self.revisao:
+                return no
+            # Verde: nenhuma dependência mudou desde a última verificação
+            if all(self._alterado_em(dep) <= no.verificado_em for dep in no.dependencias):
+                no.verificado_em = self.revisao
+                return no
+
+        if chave in self._calculando:
+            raise RuntimeError(f"Dependência cíclica na consulta {chave!r}")
+        self._calculando.add(chave)
+        self._pilha.append({})
+        try:
+            valor = self._consultas[chave[0]](self, *chave[1:])
+        finally:
+            dependencias = self._pilha.pop()
+            self._calculando.discard(chave)
+        self.recalculos += 1
+
+        if no is None:
+            no = self._derivados[chave] = _No()
+            no.alterado_em = self.revisao
+        elif no.valor != valor:
+            no.alterado_em = self.revisao
+        no.valor = valor
+        no.dependencias = tuple(dependencias)
+        no.verificado_em = self.revisao
+        return no
+
+
+# 🏢 Consultas da avaliação de um site
+
+def _q_estrutura(g):
+    """Raízes de consolidação (em ordem), membros de cada grupo e problemas encontrados."""
+    nomes = g.entrada(("nomes",))
+    indice = {}
+    for nome in nomes:
+        tratamento, alvo = g.entrada(("tratamento", nome))
+        indice[nome] = {"nome": nome, "tratamento": tratamento, "edificacao_conjunta": alvo}
+    problemas = [f"Nome duplicado: '{nome}'; apenas a primeira ocorrência foi considerada." for nome in g.entrada(("duplicados",))]
+    raizes = _resolver_raizes(indice, problemas)
+
+    membros = {nome: [nome] for nome in nomes if raizes[nome] == nome}
+    for nome in nomes:
+        if raizes[nome] != nome:
+            membros[raizes[nome]].append(nome)
+    return tuple(membros), {raiz: tuple(nomes_grupo) for raiz, nomes_grupo in membros.items()}, tuple(problemas)
+
+def _q_membros(g, raiz):
+    return g("estrutura")[1].get(raiz, ())
+
+def _q_area_grupo(g, raiz):
+    # Mesma ordem de soma de consolidar_edificacoes: principal e depois os demais
+    membros = g("membros", raiz)
+    area = g.entrada(("area", raiz))
+    for nome in membros[1:]:
+        area += g.entrada(("area", nome))
+    return area
+
+def _q_classificacao(g, raiz):
+    dados = g.entrada(("dados", raiz))
+    return classificar_compartilhado(g("area_grupo", raiz), dados.altura, dados.num_pavimentos)
+
+def _q_tabela_simplificada(g, raiz):
+    return g("classificacao", raiz)[0].tabela_simplificada
+
+def _q_medidas(g, raiz):
+    return g("classificacao", raiz)[0].medidas
+
+def _q_notas(g, raiz):
+    return g("classificacao", raiz)[1]
+
+def _q_grupo(g, raiz):
+    grupo = g.entrada(("dados", raiz)).como_grupo()
+    grupo.area = g("area_grupo", raiz)
+    grupo.area_original = g.entrada(("area", raiz))
+    grupo.areas_combinadas_com = list(g("membros", raiz))
+    grupo["tratamento"], grupo.edificacao_conjunta = g.entrada(("tratamento", raiz))
+    return grupo
+
+def _q_grupos(g):
+    return tuple(g("grupo", raiz) for raiz in g("estrutura")[0])
+
+def _q_distancia(g, id_comparacao, lado):
+    largura, altura, abertura, nome = g.entrada(("fachada", id_comparacao, lado))
+    dados = g.entrada(("dados", nome))
+    return distancia_isolamento_compartilhada(
+        largura, altura, abertura, g("area_grupo", nome), dados.altura, dados.num_pavimentos, g.entrada(("bombeiros",))
+    )
+
+# Consultas indexadas pelo nome de uma edificação (descartadas quando ela some)
+CONSULTAS_POR_EDIFICACAO = ("membros", "area_grupo", "classificacao", "tabela_simplificada", "medidas", "notas", "grupo")
+
+CONSULTAS_SITE = {
+    "estrutura": _q_estrutura,
+    "membros": _q_membros,
+    "area_grupo": _q_area_grupo,
+    "classificacao": _q_classificacao,
+    "tabela_simplificada": _q_tabela_simplificada,
+    "medidas": _q_medidas,
+    "notas": _q_notas,
+    "grupo": _q_grupo,
+    "grupos": _q_grupos,
+    "distancia": _q_distancia,
+}
+
+
+class AvaliacaoSite:
+    """
+    Avaliação incremental de um site a partir de registros de ppci.registros.
+    Guarde uma instância por sessão e chame atualizar_edificacoes a cada rerun:
+    só o que depende de valores alterados é recalculado.
+    """
+
+    def __init__(self):
+        self.grafo = GrafoIncremental()
+        for nome, consulta in CONSULTAS_SITE.items():
+            self.grafo.registrar(nome, consulta)
+        self._nomes = set() # edificações com entradas no grafo
+        self._fachadas = set() # (id_comparacao, lado) com entradas no grafo
+
+    def atualizar_edificacoes(self, edificacoes):
+        g = self.grafo
+        nomes, vistos, duplicados = [], set(), []
+        for edificacao in edificacoes:
+            nome = edificacao.nome
+            if nome in vistos:
+                duplicados.append(nome)
+                continue
+            nomes.append(nome)
+            vistos.add(nome)
+            # Cada parte é uma entrada separada: mudar a área não invalida a escolha de grupos
+            dados = edificacao.copy()
+            dados.area = 0.0
+            dados["tratamento"], dados.edificacao_conjunta = None, None
+            g.definir(("area", nome), edificacao.area)
+            g.definir(("tratamento", nome), (edificacao.tratamento, edificacao.edificacao_conjunta))
+            g.definir(("dados", nome), dados)
+        g.definir(("nomes",), tuple(nomes))
+        g.definir(("duplicados",), tuple(duplicados))
+        # Edificações renomeadas ou excluídas: sem isso o grafo só cresce ao longo da sessão
+        for nome in self._nomes - vistos:
+            for parte in ("area", "tratamento", "dados"):
+                g.remover((parte, nome))
+            for consulta in CONSULTAS_POR_EDIFICACAO:
+                g.remover((consulta, nome))
+        self._nomes = vistos
+
+    def atualizar_comparacoes(self, ids_comparacoes):
+        """Descarta as fachadas das comparações que não estão mais em `ids_comparacoes`."""
+        ids_comparacoes = set(ids_comparacoes)
+        for id_comparacao, lado in [f for f in self._fachadas if f[0] not in ids_comparacoes]:
+            self.grafo.remover(("fachada", id_comparacao, lado))
+            self.grafo.remover(("distancia", id_comparacao, lado))
+            self._fachadas.discard((id_comparacao, lado))
+
+    def grupos(self):
+        return list(self.grafo("grupos"))
+
+    def problemas(self):
+        return list(self.grafo("estrutura")[2])
+
+    def classificacao(self, nome):
+        """(entrada do índice de decisão, notas) do grupo cuja principal é `nome`."""
+        return self.grafo("classificacao", nome)
+
+    def distancia(self, id_comparacao, lado, largura, altura, abertura, nome, bombeiros):
+        """Distância de isolamento da fachada `lado` (1 ou 2) da comparação `id_comparacao`."""
+        self.grafo.definir(("bombeiros",), bombeiros)
+        self.grafo.definir(("fachada", id_comparacao, lado), (largura, altura, abertura, nome))
+        self._fachadas.add((id_comparacao, lado))
+        return self.grafo("distancia", id_comparacao, lado)
@@ -0,0 +1,119 @@
+# 📄 Leitura das planilhas de projeto (modo "Revisar projeto existente")
+#
+# A planilha é lida uma única vez por conteúdo: o resultado fica em um cache
+# LRU chaveado pelo SHA-256 dos bytes do arquivo. A leitura usa o modo
+# read-only do openpyxl, percorre as linhas uma a uma e converte apenas as
+# colunas do esquema, sem inferência de tipos pelo pandas.
+import hashlib
+import io
+import re
+import threading
+from collections import OrderedDict
+
+# Coluna -> tipo (pandas extension dtype) das edificações exportadas pelo app
+ESQUEMA_EDIFICACAO = {
+    "nome": "string", "area": "Float64", "area_original": "Float64", "altura": "Float64",
+    "terrea": "string", "num_pavimentos": "Int64", "um_ap_por_pav": "string",
+    "subsolo_tecnico": "string", "numero_subsolos": "string", "area_subsolo": "string",
+    "subsolo_ocupado": "string", "subsolo_menor_50": "string", "duplex": "string", "atico": "string",
+    "uso": "string", "carga_incendio": "string", "tratamento": "string",
+    "edificacao_conjunta": "string", "areas_combinadas_com": "string",
+}
+
+MAX_PLANILHAS_EM_CACHE = 32
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _converter(valor, dtype):
+    if valor is None or valor == "":
+        return None
+    if dtype == "Float64":
+        try:
+            return float(valor)
+        except (TypeError, ValueError):
+            return None
+    if dtype == "Int64":
+        try:
+            return int(float(valor))
+        except (TypeError, ValueError):
+            return None
+    if isinstance(valor, float) and valor.is_integer():
+        valor = int(valor) # "1" salvo como número pelo Excel
+    return str(valor)
+
+def hash_conteudo(conteudo):
+    return hashlib.sha256(conteudo).hexdigest()
+
+def nome_projeto_do_arquivo(nome_arquivo):
+    """'checklistINC_Residencial X-R03.xlsx' -> 'Residencial X'."""
+    match = re.match(r"checklistINC_(.*?)(?:-R\d+)?\.xlsx$", nome_arquivo or "", flags=re.IGNORECASE)
+    return match.group(1) if match else ""
+
+def _ler_aba(ws, esquema):
+    linhas = ws.iter_rows(values_only=True)
+    cabecalho = next(linhas, ())
+    posicoes = {str(nome).strip(): i for i, nome in enumerate(cabecalho) if nome is not None}
+    selecionadas = [(coluna, posicoes[coluna], dtype) for coluna, dtype in esquema.items() if coluna in posicoes]
+    colunas = {coluna: [] for coluna, _, _ in selecionadas}
+    for linha in linhas:
+        if not any(v is not None for v in linha):
+            continue
+        for coluna, posicao, dtype in selecionadas:
+            valor = linha[posicao] if posicao < len(linha) else None
+            colunas[coluna].append(_converter(valor, dtype))
+    return colunas
+
+def ler_colunas(conteudo, esquema=ESQUEMA_EDIFICACAO, aba=None):
+    """
+    Lê a aba (a primeira, por padrão) e devolve {coluna: lista de valores}
+    apenas para as colunas do esquema presentes no cabeçalho.
+    """
+    from openpyxl import load_workbook # Importado só quando há planilha para ler
+    wb = load_workbook(io.BytesIO(conteudo), read_only=True, data_only=True)
+    try:
+        return _ler_aba(wb[aba] if aba else wb.worksheets[0], esquema)
+    finally:
+        wb.close()
+
+def ler_abas(conteudo, esquemas):
+    """
+    Várias abas em uma única abertura do arquivo: {aba: esquema} ->
+    {aba: {coluna: valores}}. aba=None é a primeira aba; abas ausentes
+    voltam vazias ({}).
+    """
+    from openpyxl import load_workbook
+    wb = load_workbook(io.BytesIO(conteudo), read_only=True, data_only=True)
+    try:
+        return {
+            aba: _ler_aba(wb[aba] if aba else wb.worksheets[0], esquema) if aba is None or aba in wb.sheetnames else {}
+            for aba, esquema in esquemas.items()
+        }
+    finally:
+        wb.close()
+
+def _montar_dataframe(colunas, esquema):
+    import pandas as pd
+    return pd.DataFrame({coluna: pd.array(valores, dtype=esquema[coluna]) for coluna, valores in colunas.items()})
+
+def carregar_planilha(conteudo, esquema=ESQUEMA_EDIFICACAO, aba=None):
+    """
+    DataFrame tipado da planilha, lido uma vez por conteúdo e mantido em um
+    cache LRU de até MAX_PLANILHAS_EM_CACHE arquivos. O DataFrame devolvido é
+    compartilhado: não o modifique.
+    """
+    chave = (hash_conteudo(conteudo), tuple(esquema.items()), aba)
+    with _cache_lock:
+        if chave in _cache:
+            _cache.move_to_end(chave)
+            return _cache[chave]
+
+    df = _montar_dataframe(ler_colunas(conteudo, esquema, aba), esquema)
+
+    with _cache_lock:
+        _cache[chave] = df
+        _cache.move_to_end(chave)
+        while len(_cache) > MAX_PLANILHAS_EM_CACHE:
+            _cache.popitem(last=False)
+    return df
@@ -0,0 +1,130 @@
+# 📦 Processamento em lote de carteiras de projetos
+#
+# Uso:
+#   python -m ppci.lote carteira.xlsx -o resultados.xlsx [--processos N]
+#
+# Cada linha da planilha é uma edificação, com as mesmas colunas exportadas
+# pelo app (nome, area, altura, terrea, num_pavimentos, subsolo_tecnico, ...,
+# tratamento, edificacao_conjunta). Uma coluna opcional "NomeProjeto" separa
+# os projetos: a consolidação das áreas "Conjunta" é feita por projeto.
+import argparse
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from ppci.regras import avaliar_edificacao, consolidar_edificacoes_detalhado, medidas_tabela_simplificada
+
+COLUNA_PROJETO = "NomeProjeto"
+COLUNAS_RESULTADO = [COLUNA_PROJETO, "nome", "area_consolidada", "tabela", *medidas_tabela_simplificada(1), "notas", "trrf"]
+
+# Valores padrão equivalentes aos do formulário de torres do app; "terrea"
+# não tem padrão fixo: sem a coluna, é deduzida da altura e dos pavimentos
+PADROES_EDIFICACAO = {
+    "area": 0.0, "altura": 0.0, "num_pavimentos": 1,
+    "um_ap_por_pav": None, "subsolo_tecnico": "Não", "numero_subsolos": "0",
+    "area_subsolo": "Menor que 500m²", "subsolo_ocupado": "Não",
+    "subsolo_menor_50": "Não", "duplex": "Não", "atico": "Não",
+    "tratamento": "Independente", "edificacao_conjunta": None,
+    "estrutura_terrea": "Não",
+}
+
+
+def _vazio(valor):
+    return valor is None or (isinstance(valor, float) and math.isnan(valor)) or valor == ""
+
+def normalizar_edificacao(linha):
+    """Converte uma linha lida do Excel em um dicionário de edificação do app."""
+    edificacao = dict(PADROES_EDIFICACAO)
+    for chave, valor in linha.items():
+        if not _vazio(valor):
+            edificacao[chave] = valor
+    edificacao["nome"] = str(edificacao.get("nome", "")).strip()
+    edificacao["area"] = float(edificacao["area"])
+    edificacao["altura"] = float(edificacao["altura"])
+    edificacao["num_pavimentos"] = int(edificacao["num_pavimentos"])
+    if "terrea" not in edificacao:
+        # Como em registros.Torre: só é térrea se nada indica mais de um pavimento
+        edificacao["terrea"] = "Não" if edificacao["altura"] > 0 or edificacao["num_pavimentos"] > 1 else "Sim"
+    # O Excel converte "1" em número; o app trabalha com texto
+    numero_subsolos = edificacao["numero_subsolos"]
+    if isinstance(numero_subsolos, float) and numero_subsolos.is_integer():
+        numero_subsolos = int(numero_subsolos)
+    edificacao["numero_subsolos"] = str(numero_subsolos)
+    return edificacao
+
+def agrupar_por_projeto(linhas):
+    projetos = {}
+    for linha in linhas:
+        edificacao = normalizar_edificacao(linha)
+        projetos.setdefault(edificacao.get(COLUNA_PROJETO, ""), []).append(edificacao)
+    return projetos
+
+def _linha_resultado(nome_projeto, edificacao):
+    avaliacao = avaliar_edificacao(edificacao, edificacao.get("estrutura_terrea", "Não"))
+    linha = {COLUNA_PROJETO: nome_projeto, "nome": avaliacao["nome"],
+             "area_consolidada": avaliacao["area_consolidada"],
+             "tabela": "Simplificada" if avaliacao["tabela_simplificada"] else "Completa"}
+    linha.update(avaliacao["medidas"])
+    linha["notas"] = "\n".join(avaliacao["notas"])
+    linha["trrf"] = avaliacao["trrf"]
+    return linha
+
+def avaliar_bloco(bloco):
+    """Avalia um bloco de (projeto, edificação consolidada) — executado nos workers."""
+    return [_linha_resultado(nome_projeto, edificacao) for nome_projeto, edificacao in bloco]
+
+def iterar_carteira(linhas, processos=None, tamanho_bloco=500, problemas=None):
+    """
+    Consolida cada projeto e avalia as edificações resultantes, distribuindo
+    blocos de `tamanho_bloco` edificações entre os processos do pool.
+    As linhas de resultado são produzidas à medida que os blocos terminam.
+    Se `problemas` for uma lista, recebe os avisos da consolidação.
+    """
+    consolidadas = []
+    for nome_projeto, edificacoes in agrupar_por_projeto(linhas).items():
+        grupos, avisos = consolidar_edificacoes_detalhado(edificacoes, copiar=False)
+        consolidadas.extend((nome_projeto, edificacao) for edificacao in grupos)
+        if problemas is not None:
+            problemas.extend(f"{nome_projeto}: {aviso}" if nome_projeto else aviso for aviso in avisos)
+    blocos = [consolidadas[i:i + tamanho_bloco] for i in range(0, len(consolidadas), tamanho_bloco)]
+    if processos == 1 or len(blocos) <= 1:
+        for bloco in blocos:
+            yield from avaliar_bloco(bloco)
+        return
+    with ProcessPoolExecutor(max_workers=processos) as executor:
+        for resultado in executor.map(avaliar_bloco, blocos):
+            yield from resultado
+
+def avaliar_carteira(linhas, processos=None, tamanho_bloco=500, problemas=None):
+    return list(iterar_carteira(linhas, processos, tamanho_bloco, problemas))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m ppci.lote", description="Avalia em lote uma planilha de edificações.")
+    parser.add_argument("entrada", help="Planilha .xlsx com uma edificação por linha")
+    parser.add_argument("-o", "--saida", help="Planilha de resultados (padrão: <entrada>-resultados.xlsx)")
+    parser.add_argument("--aba", default=0, help="Nome ou índice da aba de entrada")
+    parser.add_argument("--processos", type=int, default=os.cpu_count(), help="Número de processos do pool")
+    parser.add_argument("--bloco", type=int, default=500, help="Edificações enviadas por vez a cada processo")
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+    from ppci.exportacao import escrever_linhas
+
+    aba = int(args.aba) if str(args.aba).isdigit() else args.aba
+    df = pd.read_excel(args.entrada, sheet_name=aba)
+    linhas = df.to_dict(orient="records")
+    del df
+
+    problemas = []
+    resultados = iterar_carteira(linhas, processos=args.processos, tamanho_bloco=args.bloco, problemas=problemas)
+    saida = args.saida or os.path.splitext(args.entrada)[0] + "-resultados.xlsx"
+    total = escrever_linhas(saida, resultados, COLUNAS_RESULTADO)
+    for problema in problemas:
+        print(f"Aviso: {problema}", file=sys.stderr)
+    print(f"{total} edificações avaliadas -> {saida}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
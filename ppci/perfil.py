@@ -0,0 +1,73 @@
+# ⏱️ Instrumentação opcional de um rerun do app
+#
+# As etapas são marcadas em sequência (perfil.marcar("etapa")): cada marca
+# encerra a etapa anterior. Ao final, o resumo traz o tempo de cada etapa,
+# os widgets criados em cada uma (quando há contador disponível) e o tamanho
+# do session_state; ele pode ser anexado como uma linha JSON em um log local.
+import json
+import os
+import pickle
+import sys
+import time
+from datetime import datetime
+
+ARQUIVO_LOG_PADRAO = os.environ.get("PPCI_PERFIL_LOG", "ppci_perfil.jsonl")
+
+
+def tamanho_estado(estado):
+    """Número de chaves e tamanho aproximado (bytes serializados) de um mapeamento."""
+    total = 0
+    for valor in estado.values():
+        try:
+            total += len(pickle.dumps(valor, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            total += sys.getsizeof(valor)
+    return {"chaves": len(estado), "bytes": total}
+
+
+class Perfil:
+    """Spans de tempo consecutivos de um rerun. Inativo, não mede nada."""
+
+    def __init__(self, ativo=False, contador_widgets=None):
+        self.ativo = ativo
+        self.contador_widgets = contador_widgets or (lambda: None)
+        self.etapas = []
+        self._atual = None
+        self._inicio_rerun = time.perf_counter()
+
+    def marcar(self, etapa):
+        """Encerra a etapa em andamento e inicia `etapa`."""
+        if not self.ativo:
+            return
+        self._encerrar()
+        self._atual = (etapa, time.perf_counter(), self.contador_widgets())
+
+    def _encerrar(self):
+        if self._atual is None:
+            return
+        etapa, inicio, widgets_inicio = self._atual
+        widgets_fim = self.contador_widgets()
+        self.etapas.append({
+            "etapa": etapa,
+            "ms": round((time.perf_counter() - inicio) * 1000, 3),
+            "widgets": widgets_fim - widgets_inicio if widgets_inicio is not None and widgets_fim is not None else None,
+        })
+        self._atual = None
+
+    def finalizar(self, estado_sessao=None):
+        """Encerra a última etapa e devolve o resumo do rerun."""
+        self._encerrar()
+        resumo = {
+            "data": datetime.now().isoformat(timespec="milliseconds"),
+            "total_ms": round((time.perf_counter() - self._inicio_rerun) * 1000, 3),
+            "widgets": self.contador_widgets(),
+            "etapas": self.etapas,
+        }
+        if estado_sessao is not None:
+            resumo["session_state"] = tamanho_estado(estado_sessao)
+        return resumo
+
+def gravar_log(resumo, caminho=ARQUIVO_LOG_PADRAO):
+    """Anexa o resumo como uma linha JSON no log local."""
+    with open(caminho, "a", encoding="utf-8") as f:
+        f.write(json.dumps(resumo, ensure_ascii=False) + "\n")
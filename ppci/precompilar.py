@@ -0,0 +1,35 @@
+# 🚀 Pré-compilação do bytecode do pacote ppci (inclui as tabelas de regras)
+#
+# Uso (no deploy, depois de instalar as dependências):
+#   python -m ppci.precompilar
+#
+# Só o bytecode é pré-compilado: as tabelas da NT-07 (ppci.regras) são
+# literais Python e vêm do .pyc sem recompilar o código-fonte, mas o índice
+# de decisão continua montado na importação por _compilar_indice_decisao
+# (oito entradas, dezenas de microssegundos; um cache próprio em disco não
+# compensaria a leitura do arquivo). Em contêineres com
+# PYTHONDONTWRITEBYTECODE=1 o interpretador nunca grava esse cache por conta
+# própria e cada processo novo recompila todos os módulos; este comando grava
+# os .pyc uma vez (a leitura continua permitida com a variável ativa).
+# O app.py não entra: o Streamlit compila o script uma vez por processo.
+import compileall
+import os
+import sys
+
+RAIZ_REPOSITORIO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def precompilar(raiz=RAIZ_REPOSITORIO, silencioso=True):
+    """Compila o pacote ppci; devolve True se todos os módulos compilaram."""
+    return bool(compileall.compile_dir(os.path.join(raiz, "ppci"), quiet=int(silencioso)))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    ok = precompilar(silencioso="-v" not in argv)
+    print("Bytecode gravado." if ok else "Falha ao compilar algum módulo.", file=sys.stderr)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
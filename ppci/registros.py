@@ -0,0 +1,236 @@
+# 🗂️ Registros compactos de edificações
+#
+# Torres, anexos e grupos consolidados são objetos com __slots__; os campos
+# de opções fixas (Sim/Não, faixas de subsolo, uso, carga de incêndio...) são
+# guardados como códigos inteiros pequenos. Os registros também se comportam
+# como mapeamentos (registro["area"], registro.get("uso")), de modo que as
+# funções de ppci.regras aceitam indistintamente registros e dicts.
+from array import array
+
+# Campo -> valores possíveis; o código armazenado é o índice na tupla
+CODIGOS = {
+    "terrea": ("Não", "Sim"),
+    "um_ap_por_pav": (None, "Não", "Sim"),
+    "subsolo_tecnico": ("Não", "Sim"),
+    "numero_subsolos": ("0", "1", "Mais de 1"),
+    "area_subsolo": ("Menor que 500m²", "Maior que 500m²"),
+    "subsolo_ocupado": ("Não", "Sim"),
+    "subsolo_menor_50": ("Não", "Sim"),
+    "duplex": ("Não", "Sim"),
+    "atico": ("Não", "Sim"),
+    "uso": (None, "C-1", "F-6", "F-8", "G-1", "G-2", "J-2"),
+    "carga_incendio": (None, "300 MJ/m²", "600 MJ/m²"),
+    "tratamento": (None, "Independente", "Conjunta"),
+}
+_INDICES = {campo: {valor: codigo for codigo, valor in enumerate(valores)} for campo, valores in CODIGOS.items()}
+
+CAMPOS_SIMPLES = ("nome", "area", "altura", "num_pavimentos", "edificacao_conjunta")
+CAMPOS_GRUPO = ("area_original", "areas_combinadas_com")
+
+# Valores padrão equivalentes aos do formulário de torres do app
+PADROES = {
+    "terrea": "Sim", "um_ap_por_pav": None, "subsolo_tecnico": "Não", "numero_subsolos": "0",
+    "area_subsolo": "Menor que 500m²", "subsolo_ocupado": "Não", "subsolo_menor_50": "Não",
+    "duplex": "Não", "atico": "Não", "uso": None, "carga_incendio": None, "tratamento": None,
+}
+
+
+def codificar(campo, valor):
+    try:
+        return _INDICES[campo][valor]
+    except KeyError:
+        raise ValueError(f"Valor inválido para '{campo}': {valor!r}") from None
+
+def decodificar(campo, codigo):
+    return CODIGOS[campo][codigo]
+
+
+class RegistroEdificacao:
+    """Edificação com slots e campos de opções codificados; acessível como mapeamento."""
+
+    __slots__ = CAMPOS_SIMPLES + tuple("_" + campo for campo in CODIGOS)
+    CAMPOS = CAMPOS_SIMPLES[:4] + tuple(CODIGOS) + CAMPOS_SIMPLES[4:]
+
+    def __init__(self, nome="", area=0.0, altura=0.0, num_pavimentos=1, edificacao_conjunta=None, **opcoes):
+        self.nome = nome
+        self.area = area
+        self.altura = altura
+        self.num_pavimentos = num_pavimentos
+        self.edificacao_conjunta = edificacao_conjunta
+        for campo in CODIGOS:
+            setattr(self, "_" + campo, codificar(campo, opcoes.pop(campo, PADROES[campo])))
+        if opcoes:
+            raise TypeError(f"Campos desconhecidos: {', '.join(opcoes)}")
+
+    # --- protocolo de mapeamento ---
+    def __getitem__(self, chave):
+        if chave in CODIGOS:
+            return CODIGOS[chave][getattr(self, "_" + chave)]
+        if chave in self.CAMPOS:
+            return getattr(self, chave)
+        raise KeyError(chave)
+
+    def __setitem__(self, chave, valor):
+        if chave in CODIGOS:
+            setattr(self, "_" + chave, codificar(chave, valor))
+        elif chave in self.CAMPOS:
+            setattr(self, chave, valor)
+        else:
+            raise KeyError(chave)
+
+    def __contains__(self, chave):
+        return chave in self.CAMPOS
+
+    def get(self, chave, padrao=None):
+        try:
+            return self[chave]
+        except KeyError:
+            return padrao
+
+    def keys(self):
+        return self.CAMPOS
+
+    def items(self):
+        return [(campo, self[campo]) for campo in self.CAMPOS]
+
+    def para_dict(self):
+        return dict(self.items())
+
+    # --- cópia, comparação e representação ---
+    def copy(self):
+        novo = object.__new__(type(self))
+        for slot in self._todos_slots():
+            setattr(novo, slot, getattr(self, slot))
+        return novo
+
+    def como_grupo(self):
+        """Novo GrupoConsolidado a partir desta edificação (usado por consolidar_edificacoes)."""
+        grupo = object.__new__(GrupoConsolidado)
+        for slot in RegistroEdificacao.__slots__:
+            setattr(grupo, slot, getattr(self, slot))
+        grupo.area_original = self.area
+        grupo.areas_combinadas_com = [self.nome]
+        return grupo
+
+    @classmethod
+    def _todos_slots(cls):
+        return [slot for klass in reversed(cls.__mro__) for slot in getattr(klass, "__slots__", ())]
+
+    def __eq__(self, outro):
+        if type(outro) is not type(self):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(outro, slot) for slot in self._todos_slots())
+
+    __hash__ = None
+
+    def __repr__(self):
+        campos = ", ".join(f"{campo}={self[campo]!r}" for campo in self.CAMPOS)
+        return f"{type(self).__name__}({campos})"
+
+    def __getstate__(self):
+        return tuple(getattr(self, slot) for slot in self._todos_slots())
+
+    def __setstate__(self, estado):
+        for slot, valor in zip(self._todos_slots(), estado):
+            setattr(self, slot, valor)
+
+def _propriedade_codificada(campo):
+    atributo = "_" + campo
+    return property(
+        lambda self: CODIGOS[campo][getattr(self, atributo)],
+        lambda self, valor: setattr(self, atributo, codificar(campo, valor)),
+        doc=f"Valor textual de '{campo}' (armazenado como código).",
+    )
+
+for _campo in CODIGOS:
+    setattr(RegistroEdificacao, _campo, _propriedade_codificada(_campo))
+
+
+class Torre(RegistroEdificacao):
+    __slots__ = ()
+
+    def __init__(self, nome="", area=0.0, altura=0.0, num_pavimentos=1, **opcoes):
+        opcoes.setdefault("terrea", "Não" if altura else "Sim")
+        super().__init__(nome, area, altura, num_pavimentos, **opcoes)
+
+class Anexo(RegistroEdificacao):
+    __slots__ = ()
+
+    def __init__(self, nome="", area=0.0, uso="C-1", carga_incendio="300 MJ/m²", **opcoes):
+        super().__init__(nome, area, 0.0, 1, uso=uso, carga_incendio=carga_incendio, terrea="Sim", **opcoes)
+
+class GrupoConsolidado(RegistroEdificacao):
+    """Edificação principal com a área somada das edificações que absorve."""
+
+    __slots__ = CAMPOS_GRUPO
+    CAMPOS = RegistroEdificacao.CAMPOS + CAMPOS_GRUPO
+
+
+# 📊 Coleção colunar
+
+class ColecaoEdificacoes:
+    """
+    Armazena uma coleção de registros por coluna: arrays numéricos para
+    áreas e alturas, arrays de bytes para os códigos e listas para os textos.
+    Converte para DataFrame (colunas categóricas) sem montar dicts por linha.
+    """
+
+    COLUNAS_NUMERICAS = {"area": "d", "altura": "d", "area_original": "d", "num_pavimentos": "i"}
+    COLUNAS_TEXTO = ("nome", "edificacao_conjunta", "areas_combinadas_com")
+
+    def __init__(self):
+        self.colunas = {campo: array(tipo) for campo, tipo in self.COLUNAS_NUMERICAS.items()}
+        self.colunas.update({campo: array("b") for campo in CODIGOS})
+        self.colunas.update({campo: [] for campo in self.COLUNAS_TEXTO})
+
+    @classmethod
+    def de_registros(cls, registros):
+        colecao = cls()
+        for registro in registros:
+            colecao.anexar(registro)
+        return colecao
+
+    def anexar(self, registro):
+        colunas = self.colunas
+        colunas["nome"].append(registro.nome)
+        colunas["area"].append(float(registro.area))
+        colunas["altura"].append(float(registro.altura))
+        colunas["num_pavimentos"].append(int(registro.num_pavimentos))
+        colunas["edificacao_conjunta"].append(registro.edificacao_conjunta)
+        for campo in CODIGOS:
+            colunas[campo].append(getattr(registro, "_" + campo))
+        colunas["area_original"].append(float(getattr(registro, "area_original", registro.area)))
+        colunas["areas_combinadas_com"].append(getattr(registro, "areas_combinadas_com", None))
+
+    def __len__(self):
+        return len(self.colunas["nome"])
+
+    def linhas(self, campos):
+        """Valores (decodificados) de `campos`, linha a linha, para exportação em streaming."""
+        geradores = []
+        for campo in campos:
+            coluna = self.colunas.get(campo)
+            if coluna is None:
+                geradores.append([None] * len(self))
+            elif campo in CODIGOS:
+                geradores.append(map(CODIGOS[campo].__getitem__, coluna))
+            else:
+                geradores.append(coluna)
+        return zip(*geradores)
+
+    def para_dataframe(self):
+        import numpy as np
+        import pandas as pd
+
+        dados = {"nome": pd.array(self.colunas["nome"], dtype="string")}
+        for campo, tipo in self.COLUNAS_NUMERICAS.items():
+            dados[campo] = np.frombuffer(self.colunas[campo], dtype=np.float64 if tipo == "d" else np.intc)
+        for campo, valores in CODIGOS.items():
+            codigos = np.frombuffer(self.colunas[campo], dtype=np.int8)
+            if valores[0] is None: # código 0 = vazio, que no Categorical é -1
+                dados[campo] = pd.Categorical.from_codes(codigos - 1, categories=valores[1:])
+            else:
+                dados[campo] = pd.Categorical.from_codes(codigos, categories=valores)
+        dados["edificacao_conjunta"] = pd.array(self.colunas["edificacao_conjunta"], dtype="string")
+        dados["areas_combinadas_com"] = self.colunas["areas_combinadas_com"]
+        return pd.DataFrame(dados)
@@ -0,0 +1,517 @@
+# 📐 Regras de enquadramento (NT-07 / Tabelas de medidas de segurança)
+#
+# Este módulo não importa Streamlit: é usado tanto pelo app.py quanto pelo
+# processamento em lote (python -m ppci.lote).
+import math
+import re
+from bisect import bisect_left, bisect_right
+from collections import namedtuple
+from types import MappingProxyType
+
+
+# 🧠 Funções auxiliares
+
+def gerar_nome_arquivo(nome_projeto, nome_arquivo_entrada=None):
+    if nome_arquivo_entrada:
+        match = re.search(r"-R(\d+)", nome_arquivo_entrada)
+        numero = int(match.group(1)) + 1 if match else 1
+        novo_nome = re.sub(r"-R\d+", f"-R{numero:02}", nome_arquivo_entrada)
+    else:
+        novo_nome = f"checklistINC_{nome_projeto}-R00.xlsx"
+    return novo_nome
+
+def faixa_altura(h):
+    if h == 0:
+        return "Térrea"
+    elif h < 6:
+        return "H < 6 m"
+    elif h < 12:
+        return "6 ≤ H < 12 m"
+    elif h < 23:
+        return "12 ≤ H < 23 m"
+    elif h < 30:
+        return "23 ≤ H < 30 m"
+    else:
+        return "Acima de 30 m"
+
+def is_tabela_simplificada(area_consolidada, altura):
+    """Edificações com até 750 m² e até 12 m usam a tabela simplificada."""
+    return area_consolidada <= 750 and altura <= 12
+
+FAIXAS_ALTURA = ("Térrea", "H < 6 m", "6 ≤ H < 12 m", "12 ≤ H < 23 m", "23 ≤ H < 30 m", "Acima de 30 m")
+
+# Tabela completa: uma coluna por faixa de altura (na ordem de FAIXAS_ALTURA)
+TABELA_COMPLETA = {
+    "Acesso de Viatura na Edificação": ("X",) * 6,
+    "Segurança Estrutural contra Incêndio": ("X",) * 6,
+    "Compartimentação Horizontal ou de Área": ("X⁴",) * 6,
+    "Compartimentação de Verticais": ("", "", "", "X²", "X²", "X²"),
+    "Controle de Materiais de Acabamento": ("", "", "", "X", "X", "X"),
+    "Saídas de Emergência": ("X", "X", "X", "X", "X", "X¹"),
+    "Brigada de Incêndio": ("X",) * 6,
+    "Iluminação de Emergência": ("X",) * 6,
+    "Alarme de Incêndio": ("X³", "X³", "X³", "X³", "X³", "X"),
+    "Sinalização de Emergência": ("X",) * 6,
+    "Extintores": ("X",) * 6,
+    "Hidrantes e Mangotinhos": ("X",) * 6
+}
+
+# Tabela simplificada: a Iluminação de Emergência só se aplica acima de dois pavimentos
+TABELA_SIMPLIFICADA = {
+    "Acesso de Viatura na Edificação": "X", 
+    "Segurança Estrutural contra Incêndio": "X", 
+    "Compartimentação Horizontal ou de Área": "X⁴",
+    "Compartimentação de Verticais": "-",
+    "Controle de Materiais de Acabamento": "-",
+    "Saídas de Emergência": "X",
+    "Brigada de Incêndio": "-",
+    "Iluminação de Emergência": None,
+    "Alarme de Incêndio": "X³",
+    "Sinalização de Emergência": "X",
+    "Extintores": "X",
+    "Hidrantes e Mangotinhos": "-"
+}
+
+NOTA_ELEVADOR_EMERGENCIA = "1 – Deve haver Elevador de Emergência para altura maior que 80 m"
+NOTAS_POR_SOBRESCRITO = (
+    ("X²", "2 – Pode ser substituída por sistema de controle de fumaça somente nos átrios"),
+    ("X³", "3 – O sistema de alarme pode ser setorizado na central junto à portaria, desde que tenha vigilância 24 horas"),
+    ("X⁴", "4 – Devem ser atendidas somente as regras específicas de compartimentação entre unidades autônomas"),
+)
+NOTA_ILUMINACAO_SIMPLIFICADA = "5 – Iluminação de Emergência: Somente para as edificações com mais de dois pavimentos (regra simplificada)."
+
+# Entrada do índice de decisão: medidas resolvidas (somente leitura), notas
+# independentes da altura e os sobrescritos presentes na tabela
+EntradaDecisao = namedtuple("EntradaDecisao", "chave tabela_simplificada medidas notas sobrescritos")
+
+ATE_2_PAVIMENTOS = "até 2 pavimentos"
+MAIS_DE_2_PAVIMENTOS = "mais de 2 pavimentos"
+
+def _notas_da_tabela(medidas, tabela_simplificada):
+    if tabela_simplificada:
+        return (NOTA_ILUMINACAO_SIMPLIFICADA,) if medidas["Iluminação de Emergência"] == "X" else ()
+    valores = "".join(medidas.values())
+    return tuple(nota for sobrescrito, nota in NOTAS_POR_SOBRESCRITO if sobrescrito in valores)
+
+def _entrada_decisao(chave, tabela_simplificada, medidas):
+    valores = "".join(medidas.values())
+    return EntradaDecisao(
+        chave, tabela_simplificada, MappingProxyType(medidas),
+        _notas_da_tabela(medidas, tabela_simplificada),
+        frozenset(s for s in "¹²³⁴" if s in valores),
+    )
+
+def _compilar_indice_decisao():
+    indice = {}
+    for idx, faixa in enumerate(FAIXAS_ALTURA):
+        chave = ("completa", faixa, None)
+        indice[chave] = _entrada_decisao(chave, False, {medida: valores[idx] for medida, valores in TABELA_COMPLETA.items()})
+    for faixa_pavimentos, iluminacao in ((ATE_2_PAVIMENTOS, "-"), (MAIS_DE_2_PAVIMENTOS, "X")):
+        chave = ("simplificada", None, faixa_pavimentos)
+        medidas = {medida: iluminacao if valor is None else valor for medida, valor in TABELA_SIMPLIFICADA.items()}
+        indice[chave] = _entrada_decisao(chave, True, medidas)
+    return MappingProxyType(indice)
+
+# Índice compilado na importação: (tipo de tabela, faixa de altura, faixa de pavimentos) -> EntradaDecisao
+INDICE_DECISAO = _compilar_indice_decisao()
+
+def chave_decisao(area_consolidada, altura, num_pavimentos):
+    if area_consolidada > 750 or altura > 12:
+        return ("completa", faixa_altura(altura), None)
+    return ("simplificada", None, MAIS_DE_2_PAVIMENTOS if num_pavimentos > 2 else ATE_2_PAVIMENTOS)
+
+def classificar(area_consolidada, altura, num_pavimentos):
+    """
+    Enquadramento de uma edificação em uma única consulta ao índice.
+    Retorna (entrada, notas); `entrada.medidas` é somente leitura.
+    """
+    entrada = INDICE_DECISAO[chave_decisao(area_consolidada, altura, num_pavimentos)]
+    if not entrada.tabela_simplificada and altura >= 80:
+        return entrada, (NOTA_ELEVADOR_EMERGENCIA,) + entrada.notas
+    return entrada, entrada.notas
+
+def medidas_tabela_completa(faixa):
+    return dict(INDICE_DECISAO[("completa", faixa, None)].medidas)
+
+def medidas_tabela_simplificada(num_pavimentos):
+    return dict(INDICE_DECISAO[("simplificada", None, MAIS_DE_2_PAVIMENTOS if num_pavimentos > 2 else ATE_2_PAVIMENTOS)].medidas)
+
+def medidas_por_enquadramento(area_consolidada, altura, num_pavimentos):
+    """Determina o conjunto de medidas de segurança com base na área e altura (somente leitura)."""
+    return INDICE_DECISAO[chave_decisao(area_consolidada, altura, num_pavimentos)].medidas
+
+
+def notas_relevantes(resumo, altura, num_pavimentos, is_tabela_simplificada):
+    notas = []
+    
+    if not is_tabela_simplificada:
+        if altura >= 80:
+            notas.append(NOTA_ELEVADOR_EMERGENCIA)
+        valores = "".join(resumo.values())
+        notas.extend(nota for sobrescrito, nota in NOTAS_POR_SOBRESCRITO if sobrescrito in valores)
+
+    if is_tabela_simplificada and resumo.get("Iluminação de Emergência") == "X":
+        notas.append(NOTA_ILUMINACAO_SIMPLIFICADA)
+        
+    return notas
+
+def fachada_edificacao(edf):
+    if "um_ap_por_pav" in edf and edf["um_ap_por_pav"] == "Sim":
+        return "toda a fachada do pavimento"
+    elif "terrea" in edf and edf["terrea"] == "Sim":
+        return "toda a fachada do edifício"
+    elif "altura" in edf and "area" in edf:
+        if edf["area"] <= 750 and edf["altura"] < 12:
+            return "toda a área da fachada"
+        elif edf["area"] > 750 and edf["altura"] < 12:
+            return "fachada da área do maior compartimento"
+        elif edf["area"] > 750 and edf["altura"] >= 12:
+            return "fachada da área do maior compartimento"
+        else:
+            return "toda a área da fachada"
+    else:
+        return "toda a fachada do edifício"
+
+# Tabela A.4 da NT-07 (simplificada): distância (m) por número de pavimentos
+# (1, 2, 3 ou mais) e porcentagem de abertura
+TABELA_A4 = {
+    1: {10: 4, 20: 5, 30: 6, 40: 7, 50: 8, 70: 9, 100: 10},
+    2: {10: 6, 20: 7, 30: 8, 40: 9, 50: 10, 70: 11, 100: 12},
+    3: {10: 8, 20: 9, 30: 10, 40: 11, 50: 12, 70: 13, 100: 14}
+}
+
+def buscar_valor_tabela_simplificada(porcentagem, num_pavimentos):
+    # Lógica da Tabela Simplificada para Distância (Tabela A.4 NT-07)
+    tabela = TABELA_A4
+    num_pavimentos_lookup = min(num_pavimentos, 3) 
+
+    porcentagens_lookup = sorted(tabela[num_pavimentos_lookup].keys())
+    
+    porcentagem_clamped = max(min(porcentagem, 100), 10) 
+    porcentagem_mais_proxima = min(porcentagens_lookup, key=lambda p: abs(p - porcentagem_clamped))
+    
+    return tabela[num_pavimentos_lookup][porcentagem_mais_proxima]
+
+# Tabela A.3 da NT-07: Fator Alfa (α) por porcentagem de abertura (linhas)
+# e Fator X (colunas). As linhas de 40% e 60% trazem um 18º valor sem
+# breakpoint correspondente; ele nunca foi alcançado pela interpolação e é
+# descartado na validação abaixo.
+_TABELA_A3_BRUTA = {
+    20: [0.4, 0.4, 0.44, 0.46, 0.48, 0.49, 0.5, 0.51, 0.51, 0.51, 0.51, 0.51, 0.51, 0.51, 0.51, 0.51, 0.51],
+    30: [0.6, 0.66, 0.73, 0.79, 0.84, 0.88, 0.9, 0.92, 0.93, 0.94, 0.94, 0.95, 0.95, 0.95, 0.95, 0.95, 0.95],
+    40: [0.8, 0.8, 0.94, 1.02, 1.1, 1.17, 1.23, 1.27, 1.3, 1.32, 1.33, 1.33, 1.34, 1.34, 1.34, 1.34, 1.34, 1.34],
+    50: [0.9, 1.0, 1.11, 1.22, 1.33, 1.42, 1.51, 1.58, 1.63, 1.66, 1.69, 1.7, 1.71, 1.71, 1.71, 1.71, 1.71, 1.71],
+    60: [1.0, 1.14, 1.26, 1.39, 1.52, 1.64, 1.76, 1.85, 1.93, 1.99, 2.03, 2.05, 2.07, 2.08, 2.08, 2.08, 2.08, 2.08],
+    80: [1.2, 1.37, 1.52, 1.68, 1.85, 2.02, 2.18, 2.34, 2.48, 2.59, 2.67, 2.73, 2.77, 2.79, 2.8, 2.81, 2.81],
+    100: [1.4, 1.56, 1.74, 1.93, 2.13, 2.34, 2.55, 2.76, 2.95, 3.12, 3.26, 3.36, 3.43, 3.48, 3.51, 3.52, 3.53]
+}
+TABELA_A3_FATOR_X = (1.0, 1.3, 1.6, 2.0, 2.5, 3.2, 4.0, 5.0, 6.0, 8.0, 10.0, 13.0, 16.0, 20.0, 25.0, 32.0, 40.0) # Eixo X (Fator X)
+
+def _validar_tabela_a3(tabela_bruta, x_values):
+    """Confere eixos crescentes e completa/recorta cada linha para len(x_values)."""
+    y_values = tuple(sorted(tabela_bruta))
+    if any(b <= a for a, b in zip(x_values, x_values[1:])):
+        raise ValueError("Tabela A.3: o eixo do Fator X deve ser estritamente crescente.")
+    linhas = []
+    for y in y_values:
+        linha = tabela_bruta[y]
+        if len(linha) < len(x_values):
+            raise ValueError(f"Tabela A.3: a linha de {y}% tem {len(linha)} valores para {len(x_values)} breakpoints.")
+        linhas.append(tuple(float(v) for v in linha[:len(x_values)]))
+    return y_values, tuple(linhas)
+
+TABELA_A3_PORCENTAGENS, TABELA_A3 = _validar_tabela_a3(_TABELA_A3_BRUTA, TABELA_A3_FATOR_X) # Eixo Y (Porcentagem de Abertura)
+
+def _linear_interpolate(x, x1, x2, y1, y2):
+    if x2 == x1: return y1
+    return y1 + (x - x1) * (y2 - y1) / (x2 - x1)
+
+def buscar_valor_tabela(porcentagem, fator_x):
+    """
+    Calcula o Fator Alfa (α) usando Interpolação Linear Bidimensional.
+    (Fator Alfa é o valor da Tabela A.3 da NT-07)
+    Para arrays de entradas use ppci.vetorizado.buscar_valor_tabela_lote.
+    """
+    y_values = TABELA_A3_PORCENTAGENS
+    x_values = TABELA_A3_FATOR_X
+
+    # 1. ANCORAGEM/CLAMPING (Piso e Teto)
+    porcentagem = max(min(porcentagem, 100), 20) # Limita a porcentagem entre 20% e 100%
+    fator_x = max(min(fator_x, 40.0), 1.0) # Limita X entre 1.0 e 40.0
+
+    # 2. LOCALIZAÇÃO DOS PONTOS DE INTERPOLAÇÃO
+    idx2_x = bisect_left(x_values, fator_x)
+    idx1_x = idx2_x if x_values[idx2_x] == fator_x else idx2_x - 1
+    x1 = x_values[idx1_x]
+    x2 = x_values[idx2_x]
+
+    idx2_y = bisect_left(y_values, porcentagem)
+    idx1_y = idx2_y if y_values[idx2_y] == porcentagem else idx2_y - 1
+    y1 = y_values[idx1_y]
+    y2 = y_values[idx2_y]
+
+    # 3. INTERPOLAÇÃO
+    linha_y1 = TABELA_A3[idx1_y]
+    alpha_y1 = _linear_interpolate(fator_x, x1, x2, linha_y1[idx1_x], linha_y1[idx2_x])
+    if y1 == y2:
+        final_alpha = alpha_y1
+    else:
+        # Interpolação Bidimensional
+        linha_y2 = TABELA_A3[idx2_y]
+        alpha_y2 = _linear_interpolate(fator_x, x1, x2, linha_y2[idx1_x], linha_y2[idx2_x])
+        final_alpha = _linear_interpolate(porcentagem, y1, y2, alpha_y1, alpha_y2)
+    
+    return final_alpha.item() if hasattr(final_alpha, 'item') else final_alpha 
+
+def acrescimo_bombeiros(bombeiros):
+    """Acréscimo (m) à distância calculada conforme haja corpo de bombeiros na cidade."""
+    return 1.5 if bombeiros == "Sim" else 3.0
+
+def distancia_isolamento(largura, altura, abertura, edificacao, bombeiros="Sim"):
+    """Distância de isolamento (m) exigida para uma fachada de uma edificação consolidada."""
+    area_fachada = largura * altura
+    porcentagem = (abertura / area_fachada) * 100 if area_fachada > 0 else 0
+    fator_x = max(largura, altura) / max(1.0, min(largura, altura))
+    menor_dim = min(largura, altura)
+    distancia_calculada = (buscar_valor_tabela(porcentagem, fator_x) * menor_dim) + acrescimo_bombeiros(bombeiros)
+
+    # Aplica regra de min(Distância Calculada, Distância Simplificada)
+    if edificacao.get('area', 0.0) <= 750 and edificacao.get('altura', 0.0) <= 12:
+        distancia_tabela_simplificada = buscar_valor_tabela_simplificada(porcentagem, edificacao.get('num_pavimentos', 1))
+        return min(distancia_calculada, distancia_tabela_simplificada)
+    return distancia_calculada
+
+def _porcentagem_maxima_a3(fator_x, alpha_limite):
+    """
+    Maior porcentagem de abertura com Fator Alfa <= alpha_limite, para um
+    Fator X fixo. Usa a monotonicidade da Tabela A.3 em cada coluna: α é
+    linear por trechos e não decrescente na porcentagem. None se nem 20% cabe.
+    """
+    alphas = [buscar_valor_tabela(p, fator_x) for p in TABELA_A3_PORCENTAGENS]
+    if alphas[0] > alpha_limite:
+        return None
+    k = bisect_right(alphas, alpha_limite) - 1
+    if k == len(alphas) - 1:
+        return float("inf") # Nem 100% de abertura excede o limite
+    y1, y2 = TABELA_A3_PORCENTAGENS[k], TABELA_A3_PORCENTAGENS[k + 1]
+    return y1 + (alpha_limite - alphas[k]) * (y2 - y1) / (alphas[k + 1] - alphas[k])
+
+def _porcentagem_maxima_a4(num_pavimentos, distancia_limite):
+    """Maior porcentagem com distância da Tabela A.4 <= distancia_limite (None se nenhuma)."""
+    linha = TABELA_A4[min(num_pavimentos, 3)]
+    porcentagens = sorted(linha)
+    aceitas = [i for i, p in enumerate(porcentagens) if linha[p] <= distancia_limite]
+    if not aceitas:
+        return None
+    i = aceitas[-1]
+    if i == len(porcentagens) - 1:
+        return float("inf")
+    # Vale a porcentagem tabelada mais próxima; no empate, a menor
+    return (porcentagens[i] + porcentagens[i + 1]) / 2
+
+MAX_AJUSTES_ULP = 8 # passos de math.nextafter antes de recorrer à bissecção
+
+def abertura_maxima(largura, altura, afastamento, edificacao, bombeiros="Sim"):
+    """
+    Problema inverso de distancia_isolamento: a maior área de abertura (m²)
+    da fachada largura x altura cuja distância exigida não passa do
+    `afastamento` disponível. Retorna a área da fachada se qualquer abertura
+    atende e None se nem a fachada sem aberturas atende.
+    """
+    area_fachada = largura * altura
+    if area_fachada <= 0:
+        return None
+    menor_dim = min(largura, altura)
+    fator_x = max(largura, altura) / max(1.0, menor_dim)
+    margem = afastamento - acrescimo_bombeiros(bombeiros)
+    candidatas = [_porcentagem_maxima_a3(fator_x, margem / menor_dim) if margem >= 0 else None]
+    if edificacao.get('area', 0.0) <= 750 and edificacao.get('altura', 0.0) <= 12:
+        candidatas.append(_porcentagem_maxima_a4(edificacao.get('num_pavimentos', 1), afastamento))
+    candidatas = [p for p in candidatas if p is not None]
+    if not candidatas:
+        return None
+    porcentagem = max(candidatas)
+    if porcentagem >= 100:
+        return area_fachada
+    abertura = porcentagem * area_fachada / 100
+
+    def atende(valor):
+        return distancia_isolamento(largura, altura, valor, edificacao, bombeiros) <= afastamento
+
+    # Arredondamentos podem deixar a conta direta alguns ulps acima do afastamento
+    for _ in range(MAX_AJUSTES_ULP):
+        if atende(abertura):
+            return abertura
+        abertura = math.nextafter(abertura, 0.0)
+    # Diferença maior que arredondamento: bissecção, devolvendo o limite inferior (que atende)
+    inferior, superior = 0.0, abertura
+    if not atende(inferior):
+        return None
+    for _ in range(64):
+        meio = (inferior + superior) / 2
+        if meio in (inferior, superior):
+            break
+        if atende(meio):
+            inferior = meio
+        else:
+            superior = meio
+    return inferior
+
+def _resolver_raizes(indice, problemas):
+    """
+    Resolve, para cada edificação, a principal que absorve sua área seguindo
+    as cadeias "Conjunta" (A ← B ← C). Cada nó é visitado uma vez e o caminho
+    percorrido é comprimido para a raiz encontrada (estilo union-find).
+    Ciclos são quebrados no primeiro nó repetido, que passa a ser a principal;
+    destinos inexistentes tornam a edificação independente.
+    """
+    def destino(edificacao):
+        if edificacao.get("tratamento") != "Conjunta":
+            return None
+        alvo = edificacao.get("edificacao_conjunta")
+        if alvo == edificacao["nome"]:
+            return None
+        if alvo not in indice:
+            problemas.append(f"A edificação '{edificacao['nome']}' está conjunta com '{alvo}', que não existe; foi tratada como independente.")
+            return None
+        return alvo
+
+    raizes = {}
+    for nome in indice:
+        caminho = []
+        no_caminho = set()
+        atual = nome
+        while True:
+            if atual in raizes:
+                raiz = raizes[atual]
+                break
+            if atual in no_caminho:
+                ciclo = caminho[caminho.index(atual):] + [atual]
+                problemas.append(f"Ciclo de edificações conjuntas ({' → '.join(ciclo)}); '{atual}' foi considerada a principal do grupo.")
+                raiz = atual
+                break
+            caminho.append(atual)
+            no_caminho.add(atual)
+            proximo = destino(indice[atual])
+            if proximo is None:
+                raiz = atual
+                break
+            atual = proximo
+        for visitado in caminho:
+            raizes[visitado] = raiz
+    return raizes
+
+def consolidar_edificacoes_detalhado(edificacoes_atuais, copiar=True):
+    """
+    Agrupa as edificações "Conjunta" na principal que absorve sua área, em
+    tempo linear e resolvendo cadeias transitivamente.
+    Retorna (edificacoes_consolidadas, problemas), onde `problemas` lista
+    nomes duplicados, ciclos e destinos inexistentes encontrados.
+    Com copiar=False as principais recebidas como dict são atualizadas no
+    próprio dict (use quando a lista de entrada é descartável, como no lote).
+    """
+    problemas = []
+    indice = {}
+    for edificacao in edificacoes_atuais:
+        if edificacao["nome"] in indice:
+            problemas.append(f"Nome duplicado: '{edificacao['nome']}'; apenas a primeira ocorrência foi considerada.")
+            continue
+        indice[edificacao["nome"]] = edificacao
+
+    raizes = _resolver_raizes(indice, problemas)
+
+    grupos = {}
+    for nome, edificacao in indice.items():
+        if raizes[nome] == nome:
+            if hasattr(edificacao, "como_grupo"):
+                # Registros compactos (ppci.registros) viram um GrupoConsolidado
+                edificacao_combinada = edificacao.como_grupo()
+            else:
+                edificacao_combinada = edificacao.copy() if copiar else edificacao
+                edificacao_combinada['area_original'] = edificacao['area']
+                edificacao_combinada['areas_combinadas_com'] = [nome]
+            grupos[nome] = edificacao_combinada
+
+    for nome, edificacao in indice.items():
+        raiz = raizes[nome]
+        if raiz != nome:
+            grupos[raiz]['area'] += edificacao['area']
+            grupos[raiz]['areas_combinadas_com'].append(nome)
+
+    return list(grupos.values()), problemas
+
+def consolidar_edificacoes(edificacoes_atuais, copiar=True):
+    edificacoes_consolidadas, _ = consolidar_edificacoes_detalhado(edificacoes_atuais, copiar)
+    return edificacoes_consolidadas
+
+
+# 🔥 Segurança Estrutural contra Incêndio (TRRF)
+
+TRRF_ISENTA = "✅ A edificação está isenta de comprovação de TRRF para elementos estruturais."
+TRRF_TERREA_30MIN = "⚠️ A edificação deve comprovar TRRF de 30min para elementos estruturais."
+TRRF_APENAS_SUBSOLOS = "⚠️ Apenas o(s) subsolo(s) deverão apresentar comprovação de TRRF para elementos estruturais."
+TRRF_POR_PAVIMENTO_SUBSOLO_ABSORVE = "⚠️ Cada pavimento deverá apresentar comprovação de TRRF para elementos estruturais. Cada pavimento tem seu TRRF determinado de acordo com seu uso e nunca inferior ao do pavimento superior (o subsolo absorve o TRRF do pavimento superior)."
+TRRF_POR_PAVIMENTO = "⚠️ Cada pavimento deverá apresentar comprovação de TRRF para elementos estruturais. Cada pavimento tem seu TRRF determinado de acordo com seu uso e nunca inferior ao do pavimento superior."
+
+def avaliar_trrf(edificacao, estrutura_terrea="Não"):
+    """
+    Resolve o veredito de TRRF de uma edificação consolidada.
+    Retorna (resposta_trrf, mostrar_trrf_adotado).
+    `estrutura_terrea` é a resposta para edificações térreas: algum elemento
+    estrutural compromete compartimentação ou isolamento se colapsar?
+    """
+    if edificacao.get("terrea") == "Sim":
+        if estrutura_terrea == "Sim":
+            return TRRF_TERREA_30MIN, True
+        return TRRF_ISENTA, False
+
+    area = edificacao.get("area", 0)
+    altura_valor = edificacao.get("altura", 0)
+    subsolo_tecnico = edificacao.get("subsolo_tecnico", "Não")
+    numero_subsolos = edificacao.get("numero_subsolos", "0")
+    area_subsolo = edificacao.get("area_subsolo", "Menor que 500m²")
+
+    altura_menor_igual_12 = altura_valor <= 12
+    area_menor_1500 = area < 1500
+    area_maior_igual_1500 = area >= 1500
+    subsolo_simples = numero_subsolos == "1" and area_subsolo == "Menor que 500m²"
+    subsolo_complexo = numero_subsolos != "1" or area_subsolo == "Maior que 500m²"
+    sem_subsolo = subsolo_tecnico == "Não"
+
+    if altura_menor_igual_12 and area_menor_1500 and (sem_subsolo or subsolo_simples):
+        return TRRF_ISENTA, False
+    elif altura_menor_igual_12 and area_menor_1500 and subsolo_complexo:
+        return TRRF_APENAS_SUBSOLOS, True
+    elif (altura_valor > 12 or area_maior_igual_1500) and (sem_subsolo or subsolo_simples):
+        return TRRF_POR_PAVIMENTO_SUBSOLO_ABSORVE, True
+    elif (altura_valor > 12 or area_maior_igual_1500) and subsolo_complexo:
+        return TRRF_POR_PAVIMENTO, True
+    return "", False
+
+def exige_trrf_por_pavimento(resposta_trrf):
+    return "Cada pavimento deverá apresentar comprovação de TRRF" in resposta_trrf
+
+
+# 🏢 Avaliação completa de uma edificação consolidada
+
+def avaliar_edificacao(edificacao, estrutura_terrea="Não"):
+    """Enquadramento, notas e veredito de TRRF de uma edificação consolidada."""
+    area_consolidada = edificacao.get("area", 0)
+    altura_valor = edificacao.get("altura", 0)
+    num_pavimentos = edificacao.get("num_pavimentos", 1)
+
+    entrada, notas = classificar(area_consolidada, altura_valor, num_pavimentos)
+    resumo = entrada.medidas
+
+    resposta_trrf = ""
+    if "X" in resumo.get("Segurança Estrutural contra Incêndio", ""):
+        resposta_trrf, _ = avaliar_trrf(edificacao, estrutura_terrea)
+
+    return {
+        "nome": edificacao.get("nome"),
+        "area_consolidada": area_consolidada,
+        "tabela_simplificada": entrada.tabela_simplificada,
+        "medidas": resumo,
+        "notas": list(notas),
+        "trrf": resposta_trrf,
+    }
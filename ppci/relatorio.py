@@ -0,0 +1,287 @@
+# 🧾 Relatório do checklist (HTML autocontido / PDF) gerado em segundo plano
+#
+# O relatório é montado por seções (cabeçalho, uma por edificação consolidada
+# e isolamento). Cada seção e cada documento final são guardados em disco com
+# o SHA-256 das entradas normalizadas como nome de arquivo: baixar de novo um
+# projeto inalterado é só ler o arquivo, e depois de uma edição apenas as
+# seções cujas entradas mudaram são renderizadas outra vez.
+#
+# A pasta funciona como um cache LRU: cada leitura renova a data de
+# modificação do arquivo e, após gravar um documento, os arquivos mais
+# antigos são apagados até o total caber em MAX_BYTES_CACHE.
+#
+# A geração roda em um pool de processos (solicitar_relatorio devolve um
+# Future), para não bloquear o script do Streamlit. O HTML usa apenas CSS
+# embutido; o PDF é opcional e depende do pacote weasyprint.
+import hashlib
+import html
+import importlib.util
+import json
+import os
+import threading
+
+from ppci.regras import avaliar_edificacao, avaliar_trrf, distancia_isolamento
+
+PASTA_PADRAO = os.environ.get("PPCI_RELATORIOS", ".ppci_relatorios")
+VERSAO_MODELO = 1 # Incrementar ao mudar o HTML: invalida as seções em cache
+MAX_PROCESSOS = 2
+MAX_BYTES_CACHE = int(os.environ.get("PPCI_RELATORIOS_MAX_MB", "256")) * 1024 * 1024
+EXTENSOES_CACHE = (".html", ".pdf") # temporários de gravações em andamento ficam fora da poda
+
+ESTILO = """
+body { font-family: "DejaVu Sans", Arial, sans-serif; font-size: 11pt; color: #222; margin: 2em; }
+h1 { font-size: 18pt; border-bottom: 3px solid #555; padding-bottom: .3em; }
+h2 { font-size: 14pt; margin-top: 1.6em; border-bottom: 1px solid #bbb; page-break-after: avoid; }
+table { border-collapse: collapse; width: 100%; margin: .6em 0; page-break-inside: avoid; }
+th, td { border: 1px solid #999; padding: .25em .5em; text-align: left; vertical-align: top; }
+th { background: #eee; }
+.nota { font-size: 9.5pt; color: #444; }
+.resumo td:first-child { width: 40%; font-weight: bold; }
+"""
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+# 🧠 Funções auxiliares
+def hash_normalizado(*partes):
+    """SHA-256 de estruturas JSON, independente da ordem das chaves."""
+    texto = json.dumps(partes, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+def _esc(valor):
+    return "" if valor is None else html.escape(str(valor))
+
+def _formatar(valor, casas=2):
+    return f"{valor:.{casas}f}" if isinstance(valor, (int, float)) else _esc(valor)
+
+def _gravar_atomico(caminho, conteudo):
+    """Grava via arquivo temporário + rename: leitores nunca veem arquivo pela metade."""
+    import tempfile
+    pasta = os.path.dirname(caminho)
+    os.makedirs(pasta, exist_ok=True)
+    modo = "wb" if isinstance(conteudo, bytes) else "w"
+    with tempfile.NamedTemporaryFile(modo, dir=pasta, delete=False, **({} if modo == "wb" else {"encoding": "utf-8"})) as tmp:
+        tmp.write(conteudo)
+    os.replace(tmp.name, caminho)
+
+def _para_dict(edificacao):
+    return edificacao.para_dict() if hasattr(edificacao, "para_dict") else dict(edificacao)
+
+def _renovar(caminho):
+    """Marca o arquivo como usado agora (ordem da poda LRU)."""
+    try:
+        os.utime(caminho)
+    except OSError:
+        pass
+
+def podar_cache(pasta=PASTA_PADRAO, limite_bytes=None, preservar=()):
+    """
+    Apaga seções e documentos, do uso mais antigo ao mais recente, até o
+    total da pasta caber em `limite_bytes` (MAX_BYTES_CACHE, por padrão).
+    Devolve o número de arquivos apagados.
+    """
+    limite_bytes = MAX_BYTES_CACHE if limite_bytes is None else limite_bytes
+    arquivos, total = [], 0
+    for subpasta in ("secoes", "documentos"):
+        try:
+            entradas = list(os.scandir(os.path.join(pasta, subpasta)))
+        except FileNotFoundError:
+            continue
+        for entrada in entradas:
+            if not entrada.name.endswith(EXTENSOES_CACHE) or entrada.path in preservar:
+                continue
+            try:
+                info = entrada.stat()
+            except FileNotFoundError: # apagado por outro processo
+                continue
+            arquivos.append((info.st_mtime, info.st_size, entrada.path))
+            total += info.st_size
+    apagados = 0
+    for _, tamanho, caminho in sorted(arquivos):
+        if total <= limite_bytes:
+            break
+        try:
+            os.remove(caminho)
+            apagados += 1
+        except FileNotFoundError:
+            pass
+        total -= tamanho
+    return apagados
+
+
+def dados_relatorio(nome_projeto, edificacoes, comparacoes=(), respostas_trrf=None, bombeiros="Sim"):
+    """
+    Entradas normalizadas do relatório (somente tipos JSON), na mesma forma
+    de escrever_relatorio: edificações consolidadas, comparações de fachada e
+    respostas da Segurança Estrutural na ordem das edificações.
+    """
+    respostas_trrf = respostas_trrf or [{} for _ in edificacoes]
+    dados = {
+        "projeto": nome_projeto or "ProjetoSemNome",
+        "bombeiros": bombeiros,
+        "edificacoes": [
+            {"dados": _para_dict(e), "respostas_trrf": dict(r)} for e, r in zip(edificacoes, respostas_trrf)
+        ],
+        "comparacoes": [dict(c) for c in comparacoes],
+    }
+    return json.loads(json.dumps(dados, ensure_ascii=False, default=str))
+
+
+# 🏗️ Seções
+def secao_cabecalho(dados):
+    nomes = [item["dados"].get("nome") for item in dados["edificacoes"]]
+    return (
+        f"<h1>Checklist PPCI — {_esc(dados['projeto'])}</h1>"
+        "<table class='resumo'>"
+        f"<tr><td>Edificações/grupos consolidados</td><td>{len(nomes)}: {_esc(', '.join(str(n) for n in nomes))}</td></tr>"
+        f"<tr><td>Corpo de bombeiros com viatura na cidade</td><td>{_esc(dados['bombeiros'])}</td></tr>"
+        f"<tr><td>Comparações de isolamento</td><td>{len(dados['comparacoes'])}</td></tr>"
+        "</table>"
+    )
+
+def secao_edificacao(item):
+    edificacao, respostas = item["dados"], item["respostas_trrf"]
+    avaliacao = avaliar_edificacao(edificacao)
+    estrutura_terrea = respostas.get("estrutura_terrea") or "Não"
+    resposta_trrf, mostrar_trrf_adotado = avaliar_trrf(edificacao, estrutura_terrea)
+    partes = [
+        f"<h2>{_esc(edificacao.get('nome'))}</h2>",
+        "<table class='resumo'>",
+        f"<tr><td>Área consolidada (m²)</td><td>{_formatar(avaliacao['area_consolidada'])}</td></tr>",
+        f"<tr><td>Altura (m)</td><td>{_formatar(edificacao.get('altura'))}</td></tr>",
+        f"<tr><td>Número de pavimentos</td><td>{_esc(edificacao.get('num_pavimentos'))}</td></tr>",
+        f"<tr><td>Tabela</td><td>{'Simplificada' if avaliacao['tabela_simplificada'] else 'Completa'}</td></tr>",
+    ]
+    if edificacao.get("areas_combinadas_com") and len(edificacao["areas_combinadas_com"]) > 1:
+        partes.append(f"<tr><td>Áreas combinadas</td><td>{_esc(', '.join(edificacao['areas_combinadas_com']))}</td></tr>")
+    partes.append("</table>")
+
+    partes.append("<table><tr><th>Medida de Segurança</th><th>Aplicação</th></tr>")
+    partes.extend(f"<tr><td>{_esc(medida)}</td><td>{_esc(aplicacao)}</td></tr>" for medida, aplicacao in avaliacao["medidas"].items())
+    partes.append("</table>")
+    if avaliacao["notas"]:
+        partes.append("<p><b>Notas Específicas</b></p><ul>")
+        partes.extend(f"<li class='nota'>{_esc(nota)}</li>" for nota in avaliacao["notas"])
+        partes.append("</ul>")
+
+    partes.append("<p><b>Segurança Estrutural (TRRF)</b></p><table class='resumo'>")
+    partes.append(f"<tr><td>Veredito</td><td>{_esc(resposta_trrf) or '—'}</td></tr>")
+    if edificacao.get("terrea") == "Sim":
+        partes.append(f"<tr><td>Estrutura compromete compartimentação/isolamento?</td><td>{_esc(estrutura_terrea)}</td></tr>")
+    for rotulo, chave in (("Cobertura", "cobertura_trrf"), ("TRRF adotado", "trrf_adotado"), ("Comentário", "comentario_estrutural")):
+        if respostas.get(chave) and (chave != "trrf_adotado" or mostrar_trrf_adotado):
+            partes.append(f"<tr><td>{rotulo}</td><td>{_esc(respostas[chave])}</td></tr>")
+    partes.append("</table>")
+    return "".join(partes)
+
+def secao_isolamento(comparacoes, edificacoes, bombeiros):
+    if not comparacoes:
+        return ""
+    indice = {item["dados"].get("nome"): item["dados"] for item in edificacoes}
+    partes = [
+        "<h2>Isolamento entre Edificações</h2><table>",
+        "<tr><th>#</th><th>Edificação</th><th>Fachada (L × H, m)</th><th>Abertura (m²)</th><th>Distância (m)</th>"
+        "<th>Edificação</th><th>Fachada (L × H, m)</th><th>Abertura (m²)</th><th>Distância (m)</th></tr>",
+    ]
+    for n, comp in enumerate(comparacoes, start=1):
+        celulas = [f"<td>{n}</td>"]
+        for lado in (1, 2):
+            edificacao = indice.get(comp.get(f"edf{lado}_nome"))
+            largura, altura, abertura = comp.get(f"largura{lado}", 0.0), comp.get(f"altura{lado}", 0.0), comp.get(f"abertura{lado}", 0.0)
+            distancia = distancia_isolamento(largura, altura, abertura, edificacao, bombeiros) if edificacao else None
+            celulas += [
+                f"<td>{_esc(comp.get(f'edf{lado}_nome'))}</td>",
+                f"<td>{_formatar(largura)} × {_formatar(altura)}</td>",
+                f"<td>{_formatar(abertura)}</td>",
+                f"<td>{_formatar(distancia) if distancia is not None else '—'}</td>",
+            ]
+        partes.append("<tr>" + "".join(celulas) + "</tr>")
+    partes.append("</table>")
+    return "".join(partes)
+
+def _secoes(dados):
+    """[(hash da seção, função, argumentos)] na ordem do documento."""
+    secoes = [(hash_normalizado(VERSAO_MODELO, "cabecalho", dados["projeto"], dados["bombeiros"],
+                                [i["dados"].get("nome") for i in dados["edificacoes"]], len(dados["comparacoes"])),
+               secao_cabecalho, (dados,))]
+    secoes += [(hash_normalizado(VERSAO_MODELO, "edificacao", item), secao_edificacao, (item,)) for item in dados["edificacoes"]]
+    # O isolamento só depende das edificações que aparecem em alguma comparação
+    citadas = {c.get(f"edf{lado}_nome") for c in dados["comparacoes"] for lado in (1, 2)}
+    envolvidas = [item for item in dados["edificacoes"] if item["dados"].get("nome") in citadas]
+    secoes.append((hash_normalizado(VERSAO_MODELO, "isolamento", dados["comparacoes"], envolvidas, dados["bombeiros"]),
+                   secao_isolamento, (dados["comparacoes"], envolvidas, dados["bombeiros"])))
+    return secoes
+
+
+# 📄 Documento
+def pdf_disponivel():
+    # Só procura o pacote: importar o weasyprint a cada rerun custaria caro
+    return importlib.util.find_spec("weasyprint") is not None
+
+def caminho_documento(dados, formato="html", pasta=PASTA_PADRAO):
+    return os.path.join(pasta, "documentos", f"{hash_normalizado(VERSAO_MODELO, formato, dados)}.{formato}")
+
+def gerar_relatorio(dados, formato="html", pasta=PASTA_PADRAO):
+    """
+    Gera (ou reaproveita) o documento e devolve {"caminho", "renderizadas",
+    "reaproveitadas"}. Pode rodar em qualquer processo: o cache é a pasta.
+    """
+    if formato not in ("html", "pdf"):
+        raise ValueError(f"Formato de relatório desconhecido: {formato}")
+    caminho = caminho_documento(dados, formato, pasta)
+    if os.path.exists(caminho):
+        _renovar(caminho)
+        return {"caminho": caminho, "renderizadas": 0, "reaproveitadas": 0}
+
+    corpo, renderizadas, reaproveitadas = [], 0, 0
+    for chave, funcao, argumentos in _secoes(dados):
+        caminho_secao = os.path.join(pasta, "secoes", f"{chave}.html")
+        try:
+            with open(caminho_secao, encoding="utf-8") as f:
+                corpo.append(f.read())
+            _renovar(caminho_secao)
+            reaproveitadas += 1
+        except FileNotFoundError:
+            trecho = funcao(*argumentos)
+            _gravar_atomico(caminho_secao, trecho)
+            corpo.append(trecho)
+            renderizadas += 1
+
+    documento = (
+        "<!DOCTYPE html><html lang='pt-BR'><head><meta charset='utf-8'>"
+        f"<title>Checklist PPCI — {_esc(dados['projeto'])}</title><style>{ESTILO}</style></head>"
+        f"<body>{''.join(corpo)}</body></html>"
+    )
+    if formato == "pdf":
+        from weasyprint import HTML # Dependência opcional
+        _gravar_atomico(caminho, HTML(string=documento).write_pdf())
+    else:
+        _gravar_atomico(caminho, documento)
+    podar_cache(pasta, preservar={caminho})
+    return {"caminho": caminho, "renderizadas": renderizadas, "reaproveitadas": reaproveitadas}
+
+
+def _executor():
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # "spawn": não herda as threads do servidor do Streamlit
+            _pool = ProcessPoolExecutor(max_workers=MAX_PROCESSOS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+def solicitar_relatorio(dados, formato="html", pasta=PASTA_PADRAO):
+    """
+    Future com o resultado de gerar_relatorio. Se o documento já está em
+    cache, o Future volta concluído sem passar pelo pool.
+    """
+    from concurrent.futures import Future
+    caminho = caminho_documento(dados, formato, pasta)
+    if os.path.exists(caminho):
+        _renovar(caminho)
+        futuro = Future()
+        futuro.set_result({"caminho": caminho, "renderizadas": 0, "reaproveitadas": 0})
+        return futuro
+    return _executor().submit(gerar_relatorio, dados, formato, pasta)
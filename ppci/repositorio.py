@@ -0,0 +1,268 @@
+# 🗄️ Repositório local de projetos (SQLite) com histórico de revisões
+#
+# Cada projeto guarda uma sequência de revisões R00, R01, ... Uma revisão é um
+# "retrato" JSON do projeto (edificações, comparações de isolamento e
+# metadados), mas só a cada INTERVALO_RETRATO revisões ele é gravado inteiro:
+# nas demais grava-se apenas a diferença para a revisão anterior. Abrir uma
+# revisão parte do último retrato completo e aplica as diferenças seguintes.
+#
+# As edificações de cada revisão também vão para uma tabela indexada (nome,
+# uso, altura, faixa de altura), de modo que buscas como "projetos com
+# edificações acima de 23 m" não precisam reconstruir nenhuma revisão.
+import copy
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+
+from ppci.regras import faixa_altura
+
+CAMINHO_PADRAO = os.environ.get("PPCI_REPOSITORIO", "ppci_projetos.sqlite3")
+INTERVALO_RETRATO = 20 # revisões entre dois retratos completos
+
+ESQUEMA_SQL = """
+CREATE TABLE IF NOT EXISTS projetos (
+    id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL UNIQUE,
+    criado_em TEXT NOT NULL,
+    revisao_atual INTEGER NOT NULL DEFAULT -1
+);
+CREATE TABLE IF NOT EXISTS revisoes (
+    projeto_id INTEGER NOT NULL REFERENCES projetos(id),
+    numero INTEGER NOT NULL,
+    usuario TEXT,
+    data TEXT NOT NULL,
+    completa INTEGER NOT NULL,
+    conteudo BLOB NOT NULL,
+    PRIMARY KEY (projeto_id, numero)
+);
+CREATE TABLE IF NOT EXISTS edificacoes (
+    projeto_id INTEGER NOT NULL REFERENCES projetos(id),
+    numero INTEGER NOT NULL,
+    posicao INTEGER NOT NULL,
+    nome TEXT,
+    uso TEXT,
+    altura REAL,
+    faixa_altura TEXT,
+    area REAL,
+    PRIMARY KEY (projeto_id, numero, posicao)
+);
+CREATE INDEX IF NOT EXISTS idx_revisoes_usuario ON revisoes(usuario);
+CREATE INDEX IF NOT EXISTS idx_revisoes_data ON revisoes(data);
+CREATE INDEX IF NOT EXISTS idx_edificacoes_nome ON edificacoes(nome);
+CREATE INDEX IF NOT EXISTS idx_edificacoes_uso ON edificacoes(uso);
+CREATE INDEX IF NOT EXISTS idx_edificacoes_altura ON edificacoes(altura);
+CREATE INDEX IF NOT EXISTS idx_edificacoes_faixa ON edificacoes(faixa_altura);
+"""
+
+
+# 🧠 Diferenças entre retratos (estruturas JSON: dicts, listas e escalares)
+def _como_mapa(valor):
+    return {str(i): v for i, v in enumerate(valor)} if isinstance(valor, list) else valor
+
+def diferenca(antes, depois):
+    """
+    Delta que transforma `antes` em `depois`, ou None se forem iguais.
+    {"=": valor} substitui; {"~": {chave: delta}, "-": [chaves], "#": tamanho}
+    altera um dict/lista chave a chave (listas são tratadas por índice).
+    """
+    if antes == depois:
+        return None
+    if type(antes) is not type(depois) or not isinstance(depois, (dict, list)):
+        return {"=": depois}
+    a, d = _como_mapa(antes), _como_mapa(depois)
+    delta = {}
+    alteradas = {}
+    for chave, valor in d.items():
+        sub = diferenca(a[chave], valor) if chave in a else {"=": valor}
+        if sub is not None:
+            alteradas[chave] = sub
+    removidas = [chave for chave in a if chave not in d]
+    if alteradas:
+        delta["~"] = alteradas
+    if removidas:
+        delta["-"] = removidas
+    if isinstance(depois, list):
+        delta["#"] = len(depois)
+    return delta
+
+def aplicar_diferenca(base, delta):
+    """Inverso de diferenca(): aplicar_diferenca(a, diferenca(a, b)) == b."""
+    if delta is None:
+        return base
+    if "=" in delta:
+        return delta["="]
+    mapa = dict(_como_mapa(base))
+    for chave in delta.get("-", ()):
+        mapa.pop(chave, None)
+    for chave, sub in delta.get("~", {}).items():
+        mapa[chave] = aplicar_diferenca(mapa.get(chave), sub)
+    if "#" in delta:
+        return [mapa[str(i)] for i in range(delta["#"])]
+    return mapa
+
+
+def _compactar(valor):
+    return zlib.compress(json.dumps(valor, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+
+def _descompactar(blob):
+    return json.loads(zlib.decompress(blob).decode("utf-8"))
+
+def _para_dict(edificacao):
+    return edificacao.para_dict() if hasattr(edificacao, "para_dict") else dict(edificacao)
+
+def montar_retrato(edificacoes, comparacoes=(), metadados=None):
+    """Retrato JSON de um projeto a partir dos registros/dicts do app."""
+    return {
+        "edificacoes": [_para_dict(e) for e in edificacoes],
+        "comparacoes": [dict(c) for c in comparacoes],
+        "metadados": dict(metadados or {}),
+    }
+
+
+class RepositorioProjetos:
+    """Projetos e revisões em um arquivo SQLite local. Seguro para uso entre threads."""
+
+    def __init__(self, caminho=CAMINHO_PADRAO):
+        self.caminho = caminho
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._ultimos = {} # projeto_id -> (numero, retrato) da revisão mais recente
+        with self._lock, self._conexao:
+            if caminho != ":memory:":
+                self._conexao.execute("PRAGMA journal_mode=WAL")
+            self._conexao.executescript(ESQUEMA_SQL)
+
+    def fechar(self):
+        with self._lock:
+            self._conexao.close()
+
+    # --- consultas internas ---
+    def _projeto(self, nome_projeto):
+        linha = self._conexao.execute(
+            "SELECT id, revisao_atual FROM projetos WHERE nome = ?", (nome_projeto,)
+        ).fetchone()
+        if linha is None:
+            raise KeyError(f"Projeto não encontrado no repositório: {nome_projeto}")
+        return linha
+
+    def _reconstruir(self, projeto_id, numero):
+        ultimo = self._ultimos.get(projeto_id)
+        if ultimo and ultimo[0] == numero:
+            return ultimo[1]
+        linhas = self._conexao.execute(
+            "SELECT numero, completa, conteudo FROM revisoes WHERE projeto_id = ? AND numero <= ? "
+            "AND numero >= (SELECT MAX(numero) FROM revisoes WHERE projeto_id = ? AND numero <= ? AND completa = 1) "
+            "ORDER BY numero",
+            (projeto_id, numero, projeto_id, numero),
+        ).fetchall()
+        if not linhas or linhas[-1][0] != numero:
+            raise KeyError(f"Revisão R{numero:02} não encontrada")
+        retrato = None
+        for _, completa, conteudo in linhas:
+            dados = _descompactar(conteudo)
+            retrato = dados if completa else aplicar_diferenca(retrato, dados)
+        return retrato
+
+    # --- API pública ---
+    def salvar(self, nome_projeto, edificacoes, comparacoes=(), usuario=None, metadados=None):
+        """
+        Grava uma nova revisão e devolve seu número. Se nada mudou desde a
+        revisão atual, nenhuma revisão é criada e o número atual é devolvido.
+        """
+        retrato = montar_retrato(edificacoes, comparacoes, metadados)
+        # Normaliza tipos (tuplas, chaves numéricas) como ficariam ao reabrir
+        retrato = json.loads(json.dumps(retrato, ensure_ascii=False))
+        agora = datetime.now().isoformat(timespec="seconds")
+        with self._lock, self._conexao:
+            linha = self._conexao.execute(
+                "SELECT id, revisao_atual FROM projetos WHERE nome = ?", (nome_projeto,)
+            ).fetchone()
+            if linha is None:
+                projeto_id = self._conexao.execute(
+                    "INSERT INTO projetos (nome, criado_em) VALUES (?, ?)", (nome_projeto, agora)
+                ).lastrowid
+                atual = -1
+            else:
+                projeto_id, atual = linha
+
+            numero = atual + 1
+            if atual >= 0:
+                delta = diferenca(self._reconstruir(projeto_id, atual), retrato)
+                if delta is None:
+                    return atual
+            completa = atual < 0 or numero % INTERVALO_RETRATO == 0
+            self._conexao.execute(
+                "INSERT INTO revisoes (projeto_id, numero, usuario, data, completa, conteudo) VALUES (?, ?, ?, ?, ?, ?)",
+                (projeto_id, numero, usuario, agora, int(completa), _compactar(retrato if completa else delta)),
+            )
+            self._conexao.executemany(
+                "INSERT INTO edificacoes (projeto_id, numero, posicao, nome, uso, altura, faixa_altura, area) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (projeto_id, numero, posicao, e.get("nome"), e.get("uso"), e.get("altura"),
+                     faixa_altura(e["altura"]) if e.get("altura") is not None else None, e.get("area"))
+                    for posicao, e in enumerate(retrato["edificacoes"])
+                ],
+            )
+            self._conexao.execute("UPDATE projetos SET revisao_atual = ? WHERE id = ?", (numero, projeto_id))
+            self._ultimos[projeto_id] = (numero, retrato)
+        return numero
+
+    def abrir(self, nome_projeto, numero=None):
+        """Retrato da revisão `numero` (a atual, por padrão) do projeto."""
+        with self._lock:
+            projeto_id, atual = self._projeto(nome_projeto)
+            return copy.deepcopy(self._reconstruir(projeto_id, atual if numero is None else numero))
+
+    def projetos(self):
+        """[(nome, revisão atual, último usuário, data da revisão atual)], do mais recente ao mais antigo."""
+        with self._lock:
+            return self._conexao.execute(
+                "SELECT p.nome, p.revisao_atual, r.usuario, r.data FROM projetos p "
+                "JOIN revisoes r ON r.projeto_id = p.id AND r.numero = p.revisao_atual "
+                "ORDER BY r.data DESC, p.nome"
+            ).fetchall()
+
+    def revisoes(self, nome_projeto):
+        """[(número, usuário, data, retrato completo?)] do projeto, da mais recente à mais antiga."""
+        with self._lock:
+            projeto_id, _ = self._projeto(nome_projeto)
+            return [
+                (numero, usuario, data, bool(completa))
+                for numero, usuario, data, completa in self._conexao.execute(
+                    "SELECT numero, usuario, data, completa FROM revisoes WHERE projeto_id = ? ORDER BY numero DESC",
+                    (projeto_id,),
+                )
+            ]
+
+    def buscar(self, altura_minima=None, uso=None, faixa=None, nome_edificacao=None,
+               nome_projeto=None, usuario=None, desde=None, apenas_atual=True):
+        """
+        Edificações que atendem a todos os filtros informados, pelos índices:
+        [(projeto, revisão, edificação, uso, altura, área)]. Por padrão só a
+        revisão atual de cada projeto é considerada.
+        """
+        condicoes, parametros = [], []
+        for condicao, valor in (
+            ("e.altura > ?", altura_minima), ("e.uso = ?", uso), ("e.faixa_altura = ?", faixa),
+            ("e.nome = ?", nome_edificacao), ("p.nome = ?", nome_projeto),
+            ("r.usuario = ?", usuario), ("r.data >= ?", desde),
+        ):
+            if valor is not None:
+                condicoes.append(condicao)
+                parametros.append(valor)
+        if apenas_atual:
+            condicoes.append("e.numero = p.revisao_atual")
+        sql = (
+            "SELECT p.nome, e.numero, e.nome, e.uso, e.altura, e.area FROM edificacoes e "
+            "JOIN projetos p ON p.id = e.projeto_id "
+            "JOIN revisoes r ON r.projeto_id = e.projeto_id AND r.numero = e.numero"
+        )
+        if condicoes:
+            sql += " WHERE " + " AND ".join(condicoes)
+        sql += " ORDER BY p.nome, e.numero, e.posicao"
+        with self._lock:
+            return self._conexao.execute(sql, parametros).fetchall()
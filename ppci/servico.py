@@ -0,0 +1,266 @@
+# 🌐 Serviço HTTP local de avaliação (asyncio, somente biblioteca padrão)
+#
+# Uso:
+#   python -m ppci.servico [--host 127.0.0.1] [--porta 8765] [--processos N]
+#
+# Endpoints (JSON no corpo e na resposta):
+#   GET  /saude
+#   POST /enquadramento   edificação -> tabela e medidas
+#   POST /notas           edificação -> notas específicas
+#   POST /trrf            edificação (+ "estrutura_terrea") -> veredito de TRRF
+#   POST /isolamento      {"largura", "altura", "abertura", "edificacao", "bombeiros"} -> distância
+#   POST /consolidar      {"edificacoes": [...]} -> grupos consolidados e problemas
+#   POST /lote/<operação> {"itens": [...]} -> {"resultados": [...]}
+#
+# As requisições individuais são resolvidas no próprio loop (microssegundos);
+# os lotes são divididos em blocos e executados em um pool de processos, para
+# que lotes grandes não atrasem as requisições pequenas.
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from ppci.lote import normalizar_edificacao
+from ppci.regras import avaliar_trrf, classificar, consolidar_edificacoes_detalhado, distancia_isolamento
+
+MAX_CORPO_BYTES = 64 * 1024 * 1024
+TAMANHO_BLOCO_PADRAO = 512
+
+MOTIVOS_HTTP = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+                413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class ErroRequisicao(Exception):
+    def __init__(self, status, mensagem):
+        super().__init__(mensagem)
+        self.status = status
+
+
+# 🧠 Operações (funções de módulo, para poderem ser enviadas ao pool)
+
+def _edificacao(dados):
+    if not isinstance(dados, dict):
+        raise ValueError("a edificação deve ser um objeto JSON")
+    return normalizar_edificacao(dados)
+
+def op_enquadramento(dados):
+    edificacao = _edificacao(dados)
+    entrada, _ = classificar(edificacao["area"], edificacao["altura"], edificacao["num_pavimentos"])
+    return {"nome": edificacao["nome"], "tabela": "Simplificada" if entrada.tabela_simplificada else "Completa",
+            "medidas": dict(entrada.medidas)}
+
+def op_notas(dados):
+    edificacao = _edificacao(dados)
+    _, notas = classificar(edificacao["area"], edificacao["altura"], edificacao["num_pavimentos"])
+    return {"nome": edificacao["nome"], "notas": list(notas)}
+
+def op_trrf(dados):
+    edificacao = _edificacao(dados)
+    resposta_trrf, mostrar_trrf_adotado = avaliar_trrf(edificacao, edificacao.get("estrutura_terrea", "Não"))
+    return {"nome": edificacao["nome"], "trrf": resposta_trrf, "exige_trrf_adotado": mostrar_trrf_adotado}
+
+def op_isolamento(dados):
+    if not isinstance(dados, dict):
+        raise ValueError("a comparação deve ser um objeto JSON")
+    edificacao = _edificacao(dados.get("edificacao") or {})
+    distancia = distancia_isolamento(float(dados["largura"]), float(dados["altura"]), float(dados["abertura"]),
+                                     edificacao, dados.get("bombeiros", "Sim"))
+    return {"nome": edificacao["nome"], "distancia": distancia}
+
+def op_consolidar(dados):
+    if not isinstance(dados, dict):
+        raise ValueError("o corpo deve ser um objeto JSON com a chave 'edificacoes'")
+    edificacoes = [_edificacao(e) for e in dados.get("edificacoes", [])]
+    grupos, problemas = consolidar_edificacoes_detalhado(edificacoes, copiar=False)
+    return {"edificacoes": grupos, "problemas": problemas}
+
+OPERACOES = {
+    "enquadramento": op_enquadramento,
+    "notas": op_notas,
+    "trrf": op_trrf,
+    "isolamento": op_isolamento,
+    "consolidar": op_consolidar,
+}
+
+def executar_bloco(operacao, itens):
+    """Executa uma operação sobre um bloco de itens; erros ficam no item, não no lote."""
+    funcao = OPERACOES[operacao]
+    resultados = []
+    for item in itens:
+        try:
+            resultados.append(funcao(item))
+        except (AttributeError, KeyError, TypeError, ValueError) as erro:
+            resultados.append({"erro": f"{type(erro).__name__}: {erro}"})
+    return resultados
+
+
+# 🌐 Servidor
+
+class ServicoPPCI:
+    """Servidor HTTP/1.1 mínimo (keep-alive, corpo por Content-Length) sobre asyncio."""
+
+    def __init__(self, processos=None, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+        self.processos = processos
+        self.tamanho_bloco = tamanho_bloco
+        self.executor = None
+        self.servidor = None
+        self._conexoes = set()
+
+    def _criar_executor(self):
+        # "spawn": com fork os workers, criados sob demanda dentro de uma conexão,
+        # herdariam o socket do cliente e o de escuta (sem EOF e porta presa)
+        return ProcessPoolExecutor(max_workers=self.processos, mp_context=multiprocessing.get_context("spawn"))
+
+    async def iniciar(self, host="127.0.0.1", porta=8765):
+        self.executor = self._criar_executor()
+        self.servidor = await asyncio.start_server(self._atender, host, porta)
+        return self.servidor
+
+    async def encerrar(self):
+        if self.servidor is not None:
+            self.servidor.close()
+            for tarefa in list(self._conexoes):
+                tarefa.cancel()
+            await asyncio.gather(*self._conexoes, return_exceptions=True)
+            await self.servidor.wait_closed()
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def porta(self):
+        return self.servidor.sockets[0].getsockname()[1]
+
+    async def _atender(self, reader, writer):
+        tarefa = asyncio.current_task()
+        self._conexoes.add(tarefa)
+        try:
+            while True:
+                linha = await reader.readline()
+                if not linha:
+                    break
+                try:
+                    metodo, caminho, versao = linha.decode("latin-1").split()
+                except ValueError:
+                    await self._responder(writer, 400, {"erro": "linha de requisição inválida"}, manter=False)
+                    break
+                cabecalhos = {}
+                while True:
+                    cabecalho = await reader.readline()
+                    if cabecalho in (b"\r\n", b"\n", b""):
+                        break
+                    nome, _, valor = cabecalho.decode("latin-1").partition(":")
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+
+                manter = versao == "HTTP/1.1" and cabecalhos.get("connection", "").lower() != "close"
+                try:
+                    tamanho = int(cabecalhos.get("content-length") or 0)
+                    if tamanho < 0:
+                        raise ValueError
+                except ValueError:
+                    await self._responder(writer, 400, {"erro": "Content-Length inválido"}, manter=False)
+                    break
+                if tamanho > MAX_CORPO_BYTES:
+                    await self._responder(writer, 413, {"erro": "corpo da requisição grande demais"}, manter=False)
+                    break
+                corpo = await reader.readexactly(tamanho) if tamanho else b""
+
+                try:
+                    status, resposta = 200, await self._despachar(metodo, caminho.split("?", 1)[0], corpo)
+                except ErroRequisicao as erro:
+                    status, resposta = erro.status, {"erro": str(erro)}
+                except (KeyError, TypeError, ValueError) as erro:
+                    status, resposta = 400, {"erro": f"{type(erro).__name__}: {erro}"}
+                except Exception as erro:
+                    status, resposta = 500, {"erro": f"{type(erro).__name__}: {erro}"}
+                await self._responder(writer, status, resposta, manter)
+                if not manter:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError):
+            pass
+        finally:
+            self._conexoes.discard(tarefa)
+            writer.close()
+
+    async def _responder(self, writer, status, resposta, manter):
+        corpo = json.dumps(resposta, ensure_ascii=False).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {MOTIVOS_HTTP.get(status, '')}\r\n"
+            f"Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(corpo)}\r\n"
+            f"Connection: {'keep-alive' if manter else 'close'}\r\n\r\n".encode("latin-1") + corpo
+        )
+        await writer.drain()
+
+    async def _despachar(self, metodo, caminho, corpo):
+        partes = [p for p in caminho.split("/") if p]
+        if partes == ["saude"]:
+            if metodo != "GET":
+                raise ErroRequisicao(405, "use GET")
+            return {"status": "ok", "operacoes": sorted(OPERACOES)}
+
+        if metodo != "POST":
+            raise ErroRequisicao(405, "use POST")
+        try:
+            dados = json.loads(corpo or b"{}")
+        except json.JSONDecodeError as erro:
+            raise ErroRequisicao(400, f"JSON inválido: {erro}")
+
+        if len(partes) == 1 and partes[0] in OPERACOES:
+            return OPERACOES[partes[0]](dados)
+        if len(partes) == 2 and partes[0] == "lote" and partes[1] in OPERACOES:
+            itens = dados.get("itens") if isinstance(dados, dict) else None
+            if not isinstance(itens, list):
+                raise ErroRequisicao(400, "o lote deve trazer uma lista em \"itens\"")
+            return {"resultados": await self._executar_lote(partes[1], itens)}
+        raise ErroRequisicao(404, f"endpoint desconhecido: {caminho}")
+
+    async def _executar_lote(self, operacao, itens):
+        loop = asyncio.get_running_loop()
+        blocos = [itens[i:i + self.tamanho_bloco] for i in range(0, len(itens), self.tamanho_bloco)]
+        for _ in range(2):
+            executor = self.executor
+            try:
+                resultados = await asyncio.gather(*(
+                    loop.run_in_executor(executor, executar_bloco, operacao, bloco) for bloco in blocos
+                ))
+                return [item for bloco in resultados for item in bloco]
+            except BrokenProcessPool:
+                # Um worker morreu (OOM, sinal): o pool quebrado recusa novas
+                # tarefas para sempre, então é recriado e o lote repetido uma vez
+                if self.executor is executor:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    self.executor = self._criar_executor()
+        raise ErroRequisicao(503, "o pool de processos falhou duas vezes; tente novamente")
+
+
+async def servir(host, porta, processos=None, tamanho_bloco=TAMANHO_BLOCO_PADRAO):
+    servico = ServicoPPCI(processos, tamanho_bloco)
+    servidor = await servico.iniciar(host, porta)
+    print(f"Serviço PPCI em http://{host}:{servico.porta}", file=sys.stderr)
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        await servico.encerrar()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m ppci.servico", description="Serviço HTTP local de avaliação PPCI.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--processos", type=int, default=os.cpu_count(), help="Processos do pool de lotes")
+    parser.add_argument("--bloco", type=int, default=TAMANHO_BLOCO_PADRAO, help="Itens por tarefa enviada ao pool")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(servir(args.host, args.porta, args.processos, args.bloco))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,159 @@
+# 🔥 TRRF por pavimento (NumPy)
+#
+# Quando o veredito de ppci.regras.avaliar_trrf exige comprovação por
+# pavimento (ou só dos subsolos), cada pavimento recebe o TRRF da tabela de
+# tempos requeridos pelo seu uso e pela classe da edificação (altura, ou
+# profundidade no caso de subsolos) e, em seguida, nunca fica abaixo do
+# pavimento imediatamente superior. Com subsolo simples ("o subsolo absorve
+# o TRRF do pavimento superior") o subsolo não tem exigência própria e herda
+# o TRRF de cima.
+#
+# Os pavimentos de todas as edificações de um site são achatados em arrays e
+# resolvidos de uma só vez: consulta da tabela por índice e máximo acumulado
+# de cima para baixo, segmentado por edificação.
+import numpy as np
+
+from ppci.regras import (
+    TRRF_APENAS_SUBSOLOS, TRRF_POR_PAVIMENTO, TRRF_POR_PAVIMENTO_SUBSOLO_ABSORVE, TRRF_TERREA_30MIN, avaliar_trrf,
+)
+
+# Classes da edificação: subsolos por profundidade (S2 > 10 m) e pavimentos
+# pela altura da edificação (P1 ≤ 6 m, P2 ≤ 12 m, P3 ≤ 23 m, P4 ≤ 30 m, P5 > 30 m)
+CLASSES = ("S2", "S1", "P1", "P2", "P3", "P4", "P5")
+LIMITES_ALTURA_P = (6.0, 12.0, 23.0, 30.0)
+LIMITE_PROFUNDIDADE_S1 = 10.0
+
+# TRRF (min) por grupo/divisão de ocupação, na ordem de CLASSES — Tabela A.1
+# da NBR 14432, sem as reduções condicionais (valores entre parênteses na
+# norma). A divisão exata tem precedência sobre o grupo (ex.: "G-1" sobre "G").
+TRRF_MINUTOS = {
+    "A": (90, 60, 30, 30, 60, 90, 120),
+    "B": (90, 60, 30, 60, 60, 90, 120),
+    "C": (90, 60, 60, 60, 60, 90, 120),
+    "D": (90, 60, 30, 60, 60, 90, 120),
+    "E": (90, 60, 30, 30, 60, 90, 120),
+    "F": (90, 60, 60, 60, 60, 90, 120),
+    "G-1": (90, 60, 30, 30, 30, 30, 60),
+    "G-2": (90, 60, 30, 30, 30, 30, 60),
+    "G": (90, 60, 60, 60, 60, 90, 120),
+    "H": (90, 60, 30, 60, 60, 90, 120),
+    "I-1": (90, 60, 30, 30, 60, 90, 120),
+    "I": (120, 90, 60, 60, 90, 120, 120),
+    "J-1": (90, 60, 30, 30, 30, 30, 60),
+    "J": (120, 90, 60, 60, 90, 120, 120),
+}
+GRUPOS = tuple(TRRF_MINUTOS)
+GRADE_TRRF = np.array([TRRF_MINUTOS[grupo] for grupo in GRUPOS], dtype=np.int32)
+GRADE_TRRF.setflags(write=False)
+
+USOS_PAVIMENTO = ("A-2", "C-1", "C-2", "D-1", "F-6", "F-8", "G-1", "G-2", "J-2") # opções da edição por pavimento
+USO_RESIDENCIAL = "A-2" # torres do app
+USO_SUBSOLO = "G-2" # estacionamento
+ALTURA_SUBSOLO = 3.0 # profundidade presumida de cada nível de subsolo (m)
+TRRF_TERREA = 30
+COLUNAS_PAVIMENTOS = ["Pavimento", "Uso", "Subsolo", "Profundidade (m)"]
+COLUNAS_TRRF_PAVIMENTOS = ["Edificação", "Pavimento", "Uso", "Classe", "TRRF próprio (min)", "TRRF (min)"]
+
+
+def grupo_trrf(uso):
+    """Linha da tabela para um uso ("A-2" -> "A", "G-1" -> "G-1")."""
+    uso = str(uso or "").strip().upper()
+    if uso in TRRF_MINUTOS:
+        return uso
+    if uso[:1] in TRRF_MINUTOS:
+        return uso[:1]
+    raise ValueError(f"Uso sem TRRF tabelado: '{uso}'")
+
+def pavimentos_padrao(edificacao):
+    """
+    Pavimentos presumidos a partir do cadastro (de baixo para cima):
+    subsolos de estacionamento, térreo e pavimentos tipo com o uso da
+    edificação. Servem de ponto de partida para a edição por pavimento.
+    """
+    uso = edificacao.get("uso") or USO_RESIDENCIAL
+    if edificacao.get("terrea") == "Sim":
+        return [{"Pavimento": "Térreo", "Uso": uso, "Subsolo": False, "Profundidade (m)": None}]
+    num_subsolos = 0
+    if edificacao.get("subsolo_tecnico") == "Sim":
+        num_subsolos = 1 if edificacao.get("numero_subsolos") == "1" else 2
+    pavimentos = [
+        {"Pavimento": f"Subsolo {n}", "Uso": USO_SUBSOLO, "Subsolo": True, "Profundidade (m)": n * ALTURA_SUBSOLO}
+        for n in range(num_subsolos, 0, -1)
+    ]
+    pavimentos.append({"Pavimento": "Térreo", "Uso": uso, "Subsolo": False, "Profundidade (m)": None})
+    pavimentos += [
+        {"Pavimento": f"Pavimento {n}", "Uso": uso, "Subsolo": False, "Profundidade (m)": None}
+        for n in range(2, int(edificacao.get("num_pavimentos", 1)) + 1)
+    ]
+    return pavimentos
+
+def _maximo_acumulado_de_cima(valores, tamanhos):
+    """
+    Máximo acumulado do topo para a base dentro de cada segmento (edificação,
+    com `tamanhos[i]` pavimentos), em uma passada: percorridos do último para
+    o primeiro, os segmentos recebem deslocamentos crescentes, de modo que o
+    máximo de um nunca passa para o seguinte.
+    """
+    if not len(valores):
+        return valores
+    segmento = np.repeat(np.arange(len(tamanhos)), tamanhos)
+    deslocamento = (len(tamanhos) - 1 - segmento).astype(np.int64) * (int(valores.max()) + 1)
+    invertido = (valores.astype(np.int64) + deslocamento)[::-1]
+    return (np.maximum.accumulate(invertido)[::-1] - deslocamento).astype(valores.dtype)
+
+def trrf_site(edificacoes, pavimentos=None, estruturas_terreas=None):
+    """
+    TRRF por pavimento de várias edificações consolidadas.
+    `pavimentos[i]` (opcional) é a lista de pavimentos da edificação i, de
+    baixo para cima, com as colunas de COLUNAS_PAVIMENTOS; na falta, usa
+    pavimentos_padrao. `estruturas_terreas[i]` é a resposta das térreas.
+    Devolve, para cada edificação, (veredito, linhas com COLUNAS_TRRF_PAVIMENTOS).
+    """
+    pavimentos = pavimentos or [None] * len(edificacoes)
+    estruturas_terreas = estruturas_terreas or ["Não"] * len(edificacoes)
+    vereditos, tamanhos, rotulos, usos, subsolos, profundidades, alturas, exige, fixos = [], [], [], [], [], [], [], [], []
+
+    for edificacao, pavimentos_edificacao, estrutura_terrea in zip(edificacoes, pavimentos, estruturas_terreas):
+        veredito, _ = avaliar_trrf(edificacao, estrutura_terrea or "Não")
+        vereditos.append(veredito)
+        pavimentos_edificacao = pavimentos_edificacao or pavimentos_padrao(edificacao)
+        tamanhos.append(len(pavimentos_edificacao))
+        exige_acima = veredito in (TRRF_POR_PAVIMENTO, TRRF_POR_PAVIMENTO_SUBSOLO_ABSORVE)
+        exige_subsolo = veredito in (TRRF_POR_PAVIMENTO, TRRF_APENAS_SUBSOLOS)
+        for pavimento in pavimentos_edificacao:
+            subsolo = pavimento.get("Subsolo") in (True, 1) # linhas novas do editor podem vir com NaN
+            rotulos.append(pavimento.get("Pavimento"))
+            usos.append(pavimento.get("Uso") or USO_RESIDENCIAL)
+            subsolos.append(subsolo)
+            profundidade = pavimento.get("Profundidade (m)")
+            profundidades.append(float(profundidade) if profundidade == profundidade and profundidade is not None else 0.0)
+            alturas.append(float(edificacao.get("altura", 0.0)))
+            exige.append(exige_subsolo if subsolo else exige_acima)
+            fixos.append(TRRF_TERREA if veredito == TRRF_TERREA_30MIN else -1)
+
+    # Grupo da tabela: resolvido uma vez por uso distinto
+    usos_distintos, indice_uso = np.unique(np.array(usos, dtype=str), return_inverse=True)
+    grupo = np.array([GRUPOS.index(grupo_trrf(uso)) for uso in usos_distintos], dtype=np.intp)[indice_uso]
+
+    subsolos = np.array(subsolos, dtype=bool)
+    classe_p = 2 + np.searchsorted(np.array(LIMITES_ALTURA_P), np.array(alturas), side="left")
+    classe_s = np.where(np.array(profundidades) > LIMITE_PROFUNDIDADE_S1, 0, 1)
+    classe = np.where(subsolos, classe_s, classe_p)
+
+    fixos = np.array(fixos, dtype=np.int32)
+    proprio = np.where(np.array(exige, dtype=bool), GRADE_TRRF[grupo, classe], 0).astype(np.int32)
+    proprio = np.where(fixos >= 0, fixos, proprio)
+    resolvido = _maximo_acumulado_de_cima(proprio, tamanhos)
+
+    resultado, inicio = [], 0
+    for edificacao, veredito, tamanho in zip(edificacoes, vereditos, tamanhos):
+        linhas = [
+            {
+                "Edificação": edificacao.get("nome"), "Pavimento": rotulos[k], "Uso": usos[k], "Classe": CLASSES[classe[k]],
+                "TRRF próprio (min)": int(proprio[k]) or None, "TRRF (min)": int(resolvido[k]) or None,
+            }
+            for k in range(inicio, inicio + tamanho)
+        ]
+        resultado.append((veredito, linhas))
+        inicio += tamanho
+    return resultado
@@ -0,0 +1,143 @@
+# 🧮 Versões vetorizadas (NumPy) das consultas de tabela da NT-07
+#
+# A grade da Tabela A.3 é montada uma única vez a partir dos dados já
+# validados em ppci.regras; as funções aqui recebem arrays (ou escalares)
+# e devolvem arrays com exatamente os mesmos valores da versão escalar.
+import numpy as np
+
+from ppci.regras import TABELA_A3, TABELA_A3_FATOR_X, TABELA_A3_PORCENTAGENS, TABELA_A4, acrescimo_bombeiros
+
+EIXO_X = np.array(TABELA_A3_FATOR_X, dtype=float)
+EIXO_Y = np.array(TABELA_A3_PORCENTAGENS, dtype=float)
+GRADE_A3 = np.array(TABELA_A3, dtype=float) # shape (len(EIXO_Y), len(EIXO_X))
+EIXO_A4 = np.array(sorted(TABELA_A4[1]), dtype=float)
+GRADE_A4 = np.array([[TABELA_A4[n][p] for p in sorted(TABELA_A4[n])] for n in sorted(TABELA_A4)], dtype=float)
+for _array in (EIXO_X, EIXO_Y, GRADE_A3, EIXO_A4, GRADE_A4):
+    _array.setflags(write=False)
+
+
+def _localizar(eixo, valores):
+    """Índices (i1, i2) dos breakpoints que cercam cada valor (i1 == i2 em acerto exato)."""
+    idx2 = np.minimum(np.searchsorted(eixo, valores, side="left"), len(eixo) - 1)
+    idx1 = np.where(eixo[idx2] == valores, idx2, np.maximum(idx2 - 1, 0))
+    return idx1, idx2
+
+def _interpolar(x, x1, x2, y1, y2):
+    dx = x2 - x1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(dx == 0, y1, y1 + (x - x1) * (y2 - y1) / dx)
+
+def buscar_valor_tabela_lote(porcentagens, fatores_x):
+    """
+    Fator Alfa (α) da Tabela A.3 para arrays de (porcentagem, fator_x).
+    As entradas são combinadas por broadcasting; o resultado tem o shape delas.
+    """
+    porcentagem = np.clip(np.asarray(porcentagens, dtype=float), 20.0, 100.0)
+    fator_x = np.clip(np.asarray(fatores_x, dtype=float), 1.0, 40.0)
+    porcentagem, fator_x = np.broadcast_arrays(porcentagem, fator_x)
+
+    ix1, ix2 = _localizar(EIXO_X, fator_x)
+    iy1, iy2 = _localizar(EIXO_Y, porcentagem)
+    x1, x2 = EIXO_X[ix1], EIXO_X[ix2]
+
+    alpha_y1 = _interpolar(fator_x, x1, x2, GRADE_A3[iy1, ix1], GRADE_A3[iy1, ix2])
+    alpha_y2 = _interpolar(fator_x, x1, x2, GRADE_A3[iy2, ix1], GRADE_A3[iy2, ix2])
+    return _interpolar(porcentagem, EIXO_Y[iy1], EIXO_Y[iy2], alpha_y1, alpha_y2)
+
+def buscar_valor_tabela_simplificada_lote(porcentagens, num_pavimentos):
+    """Distância da Tabela A.4 (simplificada) para arrays de (porcentagem, num_pavimentos)."""
+    porcentagem = np.clip(np.asarray(porcentagens, dtype=float), 10.0, 100.0)
+    pavimentos = np.asarray(num_pavimentos, dtype=int)
+    if np.any(pavimentos < 1):
+        # A versão escalar falha (KeyError) nesse caso; aqui a linha -1 leria a última da tabela
+        raise ValueError("Tabela A.4: o número de pavimentos deve ser pelo menos 1.")
+    linha = np.minimum(pavimentos, 3) - 1
+    porcentagem, linha = np.broadcast_arrays(porcentagem, linha)
+    # argmin devolve o primeiro mínimo, como o min() da versão escalar em caso de empate
+    coluna = np.argmin(np.abs(porcentagem[..., None] - EIXO_A4), axis=-1)
+    return GRADE_A4[linha, coluna]
+
+def distancias_isolamento_lote(larguras, alturas, aberturas, areas_edificacao, alturas_edificacao, num_pavimentos, bombeiros="Sim"):
+    """
+    Versão em lote de ppci.regras.distancia_isolamento: dimensões e abertura
+    das fachadas e os dados das edificações consolidadas a que pertencem,
+    combinados por broadcasting.
+    """
+    largura = np.asarray(larguras, dtype=float)
+    altura = np.asarray(alturas, dtype=float)
+    abertura = np.asarray(aberturas, dtype=float)
+
+    area_fachada = largura * altura
+    with np.errstate(divide="ignore", invalid="ignore"):
+        porcentagem = np.where(area_fachada > 0, (abertura / area_fachada) * 100, 0.0)
+    menor_dim = np.minimum(largura, altura)
+    fator_x = np.maximum(largura, altura) / np.maximum(1.0, menor_dim)
+    distancia_calculada = (buscar_valor_tabela_lote(porcentagem, fator_x) * menor_dim) + acrescimo_bombeiros(bombeiros)
+
+    # Aplica regra de min(Distância Calculada, Distância Simplificada)
+    simplificada = (np.asarray(areas_edificacao, dtype=float) <= 750) & (np.asarray(alturas_edificacao, dtype=float) <= 12)
+    # Como na versão escalar, a Tabela A.4 só é consultada (e validada) onde se aplica
+    distancia_simplificada = buscar_valor_tabela_simplificada_lote(porcentagem, np.where(simplificada, num_pavimentos, 1))
+    return np.where(simplificada, np.minimum(distancia_calculada, distancia_simplificada), distancia_calculada)
+
+def varredura_isolamento(larguras, alturas, aberturas, edificacao, bombeiros="Sim"):
+    """
+    Estudo "e se": distâncias de isolamento de uma edificação para todas as
+    combinações de largura, altura e abertura da fachada, em uma única
+    passagem. Retorna um array (len(larguras), len(alturas), len(aberturas)).
+    """
+    largura = np.asarray(larguras, dtype=float)[:, None, None]
+    altura = np.asarray(alturas, dtype=float)[None, :, None]
+    abertura = np.asarray(aberturas, dtype=float)[None, None, :]
+    return distancias_isolamento_lote(
+        largura, altura, abertura,
+        edificacao.get("area", 0.0), edificacao.get("altura", 0.0), edificacao.get("num_pavimentos", 1),
+        bombeiros,
+    )
+
+def _espacamento_simetrico(espacamentos):
+    """Basta informar o afastamento de um dos lados do par; se ambos vierem, vale o menor."""
+    disponivel = np.asarray(espacamentos, dtype=float)
+    return np.fmin(disponivel, disponivel.T)
+
+def matriz_isolamento(edificacoes, larguras, alturas, aberturas, bombeiros="Sim", espacamentos=None):
+    """
+    Distâncias de isolamento exigidas entre todos os pares de edificações consolidadas.
+
+    `larguras`, `alturas` e `aberturas` podem ter shape (N,), uma fachada por
+    edificação, ou (N, N), em que [i, j] é a fachada de i voltada para j.
+    `espacamentos` (N, N) traz o afastamento disponível entre cada par (NaN
+    quando desconhecido).
+
+    Retorna (distancias, exigidas, violacoes): `distancias[i, j]` é a distância
+    exigida pela fachada de i voltada para j, `exigidas[i, j]` o maior valor
+    entre as duas fachadas do par e `violacoes[i, j]` indica afastamento
+    disponível menor que o exigido.
+    """
+    n = len(edificacoes)
+    areas = np.array([e.get("area", 0.0) for e in edificacoes], dtype=float)
+    alturas_edificacao = np.array([e.get("altura", 0.0) for e in edificacoes], dtype=float)
+    pavimentos = np.array([e.get("num_pavimentos", 1) for e in edificacoes], dtype=int)
+
+    largura = np.asarray(larguras, dtype=float)
+    if largura.ndim == 2:
+        areas, alturas_edificacao, pavimentos = areas[:, None], alturas_edificacao[:, None], pavimentos[:, None]
+    distancias = distancias_isolamento_lote(larguras, alturas, aberturas, areas, alturas_edificacao, pavimentos, bombeiros)
+    distancias = np.broadcast_to(distancias[:, None] if distancias.ndim == 1 else distancias, (n, n))
+
+    exigidas = np.maximum(distancias, distancias.T)
+    np.fill_diagonal(exigidas, np.nan)
+
+    if espacamentos is None:
+        violacoes = np.zeros((n, n), dtype=bool)
+    else:
+        disponivel = _espacamento_simetrico(espacamentos)
+        with np.errstate(invalid="ignore"):
+            violacoes = disponivel < exigidas # NaN (desconhecido ou diagonal) nunca viola
+    return distancias, exigidas, violacoes
+
+def pares_em_violacao(nomes, exigidas, violacoes, espacamentos):
+    """Lista (nome_i, nome_j, exigida, disponível) de cada par i < j que viola o afastamento."""
+    i, j = np.nonzero(np.triu(violacoes, k=1))
+    disponivel = _espacamento_simetrico(espacamentos)
+    return [(nomes[a], nomes[b], float(exigidas[a, b]), float(disponivel[a, b])) for a, b in zip(i.tolist(), j.tolist())]
@@ -0,0 +1,243 @@
+# 👀 Reavaliação incremental de uma pasta de checklists
+#
+# Uso:
+#   python -m ppci.vigia PASTA [-o resumo.xlsx] [--manifesto arquivo.json]
+#                              [--processos N] [--observar [--intervalo S]]
+#
+# Percorre PASTA (recursivamente) atrás de checklistINC_*.xlsx e mantém um
+# manifesto JSON com, para cada arquivo, tamanho/mtime, SHA-256 do conteúdo,
+# as edificações lidas e as linhas de resultado. A cada execução:
+#   - arquivos com mesmo tamanho e mtime não são nem abertos;
+#   - arquivos tocados mas com o mesmo conteúdo só têm o mtime atualizado;
+#   - arquivos novos ou alterados são lidos e avaliados em paralelo;
+#   - se as regras (ppci.regras) mudaram, todos são reavaliados, mas a partir
+#     das edificações guardadas no manifesto, sem reler as planilhas.
+# O resumo consolidado é montado a partir do manifesto (uma linha por
+# edificação da última revisão de cada projeto, ou de todas com
+# --todas-revisoes), sem reprocessar nada.
+import argparse
+import fnmatch
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import ppci.regras
+from ppci.ingestao import ESQUEMA_EDIFICACAO, hash_conteudo, ler_colunas, nome_projeto_do_arquivo
+from ppci.lote import COLUNAS_RESULTADO, _linha_resultado, normalizar_edificacao
+from ppci.regras import consolidar_edificacoes_detalhado
+
+PADRAO_ARQUIVO = "checklistINC_*.xlsx"
+NOME_MANIFESTO = ".ppci_manifesto.json"
+VERSAO_MANIFESTO = 1
+COLUNAS_RESUMO = ["arquivo", "revisao", *COLUNAS_RESULTADO]
+
+
+def versao_regras():
+    """Impressão digital do código das regras: muda a cada atualização da NT."""
+    with open(ppci.regras.__file__, "rb") as arquivo:
+        return hash_conteudo(arquivo.read())[:16]
+
+def revisao_do_arquivo(nome_arquivo):
+    """'checklistINC_Residencial X-R03.xlsx' -> 3 (None sem sufixo de revisão)."""
+    match = re.search(r"-R(\d+)\.xlsx$", nome_arquivo, flags=re.IGNORECASE)
+    return int(match.group(1)) if match else None
+
+def listar_planilhas(pasta, padrao=PADRAO_ARQUIVO):
+    """{caminho relativo: os.stat_result} dos checklists da pasta (ignora os '~$' do Excel)."""
+    encontrados = {}
+    pendentes = [pasta]
+    while pendentes:
+        with os.scandir(pendentes.pop()) as entradas:
+            for entrada in entradas:
+                if entrada.is_dir(follow_symlinks=False):
+                    pendentes.append(entrada.path)
+                elif fnmatch.fnmatch(entrada.name.lower(), padrao.lower()) and not entrada.name.startswith("~$"):
+                    relativo = os.path.relpath(entrada.path, pasta).replace(os.sep, "/")
+                    encontrados[relativo] = entrada.stat()
+    return encontrados
+
+
+# 🧮 Avaliação (executada nos workers)
+
+def avaliar_edificacoes(nome_projeto, edificacoes):
+    """Consolida as edificações de um checklist e avalia cada grupo, como o lote."""
+    grupos, problemas = consolidar_edificacoes_detalhado([normalizar_edificacao(e) for e in edificacoes], copiar=False)
+    return [_linha_resultado(nome_projeto, grupo) for grupo in grupos], problemas
+
+def _ler_edificacoes(conteudo):
+    colunas = ler_colunas(conteudo, ESQUEMA_EDIFICACAO)
+    total = max((len(valores) for valores in colunas.values()), default=0)
+    return [{coluna: valores[i] for coluna, valores in colunas.items() if valores[i] is not None} for i in range(total)]
+
+def processar(tarefa):
+    """
+    tarefa = (caminho, nome_projeto, edificacoes). Com edificacoes=None a
+    planilha é lida; caso contrário só a avaliação é refeita.
+    Devolve a parte do manifesto referente ao arquivo.
+    """
+    caminho, nome_projeto, edificacoes = tarefa
+    registro = {}
+    try:
+        if edificacoes is None:
+            with open(caminho, "rb") as arquivo:
+                conteudo = arquivo.read()
+            registro["sha256"] = hash_conteudo(conteudo)
+            edificacoes = _ler_edificacoes(conteudo)
+        linhas, problemas = avaliar_edificacoes(nome_projeto, edificacoes)
+    except Exception as erro: # Planilha corrompida ou fora do esquema: registra e segue
+        registro.update(edificacoes=[], linhas=[], problemas=[], erro=f"{type(erro).__name__}: {erro}")
+        return registro
+    registro.update(edificacoes=edificacoes, linhas=linhas, problemas=problemas, erro=None)
+    return registro
+
+
+# 📒 Manifesto
+
+def carregar_manifesto(caminho):
+    try:
+        with open(caminho, encoding="utf-8") as arquivo:
+            manifesto = json.load(arquivo)
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifesto = {}
+    if manifesto.get("versao") != VERSAO_MANIFESTO:
+        manifesto = {"versao": VERSAO_MANIFESTO, "regras": None, "arquivos": {}}
+    return manifesto
+
+def salvar_manifesto(manifesto, caminho):
+    # Grava em um temporário e troca: uma interrupção não corrompe o manifesto
+    temporario = caminho + ".tmp"
+    with open(temporario, "w", encoding="utf-8") as arquivo:
+        json.dump(manifesto, arquivo, ensure_ascii=False, separators=(",", ":"))
+    os.replace(temporario, caminho)
+
+def atualizar(pasta, manifesto, processos=None):
+    """
+    Sincroniza o manifesto com a pasta. Devolve um dict com as contagens
+    novos/alterados/reavaliados/inalterados/removidos.
+    """
+    regras = versao_regras()
+    regras_mudaram = manifesto["regras"] != regras
+    anteriores = manifesto["arquivos"]
+    atuais = listar_planilhas(pasta)
+    contagem = dict.fromkeys(("novos", "alterados", "reavaliados", "inalterados", "removidos"), 0)
+    contagem["removidos"] = len(anteriores.keys() - atuais.keys())
+
+    tarefas, tipos = {}, {}
+    for relativo, estado in atuais.items():
+        caminho = os.path.join(pasta, relativo)
+        nome_projeto = nome_projeto_do_arquivo(os.path.basename(relativo))
+        registro = anteriores.get(relativo)
+        if registro is None:
+            tarefas[relativo], tipos[relativo] = (caminho, nome_projeto, None), "novos"
+        elif registro["tamanho"] != estado.st_size or registro["mtime_ns"] != estado.st_mtime_ns:
+            # Sem "sha256" quando a leitura anterior falhou: o arquivo é relido
+            try:
+                with open(caminho, "rb") as arquivo:
+                    mesmo_conteudo = hash_conteudo(arquivo.read()) == registro.get("sha256")
+            except OSError: # processar registra o erro de leitura
+                mesmo_conteudo = False
+            if mesmo_conteudo and not regras_mudaram:
+                contagem["inalterados"] += 1
+            else:
+                edificacoes = registro["edificacoes"] if mesmo_conteudo and not registro["erro"] else None
+                tarefas[relativo] = (caminho, nome_projeto, edificacoes)
+                tipos[relativo] = "alterados" if not mesmo_conteudo else "reavaliados"
+        elif regras_mudaram:
+            tarefas[relativo], tipos[relativo] = (caminho, nome_projeto, registro["edificacoes"] if not registro["erro"] else None), "reavaliados"
+        else:
+            contagem["inalterados"] += 1
+
+    novos = {relativo: anteriores[relativo] for relativo in atuais if relativo in anteriores}
+    ordem = list(tarefas)
+    executor = None
+    if processos == 1 or len(ordem) <= 1:
+        resultados = map(processar, (tarefas[r] for r in ordem))
+    else:
+        executor = ProcessPoolExecutor(max_workers=processos)
+        resultados = executor.map(processar, (tarefas[r] for r in ordem), chunksize=max(1, len(ordem) // 64))
+    try:
+        for relativo, resultado in zip(ordem, resultados):
+            registro = dict(novos.get(relativo, {}))
+            registro.update(resultado)
+            novos[relativo] = registro
+            contagem[tipos[relativo]] += 1
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    for relativo, estado in atuais.items():
+        novos[relativo]["tamanho"] = estado.st_size
+        novos[relativo]["mtime_ns"] = estado.st_mtime_ns
+    manifesto["regras"] = regras
+    manifesto["arquivos"] = dict(sorted(novos.items()))
+    return contagem
+
+
+# 📊 Resumo consolidado
+
+def linhas_resumo(manifesto, todas_revisoes=False):
+    """Linhas de resultado do manifesto; por padrão só a última revisão de cada projeto."""
+    selecionados = {}
+    for relativo, registro in manifesto["arquivos"].items():
+        nome_arquivo = os.path.basename(relativo)
+        chave = relativo if todas_revisoes else (os.path.dirname(relativo), nome_projeto_do_arquivo(nome_arquivo))
+        revisao = revisao_do_arquivo(nome_arquivo)
+        ordem = -1 if revisao is None else revisao
+        atual = selecionados.get(chave)
+        if atual is None or ordem > atual[0]:
+            selecionados[chave] = (ordem, relativo, revisao, registro)
+    for _, relativo, revisao, registro in sorted(selecionados.values(), key=lambda item: item[1]):
+        for linha in registro["linhas"]:
+            yield {"arquivo": relativo, "revisao": f"R{revisao:02d}" if revisao is not None else "", **linha}
+
+def problemas_resumo(manifesto):
+    for relativo, registro in manifesto["arquivos"].items():
+        if registro["erro"]:
+            yield f"{relativo}: {registro['erro']}"
+        for problema in registro["problemas"]:
+            yield f"{relativo}: {problema}"
+
+def sincronizar(pasta, caminho_manifesto, saida=None, processos=None, todas_revisoes=False):
+    """Uma passada completa: atualiza e grava o manifesto e, se houve mudança, o resumo."""
+    inicio = time.perf_counter()
+    manifesto = carregar_manifesto(caminho_manifesto)
+    contagem = atualizar(pasta, manifesto, processos)
+    houve_mudanca = any(contagem[k] for k in ("novos", "alterados", "reavaliados", "removidos"))
+    salvar_manifesto(manifesto, caminho_manifesto)
+    if saida and (houve_mudanca or not os.path.exists(saida)):
+        from ppci.exportacao import escrever_linhas
+        escrever_linhas(saida, linhas_resumo(manifesto, todas_revisoes), COLUNAS_RESUMO)
+    contagem["segundos"] = time.perf_counter() - inicio
+    return manifesto, contagem
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m ppci.vigia", description="Reavalia incrementalmente uma pasta de checklists.")
+    parser.add_argument("pasta", help="Pasta com os checklistINC_*.xlsx (percorrida recursivamente)")
+    parser.add_argument("-o", "--saida", help="Planilha com o resumo consolidado")
+    parser.add_argument("--manifesto", help=f"Arquivo do manifesto (padrão: PASTA/{NOME_MANIFESTO})")
+    parser.add_argument("--processos", type=int, default=os.cpu_count(), help="Número de processos do pool")
+    parser.add_argument("--todas-revisoes", action="store_true", help="Inclui todas as revisões no resumo, não só a última")
+    parser.add_argument("--observar", action="store_true", help="Continua observando a pasta")
+    parser.add_argument("--intervalo", type=float, default=10.0, help="Segundos entre as varreduras com --observar")
+    args = parser.parse_args(argv)
+
+    caminho_manifesto = args.manifesto or os.path.join(args.pasta, NOME_MANIFESTO)
+    while True:
+        manifesto, contagem = sincronizar(args.pasta, caminho_manifesto, args.saida, args.processos, args.todas_revisoes)
+        print(
+            f"{len(manifesto['arquivos'])} checklists · {contagem['novos']} novos, {contagem['alterados']} alterados, "
+            f"{contagem['reavaliados']} reavaliados, {contagem['removidos']} removidos · {contagem['segundos']:.1f} s",
+            file=sys.stderr,
+        )
+        if not args.observar:
+            for problema in problemas_resumo(manifesto):
+                print(f"Aviso: {problema}", file=sys.stderr)
+            return 0
+        time.sleep(args.intervalo)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+# Testes do app.py pelo AppTest do Streamlit (sem navegador); pulados quando
+# o Streamlit ou o pandas não estão instalados.
+import os
+
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("pandas")
+from streamlit.testing.v1 import AppTest
+
+CAMINHO_APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def novo_projeto():
+    """Sessão com o projeto padrão: uma torre térrea e um anexo independentes."""
+    at = AppTest.from_file(CAMINHO_APP, default_timeout=60)
+    at.run()
+    at.radio[0].set_value("🆕 Criar novo projeto").run()
+    assert not at.exception
+    return at
+
+def botao(at, rotulo):
+    return next(b for b in at.button if b.label.startswith(rotulo))
+
+
+# 🗂️ Edificações consolidadas
+
+def test_tabela_das_edificacoes_consolidadas():
+    at = novo_projeto()
+    at.checkbox(key="mostrar_consolidadas").check().run()
+    assert not at.exception
+    assert any("area_original" in tabela.value.columns and len(tabela.value) == 2 for tabela in at.dataframe)
+
+
+# 🔀 Isolamento de risco
+
+def test_comparacao_de_isolamento_em_fragmento():
+    at = novo_projeto()
+    at.checkbox(key="check_isolamento").check().run()
+    botao(at, "➕ Adicionar Comparação").click().run()
+    at.number_input(key="largura1_0").set_value(12.0).run()
+    assert not at.exception
+    assert at.session_state["comparacoes_extra"][0]["largura1"] == 12.0
+    assert len([m for m in at.metric if m.label.startswith("Distância de isolamento")]) == 2
+
+    at.button(key="remove_comp_0").click().run()
+    assert not at.exception
+    assert at.session_state["comparacoes_extra"] == []
+
+
+# 📥 Exportação
+
+def test_planilha_gerada_sob_demanda():
+    at = novo_projeto()
+    assert "planilha_exportada" not in at.session_state
+    at.button(key="gerar_planilha_final").click().run()
+    assert not at.exception
+    assinatura, conteudo = at.session_state["planilha_exportada"]
+    assert conteudo[:2] == b"PK" # xlsx é um zip
+
+
+# 🔍 Medidas de segurança
+
+def test_navegador_de_medidas_preserva_respostas():
+    at = novo_projeto()
+    assert len(at.selectbox(key="medidas_edificacao_exibida").options) == 2
+    chaves = [t.key for t in at.text_area]
+    assert "comentario_estrutural_0" in chaves and "comentario_estrutural_1" not in chaves # só a selecionada
+
+    at.text_area(key="comentario_estrutural_0").input("Pilares protegidos").run()
+    at.selectbox(key="medidas_edificacao_exibida").set_value(1).run()
+    assert not at.exception
+    assert "comentario_estrutural_0" not in [t.key for t in at.text_area]
+    assert at.session_state["comentario_estrutural_0"] == "Pilares protegidos"
+
+    at.selectbox(key="medidas_edificacao_exibida").set_value(0).run()
+    assert at.text_area(key="comentario_estrutural_0").value == "Pilares protegidos"
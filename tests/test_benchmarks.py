@@ -0,0 +1,63 @@
+import json
+import sys
+
+import pytest
+
+from benchmarks.carga import executar_nivel, main as executar_carga, percentis
+from benchmarks.executar import main as executar_benchmarks, medir
+from benchmarks.sinteticos import gerar_carteira, gerar_fachadas, gerar_site
+from ppci.regras import consolidar_edificacoes_detalhado
+
+
+def test_site_sintetico_reprodutivel_e_consolidavel():
+    site = gerar_site(200, semente=3)
+    assert site == gerar_site(200, semente=3)
+    assert site != gerar_site(200, semente=4)
+    nomes = {e["nome"] for e in site}
+    assert len(nomes) == 200
+    conjuntas = [e for e in site if e["tratamento"] == "Conjunta"]
+    assert conjuntas and all(e["edificacao_conjunta"] in nomes and e["edificacao_conjunta"] != e["nome"] for e in conjuntas)
+    grupos, _ = consolidar_edificacoes_detalhado(site)
+    assert sum(g["area"] for g in grupos) == pytest.approx(sum(e["area"] for e in site))
+
+def test_carteira_e_fachadas():
+    carteira = gerar_carteira(45, edificacoes_por_projeto=20)
+    assert len(carteira) == 45
+    assert len({linha["NomeProjeto"] for linha in carteira}) == 3
+    porcentagens, fatores_x = gerar_fachadas(10)
+    assert len(porcentagens) == len(fatores_x) == 10
+
+def test_medir():
+    chamadas = []
+    estatisticas = medir(lambda: chamadas.append(1), repeticoes=3)
+    assert len(chamadas) == 3 and estatisticas["repeticoes"] == 3
+    assert estatisticas["min"] <= estatisticas["mediana"] <= estatisticas["max"]
+
+def test_suite_sem_app_grava_json(tmp_path):
+    saida = tmp_path / "resultado.json"
+    assert executar_benchmarks(["--tamanhos", "10", "--sem-app", "--saida", str(saida)]) == 0
+    resultado = json.loads(saida.read_text(encoding="utf-8"))
+    assert set(resultado["tamanhos"]["10"]) == {"consolidar_edificacoes", "buscar_valor_tabela", "medidas_por_enquadramento", "ponta_a_ponta"}
+
+
+# 👥 Teste de carga
+
+
+def test_percentis_posto_mais_proximo():
+    resultado = percentis(list(range(100, 0, -1)))
+    assert (resultado["p50"], resultado["p90"], resultado["p99"]) == (50, 90, 99)
+    assert (resultado["min"], resultado["max"], resultado["n"]) == (1, 100, 100)
+    assert resultado["media"] == 50.5
+    assert percentis([7.0], pontos=(95,)) == {"p95": 7.0, "min": 7.0, "max": 7.0, "media": 7.0, "n": 1}
+    assert percentis([]) == {}
+
+def test_carga_sem_streamlit_devolve_2(monkeypatch):
+    monkeypatch.setitem(sys.modules, "streamlit", None)
+    assert executar_carga(["--sessoes", "1"]) == 2
+
+def test_nivel_de_carga_roda_o_roteiro():
+    pytest.importorskip("streamlit")
+    nivel = executar_nivel(2, num_torres=2, num_comparacoes=1)
+    assert nivel["falhas"] == [] and nivel["excecoes"] == []
+    assert nivel["reruns"] > 0 and nivel["latencia_rerun_s"]["n"] == nivel["reruns"]
+    assert {"abrir", "conjunta", "fachada", "gerar_planilha"} <= nivel["latencia_por_etapa_s"].keys()
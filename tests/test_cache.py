@@ -0,0 +1,73 @@
+import itertools
+
+import pytest
+
+from ppci import cache
+from ppci.cache import (
+    CacheLRU, avaliar_trrf_compartilhado, classificar_compartilhado, distancia_isolamento_compartilhada,
+)
+from ppci.regras import avaliar_trrf, classificar, distancia_isolamento
+
+
+@pytest.fixture
+def cache_novo(monkeypatch):
+    novo = CacheLRU()
+    monkeypatch.setattr(cache, "CACHE_RESULTADOS", novo)
+    return novo
+
+
+def test_acertos_faltas_e_ordem_lru():
+    lru = CacheLRU(max_itens=2)
+    calculos = []
+    def obter(chave):
+        return lru.obter(chave, lambda: calculos.append(chave) or chave * 10)
+
+    assert [obter(1), obter(2), obter(1)] == [10, 20, 10]
+    obter(3) # remove 2, o menos usado recentemente
+    assert obter(1) == 10 and obter(2) == 20
+    assert calculos == [1, 2, 3, 2]
+    estatisticas = lru.estatisticas()
+    assert (estatisticas["acertos"], estatisticas["faltas"], estatisticas["remocoes"]) == (2, 4, 2)
+    assert estatisticas["taxa_acerto"] == pytest.approx(2 / 6)
+
+def test_teto_de_memoria():
+    lru = CacheLRU(max_bytes=2_000)
+    for i in range(20):
+        lru.obter(i, lambda: "x" * 500)
+    assert 0 < len(lru) < 20
+    assert lru.estatisticas()["bytes"] <= 2_000
+    lru.limpar()
+    assert len(lru) == 0 and lru.estatisticas()["bytes"] == 0
+    assert CacheLRU().estatisticas()["taxa_acerto"] is None
+
+def test_valor_nao_serializavel_usa_getsizeof():
+    lru = CacheLRU()
+    funcao = lambda: None
+    assert lru.obter("f", lambda: funcao) is funcao
+    assert lru.estatisticas()["bytes"] > 0
+
+def test_classificacao_compartilhada_igual_a_direta(cache_novo):
+    casos = list(itertools.product((100.0, 750.0, 750.5, 3000.0), (0.0, 5.0, 12.0, 12.5, 30.0, 79.0, 80.0, 90.0), (1, 2, 3, 10)))
+    for _ in range(2):
+        for area, altura, pavimentos in casos:
+            assert classificar_compartilhado(area, altura, pavimentos) == classificar(area, altura, pavimentos)
+    assert cache_novo.acertos >= len(casos)
+
+def test_trrf_compartilhado_igual_ao_direto(cache_novo):
+    campos = itertools.product(
+        ("Sim", "Não"), (6.0, 12.0, 12.5), (900.0, 1500.0), ("Não", "Sim"), ("0", "1", "Mais de 1"),
+        ("Menor que 500m²", "Maior que 500m²"), ("Sim", "Não"),
+    )
+    for terrea, altura, area, tecnico, numero, area_subsolo, estrutura in campos:
+        edificacao = {"terrea": terrea, "altura": altura, "area": area, "subsolo_tecnico": tecnico,
+                      "numero_subsolos": numero, "area_subsolo": area_subsolo}
+        assert avaliar_trrf_compartilhado(edificacao, estrutura) == avaliar_trrf(edificacao, estrutura)
+    assert cache_novo.acertos > 0
+
+def test_distancia_compartilhada_igual_a_direta(cache_novo):
+    edificacoes = [(500.0, 6.0, 1), (500.0, 6.0, 2), (500.0, 6.0, 7), (900.0, 6.0, 2), (500.0, 15.0, 4)]
+    for (area, altura_edf, pavimentos), abertura, bombeiros in itertools.product(edificacoes, (0.0, 6.0, 30.0), ("Sim", "Não")):
+        edificacao = {"area": area, "altura": altura_edf, "num_pavimentos": pavimentos}
+        assert distancia_isolamento_compartilhada(10.0, 3.0, abertura, area, altura_edf, pavimentos, bombeiros) == \
+            distancia_isolamento(10.0, 3.0, abertura, edificacao, bombeiros)
+    assert cache_novo.acertos > 0
@@ -0,0 +1,46 @@
+from ppci.regras import consolidar_edificacoes, consolidar_edificacoes_detalhado
+
+
+def edf(nome, area, conjunta=None):
+    if conjunta is None:
+        return {"nome": nome, "area": area, "tratamento": "Independente"}
+    return {"nome": nome, "area": area, "tratamento": "Conjunta", "edificacao_conjunta": conjunta}
+
+def areas(grupos):
+    return {g["nome"]: (g["area"], sorted(g["areas_combinadas_com"])) for g in grupos}
+
+
+def test_cadeia_e_resolvida_ate_a_raiz():
+    # C -> B -> A: toda a área acaba em A
+    grupos, problemas = consolidar_edificacoes_detalhado([edf("C", 30.0, "B"), edf("B", 20.0, "A"), edf("A", 100.0)])
+    assert areas(grupos) == {"A": (150.0, ["A", "B", "C"])}
+    assert problemas == []
+
+def test_ciclo_vira_um_grupo_e_e_reportado():
+    grupos, problemas = consolidar_edificacoes_detalhado([edf("A", 1.0, "B"), edf("B", 2.0, "C"), edf("C", 4.0, "A"), edf("D", 8.0)])
+    (raiz, (area, membros)), = [(n, v) for n, v in areas(grupos).items() if n != "D"]
+    assert area == 7.0 and membros == ["A", "B", "C"]
+    assert len(problemas) == 1 and "Ciclo" in problemas[0] and f"'{raiz}'" in problemas[0]
+
+def test_destino_inexistente_fica_independente():
+    grupos, problemas = consolidar_edificacoes_detalhado([edf("A", 10.0), edf("B", 5.0, "X")])
+    assert areas(grupos) == {"A": (10.0, ["A"]), "B": (5.0, ["B"])}
+    assert problemas == ["A edificação 'B' está conjunta com 'X', que não existe; foi tratada como independente."]
+
+def test_conjunta_consigo_mesma_e_nome_duplicado():
+    grupos, problemas = consolidar_edificacoes_detalhado([edf("A", 10.0, "A"), edf("A", 99.0), edf("B", 1.0, "A")])
+    assert areas(grupos) == {"A": (11.0, ["A", "B"])}
+    assert problemas == ["Nome duplicado: 'A'; apenas a primeira ocorrência foi considerada."]
+
+def test_copiar_preserva_as_entradas():
+    entradas = [edf("A", 10.0), edf("B", 5.0, "A")]
+    consolidar_edificacoes(entradas)
+    assert entradas[0] == edf("A", 10.0)
+    grupos = consolidar_edificacoes(entradas, copiar=False)
+    assert grupos[0] is entradas[0] and entradas[0]["area"] == 15.0
+
+def test_cadeia_longa_em_tempo_linear():
+    n = 20000
+    entradas = [edf("E0", 1.0)] + [edf(f"E{i}", 1.0, f"E{i - 1}") for i in range(1, n)]
+    grupos, problemas = consolidar_edificacoes_detalhado(entradas[::-1])
+    assert len(grupos) == 1 and grupos[0]["area"] == n and not problemas
@@ -0,0 +1,71 @@
+import io
+
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+
+from ppci.diferencas import comparar_planilhas, main as comparar_arquivos
+from ppci.exportacao import escrever_relatorio
+from ppci.registros import Torre
+from ppci.regras import consolidar_edificacoes
+
+
+def planilha(edificacoes, comparacoes=()):
+    destino = io.BytesIO()
+    escrever_relatorio(destino, consolidar_edificacoes(edificacoes), comparacoes)
+    return destino.getvalue()
+
+def torre(nome, area, altura=6.0, pavimentos=2):
+    return Torre(nome, area, altura, pavimentos, tratamento="Independente")
+
+def comparacao(edf1, edf2, abertura1=6.0):
+    return {"edf1_nome": edf1, "edf2_nome": edf2, "largura1": 10.0, "altura1": 6.0, "abertura1": abertura1,
+            "largura2": 10.0, "altura2": 6.0, "abertura2": 6.0}
+
+ANTES = planilha([torre("T1", 600.0), torre("T2", 300.0)], [comparacao("T1", "T2")])
+
+
+def test_revisoes_iguais_nao_tem_diferencas():
+    diferencas = comparar_planilhas(ANTES, ANTES)
+    assert diferencas["linhas"] == []
+    assert set(diferencas["resumo"].values()) == {0}
+
+def test_diferencas_de_entrada_resultado_e_isolamento():
+    depois = planilha(
+        [torre("T1", 1200.0), torre("T3", 300.0)],
+        [comparacao("T1", "T3"), comparacao("T1", "T3", abertura1=30.0)],
+    )
+    diferencas = comparar_planilhas(ANTES, depois)
+    assert diferencas["resumo"] == {"adicionadas": 1, "removidas": 1, "entradas_alteradas": 1,
+                                    "resultados_alterados": 1, "isolamento_alterado": 3}
+    por_categoria = {}
+    for linha in diferencas["linhas"]:
+        por_categoria.setdefault(linha["Categoria"], []).append(linha)
+
+    assert {(l["Campo"], l["Antes"], l["Depois"]) for l in por_categoria["Entrada"]} >= {("area", 600.0, 1200.0)}
+    assert por_categoria["Tabela"][0]["Antes"] == "Simplificada" and por_categoria["Tabela"][0]["Depois"] == "Completa"
+    assert [l["Edificação"] for l in por_categoria["Edificação adicionada"]] == ["T3"]
+    assert [l["Edificação"] for l in por_categoria["Edificação removida"]] == ["T2"]
+    assert {l["Edificação"] for l in por_categoria["Comparação adicionada"]} == {"T1 × T3", "T1 × T3 (2)"}
+    assert [l["Edificação"] for l in por_categoria["Comparação removida"]] == ["T1 × T2"]
+    assert all(l["Tipo"] == "Resultado" for l in diferencas["linhas"] if l["Categoria"] in ("Tabela", "Medida ganha", "Medida perdida"))
+
+def test_fachada_alterada_gera_entrada_e_resultado():
+    depois = planilha([torre("T1", 600.0), torre("T2", 300.0)], [comparacao("T1", "T2", abertura1=40.0)])
+    linhas = comparar_planilhas(ANTES, depois)["linhas"]
+    assert {(l["Tipo"], l["Campo"]) for l in linhas} == {("Entrada", "Abertura 1 (m²)"), ("Resultado", "Distância 1 (m)")}
+
+def test_linha_de_comando(tmp_path, capsys):
+    antes, depois = tmp_path / "checklistINC_P-R00.xlsx", tmp_path / "checklistINC_P-R01.xlsx"
+    antes.write_bytes(ANTES)
+    depois.write_bytes(planilha([torre("T1", 1200.0), torre("T2", 300.0)], [comparacao("T1", "T2")]))
+    assert comparar_arquivos([str(antes), str(depois), "--apenas-resultados"]) == 0
+    saida = capsys.readouterr()
+    assert "T1 [Tabela]" in saida.out and "[Entrada]" not in saida.out
+    assert "1 com entradas alteradas" in saida.err
+
+    destino = tmp_path / "diferencas.xlsx"
+    assert comparar_arquivos([str(antes), str(depois), "-o", str(destino)]) == 0
+    aba = openpyxl.load_workbook(destino)["Diferenças"]
+    assert [c.value for c in aba[1]] == ["Edificação", "Tipo", "Categoria", "Campo", "Antes", "Depois"]
+    assert aba.max_row > 2
@@ -0,0 +1,60 @@
+import io
+
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+
+from ppci.exportacao import COLUNAS_EDIFICACAO, COLUNAS_ISOLAMENTO, _nome_aba, escrever_linhas, escrever_relatorio
+from ppci.regras import distancia_isolamento
+
+EDIFICACOES = [
+    {"nome": "Torre A/B", "area": 2000.0, "altura": 20.0, "terrea": "Não", "num_pavimentos": 8, "areas_combinadas_com": ["Torre A/B", "Anexo"]},
+    {"nome": "Guarita", "area": 20.0, "altura": 0.0, "terrea": "Sim", "num_pavimentos": 1},
+]
+COMPARACOES = [{"edf1_nome": "Torre A/B", "edf2_nome": "Guarita", "largura1": 10.0, "altura1": 3.0, "abertura1": 6.0,
+                "largura2": 4.0, "altura2": 3.0, "abertura2": 1.0}]
+
+
+def ler(destino):
+    destino.seek(0)
+    wb = openpyxl.load_workbook(destino)
+    return {ws.title: [list(linha) for linha in ws.iter_rows(values_only=True)] for ws in wb.worksheets}
+
+def test_escrever_linhas_em_streaming():
+    destino = io.BytesIO()
+    total = escrever_linhas(destino, ({"a": i, "b": [i, i + 1]} for i in range(3)), ["a", "b", "c"], nome_aba="X")
+    assert total == 3
+    assert ler(destino) == {"X": [["a", "b", "c"], [0, "0, 1", None], [1, "1, 2", None], [2, "2, 3", None]]}
+
+def test_nome_aba_valido_e_unico():
+    usados = set()
+    assert _nome_aba("Torre A/B", usados) == "Torre A_B"
+    assert _nome_aba("torre a/b", usados) == "torre a_b (2)"
+    longo = _nome_aba("x" * 40, usados)
+    assert len(longo) == 31 and len(_nome_aba("x" * 40, usados)) == 31
+
+def test_relatorio_completo():
+    destino = io.BytesIO()
+    escrever_relatorio(destino, EDIFICACOES, COMPARACOES, bombeiros="Não")
+    abas = ler(destino)
+    assert list(abas) == ["Edificações", "Torre A_B", "Guarita", "Isolamento", "TRRF", "TRRF por pavimento"]
+    assert abas["Edificações"][0] == COLUNAS_EDIFICACAO
+    assert abas["Torre A_B"][1] == ["Tabela", "Completa"]
+
+    cabecalho, linha = abas["Isolamento"]
+    assert cabecalho == COLUNAS_ISOLAMENTO
+    assert linha[5] == pytest.approx(distancia_isolamento(10.0, 3.0, 6.0, EDIFICACOES[0], "Não"))
+    assert linha[10] == pytest.approx(distancia_isolamento(4.0, 3.0, 1.0, EDIFICACOES[1], "Não"))
+
+    # A guarita térrea é isenta e fica fora do TRRF por pavimento
+    pavimentos = abas["TRRF por pavimento"][1:]
+    assert pavimentos and {linha[0] for linha in pavimentos} == {"Torre A/B"}
+
+def test_uso_sem_trrf_tabelado_vira_mensagem_na_aba():
+    pytest.importorskip("numpy")
+    destino = io.BytesIO()
+    respostas = [{"pavimentos_trrf": [{"Pavimento": "Térreo", "Uso": "Z-9", "Subsolo": False, "Profundidade (m)": None}]}, {}]
+    escrever_relatorio(destino, EDIFICACOES, respostas_trrf=respostas)
+    abas = ler(destino)
+    assert abas["TRRF por pavimento"][1][0] == "⚠️ TRRF por pavimento não calculado: Uso sem TRRF tabelado: 'Z-9'"
+    assert abas["TRRF"][1][0] == "Torre A/B"
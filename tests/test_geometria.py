@@ -0,0 +1,173 @@
+import json
+
+import numpy as np
+import pytest
+
+from ppci.geometria import (
+    _trechos_retos, afastamentos, associar_cadastro, criar_bloco, distancia_segmentos, ler_dxf, ler_geojson,
+    ler_implantacao, main as verificar_implantacao, pares_proximos,
+)
+from ppci.regras import distancia_isolamento
+
+
+def quadrado(x, y, lado=10.0):
+    return [[x, y], [x + lado, y], [x + lado, y + lado], [x, y + lado], [x, y]]
+
+def feicao(nome, aneis, tipo="Polygon", **propriedades):
+    coordenadas = [aneis] if tipo == "Polygon" else [[anel] for anel in aneis]
+    return {"type": "Feature", "properties": {"nome": nome, **propriedades}, "geometry": {"type": tipo, "coordinates": coordenadas}}
+
+def geojson(*feicoes):
+    return json.dumps({"type": "FeatureCollection", "features": list(feicoes)})
+
+def dxf(*entidades):
+    linhas = ["0", "SECTION", "2", "HEADER", "0", "ENDSEC", "0", "SECTION", "2", "ENTITIES"]
+    for entidade in entidades:
+        linhas += entidade
+    return "\n".join(linhas + ["0", "ENDSEC", "0", "EOF"])
+
+def lwpolyline(camada, pontos, fechada=True, espessura=None):
+    grupos = ["0", "LWPOLYLINE", "8", camada, "90", str(len(pontos)), "70", "1" if fechada else "0"]
+    if espessura is not None:
+        grupos += ["39", str(espessura)]
+    for x, y in pontos:
+        grupos += ["10", str(x), "20", str(y)]
+    return grupos
+
+
+# 🧱 Blocos
+
+def test_criar_bloco_normaliza_contorno_e_estima_edificacao():
+    bloco = criar_bloco("T1", list(reversed(quadrado(0, 0))), altura=9.0)
+    assert len(bloco["contorno"]) == 4
+    assert bloco["edificacao"] == {"nome": "T1", "area": 300.0, "altura": 6.0, "num_pavimentos": 3, "terrea": "Não"}
+    x, y = bloco["contorno"][:, 0], bloco["contorno"][:, 1]
+    assert np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y) > 0 # anti-horário
+
+    terreo = criar_bloco("G", quadrado(0, 0, 4), pavimentos=1, area=20)
+    assert terreo["altura"] == 3.0 and terreo["edificacao"]["terrea"] == "Sim" and terreo["edificacao"]["area"] == 20.0
+
+@pytest.mark.parametrize("contorno, altura, mensagem", [
+    ([[0, 0], [1, 1], [0, 0]], 3.0, "menos de 3 vértices"),
+    ([[0, 0], [1, 0], [2, 0]], 3.0, "menos de 3 vértices"),
+    (quadrado(0, 0), None, "informe a altura"),
+])
+def test_criar_bloco_invalido(contorno, altura, mensagem):
+    with pytest.raises(ValueError, match=mensagem):
+        criar_bloco("X", contorno, altura=altura)
+
+def test_trechos_retos_juntam_vertices_colineares():
+    contorno = criar_bloco("T", [[0, 0], [5, 0], [10, 0], [10, 10], [0, 10], [0, 4]], altura=3.0)["contorno"]
+    trechos = _trechos_retos(contorno)
+    assert len(trechos) == 4
+    assert sorted(round(float(np.linalg.norm(fim - inicio)), 6) for inicio, fim in trechos) == [10.0] * 4
+
+
+# 📄 Leitura
+
+def test_ler_geojson():
+    conteudo = geojson(
+        feicao("T1", quadrado(0, 0), altura=12, pavimentos=4, abertura=40),
+        feicao("Anexos", [quadrado(30, 0, 5), quadrado(40, 0, 5)], tipo="MultiPolygon", height=3),
+        {"type": "Feature", "properties": {}, "geometry": {"type": "Point", "coordinates": [1, 1]}},
+        {"type": "Feature", "properties": {"num_pavimentos": 2}, "geometry": {"type": "Polygon", "coordinates": [quadrado(60, 0)]}},
+    )
+    blocos = ler_geojson(conteudo)
+    assert [bloco["nome"] for bloco in blocos] == ["T1", "Anexos", "Anexos", "Edificação 4"]
+    assert (blocos[0]["altura"], blocos[0]["abertura"], blocos[0]["edificacao"]["num_pavimentos"]) == (12.0, 40.0, 4)
+    assert blocos[3]["altura"] == 6.0
+    assert len(ler_geojson(json.dumps(feicao("Só", quadrado(0, 0), altura=3)))) == 1
+
+def test_coordenadas_em_graus_sao_rejeitadas():
+    with pytest.raises(ValueError, match="graus"):
+        ler_geojson(geojson(feicao("T1", quadrado(-51.2, -30.0, 0.0002), altura=3)))
+    with pytest.raises(ValueError, match="Nenhuma edificação"):
+        ler_geojson(geojson())
+
+def test_ler_dxf_lwpolyline_e_polyline():
+    polyline = ["0", "POLYLINE", "8", "Bloco B", "39", "6", "70", "1"]
+    for x, y in quadrado(20, 0)[:-1]:
+        polyline += ["0", "VERTEX", "8", "Bloco B", "10", str(x), "20", str(y)]
+    polyline += ["0", "SEQEND"]
+    conteudo = dxf(
+        lwpolyline("Bloco A", quadrado(0, 0)[:-1], espessura=9),
+        lwpolyline("Cota", [(0, -5), (10, -5)], fechada=False),
+        lwpolyline("Muro", quadrado(50, 0), fechada=False, espessura=3), # fechada pela repetição do vértice
+        polyline,
+    )
+    blocos = ler_dxf(conteudo.encode())
+    assert sorted((bloco["nome"], bloco["altura"], len(bloco["contorno"])) for bloco in blocos) == [
+        ("Bloco A", 9.0, 4), ("Bloco B", 6.0, 4), ("Muro", 3.0, 4)]
+
+def test_ler_implantacao_pela_extensao():
+    conteudo = dxf(lwpolyline("Ação", quadrado(0, 0)[:-1], espessura=3)).encode("latin-1")
+    assert ler_implantacao(conteudo, "SITE.DXF")[0]["nome"] == "Ação"
+    assert len(ler_implantacao(geojson(feicao("T1", quadrado(0, 0), altura=3)).encode(), "site.json")) == 1
+    with pytest.raises(ValueError, match="Formato não suportado"):
+        ler_implantacao(b"", "site.shp")
+
+def test_associar_cadastro():
+    blocos = [criar_bloco(nome, quadrado(20 * n, 0), altura=6.0) for n, nome in enumerate(["T1", "A1", "Guarita"])]
+    cadastro = [{"nome": "T1", "area": 5000.0, "altura": 20.0, "num_pavimentos": 7, "areas_combinadas_com": ["T1", "A1"]}]
+    associados, sem_cadastro = associar_cadastro(blocos, cadastro)
+    assert [bloco["grupo"] for bloco in associados] == ["T1", "T1", "Guarita"]
+    assert associados[1]["edificacao"] is cadastro[0]
+    assert sem_cadastro == ["Guarita"]
+
+
+# 🔎 Busca espacial e afastamentos
+
+def test_pares_proximos_igual_a_forca_bruta():
+    gerador = np.random.default_rng(11)
+    inicio = gerador.uniform(0, 500, size=(300, 2))
+    fim = inicio + gerador.uniform(-20, 20, size=(300, 2))
+    alcance = gerador.uniform(0, 15, size=300)
+    a, b = pares_proximos(inicio, fim, alcance)
+    encontrados = set(zip(a.tolist(), b.tolist()))
+
+    minimos, maximos = np.minimum(inicio, fim), np.maximum(inicio, fim)
+    esperados = set()
+    for i in range(300):
+        for j in range(i + 1, 300):
+            folga = np.maximum(0.0, np.maximum(minimos[i], minimos[j]) - np.minimum(maximos[i], maximos[j]))
+            if np.hypot(*folga) <= max(alcance[i], alcance[j]):
+                esperados.add((i, j))
+    assert encontrados == esperados
+    vazio = pares_proximos(np.empty((0, 2)), np.empty((0, 2)), np.empty(0))
+    assert len(vazio[0]) == 0
+
+def test_distancia_segmentos():
+    p = np.array([[0.0, 0.0], [0.0, 0.0], [0.0, 0.0]])
+    q = np.array([[10.0, 0.0], [10.0, 0.0], [4.0, 4.0]])
+    r = np.array([[0.0, 3.0], [13.0, 4.0], [0.0, 4.0]])
+    s = np.array([[10.0, 3.0], [20.0, 4.0], [4.0, 0.0]]) # o terceiro par se cruza
+    assert distancia_segmentos(p, q, r, s).tolist() == pytest.approx([3.0, 5.0, 0.0])
+
+def test_afastamento_entre_dois_blocos():
+    blocos = [criar_bloco("T1", quadrado(0, 0), altura=6.0, pavimentos=2), criar_bloco("T2", quadrado(15, 0), altura=6.0, pavimentos=2)]
+    resultado = afastamentos(blocos, bombeiros="Sim", porcentagem_abertura=50.0, folga=100.0)
+    [linha] = resultado["linhas"]
+    assert (linha["Edificação 1"], linha["Edificação 2"]) == ("T1", "T2")
+    assert linha["Fachada 1"].endswith("(L)") and linha["Fachada 2"].endswith("(O)")
+    assert linha["Afastamento (m)"] == 5.0
+    esperada = distancia_isolamento(10.0, 6.0, 30.0, blocos[0]["edificacao"], "Sim")
+    assert linha["Distância exigida (m)"] == round(esperada, 2)
+    assert linha["Situação"] == ("Atende" if 5.0 >= esperada else "Não atende")
+    assert resultado["resumo"]["pares_listados"] == 1
+
+    # Além da distância exigida + folga o par não é listado
+    longe = [blocos[0], criar_bloco("T2", quadrado(10 + esperada + 1.0, 0), altura=6.0, pavimentos=2)]
+    assert afastamentos(longe, bombeiros="Sim", porcentagem_abertura=50.0, folga=0.5)["linhas"] == []
+
+def test_blocos_do_mesmo_grupo_nao_sao_comparados():
+    blocos = [criar_bloco("T1", quadrado(0, 0), altura=6.0), criar_bloco("A1", quadrado(12, 0), altura=3.0)]
+    blocos, _ = associar_cadastro(blocos, [{"nome": "T1", "area": 300.0, "altura": 3.0, "num_pavimentos": 2, "areas_combinadas_com": ["T1", "A1"]}])
+    assert afastamentos(blocos, folga=50.0)["linhas"] == []
+
+def test_linha_de_comando(tmp_path, capsys):
+    arquivo = tmp_path / "implantacao.geojson"
+    arquivo.write_text(geojson(feicao("T1", quadrado(0, 0), altura=6), feicao("T2", quadrado(12, 0), altura=6)), encoding="utf-8")
+    assert verificar_implantacao([str(arquivo)]) == 0
+    saida = capsys.readouterr()
+    assert "T1 · F" in saida.out and "Não atende" in saida.out
+    assert "2 blocos, 8 fachadas" in saida.err
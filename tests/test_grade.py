@@ -0,0 +1,70 @@
+import math
+
+import pytest
+
+from ppci.grade import edificacoes_da_grade, regras_anexo, regras_torre
+
+
+def torre(**campos):
+    return {"nome": "T1", "area": 800, "terrea": "Não", "num_pavimentos": 4, "altura": 9.0, **campos}
+
+
+def test_torre_terrea_zera_campos_dependentes():
+    campos, erros = regras_torre(torre(terrea="Sim", duplex="Sim", altura=12.0, numero_subsolos="Mais de 1"))
+    assert erros == []
+    assert (campos["altura"], campos["num_pavimentos"], campos["duplex"], campos["numero_subsolos"]) == (0.0, 1, "Não", "0")
+
+@pytest.mark.parametrize("extra, esperado", [
+    ({"subsolo_tecnico": "Não", "numero_subsolos": "1", "subsolo_ocupado": "Sim"}, ("0", "Menor que 500m²", "Não", "Não")),
+    ({"subsolo_tecnico": "Sim", "numero_subsolos": "Mais de 1", "area_subsolo": "Menor que 500m²"}, ("Mais de 1", "Maior que 500m²", "Não", "Não")),
+    ({"subsolo_tecnico": "Sim", "numero_subsolos": 1.0, "subsolo_ocupado": "Não", "subsolo_menor_50": "Sim"}, ("1", "Menor que 500m²", "Não", "Não")),
+    ({"subsolo_tecnico": "Sim", "subsolo_ocupado": "Sim", "subsolo_menor_50": "Sim"}, ("1", "Menor que 500m²", "Sim", "Sim")),
+])
+def test_dependencias_de_subsolo(extra, esperado):
+    campos, erros = regras_torre(torre(**extra))
+    assert erros == []
+    assert (campos["numero_subsolos"], campos["area_subsolo"], campos["subsolo_ocupado"], campos["subsolo_menor_50"]) == esperado
+
+def test_celulas_vazias_e_numeros_colados():
+    campos, erros = regras_torre(torre(area="1250,5", num_pavimentos=math.nan, um_ap_por_pav=" "))
+    assert erros == []
+    assert (campos["area"], campos["num_pavimentos"], campos["um_ap_por_pav"]) == (1250.5, 2, "Sim")
+
+@pytest.mark.parametrize("linha, mensagem", [
+    (torre(altura=None), "altura não informado"),
+    (torre(altura="alta"), "altura inválido: 'alta'"),
+    (torre(num_pavimentos=1), "num_pavimentos deve ser no mínimo 2"),
+    (torre(duplex="Talvez"), "duplex deve ser um de Não, Sim (recebido 'Talvez')"),
+    (torre(nome=""), "nome não informado"),
+])
+def test_erros_por_campo(linha, mensagem):
+    assert mensagem in regras_torre(linha)[1]
+
+def test_anexo_com_uso_invalido():
+    campos, erros = regras_anexo({"nome": "A1", "area": 100, "uso": "Z-9"})
+    assert campos["uso"] == "C-1" and campos["carga_incendio"] == "300 MJ/m²"
+    assert erros == ["uso deve ser um de C-1, F-6, F-8, G-1, G-2, J-2 (recebido 'Z-9')"]
+
+def test_grade_rotula_erros_e_ignora_linhas_vazias():
+    torres, anexos, erros = edificacoes_da_grade(
+        [torre(), {"nome": None, "area": math.nan}, torre(nome="T3", altura=None), torre(nome="T1")],
+        [{"nome": "A1", "area": 50, "tratamento": "Conjunta", "edificacao_conjunta": "T1"}],
+    )
+    assert [t.nome for t in torres] == ["T1"] and [a.nome for a in anexos] == ["A1"]
+    assert erros == ["Torre 3 (T3): altura não informado", "Torre 4 (T1): nome repetido"]
+    assert (anexos[0].tratamento, anexos[0].edificacao_conjunta) == ("Conjunta", "T1")
+
+def test_torre_unica_e_sempre_independente():
+    torres, _, erros = edificacoes_da_grade([torre(tratamento="Conjunta", edificacao_conjunta="X")], [])
+    assert erros == [] and (torres[0].tratamento, torres[0].edificacao_conjunta) == ("Independente", None)
+
+@pytest.mark.parametrize("alvo", ["T9", "T1", None])
+def test_destino_conjunta_invalido_vira_independente(alvo):
+    torres, _, erros = edificacoes_da_grade([torre(tratamento="Conjunta", edificacao_conjunta=alvo), torre(nome="T2")], [])
+    assert erros == ["Torre 1 (T1): edificacao_conjunta deve ser o nome de outra torre da tabela"]
+    assert (torres[0].tratamento, torres[0].edificacao_conjunta) == ("Independente", None)
+
+def test_tratamento_invalido():
+    torres, _, erros = edificacoes_da_grade([torre(tratamento="Parcial"), torre(nome="T2")], [])
+    assert erros == ["Torre 1 (T1): tratamento deve ser um de Independente, Conjunta (recebido 'Parcial')"]
+    assert torres[0].tratamento == "Independente"
@@ -0,0 +1,91 @@
+import pytest
+
+from ppci.incremental import AvaliacaoSite, GrafoIncremental
+from ppci.registros import Anexo, Torre
+from ppci.regras import consolidar_edificacoes
+
+
+def site(area_t1=1000.0, nome_anexo="A1"):
+    return [
+        Torre("T1", area_t1, 12.0, 4, tratamento="Independente"),
+        Anexo(nome_anexo, 150.0, tratamento="Conjunta", edificacao_conjunta="T1"),
+        Torre("T2", 400.0, 6.0, 2, tratamento="Independente"),
+    ]
+
+def chaves_com(grafo, nome):
+    return {chave for chave in [*grafo._entradas, *grafo._derivados] if nome in chave}
+
+
+def test_grafo_recalcula_so_dependentes_e_corta_cedo():
+    g = GrafoIncremental()
+    g.registrar("dobro", lambda g, k: g.entrada(("x", k)) * 2)
+    g.registrar("paridade", lambda g, k: g("dobro", k) % 4)
+    g.definir(("x", 1), 1)
+    g.definir(("x", 2), 2)
+    assert (g("paridade", 1), g("paridade", 2)) == (2, 0)
+    assert g.recalculos == 4
+
+    assert g.definir(("x", 1), 1) is False # valor igual não avança a revisão
+    g.definir(("x", 1), 3)
+    assert (g("paridade", 1), g("paridade", 2)) == (2, 0)
+    assert g.recalculos == 6 # dobro e paridade de 1; nada de 2
+    g.definir(("x", 1), 5)
+    g("paridade", 1)
+    assert g.recalculos == 8
+
+def test_grafo_detecta_ciclo():
+    g = GrafoIncremental()
+    g.registrar("a", lambda g: g("b"))
+    g.registrar("b", lambda g: g("a"))
+    with pytest.raises(RuntimeError, match="cíclica"):
+        g("a")
+
+def test_grupos_iguais_aos_da_consolidacao():
+    avaliacao = AvaliacaoSite()
+    avaliacao.atualizar_edificacoes(site())
+    assert avaliacao.grupos() == consolidar_edificacoes(site())
+    assert avaliacao.problemas() == []
+
+def test_mudanca_de_area_so_reavalia_o_grupo_afetado():
+    avaliacao = AvaliacaoSite()
+    avaliacao.atualizar_edificacoes(site())
+    avaliacao.grupos()
+    classificacao_t2 = avaliacao.classificacao("T2")
+    antes = avaliacao.grafo.recalculos
+    avaliacao.atualizar_edificacoes(site(area_t1=2000.0))
+    assert [g.area for g in avaliacao.grupos()] == [2150.0, 400.0]
+    assert avaliacao.classificacao("T2") is classificacao_t2
+    recalculadas = avaliacao.grafo.recalculos - antes
+    assert 0 < recalculadas <= 5 # área, classificação e grupo de T1, mais a tupla de grupos
+
+def test_edificacao_renomeada_sai_do_grafo():
+    avaliacao = AvaliacaoSite()
+    avaliacao.atualizar_edificacoes(site())
+    avaliacao.grupos()
+    avaliacao.classificacao("T2")
+    avaliacao.atualizar_edificacoes(site(nome_anexo="A9"))
+    assert avaliacao.grupos()[0].areas_combinadas_com == ["T1", "A9"]
+    assert chaves_com(avaliacao.grafo, "A1") == set()
+
+    avaliacao.atualizar_edificacoes(site()[:1])
+    assert [g.nome for g in avaliacao.grupos()] == ["T1"]
+    assert chaves_com(avaliacao.grafo, "T2") == chaves_com(avaliacao.grafo, "A9") == set()
+
+def test_duplicados_viram_problema():
+    avaliacao = AvaliacaoSite()
+    avaliacao.atualizar_edificacoes(site() + [Torre("T2", 50.0, 3.0, 1, tratamento="Independente")])
+    assert len(avaliacao.grupos()) == 2
+    assert avaliacao.problemas() == ["Nome duplicado: 'T2'; apenas a primeira ocorrência foi considerada."]
+
+def test_distancia_e_comparacoes_removidas():
+    avaliacao = AvaliacaoSite()
+    avaliacao.atualizar_edificacoes(site())
+    distancias = [avaliacao.distancia(i, 1, 10.0, 6.0, 30.0, "T1", "Sim") for i in range(3)]
+    assert distancias[0] == distancias[2] > 0
+    antes = avaliacao.grafo.recalculos
+    assert avaliacao.distancia(0, 1, 10.0, 6.0, 30.0, "T1", "Sim") == distancias[0]
+    assert avaliacao.grafo.recalculos == antes
+
+    avaliacao.atualizar_comparacoes(range(1))
+    assert ("fachada", 0, 1) in avaliacao.grafo._entradas
+    assert not {chave for chave in [*avaliacao.grafo._entradas, *avaliacao.grafo._derivados] if chave[0] in ("fachada", "distancia") and chave[1] > 0}
@@ -0,0 +1,66 @@
+import io
+
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+
+from ppci import ingestao
+from ppci.ingestao import ESQUEMA_EDIFICACAO, ler_abas, ler_colunas, nome_projeto_do_arquivo
+
+
+def planilha(abas):
+    wb = openpyxl.Workbook()
+    wb.remove(wb.active)
+    for nome, linhas in abas.items():
+        ws = wb.create_sheet(nome)
+        for linha in linhas:
+            ws.append(linha)
+    destino = io.BytesIO()
+    wb.save(destino)
+    return destino.getvalue()
+
+CONTEUDO = planilha({
+    "Edificações": [
+        ["nome", "area", "num_pavimentos", "numero_subsolos", "coluna_extra", "terrea"],
+        ["T1", "750,5", 4.0, 1.0, "x", "Não"],
+        [None, None, None, None, None, None],
+        ["T2", 300, None, "Mais de 1", "y", ""],
+    ],
+    "TRRF": [["Edificação", "TRRF adotado"], ["T1", "60 min"]],
+})
+
+
+def test_ler_colunas_converte_pelo_esquema():
+    colunas = ler_colunas(CONTEUDO)
+    assert set(colunas) == {"nome", "area", "num_pavimentos", "numero_subsolos", "terrea"}
+    assert colunas["nome"] == ["T1", "T2"] # linha vazia ignorada
+    assert colunas["area"] == [None, 300.0] # texto não numérico vira vazio
+    assert colunas["num_pavimentos"] == [4, None]
+    assert colunas["numero_subsolos"] == ["1", "Mais de 1"]
+    assert colunas["terrea"] == ["Não", None]
+
+def test_ler_abas_abre_o_arquivo_uma_vez():
+    abas = ler_abas(CONTEUDO, {None: ESQUEMA_EDIFICACAO, "TRRF": {"Edificação": "string", "TRRF adotado": "string"}, "Ausente": {"x": "string"}})
+    assert abas[None]["nome"] == ["T1", "T2"]
+    assert abas["TRRF"] == {"Edificação": ["T1"], "TRRF adotado": ["60 min"]}
+    assert abas["Ausente"] == {}
+
+@pytest.mark.parametrize("nome_arquivo, projeto", [
+    ("checklistINC_Residencial X-R03.xlsx", "Residencial X"),
+    ("CHECKLISTINC_Bloco-2.XLSX", "Bloco-2"),
+    ("outro.xlsx", ""),
+    (None, ""),
+])
+def test_nome_projeto_do_arquivo(nome_arquivo, projeto):
+    assert nome_projeto_do_arquivo(nome_arquivo) == projeto
+
+def test_carregar_planilha_usa_o_cache_por_conteudo(monkeypatch):
+    pytest.importorskip("pandas")
+    leituras = []
+    original = ingestao.ler_colunas
+    monkeypatch.setattr(ingestao, "ler_colunas", lambda *args: leituras.append(1) or original(*args))
+    ingestao._cache.clear()
+    df = ingestao.carregar_planilha(CONTEUDO)
+    assert ingestao.carregar_planilha(bytes(CONTEUDO)) is df
+    assert len(leituras) == 1
+    assert str(df["num_pavimentos"].dtype) == "Int64"
@@ -0,0 +1,80 @@
+import math
+
+import pytest
+
+from ppci.lote import COLUNAS_RESULTADO, avaliar_carteira, normalizar_edificacao
+from ppci.regras import (
+    TRRF_APENAS_SUBSOLOS, TRRF_ISENTA, TRRF_POR_PAVIMENTO, TRRF_POR_PAVIMENTO_SUBSOLO_ABSORVE, TRRF_TERREA_30MIN,
+    avaliar_edificacao, avaliar_trrf,
+)
+
+
+def carteira():
+    return [
+        {"NomeProjeto": "P1", "nome": "T1", "area": 600.0, "altura": 9.0, "terrea": "Não", "num_pavimentos": 4},
+        {"NomeProjeto": "P1", "nome": "A1", "area": 300.0, "terrea": "Sim", "tratamento": "Conjunta", "edificacao_conjunta": "T1"},
+        {"NomeProjeto": "P2", "nome": "T1", "area": 400.0, "terrea": "Sim"},
+        *({"NomeProjeto": "P3", "nome": f"T{i}", "area": 100.0 * i, "altura": 3.0 * i, "num_pavimentos": i + 1} for i in range(1, 12)),
+    ]
+
+
+# 🧹 Normalização das linhas
+
+def test_normalizar_ignora_vazios_e_converte_tipos():
+    edificacao = normalizar_edificacao({"nome": " T1 ", "area": "750", "altura": math.nan, "num_pavimentos": 3.0, "numero_subsolos": 1.0, "duplex": ""})
+    assert edificacao["nome"] == "T1"
+    assert edificacao["area"] == 750.0 and edificacao["altura"] == 0.0
+    assert edificacao["num_pavimentos"] == 3
+    assert edificacao["numero_subsolos"] == "1"
+    assert edificacao["duplex"] == "Não"
+
+@pytest.mark.parametrize("linha, terrea", [
+    ({"area": 2000, "altura": 30, "num_pavimentos": 10}, "Não"),
+    ({"area": 200, "num_pavimentos": 2}, "Não"),
+    ({"area": 200}, "Sim"),
+    ({"area": 2000, "altura": 30, "terrea": "Sim"}, "Sim"),
+])
+def test_normalizar_deduz_terrea_sem_a_coluna(linha, terrea):
+    assert normalizar_edificacao(linha)["terrea"] == terrea
+
+def test_edificacao_alta_sem_coluna_terrea_nao_fica_isenta():
+    assert avaliar_trrf(normalizar_edificacao({"area": 2000, "altura": 30, "num_pavimentos": 10}))[0] == TRRF_POR_PAVIMENTO_SUBSOLO_ABSORVE
+
+
+# 🔥 Veredito de TRRF
+
+@pytest.mark.parametrize("campos, estrutura_terrea, veredito", [
+    ({"terrea": "Sim"}, "Não", TRRF_ISENTA),
+    ({"terrea": "Sim"}, "Sim", TRRF_TERREA_30MIN),
+    ({"area": 1000, "altura": 9}, "Não", TRRF_ISENTA),
+    ({"area": 1000, "altura": 9, "subsolo_tecnico": "Sim", "numero_subsolos": "Mais de 1"}, "Não", TRRF_APENAS_SUBSOLOS),
+    ({"area": 1500, "altura": 9}, "Não", TRRF_POR_PAVIMENTO_SUBSOLO_ABSORVE),
+    ({"area": 1000, "altura": 15, "subsolo_tecnico": "Sim", "numero_subsolos": "1", "area_subsolo": "Maior que 500m²"}, "Não", TRRF_POR_PAVIMENTO),
+])
+def test_avaliar_trrf(campos, estrutura_terrea, veredito):
+    edificacao = normalizar_edificacao({"terrea": "Não", "num_pavimentos": 4, **campos})
+    assert avaliar_trrf(edificacao, estrutura_terrea)[0] == veredito
+
+def test_avaliar_edificacao_escolhe_a_tabela():
+    assert avaliar_edificacao(normalizar_edificacao({"area": 750, "altura": 12}))["tabela_simplificada"] is True
+    completa = avaliar_edificacao(normalizar_edificacao({"area": 751, "altura": 9}))
+    assert completa["tabela_simplificada"] is False
+    assert completa["medidas"]["Compartimentação de Verticais"] == ""
+
+
+# 📦 Carteira
+
+def test_carteira_consolida_por_projeto():
+    problemas = []
+    linhas = avaliar_carteira(carteira(), processos=1, problemas=problemas)
+    por_chave = {(l["NomeProjeto"], l["nome"]): l for l in linhas}
+    assert por_chave[("P1", "T1")]["area_consolidada"] == 900.0
+    assert ("P1", "A1") not in por_chave
+    assert por_chave[("P2", "T1")]["area_consolidada"] == 400.0
+    assert len(linhas) == 13 and not problemas
+    assert all(set(COLUNAS_RESULTADO) <= set(linha) for linha in linhas)
+
+def test_carteira_em_paralelo_igual_a_sequencial():
+    sequencial = avaliar_carteira(carteira(), processos=1)
+    paralela = avaliar_carteira(carteira(), processos=2, tamanho_bloco=3)
+    assert paralela == sequencial
@@ -0,0 +1,41 @@
+import json
+
+from ppci.perfil import Perfil, gravar_log, tamanho_estado
+
+
+def test_perfil_inativo_nao_mede():
+    perfil = Perfil(ativo=False, contador_widgets=lambda: 1 / 0)
+    perfil.marcar("ingestao")
+    assert perfil.etapas == [] and perfil._atual is None
+
+def test_etapas_consecutivas_com_contagem_de_widgets():
+    widgets = iter([0, 3, 3, 10, 10])
+    perfil = Perfil(ativo=True, contador_widgets=lambda: next(widgets))
+    perfil.marcar("ingestao")
+    perfil.marcar("grade")
+    resumo = perfil.finalizar({"a": 1, "b": "texto"})
+    assert [etapa["etapa"] for etapa in resumo["etapas"]] == ["ingestao", "grade"]
+    assert [etapa["widgets"] for etapa in resumo["etapas"]] == [3, 7]
+    assert resumo["widgets"] == 10
+    assert resumo["total_ms"] >= sum(etapa["ms"] for etapa in resumo["etapas"])
+    assert resumo["session_state"]["chaves"] == 2
+
+def test_sem_contador_widgets_fica_none():
+    perfil = Perfil(ativo=True)
+    perfil.marcar("unica")
+    resumo = perfil.finalizar()
+    assert resumo["etapas"][0]["widgets"] is None
+    assert "session_state" not in resumo
+
+def test_tamanho_estado_tolera_valores_nao_serializaveis():
+    estado = {"lista": list(range(100)), "funcao": lambda: None}
+    tamanho = tamanho_estado(estado)
+    assert tamanho["chaves"] == 2 and tamanho["bytes"] > 0
+
+def test_gravar_log_anexa_linhas_json(tmp_path):
+    caminho = tmp_path / "perfil.jsonl"
+    gravar_log({"total_ms": 1.5, "etapa": "ação"}, caminho)
+    gravar_log({"total_ms": 2.0}, caminho)
+    linhas = caminho.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(linha)["total_ms"] for linha in linhas] == [1.5, 2.0]
+    assert "ação" in linhas[0]
@@ -0,0 +1,36 @@
+import os
+import shutil
+import subprocess
+import sys
+
+from ppci.precompilar import RAIZ_REPOSITORIO, main, precompilar
+
+# Módulos importados no topo do app.py
+MODULOS_DO_APP = ["ppci.regras", "ppci.grade", "ppci.cache", "ppci.incremental", "ppci.ingestao",
+                  "ppci.perfil", "ppci.registros", "ppci.relatorio"]
+
+
+def test_precompilar_grava_o_bytecode(tmp_path):
+    shutil.copytree(os.path.join(RAIZ_REPOSITORIO, "ppci"), tmp_path / "ppci",
+                    ignore=shutil.ignore_patterns("__pycache__"))
+    assert precompilar(str(tmp_path))
+    compilados = os.listdir(tmp_path / "ppci" / "__pycache__")
+    assert any(nome.startswith("regras.") and nome.endswith(".pyc") for nome in compilados)
+
+def test_precompilar_acusa_modulo_invalido(tmp_path):
+    (tmp_path / "ppci").mkdir()
+    (tmp_path / "ppci" / "quebrado.py").write_text("def (:\n", encoding="utf-8")
+    assert not precompilar(str(tmp_path))
+
+def test_main_devolve_zero(monkeypatch):
+    monkeypatch.setattr("ppci.precompilar.precompilar", lambda silencioso: True)
+    assert main([]) == 0
+
+def test_imports_do_app_nao_carregam_dependencias_pesadas():
+    codigo = (
+        "import sys\n"
+        + "".join(f"import {modulo}\n" for modulo in MODULOS_DO_APP)
+        + "print(','.join(m for m in ('pandas', 'openpyxl', 'numpy', 'weasyprint') if m in sys.modules))"
+    )
+    saida = subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ_REPOSITORIO, capture_output=True, text=True, check=True)
+    assert saida.stdout.strip() == ""
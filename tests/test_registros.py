@@ -0,0 +1,82 @@
+import io
+import pickle
+
+import pytest
+
+from ppci.registros import Anexo, ColecaoEdificacoes, GrupoConsolidado, Torre, codificar, decodificar
+from ppci.regras import consolidar_edificacoes_detalhado
+
+
+def site():
+    return [
+        Torre("T1", 1000.0, 12.0, 4, tratamento="Independente", uso="C-1"),
+        Anexo("A1", 150.0, tratamento="Conjunta", edificacao_conjunta="T1"),
+        Torre("T2", 400.0, 0.0, 1, tratamento="Independente"),
+    ]
+
+
+def test_codigos_e_valores_invalidos():
+    assert decodificar("numero_subsolos", codificar("numero_subsolos", "Mais de 1")) == "Mais de 1"
+    with pytest.raises(ValueError, match="numero_subsolos"):
+        codificar("numero_subsolos", "3")
+    with pytest.raises(TypeError, match="cor"):
+        Torre("T", cor="azul")
+
+def test_registro_se_comporta_como_mapeamento():
+    torre, anexo, terrea = site()
+    assert torre["terrea"] == "Não" and terrea["terrea"] == "Sim"
+    assert anexo["carga_incendio"] == "300 MJ/m²" and anexo.get("inexistente", 7) == 7
+    torre["uso"] = "F-6"
+    assert torre.uso == "F-6" and torre._uso == codificar("uso", "F-6")
+    with pytest.raises(ValueError):
+        torre["duplex"] = "Talvez"
+    with pytest.raises(KeyError):
+        torre["inexistente"] = 1
+    assert "area_original" not in torre and torre.para_dict()["nome"] == "T1"
+
+def test_copia_igualdade_e_pickle():
+    torre = site()[0]
+    copia = torre.copy()
+    assert copia == torre and copia is not torre
+    copia.area = 1.0
+    assert torre.area == 1000.0
+    assert pickle.loads(pickle.dumps(torre)) == torre
+
+def test_consolidacao_de_registros_gera_grupos():
+    grupos, problemas = consolidar_edificacoes_detalhado(site())
+    assert problemas == []
+    assert all(isinstance(g, GrupoConsolidado) for g in grupos)
+    t1 = next(g for g in grupos if g.nome == "T1")
+    assert (t1.area, t1.area_original, t1.areas_combinadas_com) == (1150.0, 1000.0, ["T1", "A1"])
+    assert t1["uso"] == "C-1"
+
+def test_colecao_linhas_decodifica_codigos():
+    grupos, _ = consolidar_edificacoes_detalhado(site())
+    colecao = ColecaoEdificacoes.de_registros(grupos)
+    assert len(colecao) == 2
+    linhas = list(colecao.linhas(["nome", "area", "terrea", "uso", "areas_combinadas_com", "inexistente"]))
+    assert linhas == [
+        ("T1", 1150.0, "Não", "C-1", ["T1", "A1"], None),
+        ("T2", 400.0, "Sim", None, ["T2"], None),
+    ]
+
+def test_colecao_para_dataframe():
+    pytest.importorskip("pandas")
+    grupos, _ = consolidar_edificacoes_detalhado(site())
+    df = ColecaoEdificacoes.de_registros(grupos).para_dataframe()
+    assert list(df["nome"]) == ["T1", "T2"]
+    assert df["area"].tolist() == [1150.0, 400.0]
+    assert df["uso"].dtype == "category" and df["uso"].isna().tolist() == [False, True]
+    assert df["terrea"].tolist() == ["Não", "Sim"]
+
+def test_exportacao_de_registros_igual_a_de_dicts():
+    openpyxl = pytest.importorskip("openpyxl")
+    from ppci.exportacao import escrever_relatorio
+
+    def aba_edificacoes(edificacoes):
+        destino = io.BytesIO()
+        escrever_relatorio(destino, edificacoes)
+        return list(openpyxl.load_workbook(destino)["Edificações"].values)
+
+    grupos, _ = consolidar_edificacoes_detalhado(site())
+    assert aba_edificacoes(grupos) == aba_edificacoes([g.para_dict() for g in grupos])
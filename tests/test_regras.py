@@ -0,0 +1,75 @@
+import itertools
+
+import pytest
+
+from ppci import regras
+from ppci.regras import (
+    FAIXAS_ALTURA, INDICE_DECISAO, NOTA_ELEVADOR_EMERGENCIA, TABELA_COMPLETA, TABELA_SIMPLIFICADA, abertura_maxima,
+    classificar, distancia_isolamento, faixa_altura, is_tabela_simplificada, medidas_por_enquadramento, notas_relevantes,
+)
+
+AREAS = (0.0, 100.0, 750.0, 750.01, 5000.0)
+ALTURAS = (0.0, 3.0, 5.99, 6.0, 11.99, 12.0, 12.01, 22.99, 23.0, 29.99, 30.0, 79.99, 80.0, 150.0)
+PAVIMENTOS = (1, 2, 3, 40)
+
+
+# 🗂️ Índice de decisão
+
+def test_indice_tem_uma_entrada_por_coluna_das_tabelas():
+    assert len(INDICE_DECISAO) == len(FAIXAS_ALTURA) + 2
+
+@pytest.mark.parametrize("area, altura, num_pavimentos", list(itertools.product(AREAS, ALTURAS, PAVIMENTOS)))
+def test_classificar_igual_a_consulta_direta_as_tabelas(area, altura, num_pavimentos):
+    entrada, notas = classificar(area, altura, num_pavimentos)
+    simplificada = is_tabela_simplificada(area, altura)
+    assert entrada.tabela_simplificada == simplificada
+    if simplificada:
+        iluminacao = "X" if num_pavimentos > 2 else "-"
+        esperado = {medida: iluminacao if valor is None else valor for medida, valor in TABELA_SIMPLIFICADA.items()}
+    else:
+        coluna = FAIXAS_ALTURA.index(faixa_altura(altura))
+        esperado = {medida: valores[coluna] for medida, valores in TABELA_COMPLETA.items()}
+    assert dict(entrada.medidas) == esperado
+    assert list(notas) == notas_relevantes(esperado, altura, num_pavimentos, simplificada)
+    assert (NOTA_ELEVADOR_EMERGENCIA in notas) == (not simplificada and altura >= 80)
+
+def test_medidas_do_indice_sao_somente_leitura():
+    medidas = medidas_por_enquadramento(1000.0, 20.0, 6)
+    with pytest.raises(TypeError):
+        medidas["Extintores"] = "-"
+    with pytest.raises(TypeError):
+        INDICE_DECISAO[("completa", "Térrea", None)] = None
+
+
+# 🔁 Abertura máxima (problema inverso do isolamento)
+
+EDIFICACOES_ABERTURA = (
+    {"area": 5000.0, "altura": 30.0, "num_pavimentos": 10},
+    {"area": 600.0, "altura": 6.0, "num_pavimentos": 2},
+    {"area": 300.0, "altura": 3.0, "num_pavimentos": 1},
+)
+
+@pytest.mark.parametrize("edificacao", EDIFICACOES_ABERTURA)
+@pytest.mark.parametrize("bombeiros", ("Sim", "Não"))
+def test_abertura_maxima_e_a_maior_que_atende(edificacao, bombeiros):
+    for largura, altura, afastamento in itertools.product((4.0, 10.0, 35.0), (3.0, 9.0), (1.0, 3.0, 4.5, 8.0, 20.0)):
+        abertura = abertura_maxima(largura, altura, afastamento, edificacao, bombeiros)
+        area = largura * altura
+        if abertura is None:
+            assert distancia_isolamento(largura, altura, 0.0, edificacao, bombeiros) > afastamento
+            continue
+        assert 0.0 <= abertura <= area
+        assert distancia_isolamento(largura, altura, abertura, edificacao, bombeiros) <= afastamento
+        if abertura < area:
+            assert distancia_isolamento(largura, altura, abertura + area * 1e-6, edificacao, bombeiros) > afastamento
+
+def test_abertura_maxima_fachada_vazia():
+    assert abertura_maxima(0.0, 3.0, 10.0, EDIFICACOES_ABERTURA[0]) is None
+
+def test_abertura_maxima_termina_com_estimativa_ruim(monkeypatch):
+    # Estimativa muito acima do correto: em vez de descer ulp a ulp, bissecta
+    monkeypatch.setattr(regras, "_porcentagem_maxima_a3", lambda fator_x, alpha_limite: 99.0)
+    edificacao = EDIFICACOES_ABERTURA[0]
+    abertura = abertura_maxima(10.0, 3.0, 4.5, edificacao)
+    assert abertura is not None
+    assert distancia_isolamento(10.0, 3.0, abertura, edificacao) <= 4.5 < distancia_isolamento(10.0, 3.0, abertura + 1e-6, edificacao)
@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+from ppci import relatorio
+from ppci.registros import Torre
+from ppci.relatorio import caminho_documento, dados_relatorio, gerar_relatorio, hash_normalizado, podar_cache
+
+EDIFICACOES = [
+    Torre("T1", 1200.0, 15.0, 5, tratamento="Independente"),
+    Torre("T2", 400.0, 6.0, 2, tratamento="Independente"),
+]
+COMPARACOES = [{"edf1_nome": "T1", "edf2_nome": "T2", "largura1": 10.0, "altura1": 6.0, "abertura1": 12.0,
+                "largura2": 8.0, "altura2": 6.0, "abertura2": 4.0}]
+
+
+def test_hash_normalizado_ignora_ordem_das_chaves():
+    assert hash_normalizado({"a": 1, "b": 2}) == hash_normalizado({"b": 2, "a": 1})
+    assert hash_normalizado({"a": 1}) != hash_normalizado({"a": 2})
+
+def test_so_secoes_alteradas_sao_renderizadas(tmp_path):
+    pasta = str(tmp_path)
+    dados = dados_relatorio("Projeto <X>", EDIFICACOES, COMPARACOES)
+    primeiro = gerar_relatorio(dados, pasta=pasta)
+    assert (primeiro["renderizadas"], primeiro["reaproveitadas"]) == (4, 0)
+    with open(primeiro["caminho"], encoding="utf-8") as f:
+        documento = f.read()
+    assert "Projeto &lt;X&gt;" in documento and "<h2>T1</h2>" in documento and "Isolamento" in documento
+
+    assert gerar_relatorio(dados, pasta=pasta) == {"caminho": primeiro["caminho"], "renderizadas": 0, "reaproveitadas": 0}
+
+    # O cabeçalho só usa os nomes: mudar a área de T2 refaz apenas a sua seção e a do isolamento
+    editadas = [EDIFICACOES[0], Torre("T2", 450.0, 6.0, 2, tratamento="Independente")]
+    segundo = gerar_relatorio(dados_relatorio("Projeto <X>", editadas, COMPARACOES), pasta=pasta)
+    assert (segundo["renderizadas"], segundo["reaproveitadas"]) == (2, 2)
+
+def test_formato_desconhecido(tmp_path):
+    with pytest.raises(ValueError, match="docx"):
+        gerar_relatorio(dados_relatorio("P", EDIFICACOES), formato="docx", pasta=str(tmp_path))
+
+def criar(caminho, tamanho, mtime):
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    with open(caminho, "wb") as f:
+        f.write(b"x" * tamanho)
+    os.utime(caminho, (mtime, mtime))
+    return caminho
+
+def test_poda_apaga_os_menos_usados(tmp_path):
+    pasta = str(tmp_path)
+    antigo = criar(os.path.join(pasta, "secoes", "a.html"), 100, 1_000)
+    medio = criar(os.path.join(pasta, "documentos", "b.html"), 100, 2_000)
+    recente = criar(os.path.join(pasta, "secoes", "c.html"), 100, 3_000)
+    temporario = criar(os.path.join(pasta, "secoes", "tmpabc"), 500, 0)
+    assert podar_cache(pasta, limite_bytes=250) == 1
+    assert not os.path.exists(antigo) and os.path.exists(medio) and os.path.exists(recente)
+    assert os.path.exists(temporario)
+    assert podar_cache(pasta, limite_bytes=0, preservar={recente}) == 1
+    assert os.listdir(os.path.join(pasta, "documentos")) == []
+    assert podar_cache(str(tmp_path / "inexistente")) == 0
+
+def test_leitura_renova_e_geracao_poda(tmp_path, monkeypatch):
+    pasta = str(tmp_path)
+    dados_antigos = dados_relatorio("Antigo", EDIFICACOES)
+    dados_usados = dados_relatorio("Usado", EDIFICACOES[:1])
+    antigo = gerar_relatorio(dados_antigos, pasta=pasta)["caminho"]
+    usado = gerar_relatorio(dados_usados, pasta=pasta)["caminho"]
+    for caminho in (antigo, usado):
+        os.utime(caminho, (1_000, 1_000))
+    gerar_relatorio(dados_usados, pasta=pasta) # acerto no cache renova a data
+    assert os.path.getmtime(usado) > 1_000
+
+    monkeypatch.setattr(relatorio, "MAX_BYTES_CACHE", os.path.getsize(usado) + 1)
+    novo = gerar_relatorio(dados_relatorio("Novo", EDIFICACOES), pasta=pasta)["caminho"]
+    assert os.path.exists(novo)
+    assert not os.path.exists(antigo) and not os.path.exists(usado)
+    assert caminho_documento(dados_relatorio("Novo", EDIFICACOES), pasta=pasta) == novo
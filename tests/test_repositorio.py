@@ -0,0 +1,72 @@
+import pytest
+
+from ppci.registros import Torre
+from ppci.repositorio import INTERVALO_RETRATO, RepositorioProjetos, aplicar_diferenca, diferenca
+
+
+@pytest.mark.parametrize("antes, depois", [
+    ({"a": 1, "b": [1, 2, 3]}, {"a": 1, "b": [1, 5]}),
+    ({"a": {"x": 1}}, {"a": {"y": 2}, "c": None}),
+    ([{"n": "T1"}, {"n": "T2"}], [{"n": "T2"}]),
+    ({"a": [1]}, {"a": "texto"}),
+    ([], [1, [2, {"z": 3}]]),
+])
+def test_diferenca_e_inversa(antes, depois):
+    delta = diferenca(antes, depois)
+    assert delta is not None
+    assert aplicar_diferenca(antes, delta) == depois
+    assert diferenca(depois, depois) is None
+
+def retrato_da_revisao(numero):
+    """Edificações que mudam a cada revisão: alturas, inclusões e exclusões."""
+    edificacoes = [{"nome": f"T{i}", "area": 100.0 * (i + 1), "altura": float(numero % 30), "uso": "C-1"} for i in range(1 + numero % 4)]
+    comparacoes = [{"edf1_nome": "T0", "edf2_nome": f"T{numero % 4}", "largura1": float(numero)}] if numero % 3 else []
+    return edificacoes, comparacoes, {"NomeProjeto": "P", "versao": numero}
+
+
+def test_salvar_e_abrir_muitas_revisoes(tmp_path):
+    caminho = str(tmp_path / "projetos.sqlite3")
+    repositorio = RepositorioProjetos(caminho)
+    total = 2 * INTERVALO_RETRATO + 5
+    for numero in range(total):
+        edificacoes, comparacoes, metadados = retrato_da_revisao(numero)
+        assert repositorio.salvar("P", edificacoes, comparacoes, usuario=f"u{numero % 2}", metadados=metadados) == numero
+    repositorio.fechar()
+
+    # Um repositório novo não tem o cache da última revisão: tudo vem de retratos + diferenças
+    repositorio = RepositorioProjetos(caminho)
+    completas = [numero for numero, _, _, completa in repositorio.revisoes("P") if completa]
+    assert sorted(completas) == [0, INTERVALO_RETRATO, 2 * INTERVALO_RETRATO]
+    for numero in range(total):
+        edificacoes, comparacoes, metadados = retrato_da_revisao(numero)
+        assert repositorio.abrir("P", numero) == {"edificacoes": edificacoes, "comparacoes": comparacoes, "metadados": metadados}
+    assert repositorio.abrir("P") == repositorio.abrir("P", total - 1)
+    repositorio.fechar()
+
+def test_salvar_sem_mudancas_nao_cria_revisao():
+    repositorio = RepositorioProjetos(":memory:")
+    torres = [Torre("T1", 500.0, 9.0, 3, tratamento="Independente")]
+    assert repositorio.salvar("P", torres) == 0
+    assert repositorio.salvar("P", [t.copy() for t in torres]) == 0
+    retrato = repositorio.abrir("P")
+    retrato["edificacoes"][0]["area"] = 1.0 # a cópia devolvida não altera o cache
+    assert repositorio.abrir("P")["edificacoes"][0]["area"] == 500.0
+
+def test_buscar_pelos_indices():
+    repositorio = RepositorioProjetos(":memory:")
+    repositorio.salvar("P1", [{"nome": "Alta", "area": 900.0, "altura": 30.0, "uso": "C-1"}], usuario="ana")
+    repositorio.salvar("P1", [{"nome": "Alta", "area": 900.0, "altura": 20.0, "uso": "C-1"}], usuario="ana")
+    repositorio.salvar("P2", [{"nome": "Loja", "area": 300.0, "altura": 25.0, "uso": "G-1"}], usuario="rui")
+    assert [linha[:3] for linha in repositorio.buscar(altura_minima=23)] == [("P2", 0, "Loja")]
+    assert [linha[:3] for linha in repositorio.buscar(altura_minima=23, apenas_atual=False)] == [("P1", 0, "Alta"), ("P2", 0, "Loja")]
+    assert [linha[0] for linha in repositorio.buscar(usuario="ana")] == ["P1"]
+    assert repositorio.buscar(uso="G-1", nome_projeto="P1") == []
+    assert {nome for nome, *_ in repositorio.projetos()} == {"P1", "P2"}
+
+def test_projeto_ou_revisao_inexistente():
+    repositorio = RepositorioProjetos(":memory:")
+    with pytest.raises(KeyError, match="Projeto"):
+        repositorio.abrir("X")
+    repositorio.salvar("P", [{"nome": "T1", "area": 1.0, "altura": 0.0}])
+    with pytest.raises(KeyError, match="R05"):
+        repositorio.abrir("P", 5)
@@ -0,0 +1,83 @@
+import asyncio
+import json
+from concurrent.futures import Executor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from ppci.servico import ServicoPPCI, executar_bloco
+
+EDIFICACAO = {"nome": "T1", "area": 1200, "altura": 15, "num_pavimentos": 5}
+
+
+class PoolQuebrado(Executor):
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool("worker encerrado")
+
+
+async def requisitar(porta, metodo, caminho, corpo=None, cabecalhos=""):
+    reader, writer = await asyncio.open_connection("127.0.0.1", porta)
+    dados = corpo if isinstance(corpo, bytes) else json.dumps(corpo).encode() if corpo is not None else b""
+    writer.write(f"{metodo} {caminho} HTTP/1.1\r\nContent-Length: {len(dados)}\r\n{cabecalhos}Connection: close\r\n\r\n".encode() + dados)
+    await writer.drain()
+    resposta = await reader.read()
+    writer.close()
+    cabecalho, _, corpo_resposta = resposta.partition(b"\r\n\r\n")
+    return int(cabecalho.split()[1]), json.loads(corpo_resposta)
+
+def conversar(pedidos, executor=None, criar_executor=None):
+    """Sobe o serviço em uma porta livre, envia os pedidos em sequência e encerra."""
+    async def principal():
+        servico = ServicoPPCI(tamanho_bloco=2)
+        servico._criar_executor = criar_executor or (lambda: ThreadPoolExecutor(2))
+        await servico.iniciar(porta=0)
+        if executor is not None:
+            servico.executor = executor
+        try:
+            return [await requisitar(servico.porta, *pedido) for pedido in pedidos]
+        finally:
+            await servico.encerrar()
+    return asyncio.run(principal())
+
+
+def test_executar_bloco_isola_erros_por_item():
+    resultados = executar_bloco("enquadramento", [EDIFICACAO, [1, 2], {"nome": "X", "area": "muito"}])
+    assert resultados[0]["tabela"] == "Completa"
+    assert resultados[1]["erro"].startswith("ValueError")
+    assert "erro" in resultados[2]
+
+def test_endpoints_e_erros_http():
+    respostas = conversar([
+        ("GET", "/saude"),
+        ("POST", "/saude"),
+        ("GET", "/enquadramento"),
+        ("POST", "/nada", {}),
+        ("POST", "/enquadramento", b"{nao e json"),
+        ("POST", "/lote/trrf", {"itens": "T1"}),
+        ("POST", "/consolidar", [EDIFICACAO]),
+        ("POST", "/enquadramento", EDIFICACAO),
+    ])
+    assert [status for status, _ in respostas] == [200, 405, 405, 404, 400, 400, 400, 200]
+    assert "lote" not in respostas[0][1]["operacoes"] and "trrf" in respostas[0][1]["operacoes"]
+    assert respostas[-1][1]["nome"] == "T1"
+
+def test_content_length_invalido():
+    for valor in ("abc", "-5"):
+        [(status, resposta)] = conversar([("POST", "/enquadramento", b"", f"Content-Length: {valor}\r\n")])
+        assert status == 400 and "Content-Length" in resposta["erro"]
+
+def test_lote_preserva_ordem_entre_blocos():
+    itens = [dict(EDIFICACAO, nome=f"T{i}", area=100 * (i + 1)) for i in range(5)] + [None]
+    [(status, resposta)] = conversar([("POST", "/lote/enquadramento", {"itens": itens})])
+    assert status == 200
+    assert [r.get("nome") for r in resposta["resultados"]] == [f"T{i}" for i in range(5)] + [None]
+    assert "erro" in resposta["resultados"][-1]
+
+def test_lote_recria_pool_quebrado_e_repete():
+    [(status, resposta)] = conversar([("POST", "/lote/notas", {"itens": [EDIFICACAO]})], executor=PoolQuebrado())
+    assert status == 200 and resposta["resultados"][0]["nome"] == "T1"
+
+def test_lote_responde_503_se_o_pool_quebra_de_novo():
+    respostas = conversar([("POST", "/lote/notas", {"itens": [EDIFICACAO]}), ("GET", "/saude")],
+                          criar_executor=PoolQuebrado)
+    assert respostas[0][0] == 503 and respostas[1][0] == 200
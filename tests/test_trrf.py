@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from ppci.regras import TRRF_APENAS_SUBSOLOS, TRRF_ISENTA, TRRF_POR_PAVIMENTO, TRRF_TERREA_30MIN
+from ppci.trrf import _maximo_acumulado_de_cima, grupo_trrf, pavimentos_padrao, trrf_site
+
+
+def maximo_acumulado_ingenuo(valores, tamanhos):
+    resultado, inicio = [], 0
+    for tamanho in tamanhos:
+        segmento = list(valores[inicio:inicio + tamanho])
+        resultado += [max(segmento[i:]) for i in range(tamanho)]
+        inicio += tamanho
+    return resultado
+
+
+@pytest.mark.parametrize("uso, grupo", [("A-2", "A"), ("g-1", "G-1"), (" G-3 ", "G"), ("J-2", "J"), ("I-1", "I-1")])
+def test_grupo_trrf(uso, grupo):
+    assert grupo_trrf(uso) == grupo
+
+@pytest.mark.parametrize("uso", ["Z-1", "", None])
+def test_grupo_trrf_desconhecido(uso):
+    with pytest.raises(ValueError, match="Uso sem TRRF tabelado"):
+        grupo_trrf(uso)
+
+def test_maximo_acumulado_igual_ao_ingenuo():
+    gerador = np.random.default_rng(7)
+    for _ in range(50):
+        tamanhos = gerador.integers(1, 8, size=gerador.integers(1, 10))
+        valores = gerador.choice([0, 30, 60, 90, 120], size=int(tamanhos.sum())).astype(np.int32)
+        resultado = _maximo_acumulado_de_cima(valores, tamanhos)
+        assert resultado.dtype == np.int32
+        assert resultado.tolist() == maximo_acumulado_ingenuo(valores.tolist(), tamanhos.tolist())
+    assert len(_maximo_acumulado_de_cima(np.array([], dtype=np.int32), [])) == 0
+
+def test_pavimentos_padrao():
+    assert [p["Pavimento"] for p in pavimentos_padrao({"terrea": "Sim"})] == ["Térreo"]
+    torre = {"terrea": "Não", "num_pavimentos": 3, "subsolo_tecnico": "Sim", "numero_subsolos": "Mais de 1", "uso": "C-1"}
+    pavimentos = pavimentos_padrao(torre)
+    assert [p["Pavimento"] for p in pavimentos] == ["Subsolo 2", "Subsolo 1", "Térreo", "Pavimento 2", "Pavimento 3"]
+    assert [p["Profundidade (m)"] for p in pavimentos[:2]] == [6.0, 3.0]
+    assert {p["Uso"] for p in pavimentos[2:]} == {"C-1"}
+
+def test_trrf_site_por_veredito():
+    edificacoes = [
+        {"nome": "Alta", "terrea": "Não", "altura": 25.0, "area": 3000.0, "num_pavimentos": 3,
+         "subsolo_tecnico": "Sim", "numero_subsolos": "Mais de 1", "area_subsolo": "Maior que 500m²"},
+        {"nome": "Baixa", "terrea": "Não", "altura": 6.0, "area": 800.0, "num_pavimentos": 2,
+         "subsolo_tecnico": "Sim", "numero_subsolos": "Mais de 1", "area_subsolo": "Maior que 500m²"},
+        {"nome": "Guarita", "terrea": "Sim", "altura": 0.0, "area": 20.0, "num_pavimentos": 1},
+        {"nome": "Galpão", "terrea": "Sim", "altura": 0.0, "area": 900.0, "num_pavimentos": 1},
+    ]
+    resultados = trrf_site(edificacoes, estruturas_terreas=["Não", "Não", "Não", "Sim"])
+    assert [veredito for veredito, _ in resultados] == [TRRF_POR_PAVIMENTO, TRRF_APENAS_SUBSOLOS, TRRF_ISENTA, TRRF_TERREA_30MIN]
+
+    alta = resultados[0][1]
+    assert [linha["Classe"] for linha in alta] == ["S1", "S1", "P4", "P4", "P4"]
+    assert [linha["TRRF (min)"] for linha in alta] == [90, 90, 90, 90, 90] # subsolos não ficam abaixo do térreo
+    baixa = resultados[1][1]
+    assert [linha["TRRF próprio (min)"] for linha in baixa] == [60, 60, None, None]
+    assert resultados[2][1][0]["TRRF (min)"] is None
+    assert resultados[3][1][0]["TRRF (min)"] == 30
+
+def test_pavimentos_editados_e_subsolo_profundo():
+    edificacao = {"nome": "T", "terrea": "Não", "altura": 10.0, "area": 2000.0, "num_pavimentos": 2,
+                  "subsolo_tecnico": "Sim", "numero_subsolos": "Mais de 1", "area_subsolo": "Maior que 500m²"}
+    pavimentos = [
+        {"Pavimento": "Subsolo", "Uso": "G-2", "Subsolo": True, "Profundidade (m)": 12.0},
+        {"Pavimento": "Térreo", "Uso": "C-1", "Subsolo": float("nan"), "Profundidade (m)": float("nan")},
+        {"Pavimento": "Cobertura", "Uso": "J-2", "Subsolo": False, "Profundidade (m)": None},
+    ]
+    _, linhas = trrf_site([edificacao], [pavimentos])[0]
+    assert [linha["Classe"] for linha in linhas] == ["S2", "P2", "P2"]
+    assert [linha["TRRF próprio (min)"] for linha in linhas] == [90, 60, 60]
+    assert [linha["TRRF (min)"] for linha in linhas] == [90, 60, 60]
@@ -0,0 +1,99 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from ppci.regras import (
+    TABELA_A3_FATOR_X, TABELA_A3_PORCENTAGENS, buscar_valor_tabela, buscar_valor_tabela_simplificada, distancia_isolamento,
+)
+from ppci.vetorizado import buscar_valor_tabela_lote, buscar_valor_tabela_simplificada_lote, distancias_isolamento_lote
+
+# Grade que passa pelos breakpoints, entre eles e fora dos limites da tabela
+PORCENTAGENS = np.unique(np.concatenate([np.linspace(0, 120, 97), TABELA_A3_PORCENTAGENS]))
+FATORES_X = np.unique(np.concatenate([np.linspace(0.5, 45, 89), TABELA_A3_FATOR_X]))
+
+
+def test_tabela_a3_lote_igual_a_escalar():
+    p, x = np.meshgrid(PORCENTAGENS, FATORES_X, indexing="ij")
+    lote = buscar_valor_tabela_lote(p, x)
+    escalar = np.array([[buscar_valor_tabela(pi, xi) for xi in FATORES_X] for pi in PORCENTAGENS])
+    assert lote.shape == escalar.shape
+    np.testing.assert_allclose(lote, escalar, rtol=0, atol=1e-12)
+
+def test_tabela_a4_lote_igual_a_escalar():
+    pavimentos = np.array([1, 2, 3, 4, 10])
+    p, n = np.meshgrid(PORCENTAGENS, pavimentos, indexing="ij")
+    lote = buscar_valor_tabela_simplificada_lote(p, n)
+    escalar = np.array([[buscar_valor_tabela_simplificada(pi, ni) for ni in pavimentos] for pi in PORCENTAGENS])
+    np.testing.assert_array_equal(lote, escalar)
+
+@pytest.mark.parametrize("pavimentos", [0, -1])
+def test_tabela_a4_lote_rejeita_pavimentos_invalidos(pavimentos):
+    with pytest.raises(KeyError):
+        buscar_valor_tabela_simplificada(30, pavimentos)
+    with pytest.raises(ValueError):
+        buscar_valor_tabela_simplificada_lote([30.0, 40.0], [2, pavimentos])
+
+def test_pavimentos_invalidos_nao_importam_fora_da_tabela_simplificada():
+    # A Tabela A.4 não é consultada para edificações grandes, como na versão escalar
+    edificacao = {"area": 2000.0, "altura": 20.0, "num_pavimentos": 0}
+    esperado = distancia_isolamento(10.0, 3.0, 6.0, edificacao)
+    assert distancias_isolamento_lote(10.0, 3.0, 6.0, 2000.0, 20.0, 0) == pytest.approx(esperado)
+
+def test_distancias_lote_igual_a_escalar():
+    rng = np.random.default_rng(7)
+    n = 400
+    larguras, alturas = rng.uniform(0.5, 60, n), rng.uniform(0.5, 40, n)
+    aberturas = rng.uniform(0, 1.2, n) * larguras * alturas
+    areas, alturas_edf = rng.choice([300.0, 750.0, 900.0], n), rng.choice([0.0, 9.0, 12.0, 30.0], n)
+    pavimentos = rng.integers(1, 6, n)
+    for bombeiros in ("Sim", "Não"):
+        lote = distancias_isolamento_lote(larguras, alturas, aberturas, areas, alturas_edf, pavimentos, bombeiros)
+        escalar = [
+            distancia_isolamento(l, a, ab, {"area": ar, "altura": h, "num_pavimentos": int(p)}, bombeiros)
+            for l, a, ab, ar, h, p in zip(larguras, alturas, aberturas, areas, alturas_edf, pavimentos)
+        ]
+        np.testing.assert_allclose(lote, escalar, rtol=0, atol=1e-12)
+
+
+# 🏘️ Matriz de todos os pares
+
+EDIFICACOES = [
+    {"nome": "A", "area": 500.0, "altura": 6.0, "num_pavimentos": 3},
+    {"nome": "B", "area": 2000.0, "altura": 20.0, "num_pavimentos": 7},
+    {"nome": "C", "area": 300.0, "altura": 0.0, "num_pavimentos": 1},
+]
+
+def test_matriz_isolamento_com_uma_fachada_por_edificacao():
+    from ppci.vetorizado import matriz_isolamento
+    larguras, alturas, aberturas = [10.0, 20.0, 5.0], [6.0, 21.0, 3.0], [12.0, 80.0, 2.0]
+    distancias, exigidas, violacoes = matriz_isolamento(EDIFICACOES, larguras, alturas, aberturas)
+    individuais = [distancia_isolamento(l, a, ab, e) for l, a, ab, e in zip(larguras, alturas, aberturas, EDIFICACOES)]
+    for i in range(3):
+        np.testing.assert_allclose(distancias[i], individuais[i])
+        assert np.isnan(exigidas[i, i])
+        for j in range(3):
+            if i != j:
+                assert exigidas[i, j] == pytest.approx(max(individuais[i], individuais[j]))
+    assert not violacoes.any()
+
+def test_matriz_isolamento_com_fachadas_por_par_e_espacamentos():
+    from ppci.vetorizado import matriz_isolamento, pares_em_violacao
+    larguras = np.full((3, 3), 10.0)
+    larguras[0, 1] = 30.0 # fachada de A voltada para B é maior
+    espacamentos = np.full((3, 3), np.nan)
+    espacamentos[1, 0] = 1.0 # informado só de um lado do par
+    espacamentos[0, 2] = 100.0
+    distancias, exigidas, violacoes = matriz_isolamento(EDIFICACOES, larguras, 3.0, 9.0, "Não", espacamentos)
+    assert distancias[0, 1] == pytest.approx(distancia_isolamento(30.0, 3.0, 9.0, EDIFICACOES[0], "Não"))
+    assert violacoes[0, 1] and violacoes[1, 0] and not violacoes[0, 2]
+    assert pares_em_violacao(["A", "B", "C"], exigidas, violacoes, espacamentos) == [("A", "B", exigidas[0, 1], 1.0)]
+
+def test_varredura_igual_a_distancia_escalar():
+    from ppci.vetorizado import varredura_isolamento
+    larguras, alturas, aberturas = [2.0, 10.0, 40.0], [3.0, 12.0], [0.0, 5.0, 24.0, 80.0]
+    for edificacao in ({"area": 5000.0, "altura": 30.0, "num_pavimentos": 10}, {"area": 500.0, "altura": 6.0, "num_pavimentos": 2}):
+        distancias = varredura_isolamento(larguras, alturas, aberturas, edificacao, "Não")
+        assert distancias.shape == (3, 2, 4)
+        for (i, largura), (j, altura), (k, abertura) in itertools.product(enumerate(larguras), enumerate(alturas), enumerate(aberturas)):
+            assert distancias[i, j, k] == pytest.approx(distancia_isolamento(largura, altura, abertura, edificacao, "Não"))
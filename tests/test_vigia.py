@@ -0,0 +1,87 @@
+import os
+
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+
+from ppci import vigia
+from ppci.vigia import atualizar, carregar_manifesto, linhas_resumo, processar, revisao_do_arquivo, sincronizar
+
+
+def gravar_checklist(caminho, edificacoes):
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(["nome", "area", "altura", "num_pavimentos", "tratamento", "edificacao_conjunta"])
+    for edificacao in edificacoes:
+        ws.append(list(edificacao))
+    wb.save(caminho)
+
+@pytest.fixture
+def pasta(tmp_path):
+    gravar_checklist(tmp_path / "checklistINC_Alfa-R00.xlsx", [("T1", 500, 6, 2, "Independente", None)])
+    gravar_checklist(tmp_path / "checklistINC_Alfa-R01.xlsx", [("T1", 900, 6, 2, "Independente", None), ("A1", 100, 0, 1, "Conjunta", "T1")])
+    (tmp_path / "sub").mkdir()
+    gravar_checklist(tmp_path / "sub" / "checklistINC_Beta.xlsx", [("B1", 2000, 30, 10, "Independente", None)])
+    (tmp_path / "sub" / "checklistINC_Ruim.xlsx").write_bytes(b"nao e um xlsx")
+    (tmp_path / "~$checklistINC_Alfa-R01.xlsx").write_bytes(b"lock do Excel")
+    return tmp_path
+
+def contar(pasta, manifesto):
+    return {k: v for k, v in atualizar(str(pasta), manifesto, processos=1).items() if v}
+
+
+def test_revisao_do_arquivo():
+    assert revisao_do_arquivo("checklistINC_X-R03.xlsx") == 3
+    assert revisao_do_arquivo("checklistINC_X.xlsx") is None
+
+def test_contagens_incrementais(pasta, monkeypatch):
+    manifesto = carregar_manifesto(str(pasta / "inexistente.json"))
+    assert contar(pasta, manifesto) == {"novos": 4}
+    assert manifesto["arquivos"]["sub/checklistINC_Ruim.xlsx"]["erro"]
+    assert contar(pasta, manifesto) == {"inalterados": 4}
+
+    beta = pasta / "sub" / "checklistINC_Beta.xlsx"
+    os.utime(beta, ns=(0, 10**18)) # tocado, mesmo conteúdo
+    assert contar(pasta, manifesto) == {"inalterados": 4}
+    assert manifesto["arquivos"]["sub/checklistINC_Beta.xlsx"]["mtime_ns"] == 10**18
+
+    gravar_checklist(beta, [("B1", 2000, 30, 10, "Independente", None), ("B2", 50, 3, 1, "Independente", None)])
+    assert contar(pasta, manifesto) == {"alterados": 1, "inalterados": 3}
+    assert len(manifesto["arquivos"]["sub/checklistINC_Beta.xlsx"]["linhas"]) == 2
+
+    # Regras novas: reavalia a partir das edificações guardadas, sem reler as planilhas válidas
+    manifesto["regras"] = "outra"
+    lidas = []
+    ler = vigia._ler_edificacoes
+    monkeypatch.setattr(vigia, "_ler_edificacoes", lambda conteudo: lidas.append(1) or ler(conteudo))
+    assert contar(pasta, manifesto) == {"reavaliados": 4}
+    assert len(lidas) == 1 # só a planilha com erro
+
+    (pasta / "checklistINC_Alfa-R00.xlsx").unlink()
+    assert contar(pasta, manifesto) == {"removidos": 1, "inalterados": 3}
+
+def test_registro_sem_hash_apos_falha_de_leitura(pasta):
+    manifesto = carregar_manifesto(str(pasta / "manifesto.json"))
+    atualizar(str(pasta), manifesto, processos=1)
+    # Leitura que falhou antes de calcular o hash (arquivo sumiu ou sem permissão)
+    registro = processar((str(pasta / "sumiu.xlsx"), "Beta", None))
+    assert "sha256" not in registro and registro["erro"].startswith("FileNotFoundError")
+    manifesto["arquivos"]["sub/checklistINC_Beta.xlsx"].pop("sha256")
+    manifesto["arquivos"]["sub/checklistINC_Beta.xlsx"]["tamanho"] = -1
+    assert contar(pasta, manifesto) == {"alterados": 1, "inalterados": 3}
+    assert manifesto["arquivos"]["sub/checklistINC_Beta.xlsx"]["sha256"]
+
+def test_resumo_usa_ultima_revisao_e_e_gravado(pasta):
+    saida = pasta / "resumo.xlsx"
+    manifesto, contagem = sincronizar(str(pasta), str(pasta / "manifesto.json"), str(saida), processos=1)
+    assert contagem["novos"] == 4
+    linhas = list(linhas_resumo(manifesto))
+    assert [(linha["arquivo"], linha["revisao"], linha["nome"]) for linha in linhas] == [
+        ("checklistINC_Alfa-R01.xlsx", "R01", "T1"), ("sub/checklistINC_Beta.xlsx", "", "B1"),
+    ]
+    assert linhas[0]["area_consolidada"] == 1000
+    assert len(list(linhas_resumo(manifesto, todas_revisoes=True))) == 3
+    assert openpyxl.load_workbook(saida).active.max_row == 3
+
+    _, contagem = sincronizar(str(pasta), str(pasta / "manifesto.json"), str(saida), processos=1)
+    assert contagem["inalterados"] == 4